@@ -0,0 +1,419 @@
+"""
+Zwischengespeicherter Kontostand und Positionen, fortgeschrieben aus Order-Antworten und dem
+Binance User-Data-Stream (executionReport/outboundAccountPosition für Spot, ORDER_TRADE_UPDATE/
+ACCOUNT_UPDATE für Futures).
+
+REST (fetch_balance/fetch_positions) dient nur noch dem periodischen Abgleich: bei verbundenem
+Stream alle config.ACCOUNT_RECONCILE_INTERVAL Sekunden, ohne Stream höchstens einmal pro
+config.UPDATE_INTERVAL. Nach einer Order wird die Position direkt aus der Order-Antwort
+übernommen statt nach einer Pause erneut abgefragt.
+
+Offline-Test mit aufgezeichneten Ereignissen:
+    config.ACCOUNT_STREAM_REPLAY_FILE = 'fixtures/binance_user_data_futures.jsonl'
+"""
+import asyncio
+import inspect
+import json
+import threading
+import time
+from colorama import Fore
+import exchange_handler
+import stream_ingestion
+import structured_logging
+import utils
+import config
+
+
+logger = structured_logging.get_logger(__name__)
+
+
+USER_STREAM_URL_SPOT = 'wss://stream.binance.com:9443/ws'
+USER_STREAM_URL_FUTURES_TESTNET = 'wss://stream.binancefuture.com/ws'
+LISTEN_KEY_KEEPALIVE_SECONDS = 30 * 60  # Binance verwirft den listenKey nach 60 Minuten ohne Keepalive
+
+
+def _market_id(symbol):
+    """'BTC/USDT' oder 'BTC/USDT:USDT' -> 'BTCUSDT' (Symbolformat der Stream-Ereignisse)"""
+    return symbol.split(':')[0].replace('/', '')
+
+
+class UserDataStreamSource:
+    """Live-Quelle: User-Data-Stream über einen listenKey (Spot oder Futures je nach config.USE_TESTNET)"""
+
+    def __init__(self, exchange):
+        self.exchange = exchange
+        self.listen_key = None
+        self.url = None
+
+    def _listen_key_request(self, action):
+        if config.USE_TESTNET:
+            method = {'create': 'fapiPrivatePostListenKey', 'keepalive': 'fapiPrivatePutListenKey'}[action]
+        else:
+            method = {'create': 'publicPostUserDataStream', 'keepalive': 'publicPutUserDataStream'}[action]
+        params = {} if action == 'create' or config.USE_TESTNET else {'listenKey': self.listen_key}
+        # Implizite API-Methoden von ccxt.async_support sind keine Coroutine-Funktionen,
+        # die AsyncExchangeBridge reicht sie daher ungewartet durch
+        response = getattr(self.exchange, method)(params)
+        if inspect.isawaitable(response):
+            response = self.exchange.run(response)
+        return response
+
+    def prepare(self, last_timestamp=None):
+        self.listen_key = self._listen_key_request('create')['listenKey']
+        base_url = USER_STREAM_URL_FUTURES_TESTNET if config.USE_TESTNET else USER_STREAM_URL_SPOT
+        self.url = f"{base_url}/{self.listen_key}"
+
+    async def _keepalive(self):
+        while True:
+            await asyncio.sleep(LISTEN_KEY_KEEPALIVE_SECONDS)
+            try:
+                await asyncio.to_thread(self._listen_key_request, 'keepalive')
+            except Exception as e:
+                utils.log_error(e, "Fehler beim Verlängern des listenKey")
+
+    async def messages(self):
+        keepalive = asyncio.create_task(self._keepalive())
+        try:
+            import aiohttp  # Erst beim Verbindungsaufbau laden (Importzeit beim Start)
+            async with aiohttp.ClientSession() as session:
+                async with session.ws_connect(self.url, heartbeat=20) as websocket:
+                    logger.info("User-Data-Stream verbunden.", extra={'color': Fore.GREEN})
+                    async for message in websocket:
+                        if message.type == aiohttp.WSMsgType.TEXT:
+                            data = json.loads(message.data)
+                            if data.get('e') == 'listenKeyExpired':
+                                break
+                            yield data
+                        elif message.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                            break
+        finally:
+            keepalive.cancel()
+
+
+class AccountState:
+    """
+    Kontostand und Positionen im Speicher. Ereignisse aus dem Stream-Thread und Order-Antworten
+    aus dem Bot-Thread aktualisieren denselben Zustand (durch einen Lock geschützt).
+    """
+
+    def __init__(self, symbols=None, source=None):
+        """
+        Parameters:
+        symbols: Symbole, deren Positionen abgeglichen werden (Standard: config.SYMBOL)
+        source: Ereignisquelle (Standard: UserDataStreamSource beim Start)
+        """
+        self.symbols = list(symbols or [config.SYMBOL])
+        self.source = source
+        self.futures = config.USE_TESTNET
+
+        self.balances = {}   # {Währung: {'free', 'used', 'total'}}
+        self.positions = {}  # {'BTCUSDT': {'size', 'entry_price', 'unrealized_pnl', 'liquidation_price', 'leverage'}}
+        self.orders = {}     # Letzter Stand der Orders aus dem Stream {Order-ID: {...}}
+
+        self.reconciled_at = None
+        self.updated_at = None
+        self.stream_connected = False
+        self.events_received = 0
+        self.rest_reconciliations = 0
+
+        self._dirty = True
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ---- Abgleich per REST ----
+
+    def _is_stale(self):
+        if self._dirty or self.reconciled_at is None:
+            return True
+        now = time.monotonic()
+        if self.stream_connected:
+            return now - self.reconciled_at > config.ACCOUNT_RECONCILE_INTERVAL
+        # Ohne Stream: höchstens ein Abgleich pro Zyklus, Order-Antworten zählen als aktuell
+        return now - max(self.reconciled_at, self.updated_at or 0) > config.UPDATE_INTERVAL
+
+    def reconcile(self, exchange):
+        """
+        Übernimmt Kontostand (und bei Futures die Positionen) per REST.
+
+        Returns:
+        bool: False bei Fehler (der bisherige Zustand bleibt erhalten)
+        """
+        try:
+            balance = exchange.fetch_balance()
+            positions = None
+            if self.futures:
+                positions = exchange.fetch_positions([_market_id(symbol) for symbol in self.symbols])
+        except Exception as e:
+            utils.log_error(e, "Fehler beim Abgleich von Kontostand und Positionen")
+            return False
+
+        with self._lock:
+            self.balances = {currency: {key: float(entry.get(key) or 0) for key in ('free', 'used', 'total')}
+                             for currency, entry in balance.items()
+                             if isinstance(entry, dict) and 'free' in entry and currency not in ('free', 'used', 'total', 'info')}
+            if positions is not None:
+                self.positions = {}
+                for symbol in self.symbols:
+                    size, info = exchange_handler._futures_position_from_api(positions, symbol, config.get_base_currency(symbol))
+                    self.positions[_market_id(symbol)] = {key: value for key, value in info.items() if key != 'type'}
+            self.reconciled_at = time.monotonic()
+            self._dirty = False
+            self.rest_reconciliations += 1
+        return True
+
+    def _ensure_fresh(self, exchange):
+        if exchange is not None and self._is_stale():
+            self.reconcile(exchange)
+
+    # ---- Zugriff aus dem Bot ----
+
+    def get_balance(self, exchange=None):
+        """
+        Kontostand im Format von fetch_balance (nur bei veraltetem Zustand per REST).
+
+        Returns:
+        dict: {Währung: {'free', 'used', 'total'}, 'free': {...}, 'used': {...}, 'total': {...}}
+        """
+        self._ensure_fresh(exchange)
+        with self._lock:
+            entries = {currency: dict(entry) for currency, entry in self.balances.items()}
+        balance = dict(entries)
+        for key in ('free', 'used', 'total'):
+            balance[key] = {currency: entry[key] for currency, entry in entries.items()}
+        return balance
+
+    def get_position(self, exchange, symbol):
+        """
+        Position im Format von exchange_handler.get_position (nur bei veraltetem Zustand per REST).
+
+        Returns:
+        tuple: (Positionsgröße, position_info)
+        """
+        if symbol not in self.symbols:
+            self.symbols.append(symbol)
+            self._dirty = True
+        self._ensure_fresh(exchange)
+        with self._lock:
+            if self.futures:
+                position = self.positions.get(_market_id(symbol))
+                if position is None:
+                    return 0, exchange_handler._empty_position_info()
+                size = position['size']
+                info = dict(position, type="LONG" if size > 0 else ("SHORT" if size < 0 else "KEINE"))
+                return size, info
+            # Spot: Position entspricht dem freien Guthaben der Basis-Währung
+            size = self.balances.get(config.get_base_currency(symbol), {}).get('free', 0)
+            info = exchange_handler._empty_position_info()
+            info.update({'size': size, 'type': "LONG" if size > 0 else "KEINE"})
+            return size, info
+
+    def invalidate(self):
+        """Erzwingt beim nächsten Zugriff einen Abgleich per REST"""
+        self._dirty = True
+
+    def apply_order(self, order, symbol):
+        """
+        Übernimmt eine ausgeführte Order aus der Order-Antwort. Fehlen Menge oder Preis
+        (z.B. Futures-Antwort mit Status NEW), wird beim nächsten Zugriff per REST abgeglichen.
+        Hat der User-Data-Stream die Ausführung bereits gemeldet, sind Kontostand und Position
+        schon aktuell - dann wird nur der noch nicht gemeldete Teil übernommen.
+
+        Returns:
+        bool: True wenn der Zustand aus der Antwort aktualisiert wurde
+        """
+        filled = float(order.get('filled') or 0) if order else 0
+        price = float(order.get('average') or order.get('price') or 0) if order else 0
+        if filled <= 0 or price <= 0:
+            self.invalidate()
+            return False
+
+        side = order.get('side')
+        base_currency = config.get_base_currency(symbol)
+        quote_currency = config.get_quote_currency(symbol)
+        fee = order.get('fee') or {}
+        fee_cost = float(fee.get('cost') or 0)
+        with self._lock:
+            reported = self.orders.get(str(order.get('id')), {}).get('filled', 0)
+            if reported >= filled:
+                self.updated_at = time.monotonic()
+                return True
+            if reported > 0:
+                # Teilausführung schon per Stream übernommen: nur den Rest fortschreiben
+                share = (filled - reported) / filled
+                filled, fee_cost = filled - reported, fee_cost * share
+                order = dict(order, cost=float(order.get('cost') or 0) * share or None)
+            if self.futures:
+                realized = self._fill_future(_market_id(symbol), filled if side == 'buy' else -filled, price)
+                quote = self.balances.setdefault(quote_currency, {'free': 0.0, 'used': 0.0, 'total': 0.0})
+                quote['total'] += realized - (fee_cost if fee.get('currency') in (None, quote_currency) else 0)
+                self._update_futures_margin(quote_currency)
+            else:
+                cost = float(order.get('cost') or filled * price)
+                base = self.balances.setdefault(base_currency, {'free': 0.0, 'used': 0.0, 'total': 0.0})
+                quote = self.balances.setdefault(quote_currency, {'free': 0.0, 'used': 0.0, 'total': 0.0})
+                base_delta, quote_delta = (filled, -cost) if side == 'buy' else (-filled, cost)
+                if fee.get('currency') == base_currency:
+                    base_delta -= fee_cost
+                elif fee.get('currency') == quote_currency:
+                    quote_delta -= fee_cost
+                for entry, delta in ((base, base_delta), (quote, quote_delta)):
+                    entry['free'] += delta
+                    entry['total'] += delta
+            self.updated_at = time.monotonic()
+        return True
+
+    def _fill_future(self, market_id, delta, price):
+        """
+        Fortschreiben einer Futures-Position (One-Way-Modus) wie die Exchange.
+
+        Returns:
+        float: Realisierter Gewinn/Verlust beim Reduzieren oder Schließen
+        """
+        position = self.positions.setdefault(market_id, {key: value for key, value in exchange_handler._empty_position_info().items() if key != 'type'})
+        size = position['size']
+        new_size = size + delta
+        realized = 0.0
+        if size != 0 and (delta > 0) != (size > 0):
+            realized = min(abs(delta), abs(size)) * (price - position['entry_price']) * (1 if size > 0 else -1)
+        if abs(new_size) < 1e-12:
+            position['size'], position['entry_price'] = 0.0, 0.0
+        elif size == 0 or (new_size > 0) != (size > 0):
+            # Neue Position bzw. Seitenwechsel
+            position['size'], position['entry_price'] = new_size, price
+        elif abs(new_size) > abs(size):
+            # Aufstocken: Durchschnittlicher Einstiegspreis
+            position['entry_price'] = (abs(size) * position['entry_price'] + abs(delta) * price) / abs(new_size)
+            position['size'] = new_size
+        else:
+            position['size'] = new_size
+        return realized
+
+    def _update_futures_margin(self, quote_currency):
+        """Freies Guthaben = Wallet-Guthaben abzüglich gebundener Margin der Positionen"""
+        quote = self.balances.setdefault(quote_currency, {'free': 0.0, 'used': 0.0, 'total': 0.0})
+        used = sum(abs(position['size']) * position['entry_price'] / (position.get('leverage') or 1)
+                   for market_id, position in self.positions.items() if market_id.endswith(quote_currency))
+        quote['used'] = used
+        quote['free'] = quote['total'] - used
+
+    # ---- Stream-Ereignisse ----
+
+    def handle_message(self, message):
+        """Verarbeitet ein User-Data-Ereignis (Rohformat oder kombiniert {'stream': ..., 'data': ...})"""
+        data = message.get('data', message)
+        event = data.get('e')
+        with self._lock:
+            if event == 'outboundAccountPosition':
+                for entry in data.get('B', []):
+                    free, locked = float(entry['f']), float(entry['l'])
+                    self.balances[entry['a']] = {'free': free, 'used': locked, 'total': free + locked}
+            elif event == 'ACCOUNT_UPDATE':
+                account = data.get('a', {})
+                for entry in account.get('P', []):
+                    if entry.get('ps', 'BOTH') != 'BOTH':
+                        continue  # Hedge-Modus wird vom Bot nicht verwendet
+                    position = self.positions.setdefault(entry['s'], {key: value for key, value in exchange_handler._empty_position_info().items() if key != 'type'})
+                    position['size'] = float(entry['pa'])
+                    position['entry_price'] = float(entry['ep'])
+                    position['unrealized_pnl'] = float(entry.get('up', 0))
+                for entry in account.get('B', []):
+                    balance = self.balances.setdefault(entry['a'], {'free': 0.0, 'used': 0.0, 'total': 0.0})
+                    balance['total'] = float(entry['wb'])
+                    self._update_futures_margin(entry['a'])
+            elif event in ('executionReport', 'ORDER_TRADE_UPDATE'):
+                order = data['o'] if event == 'ORDER_TRADE_UPDATE' else data
+                self.orders[str(order['i'])] = {
+                    'symbol': order['s'],
+                    'side': order['S'].lower(),
+                    'status': order['X'],
+                    'filled': float(order['z']),
+                    'last_price': float(order.get('L', 0))
+                }
+            else:
+                return
+            self.events_received += 1
+            self.updated_at = time.monotonic()
+
+    # ---- Stream-Thread ----
+
+    async def _consume(self):
+        retry_delay = 1
+        while not self._stop.is_set():
+            try:
+                self.source.prepare(None)
+                async for message in self.source.messages():
+                    if self._stop.is_set():
+                        return
+                    self.stream_connected = True
+                    self.handle_message(message)
+                    retry_delay = 1
+                if isinstance(self.source, stream_ingestion.FixtureStreamSource):
+                    logger.info("User-Data-Aufzeichnung vollständig abgespielt (%s Ereignisse).", self.events_received, extra={'color': Fore.CYAN})
+                    self.stream_connected = False
+                    return
+            except Exception as e:
+                utils.log_error(e, "Fehler im User-Data-Stream")
+            # Verpasste Ereignisse: bis zur Wiederverbindung gilt der Zustand als veraltet
+            self.stream_connected = False
+            self._dirty = True
+            logger.warning("User-Data-Stream getrennt. Neuer Verbindungsversuch in %s Sekunden...", retry_delay)
+            await asyncio.sleep(retry_delay)
+            retry_delay = min(retry_delay * 2, 60)
+
+    def start(self, exchange):
+        """Gleicht einmal per REST ab und startet den User-Data-Stream in einem eigenen Thread"""
+        self.reconcile(exchange)
+        if not config.ACCOUNT_USER_STREAM and not config.ACCOUNT_STREAM_REPLAY_FILE:
+            return
+        if self.source is None:
+            if config.ACCOUNT_STREAM_REPLAY_FILE:
+                self.source = stream_ingestion.FixtureStreamSource(config.ACCOUNT_STREAM_REPLAY_FILE, config.STREAM_REPLAY_SPEED)
+            elif hasattr(exchange, 'fetch2') or hasattr(exchange, 'exchange'):
+                self.source = UserDataStreamSource(exchange)
+            else:
+                return  # z.B. MockExchange: nur Order-Antworten und REST-Abgleich
+        self._thread = threading.Thread(target=lambda: asyncio.run(self._consume()), name="user-data-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+# Globale Instanz
+_account_state = None
+
+def get_account_state():
+    """Singleton-Zugriff auf den AccountState"""
+    global _account_state
+    if _account_state is None:
+        _account_state = AccountState()
+    return _account_state
+
+
+def start_account_state(exchange, symbols=None):
+    """
+    Initialisiert den Kontozustand per REST und startet den User-Data-Stream.
+
+    Returns:
+    AccountState: Laufende Instanz
+    """
+    global _account_state
+    _account_state = AccountState(symbols)
+    _account_state.start(exchange)
+    return _account_state
+
+
+def position_after_trade(exchange, order, symbol, account=None):
+    """
+    Position nach einer ausgeführten Order: aus der Order-Antwort, wenn ein AccountState aktiv ist,
+    sonst wie bisher nach kurzer Pause per REST.
+
+    Returns:
+    tuple: (Positionsgröße, position_info)
+    """
+    if account is None:
+        time.sleep(1)  # Kurze Pause für API-Synchronisation
+        return exchange_handler.get_position(exchange, symbol)
+    account.apply_order(order, symbol)
+    return account.get_position(exchange, symbol)
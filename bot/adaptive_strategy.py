@@ -1,10 +1,14 @@
+import logging
 import os
 import pandas as pd
 import numpy as np
-from datetime import datetime
-from colorama import Fore, Style
 import utils
+import analysis_cache
 import config
+import structured_logging
+
+
+logger = structured_logging.get_logger(__name__)
 
 class AdaptiveStrategy:
     """
@@ -105,6 +109,11 @@ class AdaptiveStrategy:
         if len(df) < 20:  # Benötigen mindestens 20 Datenpunkte für vernünftige Analyse
             return 'unknown'
         
+        # Einmal pro abgeschlossener Kerze berechnen (analysis_cache.py)
+        return analysis_cache.get_analysis_cache().get_or_compute('adaptive_regime', df, self._detect_market_regime)
+    
+    def _detect_market_regime(self, df):
+        """Marktregime der abgeschlossenen Kerzen (siehe detect_market_regime)"""
         # Preisdynamik der letzten Perioden analysieren
         recent_df = df.tail(20)
         
@@ -148,8 +157,8 @@ class AdaptiveStrategy:
         else:
             regime = 'ranging'  # Standardfall: Seitwärtsbewegung
         
-        print(f"{Fore.CYAN}[{datetime.now().strftime('%H:%M:%S')}] Erkanntes Marktregime: {regime.upper()} "
-              f"(Preisänderung: {price_change*100:.2f}%, Volatilität: {volatility*100:.2f}%){Style.RESET_ALL}")
+        logger.info("Erkanntes Marktregime: %s (Preisänderung: %.2f%%, Volatilität: %.2f%%)",
+                    regime.upper(), price_change*100, volatility*100)
         
         return regime
     
@@ -166,7 +175,7 @@ class AdaptiveStrategy:
         # Erhöhe die Mindestanzahl an benötigten Datenpunkten
         if len(df) < self.lookback_period + 10:  # Erhöhter Puffer
             # Nicht genügend Daten, Standardgewichte verwenden
-            print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Nicht genügend Daten für Strategiebewertung. Verwende Standardgewichte.{Style.RESET_ALL}")
+            logger.info("Nicht genügend Daten für Strategiebewertung. Verwende Standardgewichte.")
             return {strat: 0.5 for strat in self.available_strategies}
         
         evaluations = {}
@@ -175,52 +184,32 @@ class AdaptiveStrategy:
         current_price = df['close'].iloc[-1]
         historical_prices = df['close'].iloc[-self.lookback_period-5:-5].values
         
-        for strategy_name, strategy_func in self.available_strategies.items():
-            if strategy_func is None:
-                self.setup_strategies()
-                strategy_func = self.available_strategies[strategy_name]
-            
-            # Berechne hypothetische Handelssignale für die letzten N Perioden
-            strategy_signals = []
+        import strategies
+        
+        # Fenstergrenzen der historischen Simulation: df.iloc[-(lookback+5-i):-5+i]
+        # (Fenster mit weniger als 3 Kerzen werden übersprungen)
+        n = len(df)
+        offsets = np.arange(len(historical_prices) - 4)
+        window_starts = n - (self.lookback_period + 5 - offsets)
+        window_stops = np.where(offsets - 5 < 0, n + offsets - 5, np.minimum(offsets - 5, n))
+        window_ends = window_stops[window_stops - window_starts >= 3] - 1
+        
+        # Preisänderungen der Perioden 1 .. N-2 (Rendite der Periode i+1 gegenüber i)
+        price_changes = (historical_prices[2:] - historical_prices[1:-1]) / historical_prices[1:-1]
+        
+        for strategy_name in self.available_strategies:
+            # Signale aller Fenster in einem vektorisierten Durchlauf berechnen
             try:
-                for i in range(len(historical_prices) - 4):
-                    # Stelle sicher, dass das temporäre DataFrame genügend Daten für die Strategie hat
-                    temp_df = df.iloc[-(self.lookback_period+5-i):-5+i].copy()
-                    
-                    # Überspringe, wenn temp_df zu klein für sinnvolle Analyse ist
-                    if len(temp_df) < 3:  # Stelle sicher, dass mindestens 3 Datenpunkte vorhanden sind
-                        continue
-                        
-                    # Füge einen try-except-Block hinzu, um potenzielle Fehler in der Strategiefunktion zu behandeln
-                    try:
-                        signal, _ = strategy_func(temp_df)
-                        strategy_signals.append(signal)
-                    except Exception as e:
-                        print(f"{Fore.RED}Fehler bei Strategieausführung {strategy_name}: {str(e)}{Style.RESET_ALL}")
-                        continue
+                strategy_signals = strategies.get_signal_series(df, strategy_name)[window_ends]
             except Exception as e:
-                print(f"{Fore.RED}Fehler bei Strategiebewertung {strategy_name}: {str(e)}{Style.RESET_ALL}")
+                logger.error("Fehler bei Strategiebewertung %s: %s", strategy_name, e)
                 evaluations[strategy_name] = 0.5  # Neutraler Wert bei Fehler
                 continue
                 
             # Berechne hypothetische Renditen basierend auf den Signalen
-            returns = []
-            position = 0
-            
-            for i, signal in enumerate(strategy_signals[:-1]):
-                if i == 0:
-                    continue
-                
-                # Position aktualisieren basierend auf Signal
-                if signal == 1 and position <= 0:  # Kaufsignal
-                    position = 1
-                elif signal == -1 and position >= 0:  # Verkaufssignal
-                    position = -1
-                
-                # Berechne Rendite für diese Periode
-                price_change = (historical_prices[i+1] - historical_prices[i]) / historical_prices[i]
-                strategy_return = position * price_change  # Positive Rendite bei korrekter Richtung
-                returns.append(strategy_return)
+            # (das erste Signal wird übersprungen, das letzte hat keine Folgeperiode)
+            positions = strategies.hold_positions(strategy_signals[1:-1])
+            returns = (positions * price_changes[:len(positions)]).tolist()
             
             # Berechne Gesamtrendite und Trefferquote
             if returns:
@@ -256,7 +245,7 @@ class AdaptiveStrategy:
         """
         # Überprüfe, ob ausreichend Daten vorhanden sind
         if len(df) < 20:  # Mindestanzahl an Daten für zuverlässige Regimeerkennung
-            print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Nicht genügend Daten für Regimeerkennung, verwende Standardstrategie.{Style.RESET_ALL}")
+            logger.info("Nicht genügend Daten für Regimeerkennung, verwende Standardstrategie.")
             return 'MULTI_INDICATOR'  # Standardstrategie als Fallback
             
         # Marktregime erkennen
@@ -279,11 +268,12 @@ class AdaptiveStrategy:
         # Beste Strategie auswählen
         best_strategy = max(combined_scores.items(), key=lambda x: x[1])[0]
         
-        # Debug-Ausgabe
-        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Strategie-Auswahl:{Style.RESET_ALL}")
-        for strategy, score in combined_scores.items():
-            selected_marker = " ◀ AUSGEWÄHLT" if strategy == best_strategy else ""
-            print(f"  {strategy}: {score:.2f}{selected_marker}")
+        # Debug-Ausgabe (nur aufbauen, wenn INFO aktiv ist)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Strategie-Auswahl:")
+            for strategy, score in combined_scores.items():
+                selected_marker = " ◀ AUSGEWÄHLT" if strategy == best_strategy else ""
+                logger.info("  %s: %.2f%s", strategy, score, selected_marker)
         
         # Speichere die aktuelle Strategie
         self.current_strategy = best_strategy
@@ -293,7 +283,7 @@ class AdaptiveStrategy:
             self.save_strategy_changes()
 
             # Log von Strategie-Scores für Debugging
-        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Strategie-Auswahl:{Style.RESET_ALL}")
+        logger.info("Strategie-Auswahl:")
         
         return best_strategy
     
@@ -361,7 +351,7 @@ class AdaptiveStrategy:
             
         except Exception as e:
             utils.log_error(e, "Fehler bei der Ausführung der adaptiven Strategie")
-            print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] Fehler bei adaptiver Strategie: {str(e)}{Style.RESET_ALL}")
+            logger.error("Fehler bei adaptiver Strategie: %s", e)
             
             # Fallback auf einfachste Strategie im Fehlerfall
             info = {
@@ -1,11 +1,17 @@
+import logging
 import pandas as pd
 import numpy as np
 from datetime import datetime
 import math
-from sklearn.cluster import KMeans
-from scipy import stats
-import matplotlib.pyplot as plt
-from colorama import Fore, Style
+from colorama import Fore
+import latency
+import analysis_cache
+import regime_features
+import chart_patterns
+import structured_logging
+
+
+logger = structured_logging.get_logger(__name__)
 
 class MarketRegimeDetector:
     """
@@ -91,6 +97,9 @@ class MarketRegimeDetector:
                 'MULTI_INDICATOR': 0.7
             }
         }
+        
+        # Rollende Regime-Merkmale (regime_features.py), wird beim ersten Aufruf angelegt
+        self.feature_window = None
 
     def detect_regime(self, df, lookback_period=50):
         """
@@ -107,7 +116,7 @@ class MarketRegimeDetector:
         min_required_data = max(20, lookback_period // 2)  # Mindestens 20 Datenpunkte oder die Hälfte
         
         if len(df) < min_required_data:
-            print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Warnung: Unzureichende Daten für Regimeerkennung. Benötigt {lookback_period}, hat {len(df)}. Verwende adaptive Analyse.{Style.RESET_ALL}")
+            logger.warning("Unzureichende Daten für Regimeerkennung. Benötigt %s, hat %s. Verwende adaptive Analyse.", lookback_period, len(df))
             
             # Statt einen festen Standardwert zu verwenden, analysieren wir die verfügbaren Daten
             if len(df) < 5:  # Bei extrem wenigen Daten
@@ -125,10 +134,10 @@ class MarketRegimeDetector:
                 return 'ranging_narrow'
         
         # Ab hier normales Verfahren mit ausreichend Daten
-        recent_df = df.tail(lookback_period).copy()
+        features = self._regime_features(df, lookback_period)
         
         # Adaptive Schwellenwerte basierend auf historischer Volatilität
-        price_volatility = recent_df['close'].pct_change().std() * np.sqrt(lookback_period)
+        price_volatility = features['price_volatility']
         
         # Berechne adaptive Schwellenwerte basierend auf Marktbedingungen
         trend_threshold = max(0.5 * price_volatility, 0.01)  # Mindestens 1%
@@ -138,79 +147,59 @@ class MarketRegimeDetector:
         range_threshold_wide = max(1.2 * price_volatility, 0.04)  # Mindestens 4%
         
         # Feature 1: Trendstärke und -richtung mit adaptiven Schwellenwerten
-        price_change = (recent_df['close'].iloc[-1] - recent_df['close'].iloc[0]) / recent_df['close'].iloc[0]
-        linear_reg = stats.linregress(range(len(recent_df)), recent_df['close'].values)
-        trend_strength = abs(linear_reg.slope) / np.mean(recent_df['close'])
-        r_squared = linear_reg.rvalue ** 2
-        
-        # Feature 2: Volatilität mit adaptiven Schwellenwerten
-        if 'atr' in recent_df.columns:
-            volatility = recent_df['atr'].mean() / recent_df['close'].mean()
-        else:
-            returns = recent_df['close'].pct_change().dropna()
-            volatility = returns.std()
-        
-        # Feature 3: Seitwärtsbewegung (Range-Erkennung) mit adaptiven Schwellenwerten
-        if 'bb_width' in recent_df.columns:
-            bb_width_avg = recent_df['bb_width'].mean()
-            # Normalisiere bb_width basierend auf historischen Daten
-            bb_width_percentile = np.percentile(recent_df['bb_width'].dropna(), [25, 50, 75])
-            is_narrow_range = bb_width_avg < bb_width_percentile[0]  # Unterste 25%
-            is_wide_range = bb_width_avg > bb_width_percentile[2]    # Oberste 25%
-        else:
-            recent_df['high_low_ratio'] = (recent_df['high'] - recent_df['low']) / recent_df['close']
-            high_low_percentile = np.percentile(recent_df['high_low_ratio'].dropna(), [25, 50, 75])
-            is_narrow_range = recent_df['high_low_ratio'].mean() < high_low_percentile[0]
-            is_wide_range = recent_df['high_low_ratio'].mean() > high_low_percentile[2]
+        price_change = features['price_change']
+        trend_strength = features['trend_strength']
+        r_squared = features['r_squared']
+        
+        # Feature 2: Volatilität mit adaptiven Schwellenwerten (ATR oder Renditen)
+        volatility = features['volatility']
+        
+        # Feature 3: Seitwärtsbewegung (Range-Erkennung) über die Bollinger-Bandbreite bzw. Hoch/Tief-Spanne
+        range_percentiles = features['range_percentiles']
+        is_narrow_range = features['range_avg'] < range_percentiles[0]  # Unterste 25%
+        is_wide_range = features['range_avg'] > range_percentiles[2]    # Oberste 25%
         
         # Feature 4: Volumen-Analyse (falls verfügbar) mit adaptiver Normalisierung
-        if 'volume' in recent_df.columns and not recent_df['volume'].isna().all():
-            recent_df['volume_sma'] = recent_df['volume'].rolling(window=10).mean()
-            # Normalisiere Volumen
-            norm_volume = recent_df['volume'] / recent_df['volume'].mean()
-            recent_volume = norm_volume.iloc[-5:].mean() 
-            volume_trend = (recent_volume / norm_volume.mean()) - 1
-            volume_spike = recent_df['volume'].iloc[-1] > 2 * recent_df['volume_sma'].iloc[-1]
-        else:
-            volume_trend = 0
-            volume_spike = False
+        volume_trend = features['volume_trend']
+        volume_spike = features['volume_spike']
         
         # Feature 5: Momentum mit adaptiven Schwellenwerten
-        if 'rsi' in recent_df.columns and not recent_df['rsi'].isna().all():
-            rsi_latest = recent_df['rsi'].iloc[-1]
+        if features['rsi_latest'] is not None:
+            rsi_latest = features['rsi_latest']
             # Adaptive RSI-Schwellenwerte basierend auf historischer RSI-Verteilung
-            rsi_percentiles = np.percentile(recent_df['rsi'].dropna(), [10, 30, 70, 90])
+            rsi_percentiles = features['rsi_percentiles']
             rsi_extreme_low = rsi_latest < rsi_percentiles[0]  # Unterste 10%
             rsi_extreme_high = rsi_latest > rsi_percentiles[3]  # Oberste 10%
             rsi_extreme = rsi_extreme_low or rsi_extreme_high
         else:
             # Alternatives Momentum-Maß mit adaptiven Schwellenwerten
-            momentum = recent_df['close'].diff(5).iloc[-1] / recent_df['close'].iloc[-6] if len(recent_df) > 6 else 0
+            momentum = features['momentum']
             momentum_threshold = max(1.2 * price_volatility, 0.03)
             rsi_extreme = abs(momentum) > momentum_threshold
         
         # Feature 6: Erkennung potenzieller Ausbrüche mit adaptiven Schwellenwerten
-        if 'bb_upper' in recent_df.columns and 'bb_lower' in recent_df.columns:
+        close = features['close']
+        if features['band_percentiles'] is not None:
             # Adaptive Nähe zu Bollinger Bändern
-            band_distance = (recent_df['bb_upper'] - recent_df['bb_lower']) / recent_df['close']
-            band_distance_pct = np.percentile(band_distance.dropna(), [10, 90])
+            band_distance_pct = features['band_percentiles']
             
             near_upper_threshold = 1 - (band_distance_pct[0] / 2)  # Näher am oberen Band
             near_lower_threshold = 1 + (band_distance_pct[0] / 2)  # Näher am unteren Band
             
-            near_upper = recent_df['close'].iloc[-1] > near_upper_threshold * recent_df['bb_upper'].iloc[-1]
-            near_lower = recent_df['close'].iloc[-1] < near_lower_threshold * recent_df['bb_lower'].iloc[-1]
+            near_upper = close > near_upper_threshold * features['bb_upper']
+            near_lower = close < near_lower_threshold * features['bb_lower']
             breakout_potential = near_upper or near_lower
         else:
             # Alternative Ausbruchs-Erkennung mit adaptiven Schwellenwerten
-            recent_high = recent_df['high'].max()
-            recent_low = recent_df['low'].min()
-            price_range = (recent_high - recent_low) / np.mean(recent_df['close'])
+            recent_high = features['recent_high']
+            recent_low = features['recent_low']
+            mean_close = features['mean_close']
+            price_range = (recent_high - recent_low) / mean_close
             range_percentile = max(0.03, price_range * 0.9)
             
             close_to_extreme = (
-                (recent_df['close'].iloc[-1] > recent_high - (range_percentile * recent_df['close'].mean())) or 
-                (recent_df['close'].iloc[-1] < recent_low + (range_percentile * recent_df['close'].mean()))
+                (close > recent_high - (range_percentile * mean_close)) or 
+                (close < recent_low + (range_percentile * mean_close))
             )
             breakout_potential = close_to_extreme and (is_narrow_range or volatility < volatility_threshold_low)
         
@@ -236,83 +225,91 @@ class MarketRegimeDetector:
             else:
                 regime = 'weak_downtrend'
         
-        # Debug-Ausgabe
-        print(f"{Fore.CYAN}[{datetime.now().strftime('%H:%M:%S')}] Market Regime Analysis:{Style.RESET_ALL}")
-        print(f"  Price Change: {price_change*100:.2f}% (Threshold: {trend_threshold*100:.2f}%)")
-        print(f"  Trend Strength: {trend_strength*1000:.2f} (R² = {r_squared:.2f})")
-        print(f"  Volatility: {volatility*100:.2f}% (High: {volatility_threshold_high*100:.2f}%, Low: {volatility_threshold_low*100:.2f}%)")
-        print(f"  Range Type: {'Narrow' if is_narrow_range else ('Wide' if is_wide_range else 'Medium')}")
-        print(f"  Breakout Potential: {breakout_potential}")
-        print(f"  Detected Regime: {regime.upper()} - {self.regimes[regime]['description']}")
+        # Debug-Ausgabe (nur aufbauen, wenn INFO aktiv ist)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Market Regime Analysis:", extra={'color': Fore.CYAN})
+            logger.info("  Price Change: %.2f%% (Threshold: %.2f%%)", price_change * 100, trend_threshold * 100)
+            logger.info("  Trend Strength: %.2f (R² = %.2f)", trend_strength * 1000, r_squared)
+            logger.info("  Volatility: %.2f%% (High: %.2f%%, Low: %.2f%%)", volatility * 100, volatility_threshold_high * 100, volatility_threshold_low * 100)
+            logger.info("  Range Type: %s", 'Narrow' if is_narrow_range else ('Wide' if is_wide_range else 'Medium'))
+            logger.info("  Breakout Potential: %s", breakout_potential)
+            logger.info("  Detected Regime: %s - %s", regime.upper(), self.regimes[regime]['description'])
         
         return regime
 
+    def _regime_features(self, df, lookback_period):
+        """
+        Regime-Merkmale der letzten lookback_period Kerzen. Mit timestamp-Spalte aus dem rollenden
+        Fenster (nur neue bzw. geänderte Kerzen werden verarbeitet), sonst vollständig berechnet.
+        """
+        if 'timestamp' in df.columns:
+            if self.feature_window is None or self.feature_window.lookback_period != lookback_period:
+                self.feature_window = regime_features.RegimeFeatureWindow(lookback_period)
+            try:
+                self.feature_window.update(df)
+                return self.feature_window.features()
+            except ValueError:
+                # Fehlende Kursdaten oder Zeitstempel: vollständige Berechnung
+                self.feature_window.reset()
+        return regime_features.compute_regime_features(df.tail(lookback_period), lookback_period)
+
 class MarketPatternRecognizer:
     """
     Erkennt häufige Chartmuster und -formationen in den Marktdaten.
     """
     
+    PATTERN_NAMES = {
+        'double_top': 'Double Top',
+        'double_bottom': 'Double Bottom',
+        'head_and_shoulders': 'Head and Shoulders',
+        'reverse_head_and_shoulders': 'Reverse Head and Shoulders',
+        'triangle': 'Triangle',
+        'flag': 'Flag',
+        'wedge': 'Wedge'
+    }
+    
     def __init__(self):
-        self.patterns = {
-            'double_top': 0,
-            'double_bottom': 0,
-            'head_and_shoulders': 0,
-            'reverse_head_and_shoulders': 0,
-            'triangle': 0,
-            'flag': 0,
-            'wedge': 0
-        }
+        self.patterns = dict.fromkeys(chart_patterns.PATTERNS, 0)
         self.confidence_threshold = 0.65  # Mindestvertrauen für Mustererkennung
     
+    def _scan(self, df, lookback):
+        """Musterkonfidenzen für die letzten lookback Kerzen (ein Durchlauf über den Pivot-Index)"""
+        recent = df.tail(lookback)
+        return chart_patterns.scan_patterns(recent['high'], recent['low'], recent['close'], lookback)
+
     def detect_double_top(self, df, lookback=30):
         """Erkennt Double-Top-Formationen"""
         if len(df) < lookback:
             return False, 0
         
-        # Einfache Implementierung - suche nach zwei Hochs in ähnlicher Höhe
-        recent = df.tail(lookback)
-        
-        # Finde lokale Maxima
-        recent['is_local_max'] = (recent['high'] > recent['high'].shift(1)) & (recent['high'] > recent['high'].shift(-1))
-        local_maxima = recent[recent['is_local_max']]['high'].values
-        
-        if len(local_maxima) < 2:
-            return False, 0
-        
-        # Prüfe auf zwei ähnliche Hochs mit einem Tal dazwischen
-        for i in range(len(local_maxima) - 1):
-            if abs(local_maxima[i] - local_maxima[i+1]) / local_maxima[i] < 0.02:  # Ähnliche Höhe (2% Toleranz)
-                # Finde das Minimum zwischen den beiden Maxima
-                idx1 = recent[recent['high'] == local_maxima[i]].index[0]
-                idx2 = recent[recent['high'] == local_maxima[i+1]].index[0]
-                
-                if idx2 - idx1 > 3:  # Genügend Abstand zwischen den Hochs
-                    between_min = recent.loc[idx1:idx2, 'low'].min()
-                    max_avg = (local_maxima[i] + local_maxima[i+1]) / 2
-                    
-                    # Genügend Tal zwischen den Hochs?
-                    if (max_avg - between_min) / max_avg > 0.03:  # Mindestens 3% Preisunterschied
-                        confidence = min(1.0, (max_avg - between_min) / max_avg * 10)  # Konfidenz basierend auf Tiefe des Tals
-                        return True, confidence
-        
-        return False, 0
+        # Zwei ähnliche Hochs (2% Toleranz) mit mindestens 3% Tal dazwischen
+        confidence = float(self._scan(df, lookback)['double_top'][-1])
+        return confidence > 0, confidence
     
-    def detect_patterns(self, df):
+    def detect_patterns(self, df, lookback=30):
         """Erkennt verschiedene Chartmuster in den Daten"""
-        # Hier würde eine komplexere Implementierung für alle Muster stehen
-        # Für dieses Beispiel verwenden wir nur die Double-Top-Erkennung
-        
-        self.patterns['double_top'] = 0
-        double_top_detected, confidence = self.detect_double_top(df)
+        self.patterns = dict.fromkeys(chart_patterns.PATTERNS, 0)
+        if len(df) < lookback:
+            return {}
         
-        if double_top_detected and confidence > self.confidence_threshold:
-            self.patterns['double_top'] = confidence
-            print(f"{Fore.MAGENTA}[PATTERN] Double Top erkannt (Konfidenz: {confidence:.2f}){Style.RESET_ALL}")
-            
-        # Für andere Muster würden hier ähnliche Erkennungsfunktionen aufgerufen
+        # Alle Muster aus einem gemeinsamen Pivot-Index
+        for name, values in self._scan(df, lookback).items():
+            confidence = float(values[-1])
+            if confidence > self.confidence_threshold:
+                self.patterns[name] = confidence
+                logger.debug("[PATTERN] %s erkannt (Konfidenz: %.2f)", self.PATTERN_NAMES[name], confidence, extra={'color': Fore.MAGENTA})
         
         # Rückgabeformat: {pattern_name: confidence}
         return {k: v for k, v in self.patterns.items() if v > self.confidence_threshold}
+    
+    def scan_history(self, df, lookback=30):
+        """
+        Musterkonfidenzen für jede Kerze der gesamten Historie (ohne Blick in die Zukunft).
+        
+        Returns:
+        DataFrame: Eine Spalte pro Muster, gleicher Index wie df
+        """
+        return chart_patterns.scan_dataframe(df, lookback)
 
 class VolumeAnalyzer:
     """
@@ -403,6 +400,7 @@ class AdvancedMarketAnalysis:
         # Analytische Ergebnisse
         self.current_analysis = {}
         
+    @latency.timed('regime')
     def analyze(self, df):
         """
         Führt eine vollständige Marktanalyse durch.
@@ -416,16 +414,28 @@ class AdvancedMarketAnalysis:
         if len(df) < 30:
             return {'regime': 'insufficient_data', 'confidence': 0}
         
-        # 1. Erkenne Marktregime
-        current_regime = self.regime_detector.detect_regime(df)
+        # Regime, Muster und Volumen nur einmal pro abgeschlossener Kerze berechnen (geteilt mit
+        # den anderen Strategie-Instanzen); Ergänzungen der Aufrufer landen in einer eigenen Kopie
+        combined_analysis = dict(analysis_cache.get_analysis_cache().get_or_compute('market_analysis', df, self._analyze_bars))
+        current_regime = combined_analysis['regime']
         
         # Erkenne Regimewechsel
         if self.previous_regime is not None and current_regime != self.previous_regime:
             self.regime_change_time = datetime.now()
-            print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Marktregime-Wechsel: {self.previous_regime} -> {current_regime}{Style.RESET_ALL}")
+            logger.info("Marktregime-Wechsel: %s -> %s", self.previous_regime, current_regime, extra={'color': Fore.YELLOW})
         
         self.previous_regime = current_regime
         
+        # Speichere die aktuelle Analyse zur späteren Verwendung
+        self.current_analysis = combined_analysis
+        
+        return combined_analysis
+    
+    def _analyze_bars(self, df):
+        """Regime, Chartmuster, Volumen und Strategiegewichte für die abgeschlossenen Kerzen"""
+        # 1. Erkenne Marktregime
+        current_regime = self.regime_detector.detect_regime(df)
+        
         # 2. Erkenne Chartmuster
         patterns = self.pattern_recognizer.detect_patterns(df)
         
@@ -464,9 +474,6 @@ class AdvancedMarketAnalysis:
         combined_analysis['recommended_strategy_weights'] = strategy_weights
         combined_analysis['confidence'] = min(1.0, (1 + volume_analysis['strength']) / 2)
         
-        # Speichere die aktuelle Analyse zur späteren Verwendung
-        self.current_analysis = combined_analysis
-        
         return combined_analysis
 
 class RiskAdjuster:
@@ -0,0 +1,150 @@
+"""
+Bar-basierter Cache für Marktanalysen.
+
+Marktregime, Chartmuster und Volumenanalyse hängen nur von den abgeschlossenen Kerzen ab. Der
+Cache berechnet sie deshalb einmal pro Kerze und teilt das Ergebnis zwischen allen Strategie-
+Instanzen (EnhancedAdaptiveStrategy, SmallCapitalAdaptiveStrategy, AdaptiveStrategy, ...).
+
+Schlüssel ist (Art der Analyse, Symbol, Zeitintervall, Zeitstempel der letzten abgeschlossenen
+Kerze). Symbol und Zeitintervall setzt die Handelsschleife bzw. das Portfolio pro Thread mit
+set_market (Standard: config.SYMBOL und config.TIMEFRAME). Die laufende Kerze wird vor der Berechnung abgeschnitten, damit
+alle Aufrufe innerhalb einer Kerze dasselbe Ergebnis bekommen. Ein Eintrag gilt nur, wenn die
+OHLCV-Werte der letzten abgeschlossenen Kerze übereinstimmen (z.B. andere Daten im Backtest).
+
+Die Ergebnisse werden eingefroren (Mappings schreibgeschützt, Listen als Tupel); Aufrufer, die
+Felder ergänzen, arbeiten auf einer eigenen Kopie der obersten Ebene. Die Anzahl der Einträge
+ist begrenzt (LRU über alle Symbole, config.ANALYSIS_CACHE_SIZE).
+"""
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+
+import candle_store
+import config
+
+
+FINGERPRINT_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+# Symbol und Zeitintervall der Daten, die der aktuelle Thread gerade analysiert
+_market = threading.local()
+
+
+def set_market(symbol, timeframe=None):
+    """Legt Symbol und Zeitintervall für die folgenden Analysen dieses Threads fest"""
+    _market.symbol = symbol
+    _market.timeframe = timeframe or config.TIMEFRAME
+
+
+def current_market():
+    """
+    Returns:
+    tuple: (Symbol, Zeitintervall) des aktuellen Threads
+    """
+    return getattr(_market, 'symbol', config.SYMBOL), getattr(_market, 'timeframe', config.TIMEFRAME)
+
+
+def freeze(value):
+    """Macht verschachtelte dicts/Listen unveränderlich (MappingProxyType bzw. Tupel)"""
+    if isinstance(value, (dict, MappingProxyType)):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class MarketAnalysisCache:
+    """LRU-Cache für Analysen pro abgeschlossener Kerze mit Treffer-/Fehlzählern"""
+
+    def __init__(self, max_entries=None):
+        """
+        Parameters:
+        max_entries: Maximale Anzahl gespeicherter Analysen (Standard: config.ANALYSIS_CACHE_SIZE)
+        """
+        self.max_entries = max(int(max_entries or config.ANALYSIS_CACHE_SIZE), 1)
+        self._entries = OrderedDict()  # Schlüssel -> (Fingerabdruck, Ergebnis)
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'uncached': 0}
+
+    @staticmethod
+    def closed_bar_count(timestamps, timeframe, now=None):
+        """
+        Anzahl der abgeschlossenen Kerzen: die letzte Kerze läuft noch, wenn Zeitstempel plus
+        Kerzendauer in der Zukunft liegt (bei historischen Daten sind alle Kerzen abgeschlossen).
+        """
+        now_ms = (time.time() if now is None else now) * 1000
+        last_ms = timestamps.iat[-1].value // 1_000_000
+        if last_ms + candle_store.timeframe_to_ms(timeframe) > now_ms:
+            return len(timestamps) - 1
+        return len(timestamps)
+
+    def get_or_compute(self, kind, df, compute):
+        """
+        Gibt die Analyse der letzten abgeschlossenen Kerze zurück und berechnet sie nur beim
+        ersten Aufruf pro Kerze.
+
+        Parameters:
+        kind: Art der Analyse (Teil des Schlüssels, z.B. 'market_analysis')
+        df: DataFrame mit timestamp, OHLCV und Indikatoren
+        compute: Funktion, die aus den abgeschlossenen Kerzen das Ergebnis berechnet
+
+        Returns:
+        Eingefrorenes Ergebnis von compute
+        """
+        if (not config.USE_ANALYSIS_CACHE or 'timestamp' not in df.columns or len(df) < 2
+                or df['timestamp'].dtype.kind != 'M'):
+            with self._lock:
+                self.stats['uncached'] += 1
+            return freeze(compute(df))
+
+        symbol, timeframe = current_market()
+        timestamps = df['timestamp']
+        count = self.closed_bar_count(timestamps, timeframe)
+        key = (kind, symbol, timeframe, timestamps.iat[count - 1])
+        fingerprint = tuple(float(df[column].iat[count - 1]) for column in FINGERPRINT_COLUMNS if column in df.columns)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == fingerprint:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return entry[1]
+            self.stats['misses'] += 1
+
+        # Berechnung außerhalb des Locks (andere Symbole werden nicht blockiert)
+        result = freeze(compute(df if count == len(df) else df.iloc[:count]))
+
+        with self._lock:
+            self._entries[key] = (fingerprint, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_status(self):
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hit_rate': self.stats['hits'] / lookups if lookups else 0.0,
+                **self.stats
+            }
+
+
+# Globale Instanz
+_analysis_cache = None
+_analysis_cache_lock = threading.Lock()
+
+def get_analysis_cache():
+    """Singleton-Zugriff auf den MarketAnalysisCache"""
+    global _analysis_cache
+    with _analysis_cache_lock:
+        if _analysis_cache is None:
+            _analysis_cache = MarketAnalysisCache()
+        return _analysis_cache
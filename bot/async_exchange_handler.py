@@ -0,0 +1,305 @@
+import asyncio
+import inspect
+import threading
+import pandas as pd
+from colorama import Fore
+import exchange_handler
+import exchange_filters
+import candle_store
+import rate_limiter
+import structured_logging
+import utils
+import config
+
+
+logger = structured_logging.get_logger(__name__)
+
+
+class AsyncExchangeBridge:
+    """
+    Synchrone Fassade für eine asynchrone ccxt-Exchange. Der Event-Loop läuft in einem eigenen
+    Thread; alle Aufrufe teilen sich eine Exchange-Instanz und damit deren HTTP-Session
+    (Connection-Reuse). Coroutine-Methoden der Exchange (fetch_ohlcv, fetch_balance, ...) werden
+    synchron aufrufbar, sodass run_bot und exchange_handler unverändert funktionieren.
+    """
+
+    def __init__(self, exchange_factory):
+        """
+        Parameters:
+        exchange_factory: Funktion, die die asynchrone Exchange erstellt (wird im Event-Loop ausgeführt)
+        """
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='async-exchange', daemon=True)
+        self._thread.start()
+        self.exchange = self.run(self._create(exchange_factory))
+
+    @staticmethod
+    async def _create(exchange_factory):
+        return exchange_factory()
+
+    def run(self, coroutine, timeout=None):
+        """Führt eine Coroutine im Event-Loop der Bridge aus und wartet auf das Ergebnis"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result(timeout)
+
+    def __getattr__(self, name):
+        if name == 'exchange':
+            raise AttributeError(name)
+        attribute = getattr(self.exchange, name)
+        if inspect.iscoroutinefunction(attribute):
+            def call(*args, **kwargs):
+                return self.run(attribute(*args, **kwargs))
+            return call
+        return attribute
+
+    def fetch_cycle_data(self, symbol, timeframe, limit, with_balance=True):
+        """Synchroner Zugriff auf fetch_cycle_data (Marktdaten und Kontostand gleichzeitig)"""
+        return self.run(fetch_cycle_data(self.exchange, symbol, timeframe, limit, with_balance))
+
+    def fetch_ohlcv_with_retry(self, symbol, timeframe, limit, since=None):
+        """Synchroner Zugriff auf _fetch_ohlcv_with_retry (für exchange_handler)"""
+        return self.run(_fetch_ohlcv_with_retry(self.exchange, symbol, timeframe, limit, since))
+
+    def get_position(self, symbol):
+        """Synchroner Zugriff auf get_position (für exchange_handler)"""
+        return self.run(get_position(self.exchange, symbol))
+
+    def execute_trade(self, symbol, side, quantity, current_price, closing=False):
+        """Synchroner Zugriff auf execute_trade (für exchange_handler)"""
+        return self.run(execute_trade(self.exchange, symbol, side, quantity, current_price, closing))
+
+    def close(self):
+        """Schließt die HTTP-Session und beendet den Event-Loop"""
+        try:
+            self.run(self.exchange.close())
+        except Exception as e:
+            utils.log_error(e, "Fehler beim Schließen der asynchronen Exchange")
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+
+
+def initialize_async_exchange(api_key, api_secret):
+    """
+    Initialisiert den asynchronen Binance Client und gibt ihn in einer AsyncExchangeBridge zurück.
+    Validierung und Sicherheitsabfragen entsprechen exchange_handler.initialize_exchange.
+
+    Returns:
+    AsyncExchangeBridge: Exchange-Objekt oder None bei Fehler
+    """
+    try:
+        exchange_options = exchange_handler._exchange_options(api_key, api_secret)
+
+        def create_exchange():
+            import ccxt.async_support as ccxt_async  # Nur bei USE_ASYNC_EXCHANGE laden (aiohttp, Importzeit)
+            exchange = ccxt_async.binance(exchange_options)
+            if config.USE_TESTNET:
+                exchange.set_sandbox_mode(True)  # Aktiviert Testnet-Modus
+            rate_limiter.install(exchange)
+            return exchange
+
+        bridge = AsyncExchangeBridge(create_exchange)
+        if not exchange_handler._validate_exchange(bridge):
+            bridge.close()
+            return None
+
+        return bridge
+    except Exception as e:
+        utils.log_error(e, "Fehler bei der Initialisierung des asynchronen Exchange")
+        logger.error("Fehlerdetails: %s", e)
+        return None
+
+
+async def _fetch_ohlcv_with_retry(exchange, symbol, timeframe, limit, since=None):
+    """
+    Holt rohe OHLCV-Daten mit Wiederholungsversuchen. Die Wartezeit blockiert nur diese
+    Abfrage, nicht den Event-Loop.
+
+    Returns:
+    list: Liste von [timestamp, open, high, low, close, volume] oder None bei Fehler
+    """
+    max_retries = 4
+
+    for retry_count in range(max_retries):
+        try:
+            logger.info("Hole Marktdaten für %s (Versuch %s/%s)...", symbol, retry_count + 1, max_retries)
+
+            if since is not None:
+                ohlcv = await exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
+            else:
+                ohlcv = await exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+            if ohlcv:
+                return ohlcv
+
+            logger.warning("Keine Daten von der API erhalten.")
+            if retry_count < max_retries - 1:
+                retry_delay = rate_limiter.retry_delay(exchange, retry_count)
+                logger.warning("Wiederhole in %.0f Sekunden...", retry_delay)
+                await asyncio.sleep(retry_delay)
+
+        except Exception as e:
+            utils.log_error(e, f"Fehler beim Abrufen der Daten für {symbol} (Versuch {retry_count + 1}/{max_retries})")
+            if retry_count < max_retries - 1:
+                retry_delay = rate_limiter.retry_delay(exchange, retry_count)
+                logger.warning("Verbindungsfehler. Wiederhole in %.0f Sekunden...", retry_delay)
+                await asyncio.sleep(retry_delay)
+            else:
+                logger.warning("Maximale Anzahl an Wiederholungen erreicht. Konnte keine Daten abrufen.")
+
+    return None
+
+async def get_historical_data(exchange, symbol, timeframe, limit):
+    """Asynchrone Variante von exchange_handler.get_historical_data"""
+    ohlcv = await _fetch_ohlcv_with_retry(exchange, symbol, timeframe, limit)
+    if not ohlcv:
+        return pd.DataFrame()
+
+    df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    logger.info("Marktdaten erfolgreich geladen.", extra={'color': Fore.GREEN})
+    return df
+
+async def update_historical_data(exchange, symbol, timeframe, limit):
+    """Asynchrone Variante von exchange_handler.update_historical_data (gleicher Candle Store)"""
+    store = candle_store.get_candle_store(symbol, timeframe, limit)
+    exchange_handler._attach_ohlcv_cache(exchange, store)
+
+    if not store.is_empty():
+        update_limit = exchange_handler._incremental_update_limit(store)
+        ohlcv = await _fetch_ohlcv_with_retry(exchange, symbol, timeframe, update_limit, since=store.last_timestamp)
+        if ohlcv is None:
+            return pd.DataFrame()
+        if exchange_handler._apply_incremental_update(store, ohlcv, symbol, update_limit):
+            return store.to_dataframe()
+
+    # Vollständige Historie laden
+    ohlcv = await _fetch_ohlcv_with_retry(exchange, symbol, timeframe, limit)
+    return exchange_handler._replace_store_history(store, ohlcv)
+
+async def fetch_balance(exchange):
+    """
+    Holt den Kontostand.
+
+    Returns:
+    dict: Antwort von fetch_balance oder None bei Fehler
+    """
+    try:
+        return await exchange.fetch_balance()
+    except Exception as e:
+        utils.log_error(e, "Fehler beim Abrufen des Kontostands")
+        return None
+
+async def get_quote_currency_balance(exchange, symbol=None):
+    """Gibt das verfügbare Guthaben in der Quote-Währung zurück"""
+    quote_currency = config.get_quote_currency(symbol)
+    balance = await fetch_balance(exchange)
+    if balance and quote_currency in balance:
+        return float(balance[quote_currency]['free'])
+    return 0
+
+async def fetch_cycle_data(exchange, symbol, timeframe, limit, with_balance=True):
+    """
+    Holt Marktdaten und Kontostand eines Zyklus gleichzeitig.
+
+    Parameters:
+    with_balance: False, wenn der Kontostand aus dem AccountState kommt (nur Marktdaten)
+
+    Returns:
+    tuple: (DataFrame wie update_historical_data/get_historical_data, Kontostand oder None)
+    """
+    if config.USE_CANDLE_STORE:
+        data_request = update_historical_data(exchange, symbol, timeframe, limit)
+    else:
+        data_request = get_historical_data(exchange, symbol, timeframe, limit)
+    if not with_balance:
+        return await data_request, None
+    df, balance = await asyncio.gather(data_request, fetch_balance(exchange))
+    return df, balance
+
+async def get_position(exchange, symbol):
+    """Asynchrone Variante von exchange_handler.get_position (Wartezeiten blockieren den Event-Loop nicht)"""
+    try:
+        logger.info("Prüfe aktuelle Position...")
+        base_currency = config.get_base_currency(symbol)
+
+        if not config.USE_TESTNET:
+            # Spot Live: Prüfe das Guthaben der Basis-Währung
+            balance = await exchange.fetch_balance()
+            return exchange_handler._spot_position_from_balance(balance, base_currency)
+
+        # Futures Testnet: Verwende fetch_positions
+        max_retries = 3
+        for retry_count in range(max_retries):
+            try:
+                positions = await exchange.fetch_positions([symbol.replace('/', '')])
+                return exchange_handler._futures_position_from_api(positions, symbol, base_currency)
+            except Exception as e:
+                if retry_count == max_retries - 1:
+                    raise
+                retry_delay = rate_limiter.retry_delay(exchange, retry_count)
+                logger.warning("Fehler beim Abrufen der Position: %s. Wiederhole in %.0f Sekunden...", e, retry_delay)
+                await asyncio.sleep(retry_delay)
+
+    except Exception as e:
+        utils.log_error(e, f"Fehler beim Abrufen der Position für {symbol}")
+        return 0, exchange_handler._empty_position_info()
+
+async def execute_trade(exchange, symbol, side, quantity, current_price, closing=False):
+    """
+    Asynchrone Variante von exchange_handler.execute_trade mit denselben Sicherheitschecks
+    und Handelsfiltern. Die Handelsbestätigung läuft in einem Worker-Thread.
+
+    Returns:
+    dict: Order-Informationen oder None bei Fehler
+    """
+    try:
+        base_currency = config.get_base_currency(symbol)
+        quote_currency = config.get_quote_currency(symbol)
+
+        # Menge vor dem Senden an die Handelsfilter anpassen (Orders gehen beim ersten Versuch durch)
+        filter_cache = exchange_filters.get_filter_cache()
+        adjusted_quantity = exchange_handler._apply_order_filters(filter_cache.get(exchange, symbol), quantity, current_price, base_currency, closing)
+        if adjusted_quantity <= 0:
+            return None
+
+        logger.info("Führe %s Order aus: %s %s @ ~%.2f %s", side.upper(), adjusted_quantity, base_currency, current_price, quote_currency)
+
+        # Sicherheitscheck für Live-Trading (input() darf den Event-Loop nicht blockieren)
+        if not await asyncio.to_thread(exchange_handler._check_live_trade, side, adjusted_quantity, current_price, base_currency, quote_currency):
+            return None
+
+        for attempt in range(2):
+            try:
+                order = await exchange.create_market_order(
+                    symbol=symbol,
+                    side=side,
+                    amount=adjusted_quantity,
+                    params=exchange_handler._order_params()
+                )
+                exchange_handler._print_order_success(side, adjusted_quantity, current_price, base_currency, quote_currency)
+                return order
+
+            except Exception as e:
+                error_message = str(e)
+                logger.error("Fehler beim Ausführen des Orders: %s", error_message)
+                if attempt > 0 or not exchange_filters.is_filter_error(error_message):
+                    break
+
+                # Filter vermutlich geändert: einmal neu laden und ohne Wartezeit erneut senden
+                try:
+                    filter_cache.update_from_markets(await exchange.load_markets(reload=True), [symbol])
+                except Exception as reload_error:
+                    utils.log_error(reload_error, f"Fehler beim Neuladen der Handelsfilter für {symbol}")
+                retry_quantity = exchange_handler._apply_order_filters(filter_cache.get(exchange, symbol), quantity, current_price, base_currency, closing)
+                if retry_quantity <= 0 or retry_quantity == adjusted_quantity:
+                    break
+                adjusted_quantity = retry_quantity
+
+        logger.warning("Trade konnte nicht ausgeführt werden.")
+        utils.log_error(Exception(f"Order abgelehnt: {error_message}"),
+                       f"Fehler beim Ausführen des {side} Orders für {adjusted_quantity} {symbol}")
+        return None
+
+    except Exception as e:
+        utils.log_error(e, f"Kritischer Fehler beim Ausführen des {side} Orders für {quantity} {symbol}")
+        logger.error("Kritischer Fehler: %s", e)
+        return None
@@ -0,0 +1,266 @@
+"""
+Paralleler Download langer Kerzenhistorien in den OHLCV-Cache (ohlcv_cache).
+
+Der Zeitraum wird in Abschnitte zu config.BACKFILL_CHUNK_CANDLES Kerzen geteilt, die gleichzeitig
+über ccxt.async_support abgefragt werden. Das Gewichtslimit der Exchange hält rate_limiter ein,
+zusätzlich laufen höchstens config.BACKFILL_CONCURRENCY Abschnitte parallel.
+Jeder fertige Abschnitt wird als Teildatei neben dem Cache abgelegt - ein abgebrochener Lauf
+lädt beim nächsten Aufruf nur die fehlenden Abschnitte. Zum Schluss werden alle Teile in den
+Cache übernommen; Abschnitte, die der Cache bereits vollständig enthält, werden übersprungen.
+Der Zeitpunkt der ersten verfügbaren Kerze (Listing) wird einmal abgefragt und neben dem Cache
+gespeichert; der Zeitraum beginnt frühestens dort, Abschnitte davor werden nie geladen.
+
+Aufruf:
+    python backfill.py BTC/USDT 1m 2023-01-01 [2024-01-01]
+"""
+import asyncio
+import os
+import shutil
+import sys
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import ccxt
+import ccxt.async_support as ccxt_async
+from colorama import Fore, Style
+import exchange_handler
+import ohlcv_cache
+import rate_limiter
+import utils
+import config
+from candle_store import OHLCV_COLUMNS, timeframe_to_ms
+
+
+def split_range(start_ms, end_ms, timeframe_ms, chunk_candles=None):
+    """
+    Teilt einen Zeitraum in Abschnitte mit fester Kerzenanzahl.
+
+    Parameters:
+    start_ms, end_ms: Zeitraum in Millisekunden (Ende exklusiv)
+    timeframe_ms: Dauer einer Kerze in Millisekunden
+    chunk_candles: Kerzen pro Abschnitt (Standard: config.BACKFILL_CHUNK_CANDLES)
+
+    Returns:
+    list: Liste von (start_ms, end_ms), an Kerzengrenzen ausgerichtet
+    """
+    chunk_ms = (chunk_candles or config.BACKFILL_CHUNK_CANDLES) * timeframe_ms
+    start_ms -= start_ms % timeframe_ms
+    return [(chunk_start, min(chunk_start + chunk_ms, end_ms)) for chunk_start in range(start_ms, end_ms, chunk_ms)]
+
+
+def _is_covered(timestamps, start_ms, end_ms, timeframe_ms):
+    """Prüft, ob der Cache alle Kerzen des Abschnitts enthält"""
+    expected = -(-(end_ms - start_ms) // timeframe_ms)
+    found = np.searchsorted(timestamps, end_ms) - np.searchsorted(timestamps, start_ms)
+    return found >= expected
+
+
+def _part_path(part_directory, start_ms, end_ms):
+    return os.path.join(part_directory, f"{start_ms}-{end_ms}.npy")
+
+
+def _listing_path(cache):
+    return f"{cache.path}.listing"
+
+
+async def _fetch_page(exchange, symbol, timeframe, since, limit):
+    """Eine Seite Kerzen mit Wiederholungsversuchen (längere Pause bei Rate-Limit-Fehlern)"""
+    max_retries = 5
+    retry_delay = 2
+    for retry_count in range(max_retries):
+        try:
+            return await exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
+        except (ccxt.RateLimitExceeded, ccxt.DDoSProtection) as e:
+            if retry_count == max_retries - 1:
+                raise
+            print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Rate-Limit erreicht ({e}). Pause {retry_delay * 10} Sekunden...{Style.RESET_ALL}")
+            await asyncio.sleep(retry_delay * 10)
+        except (ccxt.NetworkError, ccxt.ExchangeNotAvailable):
+            if retry_count == max_retries - 1:
+                raise
+            await asyncio.sleep(retry_delay)
+        retry_delay *= 2
+
+
+async def _first_available_ms(exchange, cache, symbol, timeframe):
+    """
+    Zeitstempel der ersten verfügbaren Kerze des Symbols (aus der Datei neben dem Cache,
+    sonst einmalig per Abfrage ab Zeitpunkt 0).
+
+    Returns:
+    int: Zeitstempel in ms oder None, wenn er nicht ermittelt werden konnte
+    """
+    path = _listing_path(cache)
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            return int(f.read().strip())
+    try:
+        ohlcv = await _fetch_page(exchange, symbol, timeframe, 0, 1)
+    except Exception as e:
+        utils.log_error(e, f"Fehler beim Abfragen der ersten verfügbaren Kerze für {symbol}")
+        return None
+    if not ohlcv:
+        return None
+    first_ms = int(ohlcv[0][0])
+    with open(path, 'w') as f:
+        f.write(str(first_ms))
+    return first_ms
+
+
+async def _fetch_chunk(exchange, symbol, timeframe, timeframe_ms, start_ms, end_ms):
+    """
+    Lädt alle Kerzen eines Abschnitts seitenweise.
+
+    Returns:
+    ndarray: Zeilen [timestamp, open, high, low, close, volume] mit start_ms <= timestamp < end_ms
+    """
+    pages = []
+    since = start_ms
+    while since < end_ms:
+        limit = min(config.BACKFILL_PAGE_LIMIT, -(-(end_ms - since) // timeframe_ms))
+        ohlcv = await _fetch_page(exchange, symbol, timeframe, since, limit)
+        if not ohlcv:
+            break
+        rows = np.asarray(ohlcv, dtype=np.float64)[:, :len(OHLCV_COLUMNS)]
+        pages.append(rows[rows[:, 0] < end_ms])
+        since = int(rows[-1, 0]) + timeframe_ms
+    if not pages:
+        return np.empty((0, len(OHLCV_COLUMNS)), dtype=np.float64)
+    return np.concatenate(pages)
+
+
+async def backfill_async(exchange, symbol, timeframe, start_ms, end_ms, concurrency=None):
+    """
+    Lädt den Zeitraum abschnittsweise und parallel in den OHLCV-Cache.
+
+    Parameters:
+    exchange: Asynchrone ccxt-Exchange (z.B. ccxt.async_support.binance)
+    symbol: Handelssymbol
+    timeframe: Zeitintervall
+    start_ms, end_ms: Zeitraum in Millisekunden (Ende exklusiv)
+    concurrency: Gleichzeitig geladene Abschnitte (Standard: config.BACKFILL_CONCURRENCY)
+
+    Returns:
+    dict: Statistik (chunks, skipped, failed, candles, duration)
+    """
+    start_time = time.perf_counter()
+    timeframe_ms = timeframe_to_ms(timeframe)
+    cache = ohlcv_cache.get_ohlcv_cache(exchange.id, symbol, timeframe)
+    part_directory = f"{cache.path}.parts"
+    os.makedirs(part_directory, exist_ok=True)
+
+    # Vor dem Listing gibt es keine Kerzen: diese Abschnitte gelten als abgedeckt
+    first_available = await _first_available_ms(exchange, cache, symbol, timeframe)
+    if first_available is not None and first_available > start_ms:
+        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Erste verfügbare Kerze für {symbol}: "
+              f"{pd.to_datetime(first_available, unit='ms')} - Backfill beginnt dort.{Style.RESET_ALL}")
+        start_ms = first_available
+
+    chunks = split_range(start_ms, end_ms, timeframe_ms)
+    cached_timestamps = cache.read()[:, 0]
+    pending = [chunk for chunk in chunks
+               if not os.path.exists(_part_path(part_directory, *chunk))
+               and not _is_covered(cached_timestamps, chunk[0], chunk[1], timeframe_ms)]
+    skipped = len(chunks) - len(pending)
+    print(f"{Fore.CYAN}[{datetime.now().strftime('%H:%M:%S')}] Backfill {symbol} {timeframe}: {len(chunks)} Abschnitte, "
+          f"{skipped} bereits vorhanden, {len(pending)} zu laden{Style.RESET_ALL}")
+
+    semaphore = asyncio.Semaphore(concurrency or config.BACKFILL_CONCURRENCY)
+    completed = 0
+    failed = 0
+
+    async def load(chunk):
+        nonlocal completed, failed
+        async with semaphore:
+            try:
+                rows = await _fetch_chunk(exchange, symbol, timeframe, timeframe_ms, *chunk)
+            except Exception as e:
+                failed += 1
+                utils.log_error(e, f"Backfill-Abschnitt {chunk[0]}-{chunk[1]} für {symbol} fehlgeschlagen")
+                return
+        # Atomar speichern: eine Teildatei existiert nur vollständig
+        part_path = _part_path(part_directory, *chunk)
+        with open(f"{part_path}.tmp", 'wb') as f:
+            np.save(f, rows)
+        os.replace(f"{part_path}.tmp", part_path)
+        completed += 1
+        print(f"{Fore.GREEN}[{datetime.now().strftime('%H:%M:%S')}] Abschnitt {completed}/{len(pending)} geladen "
+              f"({len(rows)} Kerzen ab {pd.to_datetime(chunk[0], unit='ms')}){Style.RESET_ALL}")
+
+    await asyncio.gather(*(load(chunk) for chunk in pending))
+
+    candles = 0
+    if failed:
+        print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] {failed} Abschnitt(e) fehlgeschlagen - "
+              f"erneuter Aufruf lädt nur die fehlenden Abschnitte.{Style.RESET_ALL}")
+    else:
+        parts = sorted(os.listdir(part_directory), key=lambda name: int(name.split('-')[0]))
+        arrays = [np.load(os.path.join(part_directory, name)) for name in parts if name.endswith('.npy')]
+        if arrays:
+            rows = np.concatenate(arrays)
+            candles = len(rows)
+            cache.write(rows)
+        shutil.rmtree(part_directory)
+        print(f"{Fore.GREEN}[{datetime.now().strftime('%H:%M:%S')}] Backfill abgeschlossen: {candles} Kerzen übernommen, "
+              f"{len(cache)} Kerzen in {cache.path}{Style.RESET_ALL}")
+
+    return {
+        'chunks': len(chunks),
+        'skipped': skipped,
+        'failed': failed,
+        'candles': candles,
+        'duration': time.perf_counter() - start_time
+    }
+
+
+def create_public_exchange():
+    """Asynchrone Binance-Instanz ohne API-Schlüssel (Kerzen sind öffentliche Daten)"""
+    exchange = ccxt_async.binance(exchange_handler._exchange_options('', ''))
+    if config.USE_TESTNET:
+        exchange.set_sandbox_mode(True)
+    rate_limiter.install(exchange)
+    return exchange
+
+
+def backfill(symbol, timeframe, start, end=None, exchange=None, concurrency=None):
+    """
+    Synchroner Einstieg für backfill_async.
+
+    Parameters:
+    symbol: Handelssymbol
+    timeframe: Zeitintervall
+    start, end: Datum (String, datetime oder ms); end Standard: jetzt
+    exchange: Asynchrone Exchange (Standard: create_public_exchange, wird danach geschlossen)
+    concurrency: siehe backfill_async
+
+    Returns:
+    dict: Statistik wie backfill_async
+    """
+    start_ms = _to_ms(start)
+    end_ms = _to_ms(end) if end is not None else int(time.time() * 1000)
+
+    async def run():
+        client = exchange or create_public_exchange()
+        try:
+            return await backfill_async(client, symbol, timeframe, start_ms, end_ms, concurrency)
+        finally:
+            if exchange is None:
+                await client.close()
+
+    return asyncio.run(run())
+
+
+def _to_ms(value):
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return int(pd.Timestamp(value).timestamp() * 1000)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 4:
+        print(f"{Fore.YELLOW}Aufruf: python backfill.py <SYMBOL> <ZEITINTERVALL> <START> [ENDE]{Style.RESET_ALL}")
+        sys.exit(1)
+
+    result = backfill(sys.argv[1], sys.argv[2], sys.argv[3], sys.argv[4] if len(sys.argv) > 4 else None)
+    print(f"{Fore.CYAN}Dauer: {result['duration']:.1f}s{Style.RESET_ALL}")
@@ -0,0 +1,511 @@
+"""
+Backtesting-Engine für alle Strategien der StrategyFactory.
+
+Die Indikatoren werden einmal für die gesamte Historie berechnet. Zustandslose Strategien
+liefern ihre Signale als NumPy-Serie (strategies.get_signal_series), die Risikoprüfungen aus
+risk_management.check_risk werden als Masken vorberechnet. Die Python-Schleife läuft dann nur
+noch über die Signalereignisse; Stop-Loss/Take-Profit werden zwischen zwei Ereignissen per
+NumPy gesucht. DAY_TRADER nutzt ebenfalls eine vorberechnete Signalstärke und prüft nur an
+den Ereignissen seine Handelsregeln (mit Kerzenzeit). Die übrigen Strategien mit internem
+Zustand (z.B. SMALL_CAPITAL) laufen Kerze für Kerze.
+
+Aufruf:
+    python backtest.py daten.csv MACD
+    python backtest.py daten.parquet DAY_TRADER --trades trades.csv
+    python backtest.py data/ohlcv/binance-testnet/BTCUSDT_15m.ohlcv RSI
+"""
+import inspect
+import sys
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from colorama import Fore, Style
+import indicators
+import ohlcv_cache
+import risk_management
+import strategies
+import structured_logging
+import utils
+import config
+from performance import PerformanceTracker
+from strategy_factory import StrategyFactory
+
+
+TIMESTAMP_ALIASES = ['open_time', 'time', 'date', 'datetime']
+
+
+def load_ohlcv(path):
+    """
+    Lädt OHLCV-Daten aus einer CSV-, Parquet- oder OHLCV-Cache-Datei.
+
+    Parameters:
+    path: Dateipfad (.csv, .parquet oder .ohlcv aus config.OHLCV_CACHE_DIR); CSV/Parquet benötigen
+          Spalten timestamp, open, high, low, close[, volume]
+
+    Returns:
+    DataFrame: Gleiches Format wie exchange_handler.get_historical_data
+    """
+    if str(path).endswith(ohlcv_cache.FILE_EXTENSION):
+        return ohlcv_cache.load_file(path)
+    if str(path).endswith('.parquet'):
+        try:
+            df = pd.read_parquet(path)
+        except ImportError as e:
+            raise ImportError("Für Parquet-Dateien wird pyarrow oder fastparquet benötigt (pip install pyarrow)") from e
+    else:
+        df = pd.read_csv(path)
+
+    df.columns = [str(col).lower() for col in df.columns]
+    if 'timestamp' not in df.columns:
+        alias = next((col for col in TIMESTAMP_ALIASES if col in df.columns), None)
+        if alias is None:
+            raise ValueError(f"Keine Zeitstempel-Spalte in {path} gefunden")
+        df = df.rename(columns={alias: 'timestamp'})
+
+    # Millisekunden wie bei ccxt, sonst Datumsstrings
+    if pd.api.types.is_numeric_dtype(df['timestamp']):
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    else:
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+    if 'volume' not in df.columns:
+        df['volume'] = 0.0
+
+    df = df.sort_values('timestamp').drop_duplicates('timestamp', keep='last').reset_index(drop=True)
+    return df[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
+
+
+def risk_block_masks(df, strategy_name):
+    """
+    Vektorisierte Variante der marktabhängigen Prüfungen aus risk_management.check_risk.
+
+    Returns:
+    tuple: (block_flat, block_in_position) - True, wenn check_risk den Trade ablehnen würde,
+           ohne bzw. mit offener Position. Die positionsabhängige Verlustprüfung erfolgt
+           beim Ereignis selbst.
+    """
+    rows = len(df)
+    if strategy_name == 'AGGRESSIVE_TEST':
+        # check_risk erlaubt im Testmodus alle Trades
+        no_block = np.zeros(rows, dtype=bool)
+        return no_block, no_block
+
+    column = lambda name: df[name].to_numpy(dtype=np.float64) if name in df.columns else np.full(rows, np.nan)
+    close = column('close')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        high_volatility = column('atr') / close * 100 > 5
+    rsi = column('rsi')
+    extreme_rsi = (rsi < 10) | (rsi > 90)
+    squeeze = column('bb_width') < 0.01
+
+    block_in_position = high_volatility | squeeze
+    return block_in_position | extreme_rsi, block_in_position
+
+
+class Backtester:
+    """
+    Spielt eine Strategie über historische Kerzen ab. Ausführung zum Schlusskurs der
+    Signalkerze (wie im Live-Bot), Gebühren pro Order, Stop-Loss/Take-Profit innerhalb der
+    Kerze über High/Low (bei beiden Treffern zählt konservativ der Stop-Loss).
+
+    Im Futures-Modus wird bei einem Gegensignal die Position gedreht, im Spot-Modus wird nur
+    long gehandelt und ein Verkaufssignal schließt die gesamte Position.
+    """
+
+    def __init__(self, df, strategy_name=None, initial_balance=None, fee_rate=None,
+                 futures=None, use_stops=None, window=None, strategy_params=None, bar_by_bar=False, symbol=None):
+        """
+        Parameters:
+        df: OHLCV-DataFrame (Indikatoren werden bei Bedarf berechnet)
+        strategy_name: Strategie (Standard: config.ACTIVE_STRATEGY)
+        initial_balance: Startkapital (Standard: config.BACKTEST_INITIAL_BALANCE)
+        fee_rate: Gebühr pro Order (Standard: config.BACKTEST_FEE_RATE)
+        futures: Long/Short handeln (Standard: config.USE_TESTNET wie im Live-Bot)
+        use_stops: Stop-Loss/Take-Profit auslösen (Standard: config.BACKTEST_USE_STOPS)
+        window: Kerzen pro Strategieaufruf im Kerze-für-Kerze-Modus (Standard: config.LIMIT)
+        strategy_params: Parameter für DAY_TRADER (siehe SimpleDayTraderStrategy.get_parameters)
+        bar_by_bar: Kerze-für-Kerze-Modus erzwingen (auch für vektorisierbare Strategien)
+        symbol: Handelspaar der Kerzen (Standard: config.SYMBOL), wird in den Trades vermerkt
+        """
+        self.strategy_name = strategy_name or config.ACTIVE_STRATEGY
+        self.symbol = symbol or config.SYMBOL
+        self.initial_balance = initial_balance if initial_balance is not None else config.BACKTEST_INITIAL_BALANCE
+        self.fee_rate = fee_rate if fee_rate is not None else config.BACKTEST_FEE_RATE
+        self.futures = config.USE_TESTNET if futures is None else futures
+        self.use_stops = config.BACKTEST_USE_STOPS if use_stops is None else use_stops
+        self.window = window or config.LIMIT
+        self.strategy_params = strategy_params
+        self.bar_by_bar = bar_by_bar
+        self._signal_strength = None
+
+        if 'atr' not in df.columns:
+            with structured_logging.console_suppressed():
+                df = indicators.calculate_all_indicators(df)
+        self.df = df.reset_index(drop=True)
+
+        self.timestamps = self.df['timestamp']
+        self.bar_times = self.timestamps.to_numpy().astype('datetime64[us]')
+        self.open = self.df['open'].to_numpy(dtype=np.float64)
+        self.high = self.df['high'].to_numpy(dtype=np.float64)
+        self.low = self.df['low'].to_numpy(dtype=np.float64)
+        self.close = self.df['close'].to_numpy(dtype=np.float64)
+        self.atr = self.df['atr'].to_numpy(dtype=np.float64) if 'atr' in self.df.columns else np.full(len(self.df), np.nan)
+        self.block_flat, self.block_in_position = risk_block_masks(self.df, self.strategy_name)
+
+        self._reset()
+
+    def _reset(self):
+        self.cash = self.initial_balance
+        self.position = 0          # Vorzeichenbehaftete Positionsgröße
+        self.entry_price = 0
+        self.entry_index = None
+        self.stop_loss = None
+        self.take_profit = None
+        self.checked_until = 0     # Letzte auf Stop-Loss/Take-Profit geprüfte Kerze
+        self.trades = []
+        self.strategy_instance = None
+
+    def _bar_time(self, index):
+        """Zeitpunkt einer Kerze als datetime (schneller als Series.iloc je Ereignis)"""
+        return self.bar_times[index].item()
+
+    # ---- Positionsverwaltung ----
+
+    def _open(self, index, direction):
+        price = self.close[index]
+        with structured_logging.console_suppressed():
+            size = risk_management.calculate_position_size(self.cash, price, config.QUANTITY, self.symbol)
+        if size <= 0 or size * price * (1 + self.fee_rate) > self.cash:
+            return False
+
+        position_type = 'LONG' if direction > 0 else 'SHORT'
+        self.position = size * direction
+        self.entry_price = price
+        self.entry_index = index
+        self.checked_until = index
+        self.cash -= size * price * self.fee_rate
+        # Stop-Loss wird beim Einstieg mit der ATR der Einstiegskerze fixiert
+        atr = self.atr[index] if not np.isnan(self.atr[index]) else None
+        self.stop_loss = risk_management.calculate_stop_loss(price, position_type, atr)
+        self.take_profit = risk_management.calculate_take_profit(price, position_type)
+        self._notify_strategy(index, 'BUY' if direction > 0 else 'SELL', price)
+        return True
+
+    def _close(self, index, price, reason):
+        size = abs(self.position)
+        if self.position > 0:
+            gross = size * (price - self.entry_price)
+        else:
+            gross = size * (self.entry_price - price)
+        fees = size * (self.entry_price + price) * self.fee_rate
+        profit = gross - fees
+        self.cash += gross - size * price * self.fee_rate
+
+        self.trades.append({
+            'time': self._bar_time(index),
+            'entry_time': self._bar_time(self.entry_index),
+            'type': ('LONG' if self.position > 0 else 'SHORT') if self.futures else 'SPOT',
+            'entry_price': self.entry_price,
+            'exit_price': price,
+            'position_size': size,
+            'profit': profit,
+            'profit_percent': profit / (self.entry_price * size) * 100,
+            'fees': fees,
+            'exit_reason': reason,
+            'entry_index': self.entry_index,
+            'exit_index': index,
+            'quote_currency': config.get_quote_currency(self.symbol),
+            'base_currency': config.get_base_currency(self.symbol),
+            'symbol': self.symbol
+        })
+
+        self._notify_strategy(index, 'SELL' if self.position > 0 else 'BUY', price, self.entry_price, profit)
+        self.position = 0
+        self.entry_price = 0
+        self.entry_index = None
+        self.stop_loss = None
+        self.take_profit = None
+
+    def _check_stops(self, end):
+        """
+        Sucht den ersten Stop-Loss/Take-Profit-Treffer in den Kerzen nach checked_until bis
+        einschließlich end und schließt die Position gegebenenfalls.
+
+        Returns:
+        bool: True, wenn die Position geschlossen wurde
+        """
+        start = self.checked_until + 1
+        self.checked_until = max(self.checked_until, end)
+        if not self.use_stops or self.position == 0 or start > end:
+            return False
+
+        low = self.low[start:end + 1]
+        high = self.high[start:end + 1]
+        if self.position > 0:
+            stop_hit = low <= self.stop_loss
+            target_hit = high >= self.take_profit
+        else:
+            stop_hit = high >= self.stop_loss
+            target_hit = low <= self.take_profit
+
+        hits = stop_hit | target_hit
+        if not hits.any():
+            return False
+
+        offset = int(np.argmax(hits))
+        index = start + offset
+        if stop_hit[offset]:
+            level, reason = self.stop_loss, 'Stop-Loss'
+        else:
+            level, reason = self.take_profit, 'Take-Profit'
+
+        # Kurslücke über das Niveau hinaus: Ausführung zum Eröffnungskurs
+        gapped = (self.open[index] < level) if (self.position > 0) == (reason == 'Stop-Loss') else (self.open[index] > level)
+        self._close(index, self.open[index] if gapped else level, reason)
+        return True
+
+    def _position_risk_too_high(self, index):
+        """Verlustprüfung aus check_risk für eine offene Position (Stop-Loss mit aktueller ATR)"""
+        position_type = 'LONG' if self.position > 0 else 'SHORT'
+        atr = self.atr[index] if not np.isnan(self.atr[index]) else None
+        stop_loss = risk_management.calculate_stop_loss(self.entry_price, position_type, atr)
+        potential_loss = abs(self.entry_price - stop_loss) * abs(self.position)
+        return potential_loss / self.cash * 100 > config.MAX_RISK_PER_TRADE * 100
+
+    def _process_signal(self, index, signal):
+        """Setzt ein Signal zum Schlusskurs der Kerze um (Logik wie in run_bot)"""
+        if signal == 0:
+            return
+        if self.position == 0:
+            if self.block_flat[index] or (signal < 0 and not self.futures):
+                return
+            self._open(index, 1 if signal > 0 else -1)
+            return
+
+        # Signal in Richtung der bestehenden Position: nichts zu tun
+        if (signal > 0) == (self.position > 0):
+            return
+        if self.block_in_position[index] or self._position_risk_too_high(index):
+            return
+
+        self._close(index, self.close[index], 'Signal')
+        if self.futures:
+            self._open(index, 1 if signal > 0 else -1)
+
+    def _notify_strategy(self, index, trade_type, price, entry_price=None, profit=None):
+        """Meldet Trades an die Strategie-Instanz (wie PortfolioRunner._notify_strategy)"""
+        instance = self.strategy_instance
+        if instance is None:
+            return
+        if self.strategy_name == 'DAY_TRADER' and profit is not None:
+            instance.record_trade_result(trade_type, entry_price, price, profit,
+                                         trade_time=self._bar_time(index))
+        elif self.strategy_name == 'SMALL_CAPITAL':
+            if trade_type == 'BUY':
+                instance.last_buy_price = price
+            else:
+                instance.last_sell_price = price
+            instance.last_trade_time = self._bar_time(index)
+            instance.last_trade_type = trade_type
+
+    # ---- Simulation ----
+
+    def _first_signal_index(self):
+        """Erste Kerze mit Signal: wie im Live-Bot erst ab einem vollen Fenster von window Kerzen"""
+        return max(2, min(self.window, len(self.df)) - 1)
+
+    def _run_vectorized(self):
+        """Ereignisgesteuerter Durchlauf über vorberechnete Signalserien"""
+        signals = strategies.get_signal_series(self.df, self.strategy_name)
+        # Gleiche Einschwingphase wie im Kerze-für-Kerze-Modus
+        signals[:self._first_signal_index()] = 0
+        # Kerzen, die check_risk in keinem Fall erlaubt, fallen schon hier heraus
+        events = np.flatnonzero((signals != 0) & ~self.block_in_position)
+
+        for index in events:
+            if self.position != 0:
+                self._check_stops(index)
+            self._process_signal(index, signals[index])
+
+    def signal_strength(self):
+        """DAY_TRADER-Signalstärke pro Kerze (einmal berechnet bzw. aus der Spalte 'day_trader_strength')"""
+        if self._signal_strength is None:
+            if 'day_trader_strength' in self.df.columns:
+                self._signal_strength = self.df['day_trader_strength'].to_numpy(dtype=np.float64)
+            else:
+                from day_trader_strategy import calculate_signal_strength_series
+                self._signal_strength = calculate_signal_strength_series(self.df)
+        return self._signal_strength
+
+    def _create_strategy_instance(self):
+        with structured_logging.console_suppressed():
+            instance, strategy_func = StrategyFactory.create_strategy_instance(self.strategy_name)
+        if instance is not None:
+            # Keine Selbstoptimierung innerhalb eines Backtests
+            instance.optimization_active = False
+            for name, value in (self.strategy_params or {}).items():
+                setattr(instance, name, value)
+        return instance, strategy_func
+
+    def _run_day_trader(self):
+        """
+        Ereignisgesteuerter DAY_TRADER-Durchlauf: Signalschwelle auf der vorberechneten
+        Signalstärke, Tageslimits/Mindestabstand über should_execute_trade mit Kerzenzeit.
+        """
+        self.strategy_instance, _ = self._create_strategy_instance()
+        instance = self.strategy_instance
+        strength = self.signal_strength()
+        threshold = instance.signal_threshold
+        signals = np.where(strength > threshold, 1, np.where(strength < -threshold, -1, 0))
+        signals[:self._first_signal_index()] = 0
+        events = np.flatnonzero((signals != 0) & ~self.block_in_position)
+
+        for index in events:
+            if self.position != 0:
+                self._check_stops(index)
+            allowed, _ = instance.should_execute_trade(signals[index], strength[index], self.close[index],
+                                                      now=self._bar_time(index))
+            if allowed:
+                self._process_signal(index, signals[index])
+
+    def _run_bar_by_bar(self):
+        """Kerze für Kerze mit eigener Strategie-Instanz (für Strategien mit internem Zustand)"""
+        self.strategy_instance, strategy_func = self._create_strategy_instance()
+        accepts_balance = 'actual_balance' in inspect.signature(strategy_func).parameters
+
+        # Wie im Live-Bot bekommt die Strategie immer ein volles Fenster von window Kerzen
+        for index in range(self._first_signal_index(), len(self.df)):
+            if self.position != 0:
+                self._check_stops(index)
+            window = self.df.iloc[max(0, index - self.window + 1):index + 1]
+            try:
+                with structured_logging.console_suppressed():
+                    if accepts_balance:
+                        signal, _ = strategy_func(window, actual_balance=self.cash)
+                    else:
+                        signal, _ = strategy_func(window)
+            except Exception as e:
+                utils.log_error(e, f"Fehler in Strategie {self.strategy_name} bei Kerze {index}")
+                signal = 0
+            self._process_signal(index, signal)
+
+    def _equity_curve(self):
+        """Kontowert pro Kerze (realisiert + unrealisiert), vektorisiert aus der Trade-Liste"""
+        rows = len(self.close)
+        cash_delta = np.zeros(rows)
+        held_size = np.zeros(rows)
+        held_entry = np.zeros(rows)
+
+        for trade in self.trades:
+            entry, exit_ = trade['entry_index'], trade['exit_index']
+            size = trade['position_size']
+            direction = -1 if trade['type'] == 'SHORT' else 1
+            entry_fee = size * trade['entry_price'] * self.fee_rate
+            cash_delta[entry] -= entry_fee
+            cash_delta[exit_] += trade['profit'] + entry_fee
+            held_size[entry:exit_] = size * direction
+            held_entry[entry:exit_] = trade['entry_price']
+
+        equity = self.initial_balance + np.cumsum(cash_delta) + held_size * (self.close - held_entry)
+        return pd.Series(equity, index=self.timestamps, name='equity')
+
+    def run(self, strategy_params=None):
+        """
+        Führt den Backtest aus. Die Indikatoren und Signalserien bleiben zwischen mehreren
+        Läufen (z.B. mit verschiedenen Parametern) erhalten.
+
+        Parameters:
+        strategy_params: Parameter für diesen Lauf (Standard: die beim Erstellen übergebenen)
+
+        Returns:
+        dict: trades (DataFrame), equity (Series), tracker (PerformanceTracker), summary (dict)
+        """
+        if strategy_params is not None:
+            self.strategy_params = strategy_params
+        self._reset()
+        start = time.perf_counter()
+
+        vectorized = not self.bar_by_bar and (self.strategy_name in strategies.SIGNAL_SERIES_FUNCTIONS or self.strategy_name == 'DAY_TRADER')
+        if not vectorized:
+            self._run_bar_by_bar()
+        elif self.strategy_name == 'DAY_TRADER':
+            self._run_day_trader()
+        else:
+            self._run_vectorized()
+
+        # Offene Position am Ende prüfen und zum letzten Schlusskurs schließen
+        if self.position != 0:
+            last = len(self.close) - 1
+            if not self._check_stops(last):
+                self._close(last, self.close[last], 'Ende')
+
+        equity = self._equity_curve()
+        tracker = PerformanceTracker()
+        tracker.set_initial_balance(self.initial_balance)
+        tracker.set_trades(self.trades)
+        tracker.update_equity_curve(equity.to_numpy())
+
+        peak = np.maximum.accumulate(equity.to_numpy())
+        summary = {
+            'strategy': self.strategy_name,
+            'symbol': self.symbol,
+            'mode': 'vektorisiert' if vectorized else 'Kerze für Kerze',
+            'bars': len(self.df),
+            'trades': len(self.trades),
+            'final_balance': float(equity.iloc[-1]),
+            'return_percent': float((equity.iloc[-1] / self.initial_balance - 1) * 100),
+            'max_drawdown_percent': float(((peak - equity.to_numpy()) / peak).max() * 100),
+            'duration_seconds': time.perf_counter() - start
+        }
+        return {
+            'trades': pd.DataFrame(self.trades),
+            'equity': equity,
+            'tracker': tracker,
+            'summary': summary
+        }
+
+
+def run_backtest(df, strategy_name=None, **kwargs):
+    """Kurzform: Backtester(df, strategy_name, **kwargs).run()"""
+    return Backtester(df, strategy_name, **kwargs).run()
+
+
+def print_backtest_report(result):
+    """Gibt die Kennzahlen eines Backtests aus"""
+    summary = result['summary']
+    quote_currency = config.get_quote_currency(summary['symbol'])
+    return_color = Fore.GREEN if summary['return_percent'] >= 0 else Fore.RED
+
+    print(f"\n{Fore.CYAN}=== Backtest: {summary['strategy']} ({summary['mode']}) ==={Style.RESET_ALL}")
+    print(f"Kerzen: {summary['bars']} | Trades: {summary['trades']} | Laufzeit: {summary['duration_seconds']:.2f}s")
+    print(f"Endkapital: {summary['final_balance']:.2f} {quote_currency} ({return_color}{summary['return_percent']:+.2f}%{Style.RESET_ALL})")
+    print(f"Maximaler Drawdown (Hoch bis Tief): {summary['max_drawdown_percent']:.2f}%")
+
+    trades = result['trades']
+    if not trades.empty:
+        reasons = trades['exit_reason'].value_counts()
+        print("Ausstiege: " + ", ".join(f"{reason}: {count}" for reason, count in reasons.items()))
+
+    result['tracker'].print_summary()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(f"{Fore.YELLOW}Aufruf: python backtest.py <daten.csv|daten.parquet|daten.ohlcv> [STRATEGIE] [--trades datei.csv]{Style.RESET_ALL}")
+        sys.exit(1)
+
+    args = sys.argv[1:]
+    trades_file = None
+    if '--trades' in args:
+        position = args.index('--trades')
+        trades_file = args[position + 1]
+        del args[position:position + 2]
+
+    print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Lade Daten aus {args[0]}...{Style.RESET_ALL}")
+    data = load_ohlcv(args[0])
+    result = run_backtest(data, args[1] if len(args) > 1 else None)
+    print_backtest_report(result)
+
+    if trades_file:
+        result['trades'].to_csv(trades_file, index=False)
+        print(f"{Fore.GREEN}Trades gespeichert in {trades_file}{Style.RESET_ALL}")
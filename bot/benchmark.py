@@ -0,0 +1,399 @@
+"""
+Benchmarks für die Hot-Paths des Trading-Bots.
+
+Aufruf:
+    python benchmark.py signals    # Signal-Abstimmung in indicators.generate_signals
+    python benchmark.py backtest   # Backtest-Engine über Millionen Kerzen
+    python benchmark.py regime     # Regime-Merkmale: vollständige Berechnung gegen rollendes Fenster
+    python benchmark.py incremental  # Inkrementelle Indikatoren: Abgleich mit calculate_all_indicators
+    python benchmark.py patterns   # Chartmuster: Scan über die gesamte Historie mit Musterstatistik
+    python benchmark.py imports    # Importzeit der Startmodule (mit Verlauf in config.IMPORT_TIME_HISTORY_FILE)
+"""
+import csv
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from colorama import Fore, Style
+
+import indicators
+import structured_logging
+import config
+
+
+def _synthetic_ohlcv(rows, seed=42):
+    """Erzeugt synthetische OHLCV-Daten (Random Walk) für Benchmarks"""
+    rng = np.random.default_rng(seed)
+    close = 60000 + np.cumsum(rng.normal(0, 50, rows))
+    open_ = close + rng.normal(0, 10, rows)
+    high = np.maximum(open_, close) + rng.random(rows) * 30
+    low = np.minimum(open_, close) - rng.random(rows) * 30
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(np.arange(rows) * 60000, unit='ms'),
+        'open': open_,
+        'high': high,
+        'low': low,
+        'close': close,
+        'volume': rng.random(rows) * 100,
+    })
+
+
+def _time_call(func, repeat):
+    """Gibt die beste Laufzeit (Sekunden) aus mehreren Wiederholungen zurück"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _legacy_signal_vote(df):
+    """Bisherige zeilenweise Abstimmung per DataFrame.apply (Referenz für den Vergleich)"""
+    signal_columns = [col for col in df.columns if col.startswith('signal_')]
+    buy_signals = df[signal_columns].apply(lambda row: sum(row > 0), axis=1)
+    sell_signals = df[signal_columns].apply(lambda row: sum(row < 0), axis=1)
+    return np.where(buy_signals > sell_signals, 1, np.where(sell_signals > buy_signals, -1, 0))
+
+
+def benchmark_signal_vote(sizes=(100, 1000, 100000)):
+    """
+    Vergleicht die zeilenweise Abstimmung mit der vektorisierten Variante. Die neuen
+    Messwerte enthalten zusätzlich die Berechnung der Einzelsignale, der Speedup ist
+    also eher konservativ.
+
+    Parameters:
+    sizes: Anzahl der Kerzen pro Messung
+    """
+    print(f"{Fore.CYAN}Benchmark: Signal-Abstimmung (generate_signals){Style.RESET_ALL}")
+    print(f"{'Zeilen':>8} | {'apply (alt)':>12} | {'vektorisiert':>12} | {'nur letzte':>12} | {'Speedup':>8}")
+    print("-" * 66)
+
+    for rows in sizes:
+        with structured_logging.console_suppressed():
+            df = indicators.calculate_all_indicators(_synthetic_ohlcv(rows))
+
+        repeat = 3 if rows >= 100000 else 20
+        # Die Kopie des DataFrames wird von den Messungen abgezogen
+        copy_time = _time_call(lambda: df.copy(), repeat)
+        legacy = _time_call(lambda: _legacy_signal_vote(df), 1 if rows >= 100000 else repeat)
+        vectorized = _time_call(lambda: indicators.generate_signals(df.copy(), last_row_only=False), repeat) - copy_time
+        last_row = _time_call(lambda: indicators.generate_signals(df.copy(), last_row_only=True), repeat) - copy_time
+
+        # Ergebnisse müssen identisch sein
+        assert np.array_equal(_legacy_signal_vote(df), indicators.generate_signals(df.copy(), last_row_only=False)['signal'].to_numpy())
+
+        print(f"{rows:>8} | {legacy * 1000:>10.2f}ms | {vectorized * 1000:>10.2f}ms | {last_row * 1000:>10.2f}ms | {legacy / vectorized:>7.1f}x")
+
+
+def benchmark_backtest(sizes=(100000, 1000000), strategy_names=('MACD', 'MULTI_INDICATOR')):
+    """
+    Misst die Laufzeit der vektorisierten Backtest-Engine (Indikatorberechnung getrennt).
+
+    Parameters:
+    sizes: Anzahl der 1m-Kerzen pro Messung
+    strategy_names: Zu testende Strategien
+    """
+    import backtest
+
+    print(f"{Fore.CYAN}Benchmark: Backtest-Engine (vektorisierter Pfad){Style.RESET_ALL}")
+    print(f"{'Zeilen':>8} | {'Indikatoren':>12} | {'Strategie':>16} | {'Backtest':>10} | {'Trades':>7}")
+    print("-" * 66)
+
+    for rows in sizes:
+        df = _synthetic_ohlcv(rows)
+        start = time.perf_counter()
+        with structured_logging.console_suppressed():
+            df = indicators.calculate_all_indicators(df)
+        indicator_time = time.perf_counter() - start
+
+        for name in strategy_names:
+            with structured_logging.console_suppressed():
+                result = backtest.run_backtest(df, name)
+            summary = result['summary']
+            print(f"{rows:>8} | {indicator_time:>11.2f}s | {name:>16} | {summary['duration_seconds']:>9.2f}s | {summary['trades']:>7}")
+
+
+def benchmark_regime(rows=3000, window=200, lookback_period=50, sliding_rows=500):
+    """
+    Vergleicht die vollständige Berechnung der Regime-Merkmale mit dem rollenden Fenster
+    (je Kerze ein DataFrame-Ausschnitt wie im Live-Bot bzw. Backtest). Im zweiten Teil werden
+    die Indikatoren wie im Live-Bot für jedes gleitende Fenster neu berechnet: ältere Kerzen
+    haben dann leicht abweichende Indikatorwerte, das Fenster darf trotzdem nur einmal
+    aufgebaut werden.
+
+    Parameters:
+    rows: Anzahl der Kerzen
+    window: Länge des DataFrames pro Aufruf
+    lookback_period: Fensterlänge der Regimeerkennung
+    sliding_rows: Anzahl der Kerzen für das gleitende Fenster mit Neuberechnung
+    """
+    import regime_features
+
+    print(f"{Fore.CYAN}Benchmark: Regime-Merkmale (lookback {lookback_period}){Style.RESET_ALL}")
+    with structured_logging.console_suppressed():
+        df = indicators.calculate_all_indicators(_synthetic_ohlcv(rows))
+    windows = [df.iloc[index - window + 1:index + 1] for index in range(window - 1, rows)]
+
+    start = time.perf_counter()
+    expected = [regime_features.compute_regime_features(frame.tail(lookback_period), lookback_period) for frame in windows]
+    full = (time.perf_counter() - start) / len(windows)
+
+    feature_window = regime_features.RegimeFeatureWindow(lookback_period)
+    start = time.perf_counter()
+    actual = []
+    for frame in windows:
+        feature_window.update(frame)
+        actual.append(feature_window.features())
+    rolling = (time.perf_counter() - start) / len(windows)
+
+    # Merkmale müssen (bis auf Rundung) übereinstimmen
+    for a, b in zip(actual, expected):
+        for key in ('price_volatility', 'volatility', 'range_avg', 'trend_strength', 'r_squared'):
+            assert np.isclose(a[key], b[key], rtol=1e-6, atol=1e-12), key
+        assert np.allclose(a['range_percentiles'], b['range_percentiles'])
+        assert np.allclose(a['rsi_percentiles'], b['rsi_percentiles'])
+
+    print(f"{'vollständig':>12} | {'rollend':>10} | {'Speedup':>8}")
+    print("-" * 38)
+    print(f"{full * 1e6:>10.0f}us | {rolling * 1e6:>8.0f}us | {full / rolling:>7.1f}x")
+
+    # Gleitendes Fenster: Indikatoren je Aufruf neu berechnet (nicht Teil der Messung)
+    raw = _synthetic_ohlcv(sliding_rows)
+    with structured_logging.console_suppressed():
+        frames = [indicators.calculate_all_indicators(raw.iloc[index - window + 1:index + 1]) for index in range(window - 1, sliding_rows)]
+
+    start = time.perf_counter()
+    expected = [regime_features.compute_regime_features(frame.tail(lookback_period), lookback_period) for frame in frames]
+    full = (time.perf_counter() - start) / len(frames)
+
+    feature_window = regime_features.RegimeFeatureWindow(lookback_period)
+    start = time.perf_counter()
+    actual = []
+    reseeds = 0
+    for frame in frames:
+        reseeds += feature_window.update(frame)
+        actual.append(feature_window.features())
+    rolling = (time.perf_counter() - start) / len(frames)
+
+    # Abweichungen nur durch die bei der Aufnahme gültigen Indikatorwerte älterer Kerzen
+    assert reseeds == 1, reseeds
+    max_error = 0.0
+    for a, b in zip(actual, expected):
+        for key in ('price_volatility', 'volatility', 'range_avg', 'trend_strength', 'r_squared', 'range_percentiles', 'rsi_percentiles'):
+            assert np.allclose(a[key], b[key], rtol=1e-2, atol=1e-9), key
+            max_error = max(max_error, float(np.max(np.abs(np.asarray(a[key]) - b[key]) / np.maximum(np.abs(b[key]), 1e-12))))
+
+    print(f"Gleitendes Fenster mit Neuberechnung: {reseeds} Neuaufbau bei {len(frames)} Aufrufen, "
+          f"größte relative Abweichung {max_error:.1e}")
+    print(f"{full * 1e6:>10.0f}us | {rolling * 1e6:>8.0f}us | {full / rolling:>7.1f}x")
+
+
+def benchmark_incremental(rows=1000, window=None, amends=3, seed=7):
+    """
+    Vergleicht die inkrementelle Indikator-Engine auf einem gleitenden Fenster wie im Candle
+    Store (neue Kerzen und Änderungen der laufenden Kerze) mit calculate_all_indicators auf der
+    Historie seit dem Start der Engine. Alle Spalten müssen bis auf Rundung übereinstimmen, die
+    Signale exakt. Die Laufzeit wird gegen die Neuberechnung auf dem Fenster gemessen.
+
+    Parameters:
+    rows: Anzahl der Kerzen
+    window: Fensterlänge (Standard: config.LIMIT)
+    amends: Änderungen der laufenden Kerze pro Kerze
+    seed: Startwert für die Kursänderungen der laufenden Kerze
+    """
+    import incremental_indicators
+
+    window = window or config.LIMIT
+    print(f"{Fore.CYAN}Benchmark: Inkrementelle Indikatoren (Fenster {window}){Style.RESET_ALL}")
+    rng = np.random.default_rng(seed)
+    df = _synthetic_ohlcv(rows)
+    engine = incremental_indicators.IncrementalIndicatorEngine(window)
+    full_time = incremental_time = 0.0
+    checks = 0
+    max_error = 0.0
+
+    for end in range(2, rows + 1):
+        history = df.iloc[:end]
+        for amend in range(amends + 1):
+            if amend:
+                # Laufende Kerze ändert sich (neuer Schlusskurs, Hoch/Tief entsprechend)
+                history = history.copy()
+                index = history.index[-1]
+                close = history.at[index, 'close'] * (1 + rng.normal(0, 0.002))
+                history.at[index, 'close'] = close
+                history.at[index, 'high'] = max(history.at[index, 'high'], close)
+                history.at[index, 'low'] = min(history.at[index, 'low'], close)
+            frame = history.iloc[-window:]
+
+            start = time.perf_counter()
+            with structured_logging.console_suppressed():
+                indicators.calculate_all_indicators(frame)
+            full_time += time.perf_counter() - start
+            start = time.perf_counter()
+            engine.update(frame)
+            with structured_logging.console_suppressed():
+                actual = engine.to_dataframe(frame)
+            incremental_time += time.perf_counter() - start
+
+            with structured_logging.console_suppressed():
+                source = frame if len(frame) < engine._patch_min_rows else history
+                expected = indicators.calculate_all_indicators(source).iloc[-len(frame):]
+            assert list(actual.columns) == list(expected.columns)
+            for column in expected.columns:
+                if column == 'timestamp' or column.startswith('signal'):
+                    assert np.array_equal(actual[column].to_numpy(), expected[column].to_numpy()), column
+                    continue
+                a = actual[column].to_numpy(dtype=np.float64)
+                b = expected[column].to_numpy(dtype=np.float64)
+                assert np.allclose(a, b, rtol=1e-8, atol=1e-8, equal_nan=True), column
+                valid = ~np.isnan(b)
+                if valid.any():
+                    max_error = max(max_error, float(np.max(np.abs(a[valid] - b[valid]) / np.maximum(np.abs(b[valid]), 1))))
+            checks += 1
+
+    print(f"{checks} Vergleiche, größte relative Abweichung {max_error:.1e}")
+    print(f"{'Fenster neu':>12} | {'inkrementell':>12} | {'Speedup':>8}")
+    print("-" * 40)
+    print(f"{full_time / checks * 1e6:>10.0f}us | {incremental_time / checks * 1e6:>10.0f}us | {full_time / incremental_time:>7.1f}x")
+
+
+def benchmark_patterns(rows=1000000, lookback=30, sample=2000, horizon=20):
+    """
+    Misst den vektorisierten Muster-Scan über die gesamte Historie, vergleicht ihn mit der
+    Erkennung pro Kerze auf df.tail(lookback) und gibt eine einfache Musterstatistik aus.
+
+    Parameters:
+    rows: Anzahl der Kerzen für den Scan
+    lookback: Fensterlänge der Mustererkennung
+    sample: Anzahl der Kerzen für den Vergleich mit der Erkennung pro Kerze
+    horizon: Kerzen bis zur Messung der Folgerendite
+    """
+    import chart_patterns
+
+    print(f"{Fore.CYAN}Benchmark: Chartmuster (lookback {lookback}){Style.RESET_ALL}")
+    df = _synthetic_ohlcv(rows)
+    start = time.perf_counter()
+    scan = chart_patterns.scan_dataframe(df, lookback)
+    scan_time = time.perf_counter() - start
+
+    # Erkennung pro Kerze muss mit dem Scan über die Historie übereinstimmen
+    start = time.perf_counter()
+    for index in range(lookback - 1, lookback - 1 + sample):
+        recent = df.iloc[index - lookback + 1:index + 1]
+        per_bar = chart_patterns.scan_patterns(recent['high'], recent['low'], recent['close'], lookback)
+        for name in chart_patterns.PATTERNS:
+            assert np.isclose(per_bar[name][-1], scan[name].iat[index]), name
+    per_bar_time = (time.perf_counter() - start) / sample
+
+    print(f"{rows} Kerzen: {scan_time:.2f}s ({scan_time / rows * 1e6:.2f}us pro Kerze, "
+          f"pro Kerze einzeln {per_bar_time * 1e6:.0f}us)")
+    forward = df['close'].shift(-horizon) / df['close'] - 1
+    print(f"{'Muster':>28} | {'Kerzen':>8} | {f'Rendite +{horizon}':>12}")
+    print("-" * 54)
+    for name in chart_patterns.PATTERNS:
+        found = scan[name] > 0
+        average = forward[found].mean() if found.any() else float('nan')
+        print(f"{name:>28} | {int(found.sum()):>8} | {average * 100:>11.3f}%")
+
+
+def _import_times(modules):
+    """
+    Importiert die Module in einem frischen Interpreter mit -X importtime.
+
+    Returns:
+    dict: Modulname -> kumulierte Importzeit in Millisekunden (inkl. Untermodule)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    times = {}
+    for line in result.stderr.splitlines():
+        # Format: "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative) / 1000
+    return times
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ""
+
+
+def benchmark_imports(modules=('main',), top=15, history_file=None):
+    """
+    Misst die Importzeit beim Start und vergleicht sie mit der letzten gespeicherten Messung.
+
+    Parameters:
+    modules: Zu importierende Module (Standard: main, also alles, was der Bot beim Start lädt)
+    top: Anzahl der langsamsten Top-Level-Module in der Ausgabe
+    history_file: CSV-Verlauf (Standard: config.IMPORT_TIME_HISTORY_FILE)
+    """
+    history_file = history_file or config.IMPORT_TIME_HISTORY_FILE
+    print(f"{Fore.CYAN}Benchmark: Importzeit ({', '.join(modules)}){Style.RESET_ALL}")
+
+    # Beste von mehreren Messungen (der erste Lauf enthält ggf. das Schreiben der .pyc-Dateien)
+    times = min((_import_times(modules) for _ in range(3)), key=lambda t: sum(t[m] for m in modules))
+    total = sum(times[module] for module in modules)
+
+    # Nur Top-Level-Pakete zeigen (numpy statt numpy.core.multiarray ...)
+    packages = {name: ms for name, ms in times.items() if "." not in name}
+    print(f"{'Modul':>28} | {'kumuliert':>10} | {'Anteil':>7}")
+    print("-" * 52)
+    for name, ms in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"{name:>28} | {ms:>8.1f}ms | {ms / total * 100:>6.1f}%")
+    print(f"{'Gesamt':>28} | {total:>8.1f}ms")
+
+    previous = None
+    if os.path.exists(history_file):
+        with open(history_file, newline='') as f:
+            rows = [row for row in csv.DictReader(f) if row['modules'] == " ".join(modules)]
+        previous = rows[-1] if rows else None
+
+    if previous:
+        change = total - float(previous['total_ms'])
+        color = Fore.RED if change > 0.1 * float(previous['total_ms']) else Fore.GREEN
+        print(f"{color}Vorherige Messung ({previous['date']}, {previous['commit'] or '-'}): "
+              f"{float(previous['total_ms']):.1f}ms ({change:+.1f}ms){Style.RESET_ALL}")
+
+    directory = os.path.dirname(history_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    is_new = not os.path.exists(history_file)
+    with open(history_file, 'a', newline='') as f:
+        writer = csv.writer(f)
+        if is_new:
+            writer.writerow(['date', 'commit', 'modules', 'total_ms'])
+        writer.writerow([datetime.now().isoformat(timespec='seconds'), _git_commit(), " ".join(modules), f"{total:.1f}"])
+
+
+BENCHMARKS = {
+    'signals': benchmark_signal_vote,
+    'backtest': benchmark_backtest,
+    'regime': benchmark_regime,
+    'incremental': benchmark_incremental,
+    'patterns': benchmark_patterns,
+    'imports': benchmark_imports,
+}
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"{Fore.RED}Unbekannter Benchmark: {name} (verfügbar: {', '.join(BENCHMARKS)}){Style.RESET_ALL}")
+            sys.exit(1)
+        BENCHMARKS[name]()
@@ -0,0 +1,200 @@
+import numpy as np
+import pandas as pd
+import config
+
+
+# Spaltenreihenfolge der OHLCV-Daten (identisch zu ccxt.fetch_ohlcv)
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+# Umrechnung der Zeitintervall-Einheiten in Millisekunden
+_TIMEFRAME_UNITS_MS = {
+    's': 1000,
+    'm': 60 * 1000,
+    'h': 60 * 60 * 1000,
+    'd': 24 * 60 * 60 * 1000,
+    'w': 7 * 24 * 60 * 60 * 1000,
+}
+
+
+def timeframe_to_ms(timeframe):
+    """
+    Wandelt ein ccxt-Zeitintervall (z.B. '15m', '1h', '4h') in Millisekunden um.
+
+    Parameters:
+    timeframe: Zeitintervall als String
+
+    Returns:
+    int: Dauer einer Kerze in Millisekunden
+    """
+    unit = timeframe[-1]
+    if unit not in _TIMEFRAME_UNITS_MS:
+        raise ValueError(f"Unbekanntes Zeitintervall: {timeframe}")
+    return int(timeframe[:-1]) * _TIMEFRAME_UNITS_MS[unit]
+
+
+class CandleStore:
+    """
+    Ringpuffer für OHLCV-Kerzen eines Symbols und Zeitintervalls.
+
+    Die Historie wird einmalig vollständig geladen, danach werden nur noch neue
+    Kerzen angehängt bzw. die noch laufende (letzte) Kerze aktualisiert. Der
+    DataFrame wird nur bei Änderungen neu aufgebaut.
+    """
+
+    def __init__(self, symbol, timeframe, capacity=None):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.timeframe_ms = timeframe_to_ms(timeframe)
+        self.capacity = max(int(capacity or config.LIMIT), 2)
+
+        # Ringpuffer: Zeile i = [timestamp_ms, open, high, low, close, volume]
+        self._buffer = np.zeros((self.capacity, len(OHLCV_COLUMNS)), dtype=np.float64)
+        self._head = 0  # Index der ältesten Kerze
+        self._size = 0
+
+        self._frame = None  # Zwischengespeicherter DataFrame
+        self.version = 0    # Wird bei jeder Änderung erhöht
+        self.cache = None   # Optionaler OhlcvCache, in den alle Änderungen geschrieben werden
+
+    def __len__(self):
+        return self._size
+
+    def is_empty(self):
+        return self._size == 0
+
+    @property
+    def last_timestamp(self):
+        """Zeitstempel (ms) der letzten gespeicherten Kerze oder None"""
+        if self._size == 0:
+            return None
+        return int(self._buffer[(self._head + self._size - 1) % self.capacity, 0])
+
+    def _ordered(self):
+        """Gibt die Kerzen in zeitlicher Reihenfolge als zusammenhängendes Array zurück"""
+        end = self._head + self._size
+        if end <= self.capacity:
+            return self._buffer[self._head:end]
+        return np.concatenate((self._buffer[self._head:], self._buffer[:end - self.capacity]))
+
+    def _append_row(self, row):
+        if self._size < self.capacity:
+            self._buffer[(self._head + self._size) % self.capacity] = row
+            self._size += 1
+        else:
+            # Puffer voll: älteste Kerze überschreiben
+            self._buffer[self._head] = row
+            self._head = (self._head + 1) % self.capacity
+
+    def _changed(self):
+        self._frame = None
+        self.version += 1
+
+    def replace(self, ohlcv):
+        """
+        Ersetzt den gesamten Inhalt durch eine vollständige Historie.
+
+        Parameters:
+        ohlcv: Liste von [timestamp, open, high, low, close, volume] (aufsteigend sortiert)
+        """
+        self._head = 0
+        self._size = 0
+        rows = np.asarray(ohlcv, dtype=np.float64)[-self.capacity:]
+        if len(rows) > 0:
+            self._buffer[:len(rows)] = rows
+            self._size = len(rows)
+            if self.cache is not None:
+                self.cache.write(rows)
+        self._changed()
+
+    def has_gap(self, ohlcv):
+        """
+        Prüft, ob zwischen der letzten gespeicherten Kerze und den neuen Daten Kerzen fehlen.
+        In diesem Fall muss die Historie vollständig neu geladen werden.
+        """
+        if self._size == 0 or not ohlcv:
+            return self._size == 0
+        return int(ohlcv[0][0]) > self.last_timestamp + self.timeframe_ms
+
+    def upsert(self, ohlcv):
+        """
+        Übernimmt neue Kerzen: Kerzen mit bekanntem Zeitstempel werden aktualisiert
+        (typischerweise die noch laufende Kerze), neuere Kerzen werden angehängt.
+
+        Parameters:
+        ohlcv: Liste von [timestamp, open, high, low, close, volume] (aufsteigend sortiert)
+
+        Returns:
+        tuple: (Anzahl neuer Kerzen, Anzahl aktualisierter Kerzen)
+        """
+        new_bars = 0
+        amended_bars = 0
+        changed_rows = []
+
+        for candle in ohlcv:
+            row = np.asarray(candle[:len(OHLCV_COLUMNS)], dtype=np.float64)
+            last_ts = self.last_timestamp
+
+            if last_ts is None or row[0] > last_ts:
+                self._append_row(row)
+                changed_rows.append(row)
+                new_bars += 1
+                continue
+
+            # Vorhandene Kerze suchen (meist die letzte) und bei Änderung überschreiben
+            for offset in range(self._size - 1, -1, -1):
+                idx = (self._head + offset) % self.capacity
+                if self._buffer[idx, 0] == row[0]:
+                    if not np.array_equal(self._buffer[idx], row):
+                        self._buffer[idx] = row
+                        changed_rows.append(row)
+                        amended_bars += 1
+                    break
+                if self._buffer[idx, 0] < row[0]:
+                    break
+
+        if new_bars or amended_bars:
+            if self.cache is not None:
+                self.cache.write(changed_rows)
+            self._changed()
+
+        return new_bars, amended_bars
+
+    def to_array(self):
+        """Gibt die gespeicherten Kerzen in zeitlicher Reihenfolge als Array zurück (nur lesen)"""
+        return self._ordered()
+
+    def to_dataframe(self):
+        """
+        Gibt die gespeicherten Kerzen als DataFrame zurück - im selben Format wie
+        exchange_handler.get_historical_data (timestamp als datetime, OHLCV als float).
+        """
+        if self._frame is None:
+            df = pd.DataFrame(self._ordered().copy(), columns=OHLCV_COLUMNS)
+            df['timestamp'] = pd.to_datetime(df['timestamp'].astype(np.int64), unit='ms')
+            self._frame = df
+        # Kopie zurückgeben, damit Aufrufer den Zwischenspeicher nicht verändern
+        return self._frame.copy()
+
+
+# Globale Registry der Candle Stores (ein Store pro Symbol und Zeitintervall)
+_candle_stores = {}
+
+
+def get_candle_store(symbol=None, timeframe=None, capacity=None):
+    """
+    Gibt den Candle Store für Symbol und Zeitintervall zurück (wird bei Bedarf erstellt).
+
+    Parameters:
+    symbol: Handelssymbol (Standard: config.SYMBOL)
+    timeframe: Zeitintervall (Standard: config.TIMEFRAME)
+    capacity: Maximale Anzahl gespeicherter Kerzen (Standard: config.LIMIT)
+
+    Returns:
+    CandleStore: Store-Instanz
+    """
+    symbol = symbol or config.SYMBOL
+    timeframe = timeframe or config.TIMEFRAME
+    key = (symbol, timeframe)
+    if key not in _candle_stores:
+        _candle_stores[key] = CandleStore(symbol, timeframe, capacity)
+    return _candle_stores[key]
@@ -0,0 +1,267 @@
+"""
+Vektorisierte Erkennung von Chartmustern (für MarketPatternRecognizer und Backtests).
+
+Ein Durchlauf bestimmt alle Swing-Hochs und -Tiefs (Hoch bzw. Tief über/unter beiden
+Nachbarkerzen). Die Muster werden aus diesem gemeinsamen Pivot-Index berechnet, Dreieck und Keil
+aus einem zweiten Index mit breiteren Pivots:
+
+- double_top / double_bottom: zwei aufeinanderfolgende ähnliche Hochs (Tiefs) mit Tal (Gipfel) dazwischen
+- head_and_shoulders / reverse_head_and_shoulders: drei aufeinanderfolgende Hochs (Tiefs), mittleres
+  deutlich höher (tiefer), Schultern ähnlich hoch
+- triangle: Trendlinien durch die letzten zwei Hochs und Tiefs laufen zusammen, obere fällt und/oder
+  untere steigt (Pivots der Ordnung TRENDLINE_PIVOT_ORDER mit Mindestabstand wie bei den Doppelmustern)
+- wedge: beide Trendlinien in dieselbe Richtung, trotzdem zusammenlaufend
+- flag: starker Anstieg (Abfall) bis zum letzten Swing-Hoch (-Tief), danach flache Konsolidierung
+
+scan_patterns liefert für jede Kerze die Konfidenz jedes Musters im Fenster der letzten lookback
+Kerzen bis einschließlich dieser Kerze (ohne Blick in die Zukunft). Ein Pivot zählt nur, wenn er
+weder die erste noch die letzte Kerze des Fensters ist (bei Trendlinien-Pivots: TRENDLINE_PIVOT_ORDER
+Kerzen auf jeder Seite im Fenster) - wie bei der Erkennung auf df.tail(lookback).
+Die Laufzeit wächst linear mit der Anzahl der Kerzen (Bereichs-Minima/-Maxima über eine Sparse
+Table mit Spannen bis lookback), sodass auch Jahre an Kerzen für Musterstatistiken in einem
+Durchlauf ausgewertet werden.
+"""
+import numpy as np
+import pandas as pd
+
+
+PATTERNS = ('double_top', 'double_bottom', 'head_and_shoulders', 'reverse_head_and_shoulders',
+            'triangle', 'flag', 'wedge')
+
+MIN_PIVOT_DISTANCE = 3      # Mehr als 3 Kerzen zwischen zwei Pivots eines Musters
+SIMILAR_TOLERANCE = 0.02    # Doppel-Hoch/-Tief: höchstens 2% Unterschied
+MIN_PATTERN_DEPTH = 0.03    # Mindestens 3% zwischen Pivots und Tal/Gipfel bzw. Nackenlinie
+SHOULDER_TOLERANCE = 0.03   # Kopf-Schulter: Schultern höchstens 3% unterschiedlich
+MIN_HEAD_EXCESS = 0.01      # Kopf mindestens 1% über (unter) der höheren (tieferen) Schulter
+FLAT_SLOPE = 0.0005         # Trendlinie gilt als flach unter 0.05% Steigung pro Kerze
+MIN_FLAG_POLE = 0.03        # Fahnenstange: mindestens 3% Kursbewegung
+MAX_FLAG_RETRACE = 0.5      # Konsolidierung korrigiert höchstens 50% der Fahnenstange
+MIN_FLAG_BARS = 3           # Konsolidierung über mindestens 3 Kerzen
+TRENDLINE_PIVOT_ORDER = 3   # Dreieck/Keil: Pivots über/unter 3 Nachbarkerzen auf jeder Seite
+
+
+def find_pivots(high, low, order=1):
+    """
+    Swing-Hochs und -Tiefs (Hoch bzw. Tief echt über/unter den order Nachbarkerzen auf beiden Seiten).
+
+    Returns:
+    tuple: (Positionen der Swing-Hochs, Positionen der Swing-Tiefs) als aufsteigende int-Arrays
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    n = len(high)
+    if n < 2 * order + 1:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    center = slice(order, n - order)
+    swing_high = np.ones(n - 2 * order, dtype=bool)
+    swing_low = np.ones(n - 2 * order, dtype=bool)
+    for offset in range(1, order + 1):
+        before, after = slice(order - offset, n - order - offset), slice(order + offset, n - order + offset)
+        swing_high &= (high[center] > high[before]) & (high[center] > high[after])
+        swing_low &= (low[center] < low[before]) & (low[center] < low[after])
+    return np.flatnonzero(swing_high) + order, np.flatnonzero(swing_low) + order
+
+
+class _RangeExtrema:
+    """Sparse Table für Minimum/Maximum über Bereiche bis max_span Kerzen (Abfrage in O(1), NaN wird ignoriert)"""
+
+    def __init__(self, values, max_span, use_max=False):
+        self._func = np.fmax if use_max else np.fmin
+        levels = [np.asarray(values, dtype=np.float64)]
+        width = 1
+        while width * 2 <= max_span:
+            previous = levels[-1]
+            level = previous.copy()
+            level[:len(previous) - width] = self._func(previous[:-width], previous[width:])
+            levels.append(level)
+            width *= 2
+        self._levels = np.stack(levels)
+
+    def query(self, start, end):
+        """Extremwert über [start, end] (beide inklusive, end - start < max_span)"""
+        start = np.asarray(start, dtype=np.int64)
+        end = np.asarray(end, dtype=np.int64)
+        level = np.floor(np.log2(np.maximum(end - start + 1, 1))).astype(np.int64)
+        return self._func(self._levels[level, start], self._levels[level, end - (1 << level) + 1])
+
+
+def _earliest_instances(starts, ends, confidence, n, lookback):
+    """
+    Konfidenz des frühesten Musters, das vollständig im Fenster jeder Kerze liegt.
+
+    starts/ends sind die erste und letzte Pivot-Position der Muster (beide aufsteigend sortiert).
+    Ein Muster liegt im Fenster der Kerze t, wenn t - lookback + 1 < start und end < t.
+    """
+    result = np.zeros(n)
+    if len(starts) == 0:
+        return result
+    bars = np.arange(n)
+    first = np.searchsorted(starts, bars - lookback + 1, side='right')
+    index = np.minimum(first, len(starts) - 1)
+    active = (first < len(starts)) & (ends[index] < bars)
+    result[active] = confidence[index[active]]
+    return result
+
+
+def _double_pattern(pivots, values, between, n, lookback, top):
+    """Doppel-Hoch (top=True) bzw. Doppel-Tief aus aufeinanderfolgenden Pivot-Paaren"""
+    first, second = pivots[:-1], pivots[1:]
+    keep = (second - first > MIN_PIVOT_DISTANCE) & (second - first < lookback - 2)
+    first, second = first[keep], second[keep]
+    a, b = values[first], values[second]
+    similar = np.abs(a - b) / a < SIMILAR_TOLERANCE
+
+    average = (a + b) / 2
+    extreme = between.query(first, second)  # Tal zwischen zwei Hochs bzw. Gipfel zwischen zwei Tiefs
+    depth = (average - extreme) / average if top else (extreme - average) / average
+    found = similar & (depth > MIN_PATTERN_DEPTH)
+    return _earliest_instances(first[found], second[found], np.minimum(1.0, depth[found] * 10), n, lookback)
+
+
+def _head_and_shoulders(pivots, values, between, n, lookback, top):
+    """Kopf-Schulter (top=True) bzw. inverse Kopf-Schulter aus aufeinanderfolgenden Pivot-Tripeln"""
+    left, head, right = pivots[:-2], pivots[1:-1], pivots[2:]
+    keep = ((head - left > MIN_PIVOT_DISTANCE) & (right - head > MIN_PIVOT_DISTANCE)
+            & (right - left < lookback - 2))
+    left, head, right = left[keep], head[keep], right[keep]
+    shoulder_left, head_value, shoulder_right = values[left], values[head], values[right]
+    neckline = (between.query(left, head) + between.query(head, right)) / 2
+
+    if top:
+        outer = np.maximum(shoulder_left, shoulder_right)
+        head_excess = (head_value - outer) / outer
+        height = (head_value - neckline) / head_value
+    else:
+        outer = np.minimum(shoulder_left, shoulder_right)
+        head_excess = (outer - head_value) / outer
+        height = (neckline - head_value) / head_value
+    shoulders_similar = np.abs(shoulder_left - shoulder_right) / outer < SHOULDER_TOLERANCE
+    found = shoulders_similar & (head_excess > MIN_HEAD_EXCESS) & (height > MIN_PATTERN_DEPTH)
+    return _earliest_instances(left[found], right[found], np.minimum(1.0, height[found] * 10), n, lookback)
+
+
+def _last_two_pivots(pivots, n, lookback, order=1):
+    """
+    Letzter Pivot im Fenster jeder Kerze und der jüngste Pivot davor, der mehr als
+    MIN_PIVOT_DISTANCE Kerzen entfernt ist (Positionen, -1 wenn nicht vorhanden).
+    Ein Pivot der Ordnung order braucht order Kerzen im Fenster auf jeder Seite.
+    """
+    bars = np.arange(n)
+    count = np.searchsorted(pivots, bars - order + 1, side='left')  # Bis zur Kerze bestätigte Pivots
+    # Partner jedes Pivots: letzter Pivot mit mehr als MIN_PIVOT_DISTANCE Kerzen Abstand
+    partner = np.searchsorted(pivots, pivots - MIN_PIVOT_DISTANCE, side='left') - 1
+    padded = np.concatenate(([-1], pivots))
+    partner_padded = np.concatenate(([-1], np.where(partner >= 0, pivots[np.maximum(partner, 0)], -1)))
+    last, previous = padded[count], partner_padded[count]
+    valid = previous >= np.maximum(bars - lookback + 1, 0) + order
+    return np.where(valid, previous, -1), np.where(valid, last, -1), valid
+
+
+def _trendline_patterns(high, low, close, n, lookback):
+    """Dreieck und Keil aus den Trendlinien durch die letzten zwei Swing-Hochs und -Tiefs (Ordnung TRENDLINE_PIVOT_ORDER)"""
+    triangle = np.zeros(n)
+    wedge = np.zeros(n)
+    high_pivots, low_pivots = find_pivots(high, low, TRENDLINE_PIVOT_ORDER)
+    h1, h2, high_valid = _last_two_pivots(high_pivots, n, lookback, TRENDLINE_PIVOT_ORDER)
+    l1, l2, low_valid = _last_two_pivots(low_pivots, n, lookback, TRENDLINE_PIVOT_ORDER)
+    bars = np.flatnonzero(high_valid & low_valid)
+    if len(bars) == 0:
+        return triangle, wedge
+    h1, h2, l1, l2 = h1[bars], h2[bars], l1[bars], l2[bars]
+
+    upper_slope = (high[h2] - high[h1]) / (h2 - h1)
+    lower_slope = (low[l2] - low[l1]) / (l2 - l1)
+    start = np.minimum(h1, l1)
+    width_start = (high[h1] + upper_slope * (start - h1)) - (low[l1] + lower_slope * (start - l1))
+    width_end = (high[h1] + upper_slope * (bars - h1)) - (low[l1] + lower_slope * (bars - l1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        contraction = 1 - width_end / width_start
+    converging = (width_start > 0) & (width_end > 0) & (contraction > 0)
+
+    upper = upper_slope / close[bars]  # Steigung relativ zum Kurs pro Kerze
+    lower = lower_slope / close[bars]
+    upper_flat, lower_flat = np.abs(upper) <= FLAT_SLOPE, np.abs(lower) <= FLAT_SLOPE
+    is_triangle = converging & (upper <= FLAT_SLOPE) & (lower >= -FLAT_SLOPE) & ~(upper_flat & lower_flat)
+    is_wedge = converging & (((upper > FLAT_SLOPE) & (lower > FLAT_SLOPE)) | ((upper < -FLAT_SLOPE) & (lower < -FLAT_SLOPE)))
+
+    confidence = np.minimum(1.0, np.nan_to_num(contraction))
+    triangle[bars[is_triangle]] = confidence[is_triangle]
+    wedge[bars[is_wedge]] = confidence[is_wedge]
+    return triangle, wedge
+
+
+def _flag_pattern(pivots, values, pole_extrema, same_extrema, opposite_extrema, n, lookback, bullish):
+    """Bullen- (Anstieg bis zum letzten Swing-Hoch) bzw. Bärenflagge (Abfall bis zum letzten Swing-Tief)"""
+    result = np.zeros(n)
+    bars = np.arange(n)
+    count = np.searchsorted(pivots, bars, side='left')
+    pivot = np.concatenate(([-1], pivots))[count]
+    window_start = np.maximum(bars - lookback + 1, 0)
+    valid = (pivot > window_start) & (bars - pivot >= MIN_FLAG_BARS)
+    bars, pivot, window_start = bars[valid], pivot[valid], window_start[valid]
+    if len(bars) == 0:
+        return result
+
+    extreme = values[pivot]
+    pole_base = pole_extrema.query(window_start, pivot)        # Beginn der Fahnenstange im Fenster
+    consolidation = opposite_extrema.query(pivot + 1, bars)   # Gegenbewegung seit dem Pivot
+    breakout = same_extrema.query(pivot + 1, bars)            # Neues Hoch (Tief) beendet die Flagge
+    if bullish:
+        pole = (extreme - pole_base) / pole_base
+        retrace = (extreme - consolidation) / (extreme - pole_base)
+        inside = breakout <= extreme
+    else:
+        pole = (pole_base - extreme) / pole_base
+        retrace = (consolidation - extreme) / (pole_base - extreme)
+        inside = breakout >= extreme
+    with np.errstate(invalid='ignore'):
+        found = (pole > MIN_FLAG_POLE) & (retrace >= 0) & (retrace <= MAX_FLAG_RETRACE) & inside
+    result[bars[found]] = np.minimum(1.0, pole[found] * 10) * (1 - retrace[found])
+    return result
+
+
+def scan_patterns(high, low, close, lookback=30):
+    """
+    Konfidenz aller Muster für jede Kerze (Fenster der letzten lookback Kerzen bis zu dieser Kerze).
+
+    Parameters:
+    high, low, close: Kursreihen (numpy-Arrays oder pandas-Series)
+    lookback: Fensterlänge in Kerzen
+
+    Returns:
+    dict: Mustername -> np.ndarray mit Konfidenz 0..1 pro Kerze (0 = nicht erkannt)
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    n = len(high)
+    if n < 3:
+        return {name: np.zeros(n) for name in PATTERNS}
+
+    high_pivots, low_pivots = find_pivots(high, low)
+    low_min = _RangeExtrema(low, lookback)
+    high_max = _RangeExtrema(high, lookback, use_max=True)
+
+    triangle, wedge = _trendline_patterns(high, low, close, n, lookback)
+    return {
+        'double_top': _double_pattern(high_pivots, high, low_min, n, lookback, top=True),
+        'double_bottom': _double_pattern(low_pivots, low, high_max, n, lookback, top=False),
+        'head_and_shoulders': _head_and_shoulders(high_pivots, high, low_min, n, lookback, top=True),
+        'reverse_head_and_shoulders': _head_and_shoulders(low_pivots, low, high_max, n, lookback, top=False),
+        'triangle': triangle,
+        'flag': np.maximum(
+            _flag_pattern(high_pivots, high, low_min, high_max, low_min, n, lookback, bullish=True),
+            _flag_pattern(low_pivots, low, high_max, low_min, high_max, n, lookback, bullish=False)
+        ),
+        'wedge': wedge
+    }
+
+
+def scan_dataframe(df, lookback=30):
+    """
+    Musterkonfidenzen für alle Kerzen eines DataFrames (z.B. für Musterstatistiken im Backtest).
+
+    Returns:
+    DataFrame: Eine Spalte pro Muster, gleicher Index wie df
+    """
+    return pd.DataFrame(scan_patterns(df['high'], df['low'], df['close'], lookback), index=df.index)
@@ -15,6 +15,58 @@ LIMIT = 100          # Anzahl der zu holenden Candlesticks
 QUANTITY_TYPE = 'PERCENTAGE'  # 'ABSOLUTE' oder 'PERCENTAGE'
 QUANTITY = 0.2  # 20% des verfügbaren Guthabens
 UPDATE_INTERVAL = 15 # Sekunden zwischen Updates
+USE_ASYNC_EXCHANGE = False    # Exchange-Aufrufe über ccxt.async_support (Marktdaten und Kontostand gleichzeitig)
+EXCHANGE_FILTER_REFRESH_INTERVAL = 3600  # Sekunden zwischen Aktualisierungen der Handelsfilter (LOT_SIZE, MIN_NOTIONAL, ...)
+
+# Gemeinsames Gewichtsbudget für alle REST-Aufrufe (rate_limiter.py)
+RATE_LIMIT_ENABLED = True         # Aufrufe nach Request-Gewicht drosseln, Orders vor Marktdaten
+RATE_LIMIT_DATA_SHARE = 0.7       # Marktdaten nutzen höchstens 70% des Budgets pro Minute
+RATE_LIMIT_ACCOUNT_SHARE = 0.9    # Konto-/Positionsabfragen höchstens 90%, Orders das volle Budget
+RATE_LIMIT_SERVER_WEIGHT = {'spot': 6000, 'future': 2400}  # Binance-Gewichtslimit pro Minute (Abgleich mit X-MBX-USED-WEIGHT-1M)
+RATE_LIMIT_BAN_SECONDS = 60       # Pause nach 429/418 ohne Retry-After-Header
+RATE_LIMIT_RETRY_DELAY = 3        # Erste Wartezeit vor einem erneuten Versuch (verdoppelt sich je Versuch)
+RATE_LIMIT_RETRY_MAX_DELAY = 60   # Obergrenze der Wartezeit zwischen zwei Versuchen
+USE_CANDLE_STORE = True      # Historie einmalig laden und danach nur neue Kerzen abfragen
+CANDLE_STORE_UPDATE_LIMIT = 5  # Maximale Anzahl Kerzen pro inkrementeller Abfrage
+OHLCV_CACHE_ENABLED = True     # Kerzen auf der Festplatte speichern (Warmstart nach Neustart, Daten für Backtests)
+OHLCV_CACHE_DIR = 'data/ohlcv' # Verzeichnis des OHLCV-Caches (eine Datei pro Exchange, Symbol und Zeitintervall)
+
+# Höhere Zeitintervalle aus einer Basisreihe ableiten (resampler.py) statt je Zeitintervall abzufragen
+USE_RESAMPLED_TIMEFRAMES = False      # TIMEFRAME und Bestätigungs-Zeitintervalle aus RESAMPLE_BASE_TIMEFRAME bilden
+RESAMPLE_BASE_TIMEFRAME = '1m'        # Einzige per API aktualisierte Kerzenreihe
+CONFIRMATION_TIMEFRAMES = ['1h', '4h']  # Zusätzliche Zeitintervalle für Strategien (resampler.get_timeframe_data)
+RESAMPLE_MAX_BASE_CANDLES = 1000      # Maximale Länge der Basisreihe (eine API-Abfrage beim Start)
+
+# Download langer Historien in den OHLCV-Cache (python backfill.py BTC/USDT 1m 2023-01-01)
+BACKFILL_CHUNK_CANDLES = 10000  # Kerzen pro Abschnitt (eine Teildatei, Einheit für die Fortsetzung)
+BACKFILL_CONCURRENCY = 4        # Gleichzeitig geladene Abschnitte (das Rate-Limit hält rate_limiter zusätzlich ein)
+BACKFILL_PAGE_LIMIT = 1000      # Kerzen pro API-Abfrage (Binance-Maximum für Spot-Klines)
+
+# Ereignisgesteuerte Marktdaten (WebSocket-Streams statt REST-Polling)
+USE_STREAM_INGESTION = False          # Kline- und bookTicker-Streams, Auswertung bei Kerzenschluss oder Preisbewegung
+STREAM_PRICE_TRIGGER_PERCENT = 0.003  # Auswertung zusätzlich bei 0.3% Preisbewegung seit der letzten Auswertung
+STREAM_MIN_TRIGGER_INTERVAL = 2       # Mindestabstand zwischen zwei Auswertungen durch Preisbewegungen (Sekunden)
+STREAM_STALE_SECONDS = 60             # Ohne Stream-Nachrichten länger als X Sekunden per REST aktualisieren
+STREAM_REPLAY_FILE = None             # Aufgezeichnete Stream-Datei für Offline-Tests, z.B. 'fixtures/binance_stream_btcusdt_15m.jsonl'
+STREAM_REPLAY_SPEED = None            # Abspielgeschwindigkeit der Aufzeichnung (None = ohne Pausen)
+
+# Kontostand und Positionen aus Order-Antworten und User-Data-Stream (account_state.py)
+USE_ACCOUNT_STATE = True              # Zwischengespeicherter Kontostand statt fetch_balance/get_position in jedem Zyklus
+ACCOUNT_USER_STREAM = True            # User-Data-Stream abonnieren (executionReport, outboundAccountPosition, ACCOUNT_UPDATE)
+ACCOUNT_RECONCILE_INTERVAL = 300      # Sekunden zwischen REST-Abgleichen bei verbundenem Stream (ohne Stream: UPDATE_INTERVAL)
+ACCOUNT_STREAM_REPLAY_FILE = None     # Aufgezeichnete Ereignisse für Offline-Tests, z.B. 'fixtures/binance_user_data_futures.jsonl'
+
+# Positionsjournal (position_journal.py): Schreibzugriffe nur bei echten Positionsänderungen
+POSITION_JOURNAL_FSYNC_INTERVAL = 1.0  # Sekunden, in denen Journaleinträge gesammelt und mit einem fsync gesichert werden
+POSITION_JOURNAL_SNAPSHOT_EVERY = 100  # Einträge bis zum nächsten atomaren Snapshot (danach wird das Journal geleert)
+
+# Portfolio-Modus (Start mit: python main.py --portfolio [--mock])
+PORTFOLIO_SYMBOLS = ['BTC/USDT', 'ETH/USDT', 'SOL/USDT']  # Gleichzeitig gehandelte Paare (gleiche Quote-Währung)
+PORTFOLIO_STRATEGIES = {}        # Optionale Strategie pro Symbol, z.B. {'ETH/USDT': 'MACD'} (Standard: ACTIVE_STRATEGY)
+PORTFOLIO_MAX_WORKERS = 4        # Threads für parallele Datenabfrage und Indikatorberechnung
+PORTFOLIO_MAX_OPEN_POSITIONS = 3 # Maximale Anzahl gleichzeitig offener Positionen
+PORTFOLIO_MAX_TOTAL_RISK = 0.06  # Maximales Gesamtrisiko aller offenen Positionen (6% des Kontos)
+PORTFOLIO_RECONCILE_INTERVAL = 20  # Abgleich der Positionen mit der API alle N Zyklen
 
 # Strategie-Konfiguration
 # Verfügbare Strategien:
@@ -52,6 +104,19 @@ MACD_SLOW = 26
 MACD_SIGNAL = 9
 BOLLINGER_PERIOD = 20
 BOLLINGER_STD_DEV = 2
+USE_INCREMENTAL_INDICATORS = True   # Indikatoren mit laufendem Zustand nur für neue/geänderte Kerzen aktualisieren (Abgleich: python benchmark.py incremental)
+USE_ANALYSIS_CACHE = True  # Marktanalyse (Regime, Muster, Volumen) nur einmal pro abgeschlossener Kerze berechnen
+ANALYSIS_CACHE_SIZE = 64   # Maximale Anzahl zwischengespeicherter Analysen (LRU über alle Symbole)
+
+# Gewichtung der Einzelsignale bei der Abstimmung in indicators.generate_signals
+SIGNAL_VOTE_WEIGHTS = {
+    'signal_sma': 1.0,
+    'signal_rsi': 1.0,
+    'signal_macd': 1.0,
+    'signal_bb': 1.0,
+    'signal_stoch': 1.0
+}
+SIGNAL_VOTE_LAST_ROW_ONLY = False  # Nur die letzte Kerze abstimmen (run_bot liest nur iloc[-1])
 
 # Risikomanagement-Konfiguration
 MAX_RISK_PER_TRADE = 0.02  # 2% des Kontos pro Trade riskieren
@@ -68,10 +133,38 @@ ENABLE_ADAPTIVE_POSITION_SIZING = True  # Positionsgröße basierend auf Marktan
 
 # Performance-Tracking
 SAVE_PERFORMANCE_DATA = True
-PERFORMANCE_FILE = 'bot_performance.csv'
+PERFORMANCE_FILE = 'bot_performance.csv'  # Nur noch CSV-Export und einmalige Übernahme in das Ledger
+PERFORMANCE_LEDGER_FILE = 'bot_performance.ledger'  # Append-only Trade-Ledger (ein Datensatz fester Länge pro Trade)
 SAVE_STRATEGY_CHANGES = True  # Speichere Strategiewechsel in separater Datei
 STRATEGY_CHANGES_FILE = 'strategy_changes.csv'
 
+# Strukturiertes Logging (structured_logging.py, Ausgabe über Warteschlange und Hintergrund-Thread)
+LOG_PROFILE = 'default'                 # 'default' oder 'quiet' (nur Warnungen/Fehler, keine Konsolenanzeige; auch per --quiet)
+LOG_LEVEL = 'INFO'                      # Level für alle Module (DEBUG, INFO, WARNING, ERROR)
+LOG_LEVELS = {}                         # Level pro Modul, z.B. {'indicators': 'WARNING', 'exchange_handler': 'DEBUG'}
+LOG_FILE = 'logs/bot.jsonl'             # Strukturierte Logdatei, eine JSON-Zeile pro Meldung (None = aus)
+ERROR_LOG_FILE = 'bot_error.log'        # Fehler mit Stacktrace
+
+# Konsolenanzeige (dashboard.py, eigener Render-Thread)
+DASHBOARD_HEADLESS = False              # Keine Konsolenanzeige, z.B. auf Servern (auch per --headless)
+DASHBOARD_MAX_FPS = 2                   # Maximale Bildwiederholrate der Anzeige
+DASHBOARD_LOG_ROWS = 8                  # Mindestens freizuhaltende Zeilen für Logausgaben unter der Anzeige
+
+# Latenzmessung pro Zyklusphase (latency.py)
+LATENCY_TRACKING = True                 # Laufzeiten von Datenabruf, Indikatoren, Strategie usw. messen
+LATENCY_WINDOW_SIZE = 500               # Messwerte pro Phase für p50/p95/p99
+LATENCY_EXPORT_FILE = 'logs/latency_metrics.prom'  # Prometheus-Textdatei (None = kein Export)
+LATENCY_EXPORT_INTERVAL = 60            # Sekunden zwischen zwei Datei-Exporten
+LATENCY_HTTP_PORT = None                # Lokaler /metrics-Endpunkt, z.B. 9108 (None = deaktiviert)
+
+# Startzeit (python benchmark.py imports)
+IMPORT_TIME_HISTORY_FILE = 'logs/import_times.csv'  # Verlauf der gemessenen Importzeiten zum Erkennen von Regressionen
+
+# Backtesting
+BACKTEST_INITIAL_BALANCE = 1000  # Startkapital in Quote-Währung
+BACKTEST_FEE_RATE = 0.001        # Handelsgebühr pro Order (0.1%)
+BACKTEST_USE_STOPS = True        # Stop-Loss/Take-Profit innerhalb der Kerze (High/Low) auslösen
+
 # Live-Handel Sicherheitsmaßnahmen (nur relevant wenn USE_TESTNET = False)
 CONFIRM_TRADES = True  # Bestätigung vor jedem Trade anfordern
 MAX_TRADE_VALUE = 15  # Maximaler Wert pro Trade in USDT
@@ -94,21 +187,34 @@ DAY_TRADER_PARAM_RANGES = {
     'max_daily_loss': [0.015, 0.02, 0.025, 0.03]    # Zu testende maximale tägliche Verluste
 }
 
+# Parameter-Optimierung per Backtest (optimizer.py)
+OPTIMIZER_METHOD = 'grid'           # 'grid' (alle Kombinationen) oder 'random' (Stichprobe)
+OPTIMIZER_RANDOM_SAMPLES = 64       # Anzahl Kandidaten bei 'random'
+OPTIMIZER_TIME_BUDGET = 120         # Maximale Laufzeit in Sekunden (danach zählen die fertigen Ergebnisse)
+OPTIMIZER_MAX_WORKERS = None        # Prozesse für die Backtests (None = Anzahl CPU-Kerne)
+OPTIMIZER_LIVE_MAX_WORKERS = 2      # Prozesse für die Selbstoptimierung im laufenden Bot (CPU bleibt für den Handelszyklus frei)
+OPTIMIZER_LOOKBACK_CANDLES = 1000   # Kerzen für den Optimierungs-Backtest
+OPTIMIZER_MIN_TRADES = 5            # Kandidaten mit weniger Trades werden nachrangig eingestuft
+
 # Rejected Signal Logging Configuration
 LOG_REJECTED_SIGNALS = True        # Enable/disable logging of rejected trade signals
 DISPLAY_REJECTED_SIGNALS = True    # Show rejected signals in console output
+REJECTED_SIGNALS_DB = 'logs/rejected_signals.db'  # SQLite store (WAL mode) indexed by time and strategy
+REJECTED_SIGNALS_FLUSH_INTERVAL = 1.0  # Seconds the background writer batches records into one transaction
 
 # Hilfsfunktionen zur Extraktion von Währungsinformationen
-def get_base_currency():
-    """Gibt die Base-Währung des konfigurierten Trading-Paars zurück"""
-    if '/' in SYMBOL:
-        return SYMBOL.split('/')[0]
+def get_base_currency(symbol=None):
+    """Gibt die Base-Währung des Trading-Paars zurück (Standard: konfiguriertes SYMBOL)"""
+    symbol = symbol or SYMBOL
+    if '/' in symbol:
+        return symbol.split('/')[0]
     return 'BTC'  # Fallback
 
-def get_quote_currency():
-    """Gibt die Quote-Währung des konfigurierten Trading-Paars zurück"""
-    if '/' in SYMBOL:
-        return SYMBOL.split('/')[1]
+def get_quote_currency(symbol=None):
+    """Gibt die Quote-Währung des Trading-Paars zurück (Standard: konfiguriertes SYMBOL)"""
+    symbol = symbol or SYMBOL
+    if '/' in symbol:
+        return symbol.split('/')[1].split(':')[0]
     return 'USDT'  # Fallback
 
 # Fallback-Werte für coin-spezifische Parameter
@@ -0,0 +1,532 @@
+"""
+Konsolenanzeige in einem eigenen Thread (entkoppelt von der Handelsschleife).
+
+Die Handelsschleife veröffentlicht über utils.update_display nur noch einen unveränderlichen
+DashboardSnapshot (letzte Kerzen, Kontostand, Position, Strategie- und Risikoinformationen).
+Der Render-Thread zeichnet jeweils den neuesten Snapshot mit höchstens config.DASHBOARD_MAX_FPS
+Bildern pro Sekunde; zwischenzeitlich überholte Snapshots werden übersprungen. Auch die
+Signalnähe (calculate_signal_proximity) wird erst im Render-Thread berechnet.
+
+Im Terminal bleibt die Anzeige oben stehen und nur geänderte Zeilen werden neu geschrieben;
+Logausgaben der Handelsschleife laufen in einem Scrollbereich darunter. Ohne Terminal (z.B.
+Umleitung in eine Datei) wird ein Bild nur bei geändertem Inhalt vollständig ausgegeben. Mit
+config.DASHBOARD_HEADLESS (oder --headless) läuft kein Render-Thread; Snapshots stehen dann
+nur noch über latest() zur Verfügung.
+"""
+import atexit
+import io
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime
+from colorama import Fore, Style
+import config
+import utils
+from signal_proximity import calculate_signal_proximity, generate_signal_proximity_display
+
+
+# Anzeige und Signalnähe werten nur die letzten Kerzen aus
+SNAPSHOT_ROWS = 3
+
+
+def _frozen_copy(value):
+    """Kopiert verschachtelte dicts/Listen, damit spätere Änderungen der Handelsschleife den Snapshot nicht verändern"""
+    if isinstance(value, dict):
+        return {key: _frozen_copy(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return tuple(_frozen_copy(item) for item in value)
+    return value
+
+
+class DashboardSnapshot:
+    """Unveränderlicher Zustand eines Handelszyklus für die Anzeige"""
+
+    __slots__ = ('df', 'position', 'balance', 'last_action', 'risk_result', 'strategy_info',
+                 'performance', 'position_info', 'cycle', 'published_at', 'time_since_last')
+
+    def __init__(self, df, position, balance, last_action=None, risk_result=None, strategy_info=None,
+                 performance_tracker=None, position_info=None, cycle=0, published_at=None, time_since_last=None):
+        performance = None
+        if performance_tracker is not None:
+            performance = {key: getattr(performance_tracker, key, 0) for key in
+                           ('total_profit', 'total_trades', 'winning_trades', 'losing_trades', 'consecutive_wins', 'consecutive_losses')}
+        values = {
+            'df': df.tail(SNAPSHOT_ROWS).copy() if df is not None else None,
+            'position': position,
+            'balance': balance,
+            'last_action': last_action,
+            'risk_result': _frozen_copy(risk_result),
+            'strategy_info': _frozen_copy(strategy_info),
+            'performance': performance,
+            'position_info': _frozen_copy(position_info),
+            'cycle': cycle,
+            'published_at': published_at or datetime.now(),
+            'time_since_last': time_since_last
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("DashboardSnapshot ist unveränderlich")
+
+
+def render_frame(snapshot):
+    """
+    Erzeugt die Anzeige eines Snapshots.
+
+    Parameters:
+    snapshot: DashboardSnapshot
+
+    Returns:
+    list: Ausgabezeilen (mit Farbcodes)
+    """
+    buffer = io.StringIO()
+
+    def out(*args, end="\n"):
+        buffer.write(" ".join(str(arg) for arg in args) + end)
+
+    try:
+        _render(snapshot, out)
+    except Exception as e:
+        utils.log_error(e, "Fehler bei der Aktualisierung der Anzeige")
+    return buffer.getvalue().rstrip("\n").split("\n")
+
+
+def _render(snapshot, out):
+    df = snapshot.df
+    position = snapshot.position
+    balance = snapshot.balance
+    last_action = snapshot.last_action
+    risk_result = snapshot.risk_result
+    strategy_info = snapshot.strategy_info
+    performance = snapshot.performance
+    position_info = snapshot.position_info
+
+    if df is None or df.empty:
+        out(f"{Fore.RED}Keine Daten zum Anzeigen verfügbar.{Style.RESET_ALL}")
+        return
+    
+    # Holen der Währungskonfiguration
+    base_currency = config.get_base_currency()
+    quote_currency = config.get_quote_currency()
+    
+    # Zeitpunkt der Veröffentlichung (nicht des Zeichnens)
+    current_time_str = snapshot.published_at.strftime("%d.%m.%Y %H:%M:%S")
+    time_since_last = "Erstes Update" if snapshot.time_since_last is None else f"{snapshot.time_since_last:.1f} Sekunden"
+    
+    # Modus anzeigen (Live/Testnet)
+    mode_info = f"{Fore.RED}LIVE-HANDEL{Style.RESET_ALL}" if not config.USE_TESTNET else f"{Fore.GREEN}TESTNET{Style.RESET_ALL}"
+    
+    # Banner und Statusinfo
+    out(utils.banner_text())
+    out(f"{Fore.CYAN}Update #{snapshot.cycle} | {current_time_str} | Modus: {mode_info} | Zeit seit letztem Update: {time_since_last}{Style.RESET_ALL}")
+    
+    # Aktuelle Werte
+    current_price = df['close'].iloc[-1]
+    
+    # Anzeige von Konto- und Positionsinformationen
+    out(f"\n{Fore.YELLOW}Kontostand: {balance:.2f} {quote_currency} | Position: ", end="")
+    if position > 0:
+        out(f"{Fore.GREEN}LONG {position} {base_currency}" + Style.RESET_ALL)
+    elif position < 0:
+        out(f"{Fore.RED}SHORT {abs(position)} {base_currency}" + Style.RESET_ALL)
+    else:
+        out(f"{Fore.WHITE}KEINE" + Style.RESET_ALL)
+    
+    # Marktdaten
+    out(f"\n{Fore.CYAN}=== Marktdaten für {base_currency}/{quote_currency} ==={Style.RESET_ALL}")
+    out(f"Handelspaar: {Fore.YELLOW}{base_currency}/{quote_currency}{Style.RESET_ALL}")
+    out(f"Aktueller Kurs: {Fore.YELLOW}1 {base_currency} = {current_price:.2f} {quote_currency}{Style.RESET_ALL}")
+    out(f"24h Volumen: {Fore.YELLOW}{df['volume'].iloc[-1]:.2f}{Style.RESET_ALL}")
+    
+    # Preisänderungen
+    if len(df) > 1:
+        price_change_abs = current_price - df['close'].iloc[-2]
+        price_change_pct = (price_change_abs / df['close'].iloc[-2]) * 100
+        change_color = Fore.GREEN if price_change_abs >= 0 else Fore.RED
+        change_symbol = "↑" if price_change_abs >= 0 else "↓"
+        out(f"Preisänderung: {change_color}{change_symbol} {abs(price_change_abs):.2f} {quote_currency} ({price_change_pct:.2f}%){Style.RESET_ALL}")
+    
+    # Technische Indikatoren
+    out(f"\n{Fore.CYAN}=== Technische Indikatoren ==={Style.RESET_ALL}")
+    
+    # SMA
+    if 'sma_5' in df.columns and 'sma_20' in df.columns:
+        sma_short = df['sma_5'].iloc[-1]
+        sma_long = df['sma_20'].iloc[-1]
+        out(f"SMA (kurz): {Fore.GREEN if sma_short > sma_long else Fore.RED}{sma_short:.2f}{Style.RESET_ALL}")
+        out(f"SMA (lang): {Fore.GREEN if sma_long > sma_short else Fore.RED}{sma_long:.2f}{Style.RESET_ALL}")
+        
+        # SMA Trend
+        if len(df) > 1:
+            sma_short_prev = df['sma_5'].iloc[-2]
+            sma_short_trend = "steigend" if sma_short > sma_short_prev else "fallend"
+            out(f"SMA (kurz) Trend: {Fore.GREEN if sma_short > sma_short_prev else Fore.RED}{sma_short_trend}{Style.RESET_ALL}")
+    
+    # RSI
+    if 'rsi' in df.columns:
+        rsi = df['rsi'].iloc[-1]
+        rsi_color = Fore.GREEN
+        rsi_status = "neutral"
+        if rsi < 30:
+            rsi_color = Fore.RED
+            rsi_status = "überkauft"
+        elif rsi > 70:
+            rsi_color = Fore.YELLOW
+            rsi_status = "überverkauft"
+        out(f"RSI: {rsi_color}{rsi:.2f} ({rsi_status}){Style.RESET_ALL}")
+    
+    # MACD
+    if 'macd' in df.columns and 'macd_signal' in df.columns:
+        macd = df['macd'].iloc[-1]
+        macd_signal = df['macd_signal'].iloc[-1]
+        macd_hist = df['macd_hist'].iloc[-1]
+        macd_color = Fore.GREEN if macd > macd_signal else Fore.RED
+        out(f"MACD: {macd_color}{macd:.2f}{Style.RESET_ALL}")
+        out(f"MACD Signal: {macd_color}{macd_signal:.2f}{Style.RESET_ALL}")
+        out(f"MACD Histogramm: {Fore.GREEN if macd_hist > 0 else Fore.RED}{macd_hist:.2f}{Style.RESET_ALL}")
+    
+    # Bollinger Bands
+    if 'bb_upper' in df.columns and 'bb_middle' in df.columns and 'bb_lower' in df.columns:
+        bb_upper = df['bb_upper'].iloc[-1]
+        bb_middle = df['bb_middle'].iloc[-1]
+        bb_lower = df['bb_lower'].iloc[-1]
+        
+        # Position des Preises relativ zu den Bändern
+        if current_price > bb_upper:
+            bb_position = f"{Fore.RED}über oberem Band{Style.RESET_ALL}"
+        elif current_price < bb_lower:
+            bb_position = f"{Fore.GREEN}unter unterem Band{Style.RESET_ALL}"
+        else:
+            bb_position = f"{Fore.YELLOW}innerhalb der Bänder{Style.RESET_ALL}"
+        
+        out(f"Bollinger Bänder: {bb_position}")
+        out(f"  Oberes Band: {bb_upper:.2f}")
+        out(f"  Mittleres Band: {bb_middle:.2f}")
+        out(f"  Unteres Band: {bb_lower:.2f}")
+    
+    # Strategie-Informationen
+    if strategy_info:
+        out(f"\n{Fore.CYAN}=== Strategie: {strategy_info.get('strategy', 'Unbekannt')} ==={Style.RESET_ALL}")
+        if 'description' in strategy_info:
+            out(f"Beschreibung: {strategy_info['description']}")
+        if 'parameters' in strategy_info:
+            out(f"Parameter: {strategy_info['parameters']}")
+            
+        # Für adaptive oder verbesserte adaptive Strategie zusätzliche Informationen anzeigen
+        if strategy_info.get('strategy') in ['ADAPTIVE', 'ENHANCED_ADAPTIVE'] and 'selected_strategy' in strategy_info:
+            out(f"Aktuell verwendete Strategie: {Fore.YELLOW}{strategy_info['selected_strategy']}{Style.RESET_ALL}")
+            
+            # Zeige Marktregime für erweiterte adaptive Strategie
+            if 'market_regime' in strategy_info:
+                regime_color = Fore.GREEN if 'uptrend' in strategy_info['market_regime'] else (
+                    Fore.RED if 'downtrend' in strategy_info['market_regime'] else Fore.YELLOW)
+                out(f"Marktregime: {regime_color}{strategy_info['market_regime'].upper()}{Style.RESET_ALL}")
+                
+                if 'regime_description' in strategy_info:
+                    out(f"Regime-Beschreibung: {strategy_info['regime_description']}")
+                
+                if 'confidence' in strategy_info:
+                    conf_color = Fore.GREEN if strategy_info['confidence'] > 0.7 else (
+                        Fore.YELLOW if strategy_info['confidence'] > 0.4 else Fore.RED)
+                    out(f"Konfidenz: {conf_color}{strategy_info['confidence']:.2f}{Style.RESET_ALL}")
+            
+            # Zeige Volumenanalyse
+            if 'volume_pressure' in strategy_info:
+                vol_pressure = strategy_info['volume_pressure']
+                vol_color = Fore.GREEN if 'buying' in vol_pressure else (
+                    Fore.RED if 'selling' in vol_pressure else Fore.YELLOW)
+                out(f"Volumendruck: {vol_color}{vol_pressure.upper()}{Style.RESET_ALL}")
+            
+            # Zeige erkannte Chartmuster
+            if 'patterns' in strategy_info and strategy_info['patterns']:
+                out(f"Erkannte Chartmuster:")
+                for pattern, confidence in strategy_info['patterns'].items():
+                    pattern_color = Fore.MAGENTA
+                    out(f"  - {pattern_color}{pattern.replace('_', ' ').title()}{Style.RESET_ALL} (Konfidenz: {confidence:.2f})")
+            
+            # Zeige angepasste Risikoparameter
+            if 'adjusted_risk_per_trade' in strategy_info:
+                out(f"Angepasstes Risiko pro Trade: {strategy_info['adjusted_risk_per_trade']*100:.2f}%")
+                out(f"Angepasster Stop-Loss: {strategy_info['adjusted_stop_loss']*100:.2f}%")
+                out(f"Angepasster Take-Profit: {strategy_info['adjusted_take_profit']*100:.2f}%")
+        
+        if 'signal_details' in strategy_info:
+            out(f"Signal: {strategy_info['signal_details']}")
+        
+        if 'analysis' in strategy_info:
+            out(f"Analyse: {strategy_info['analysis']}")
+        
+        # Zeige individuelle Strategiesignale für die adaptive Strategie an
+        if strategy_info.get('strategy') in ['ADAPTIVE', 'ENHANCED_ADAPTIVE'] and 'strategy_performance' in strategy_info:
+            out(f"\n{Fore.CYAN}Strategie-Performance:{Style.RESET_ALL}")
+            for strat_name, perf in strategy_info.get('strategy_performance', {}).items():
+                if isinstance(perf, dict) and 'score' in perf:
+                    score = perf['score']
+                    score_color = Fore.GREEN if score > 0.7 else (Fore.YELLOW if score > 0.4 else Fore.RED)
+                    out(f"  {strat_name}: {score_color}Score: {score:.2f}{Style.RESET_ALL} | Return: {perf.get('cumulative_return', 0):.2%} | Win Rate: {perf.get('win_rate', 0):.2%}")
+           
+    # Signalnähe-Anzeige
+    if strategy_info:
+        try:
+            # Überprüfe, ob es sich um eine Fehlerstrategie handelt
+            if 'strategy' in strategy_info and 'FEHLER' in strategy_info['strategy'].upper():
+                out(f"\n{Fore.RED}=== Signal-Nähe-Indikator ==={Style.RESET_ALL}")
+                out(f"Beschreibung: Keine Signal-Nähe-Berechnung für Strategie mit Fehler verfügbar")
+                out(f"Details: {strategy_info.get('description', 'Keine Details verfügbar')}")
+            else:
+                # Normale Verarbeitung
+                if 'selected_strategy' in strategy_info:
+                    # Für adaptive Strategie
+                    selected_strategy = strategy_info['selected_strategy']
+                    proximity_info = calculate_signal_proximity(df, selected_strategy)
+                else:
+                    # Für direkte Strategie
+                    proximity_info = calculate_signal_proximity(df, strategy_info.get('strategy', 'MULTI_INDICATOR'))
+                
+                # Zeige Signal-Nähe-Indikator
+                signal_proximity_display = generate_signal_proximity_display(proximity_info)
+                out(signal_proximity_display)
+        except Exception as e:
+            # Fehlerbehandlung für die Signal-Nähe-Anzeige
+            error_msg = f"Fehler bei der Signal-Nähe-Anzeige: {str(e)}"
+            utils.log_error(e, error_msg)
+            out(f"\n{Fore.RED}=== Signal-Nähe-Indikator (Fehler) ==={Style.RESET_ALL}")
+            out(f"Beschreibung: {error_msg}")
+
+    # Risikomanagement
+    if risk_result:
+        out(f"\n{Fore.CYAN}=== Risikomanagement ==={Style.RESET_ALL}")
+        risk_color = Fore.GREEN if risk_result.get('allow_trade', True) else Fore.RED
+        out(f"Trade erlaubt: {risk_color}{risk_result.get('allow_trade', True)}{Style.RESET_ALL}")
+        
+        if 'reason' in risk_result and risk_result['reason']:
+            out(f"Grund: {risk_result['reason']}")
+        
+        out(f"Risikoniveau: {risk_result.get('risk_level', 'Unbekannt')}")
+        
+        if 'stop_loss' in risk_result and risk_result['stop_loss']:
+            out(f"Stop-Loss: {risk_result['stop_loss']:.2f} {quote_currency}")
+        
+        if 'take_profit' in risk_result and risk_result['take_profit']:
+            out(f"Take-Profit: {risk_result['take_profit']:.2f} {quote_currency}")
+    
+    # Position Details
+    if position_info and position_info.get('size', 0) != 0:
+        out(f"\n{Fore.CYAN}=== Positions-Details ==={Style.RESET_ALL}")
+        position_type = position_info.get('type', 'KEINE')
+        position_color = Fore.GREEN if position_type == 'LONG' else (Fore.RED if position_type == 'SHORT' else Fore.WHITE)
+        
+        out(f"Typ: {position_color}{position_type}{Style.RESET_ALL}")
+        out(f"Größe: {abs(position_info.get('size', 0)):.6f} {base_currency}")
+        out(f"Einstiegspreis: {position_info.get('entry_price', 0):.2f} {quote_currency}")
+        
+        # Unrealisierter Gewinn/Verlust
+        unrealized_pnl = position_info.get('unrealized_pnl', 0)
+        pnl_color = Fore.GREEN if unrealized_pnl > 0 else (Fore.RED if unrealized_pnl < 0 else Fore.WHITE)
+        out(f"Unrealisierter G/V: {pnl_color}{unrealized_pnl:.2f} {quote_currency}{Style.RESET_ALL}")
+        
+        # Liquidation
+        if 'liquidation_price' in position_info and position_info['liquidation_price'] > 0:
+            liq_price = position_info['liquidation_price']
+            distance_to_liq = abs((current_price - liq_price) / current_price * 100)
+            out(f"Liquidationspreis: {Fore.RED}{liq_price:.2f} {quote_currency} (Abstand: {distance_to_liq:.2f}%){Style.RESET_ALL}")
+    
+    # Performance-Tracking
+    if performance:
+        out(f"\n{Fore.CYAN}=== Performance ==={Style.RESET_ALL}")
+        out(f"Gesamtgewinn/-verlust: {Fore.GREEN if performance['total_profit'] >= 0 else Fore.RED}{performance['total_profit']:.2f} {quote_currency}{Style.RESET_ALL}")
+        
+        if performance['total_trades'] > 0:
+            win_rate = performance['winning_trades'] / performance['total_trades'] * 100
+            out(f"Trades: {performance['total_trades']} (Gewonnen: {performance['winning_trades']}, Verloren: {performance['losing_trades']})")
+            out(f"Win-Rate: {Fore.GREEN}{win_rate:.1f}%{Style.RESET_ALL}")
+        
+        out(f"Aktuelle Serie: ", end="")
+        if performance['consecutive_wins'] > 0:
+            out(f"{Fore.GREEN}{performance['consecutive_wins']} Gewinne in Folge{Style.RESET_ALL}")
+        elif performance['consecutive_losses'] > 0:
+            out(f"{Fore.RED}{performance['consecutive_losses']} Verluste in Folge{Style.RESET_ALL}")
+        else:
+            out("Keine")
+    
+    # Letzte Aktion
+    if last_action:
+        out(f"\n{Fore.CYAN}Letzte Aktion: {last_action}{Style.RESET_ALL}")
+    
+    # Status und Hilfe
+    out(f"\n{Fore.YELLOW}Bot Status: AKTIV - Nächstes Update in {config.UPDATE_INTERVAL} Sekunden{Style.RESET_ALL}")
+    out(f"{Fore.YELLOW}Drücke STRG+C zum Beenden{Style.RESET_ALL}")
+
+
+
+class Dashboard:
+    """Veröffentlicht Snapshots der Handelsschleife und zeichnet sie in einem Render-Thread"""
+
+    def __init__(self, max_fps=None, headless=None):
+        """
+        Parameters:
+        max_fps: Maximale Bilder pro Sekunde (Standard: config.DASHBOARD_MAX_FPS)
+        headless: Ohne Konsolenanzeige (Standard: config.DASHBOARD_HEADLESS oder Profil 'quiet')
+        """
+        self.max_fps = max_fps or config.DASHBOARD_MAX_FPS
+        if headless is None:
+            headless = config.DASHBOARD_HEADLESS or config.LOG_PROFILE == 'quiet'
+        self.headless = headless
+        self.stats = {'published': 0, 'frames': 0, 'skipped': 0, 'render_seconds': 0.0}
+
+        self._snapshot = None
+        self._rendered_cycle = 0
+        self._cycle = 0
+        self._last_publish = None
+        self._lock = threading.Lock()
+        self._changed = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        # Zustand der Terminalausgabe
+        self._previous_lines = []
+        self._height = 0
+        self._terminal_size = None
+
+    # ---- Handelsschleife ----
+
+    def publish(self, df, position, balance, last_action=None, risk_result=None, strategy_info=None, performance_tracker=None, position_info=None):
+        """
+        Übernimmt den Zustand eines Zyklus als Snapshot (kein Zeichnen, keine Terminalausgabe).
+        Parameter wie utils.update_display.
+        """
+        now = datetime.now()
+        with self._lock:
+            self._cycle += 1
+            time_since_last = None if self._last_publish is None else (now - self._last_publish).total_seconds()
+            self._last_publish = now
+            cycle = self._cycle
+        snapshot = DashboardSnapshot(df, position, balance, last_action, risk_result, strategy_info,
+                                     performance_tracker, position_info, cycle, now, time_since_last)
+        with self._lock:
+            self._snapshot = snapshot
+            self.stats['published'] += 1
+        if not self.headless:
+            if self._thread is None:
+                self.start()
+            self._changed.set()
+
+    def latest(self):
+        """Zuletzt veröffentlichter Snapshot (oder None)"""
+        with self._lock:
+            return self._snapshot
+
+    # ---- Render-Thread ----
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="dashboard", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        frame_interval = 1.0 / self.max_fps
+        last_frame = 0.0
+        while not self._stop_event.is_set():
+            self._changed.wait()
+            if self._stop_event.is_set():
+                break
+            # Bildrate begrenzen; in der Zwischenzeit veröffentlichte Snapshots ersetzen den aktuellen
+            delay = last_frame + frame_interval - time.monotonic()
+            if delay > 0 and self._stop_event.wait(delay):
+                break
+            self._changed.clear()
+            snapshot = self.latest()
+            if snapshot is None or snapshot.cycle == self._rendered_cycle:
+                continue
+
+            start = time.perf_counter()
+            try:
+                self._draw(render_frame(snapshot))
+            except Exception as e:
+                utils.log_error(e, "Fehler beim Zeichnen der Anzeige")
+            last_frame = time.monotonic()
+            with self._lock:
+                self.stats['skipped'] += snapshot.cycle - self._rendered_cycle - 1
+                self.stats['frames'] += 1
+                self.stats['render_seconds'] += time.perf_counter() - start
+            self._rendered_cycle = snapshot.cycle
+
+    def _draw(self, lines):
+        stream = sys.stdout
+        if stream.isatty():
+            self._draw_terminal(stream, lines)
+        elif lines != self._previous_lines:
+            # Ohne Terminal (Datei, Pipe): vollständiges Bild nur bei geändertem Inhalt
+            stream.write("\n".join(lines) + "\n\n")
+            stream.flush()
+            self._previous_lines = lines
+
+    def _draw_terminal(self, stream, lines):
+        """Schreibt nur geänderte Zeilen; Logausgaben laufen im Scrollbereich unterhalb der Anzeige"""
+        size = shutil.get_terminal_size()
+        rows, columns = size.lines, size.columns
+        lines = lines[:max(rows - config.DASHBOARD_LOG_ROWS - 1, 1)]
+        parts = []
+
+        if (rows, columns) != self._terminal_size or len(lines) > self._height:
+            # Neuaufbau bei geänderter Terminalgröße oder wachsender Anzeige
+            self._terminal_size = (rows, columns)
+            self._height = len(lines)
+            self._previous_lines = []
+            parts.append("\x1b[r\x1b[2J")
+            parts.append(f"\x1b[{self._height + 1};1H{Style.RESET_ALL}{'─' * columns}")
+            parts.append(f"\x1b[{self._height + 2};{rows}r\x1b[{rows};1H")
+
+        lines = lines + [""] * (self._height - len(lines))
+        changed = [(row, line) for row, line in enumerate(lines)
+                   if row >= len(self._previous_lines) or self._previous_lines[row] != line]
+        if changed:
+            # Cursor sichern, Zeilenumbruch aus (lange Zeilen verschieben sonst die Anzeige)
+            parts.append("\x1b7\x1b[?7l")
+            for row, line in changed:
+                parts.append(f"\x1b[{row + 1};1H{line}{Style.RESET_ALL}\x1b[K")
+            parts.append("\x1b[?7h\x1b8")
+        self._previous_lines = lines
+
+        if parts:
+            stream.write("".join(parts))
+            stream.flush()
+
+    def stop(self):
+        """Beendet den Render-Thread und gibt das Terminal (Scrollbereich) wieder frei"""
+        self._stop_event.set()
+        self._changed.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        if self._terminal_size is not None:
+            sys.stdout.write(f"\x1b[r\x1b[{self._terminal_size[0]};1H\n")
+            sys.stdout.flush()
+            self._terminal_size = None
+
+    def get_status(self):
+        with self._lock:
+            return dict(self.stats, headless=self.headless, max_fps=self.max_fps)
+
+
+# Globale Instanz
+_dashboard = None
+_dashboard_lock = threading.Lock()
+
+def get_dashboard():
+    """Singleton-Zugriff auf das Dashboard (der Render-Thread startet mit dem ersten Snapshot)"""
+    global _dashboard
+    with _dashboard_lock:
+        if _dashboard is None:
+            _dashboard = Dashboard()
+            atexit.register(_dashboard.stop)
+        return _dashboard
+
+def stop_dashboard():
+    """Beendet die Anzeige, z.B. vor der Performance-Zusammenfassung beim Beenden"""
+    if _dashboard is not None:
+        _dashboard.stop()
@@ -1,9 +1,14 @@
 import pandas as pd
 import numpy as np
+import threading
 from datetime import datetime, timedelta
 from colorama import Fore, Style
 import utils
 import config
+import structured_logging
+
+
+logger = structured_logging.get_logger(__name__)
 
 class SimpleDayTraderStrategy:
     """
@@ -45,11 +50,11 @@ class SimpleDayTraderStrategy:
                 }
             
             # Log der geladenen Konfiguration
-            print(f"{Fore.CYAN}[{datetime.now().strftime('%H:%M:%S')}] Day Trader Strategie initialisiert.")
+            logger.info("Day Trader Strategie initialisiert.")
             if self.optimization_active:
-                print(f"{Fore.GREEN}[{datetime.now().strftime('%H:%M:%S')}] Selbstoptimierung aktiv (Intervall: {self.optimization_interval}h){Style.RESET_ALL}")
+                logger.info("Selbstoptimierung aktiv (Intervall: %sh)", self.optimization_interval)
         except Exception as e:
-            print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Fehler beim Laden der Day Trader Konfiguration: {str(e)}. Verwende Standardwerte.{Style.RESET_ALL}")
+            logger.warning("Fehler beim Laden der Day Trader Konfiguration: %s. Verwende Standardwerte.", e)
             # Standardwerte verwenden
             self.signal_threshold = 0.65
             self.min_trade_interval = 300
@@ -72,6 +77,9 @@ class SimpleDayTraderStrategy:
         # Self-Optimization Tracking
         self.last_optimization = None
         self.performance_history = []
+        self.optimization_exchange = None  # Exchange für die Historie der Optimierung (optional)
+        self._optimization_thread = None
+        self._optimization_result = None
     
     def calculate_signal_strength(self, df):
         """
@@ -249,17 +257,22 @@ class SimpleDayTraderStrategy:
                 return 0, "Keine Signale erkannt"
                 
         except Exception as e:
-            print(f"{Fore.RED}Fehler bei der Signalberechnung: {str(e)}{Style.RESET_ALL}")
+            logger.error("Fehler bei der Signalberechnung: %s", e)
             return 0, f"Fehler: {str(e)}"
     
-    def should_execute_trade(self, signal, signal_strength, current_price, balance=None):
-        """Entscheidet, ob ein Trade ausgeführt werden soll"""
+    def should_execute_trade(self, signal, signal_strength, current_price, balance=None, now=None):
+        """
+        Entscheidet, ob ein Trade ausgeführt werden soll
+        (now: Zeitpunkt der Entscheidung, im Backtest die Kerzenzeit - Standard: jetzt)
+        """
+        now = now or datetime.now()
+        
         # 1. Grundlegende Signalprüfung
         if signal == 0 or abs(signal_strength) < self.signal_threshold:
             return False, f"Signalstärke zu gering ({abs(signal_strength):.2f} < {self.signal_threshold:.2f})"
         
         # 2. Tageswechsel prüfen
-        current_day = datetime.now().date()
+        current_day = now.date()
         if current_day != self.current_day:
             # Neuer Tag - reset Tracking
             self.daily_profit = 0
@@ -275,7 +288,7 @@ class SimpleDayTraderStrategy:
         
         # 4. Zeitabstand zwischen Trades
         if self.last_trade_time:
-            seconds_since_last = (datetime.now() - self.last_trade_time).total_seconds()
+            seconds_since_last = (now - self.last_trade_time).total_seconds()
             if seconds_since_last < self.min_trade_interval:
                 return False, f"Zu kurze Zeit seit letztem Trade ({seconds_since_last:.0f}s < {self.min_trade_interval}s)"
         
@@ -288,14 +301,11 @@ class SimpleDayTraderStrategy:
                 if price_change > 0.01:  # +1% höher als letzter Kauf
                     return False, f"Preis {price_change*100:.1f}% höher als letzter Kauf, keine weitere Akkumulation"
         
-        # 6. Selbstoptimierung bei Bedarf durchführen
-        self.maybe_optimize_parameters()
-        
         return True, f"Signal bestätigt (Stärke: {signal_strength:.2f})"
     
-    def record_trade_result(self, trade_type, entry_price, exit_price=None, profit=None):
-        """Zeichnet Handelsergebnisse auf für Optimierung und Tracking"""
-        self.last_trade_time = datetime.now()
+    def record_trade_result(self, trade_type, entry_price, exit_price=None, profit=None, trade_time=None):
+        """Zeichnet Handelsergebnisse auf für Optimierung und Tracking (trade_time: Standard jetzt)"""
+        self.last_trade_time = trade_time or datetime.now()
         self.last_trade_type = trade_type
         
         if trade_type == 'BUY':
@@ -310,7 +320,7 @@ class SimpleDayTraderStrategy:
             
             # Speichere für Optimierungszwecke
             self.performance_history.append({
-                'time': datetime.now(),
+                'time': self.last_trade_time,
                 'type': trade_type,
                 'entry_price': entry_price,
                 'exit_price': exit_price,
@@ -328,123 +338,90 @@ class SimpleDayTraderStrategy:
             if len(self.performance_history) > 30:
                 self.performance_history = self.performance_history[-30:]
     
-    def maybe_optimize_parameters(self):
-        """Führt bei Bedarf eine Selbstoptimierung der Parameter durch"""
+    def get_parameters(self):
+        """Gibt die aktuell verwendeten, optimierbaren Parameter zurück"""
+        return {
+            'signal_threshold': self.signal_threshold,
+            'min_trade_interval': self.min_trade_interval,
+            'daily_profit_target': self.daily_profit_target,
+            'max_daily_loss': self.max_daily_loss
+        }
+    
+    def maybe_optimize_parameters(self, df=None):
+        """
+        Startet bei Bedarf eine Parameteroptimierung per Backtest (optimizer.py) in einem
+        Hintergrund-Thread und übernimmt das Ergebnis eines abgeschlossenen Laufs.
+        Der Handelszyklus wartet nie auf die Optimierung.
+        
+        Parameters:
+        df: Aktuelle Kerzen (Fallback, falls keine längere Historie geladen werden kann)
+        """
         if not self.optimization_active:
             return
-            
-        # Prüfe, ob es Zeit für eine Optimierung ist
-        if (self.last_optimization is None or 
-            (datetime.now() - self.last_optimization).total_seconds() > self.optimization_interval * 3600):
-            
-            # Benötigen mindestens 10 Trades für die Optimierung
-            if len(self.performance_history) < 10:
-                return
-                
-            print(f"{Fore.CYAN}[{datetime.now().strftime('%H:%M:%S')}] Starte Parameter-Selbstoptimierung...{Style.RESET_ALL}")
-            
-            # Berechne Performance mit aktuellen Parametern
-            current_win_rate = self._calculate_win_rate()
-            current_avg_profit = self._calculate_avg_profit()
-            current_score = current_win_rate * 0.6 + current_avg_profit * 0.4
-            
-            best_params = None
-            best_score = current_score
-            
-            # Teste verschiedene Parameterkombinationen (einfacher Grid-Search)
-            for signal_threshold in self.param_ranges['signal_threshold']:
-                for min_trade_interval in self.param_ranges['min_trade_interval']:
-                    # Die anderen Parameter weniger häufig variieren, um Rechenzeit zu sparen
-                    for daily_profit_target in [self.param_ranges['daily_profit_target'][1]]:
-                        for max_daily_loss in [self.param_ranges['max_daily_loss'][1]]:
-                            # Simuliere die Performance mit diesen Parametern
-                            temp_win_rate = self._simulate_win_rate(signal_threshold, min_trade_interval)
-                            temp_avg_profit = self._simulate_avg_profit(signal_threshold, min_trade_interval)
-                            temp_score = temp_win_rate * 0.6 + temp_avg_profit * 0.4
-                            
-                            # Speichere, wenn besser
-                            if temp_score > best_score:
-                                best_score = temp_score
-                                best_params = {
-                                    'signal_threshold': signal_threshold,
-                                    'min_trade_interval': min_trade_interval,
-                                    'daily_profit_target': daily_profit_target,
-                                    'max_daily_loss': max_daily_loss
-                                }
-            
-            # Wende die besten Parameter an, wenn gefunden
-            if best_params and best_score > current_score * 1.05:  # Mindestens 5% Verbesserung
-                old_threshold = self.signal_threshold
-                old_interval = self.min_trade_interval
-                
-                self.signal_threshold = best_params['signal_threshold']
-                self.min_trade_interval = best_params['min_trade_interval']
-                self.daily_profit_target = best_params['daily_profit_target']
-                self.max_daily_loss = best_params['max_daily_loss']
-                
-                print(f"{Fore.GREEN}[{datetime.now().strftime('%H:%M:%S')}] Parameter optimiert:"
-                      f" Signalschwelle: {old_threshold:.2f} → {self.signal_threshold:.2f},"
-                      f" Handelsintervall: {old_interval}s → {self.min_trade_interval}s{Style.RESET_ALL}")
-            else:
-                print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Keine besseren Parameter gefunden.{Style.RESET_ALL}")
-            
-            self.last_optimization = datetime.now()
-    
-    def _calculate_win_rate(self):
-        """Berechnet die aktuelle Win Rate aus der Handelshistorie"""
-        if not self.performance_history:
-            return 0.5  # Neutraler Wert, wenn keine Daten
         
-        wins = sum(1 for trade in self.performance_history if trade['profit'] > 0)
-        return wins / len(self.performance_history)
-    
-    def _calculate_avg_profit(self):
-        """Berechnet den durchschnittlichen Gewinn aus der Handelshistorie"""
-        if not self.performance_history:
-            return 0
+        self._apply_optimization_result()
         
-        total_profit = sum(trade['profit_percent'] for trade in self.performance_history)
-        return total_profit / len(self.performance_history)
-    
-    def _simulate_win_rate(self, signal_threshold, min_trade_interval):
-        """Simuliert Win Rate mit anderen Parametern"""
-        if not self.performance_history:
-            return 0.5
-            
-        # Einfache Simulation: Höhere Schwellen = weniger Trades, aber höhere Genauigkeit
-        base_win_rate = self._calculate_win_rate()
+        if self._optimization_thread is not None and self._optimization_thread.is_alive():
+            return
+        
+        # Prüfe, ob es Zeit für eine Optimierung ist
+        if (self.last_optimization is not None and
+            (datetime.now() - self.last_optimization).total_seconds() <= self.optimization_interval * 3600):
+            return
         
-        # Relative Änderung berechnen
-        threshold_factor = signal_threshold / self.signal_threshold
-        interval_factor = min_trade_interval / self.min_trade_interval
+        if df is None or df.empty:
+            return
         
-        # Annahmen:
-        # - Höhere Schwellen verbessern die Win Rate, aber reduzieren die Anzahl der Trades
-        # - Längere Intervalle tendieren zu besseren Trades (weniger Overtrading)
-        adjustment = (threshold_factor - 1) * 0.2 + (interval_factor - 1) * 0.1
+        # Benötigen mindestens 10 Trades für die Optimierung
+        if len(self.performance_history) < 10:
+            return
         
-        # Anwenden mit Begrenzung
-        simulated_win_rate = base_win_rate * (1 + adjustment)
-        return min(0.95, max(0.3, simulated_win_rate))  # Begrenzen zwischen 30% und 95%
+        logger.info("Starte Parameter-Selbstoptimierung im Hintergrund...")
+        self.last_optimization = datetime.now()
+        self._optimization_thread = threading.Thread(
+            target=self._run_optimization, args=(df.copy(), self.get_parameters()),
+            name="day-trader-optimizer", daemon=True
+        )
+        self._optimization_thread.start()
     
-    def _simulate_avg_profit(self, signal_threshold, min_trade_interval):
-        """Simuliert durchschnittlichen Gewinn mit anderen Parametern"""
-        if not self.performance_history:
-            return 0
-            
-        # Ähnlich wie bei Win Rate
-        base_avg_profit = self._calculate_avg_profit()
+    def _run_optimization(self, df, current_params):
+        """Läuft im Hintergrund-Thread: lädt die Historie und bewertet alle Kandidaten"""
+        import optimizer
+        try:
+            candles = optimizer.load_optimization_candles(self.optimization_exchange, df)
+            results = optimizer.optimize_day_trader(candles, current_params=current_params, verbose=False,
+                                                    max_workers=config.OPTIMIZER_LIVE_MAX_WORKERS)
+            self._optimization_result = results
+        except Exception as e:
+            utils.log_error(e, "Fehler bei der Parameter-Selbstoptimierung")
+    
+    def _apply_optimization_result(self):
+        """Übernimmt die besten Parameter eines abgeschlossenen Optimierungslaufs (im Handels-Thread)"""
+        results, self._optimization_result = self._optimization_result, None
+        if not results:
+            return
         
-        # Relative Änderung berechnen
-        threshold_factor = signal_threshold / self.signal_threshold
-        interval_factor = min_trade_interval / self.min_trade_interval
+        best = results[0]
+        current = next((result for result in results if result.get('is_current')), None)
+        current_score = current['score'] if current else 0
         
-        # Annahmen wie oben
-        adjustment = (threshold_factor - 1) * 0.3 + (interval_factor - 1) * 0.15
+        # Mindestens 5% Verbesserung gegenüber den aktuellen Parametern
+        if best.get('is_current') or not best['valid'] or best['score'] <= current_score + abs(current_score) * 0.05:
+            logger.info("Keine besseren Parameter gefunden.")
+            return
+        
+        old_threshold = self.signal_threshold
+        old_interval = self.min_trade_interval
         
-        # Anwenden mit Begrenzung
-        simulated_avg_profit = base_avg_profit * (1 + adjustment)
-        return simulated_avg_profit  # Hier ohne harte Grenzen
+        self.signal_threshold = best['params']['signal_threshold']
+        self.min_trade_interval = best['params']['min_trade_interval']
+        self.daily_profit_target = best['params']['daily_profit_target']
+        self.max_daily_loss = best['params']['max_daily_loss']
+        
+        logger.info("Parameter optimiert: Signalschwelle: %.2f → %.2f, Handelsintervall: %ss → %ss"
+                    " (Backtest-Rendite %+.2f%% statt %+.2f%%)",
+                    old_threshold, self.signal_threshold, old_interval, self.min_trade_interval,
+                    best['score'], current_score, extra={'color': Fore.GREEN})
     
     def day_trader_strategy(self, df, actual_balance=None):
         """
@@ -466,6 +443,9 @@ class SimpleDayTraderStrategy:
             # 2. Berechne Signal und Signalstärke
             signal_strength, signal_details = self.calculate_signal_strength(df)
             
+            # Selbstoptimierung bei Bedarf (läuft im Hintergrund)
+            self.maybe_optimize_parameters(df)
+            
             # 3. Konvertiere in binäres Signal
             if signal_strength > self.signal_threshold:
                 signal = 1  # Kaufsignal
@@ -483,7 +463,7 @@ class SimpleDayTraderStrategy:
             if not execute_trade:
                 original_signal = signal
                 signal = 0
-                print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Signal ignoriert: {execution_reason}{Style.RESET_ALL}")
+                logger.info("Signal ignoriert: %s", execution_reason)
             
             # Signal-Farbe für Ausgabe
             signal_color = Fore.GREEN if signal > 0 else (Fore.RED if signal < 0 else Fore.YELLOW)
@@ -505,7 +485,7 @@ class SimpleDayTraderStrategy:
             return signal, info
             
         except Exception as e:
-            print(f"{Fore.RED}Fehler in der Day-Trader-Strategie: {str(e)}{Style.RESET_ALL}")
+            logger.error("Fehler in der Day-Trader-Strategie: %s", e)
             info = {
                 'strategy': 'DAY_TRADER',
                 'description': 'Optimierte Day-Trading-Strategie für kleine Kapitalbeträge',
@@ -514,6 +494,111 @@ class SimpleDayTraderStrategy:
             return 0, info
 
 
+def _cap(values, limit):
+    """Wie min(limit, value) in Python: NaN-Werte ergeben limit"""
+    return np.where(values < limit, values, limit)
+
+def _floor(values, limit):
+    """Wie max(limit, value) in Python: NaN-Werte ergeben limit"""
+    return np.where(values > limit, values, limit)
+
+def calculate_signal_strength_series(df):
+    """
+    Vektorisierte Variante von SimpleDayTraderStrategy.calculate_signal_strength.
+    Eintrag i entspricht der Signalstärke für ein Fenster, das mit Zeile i endet
+    (Zeilen mit weniger als 10 Kerzen Vorlauf erhalten 0). Die Signalstärke hängt nicht
+    von den optimierbaren Parametern ab und wird für Backtests nur einmal berechnet.
+    
+    Returns:
+    np.ndarray: Signalstärke zwischen -1 und 1 pro Zeile
+    """
+    rows = len(df)
+    column = lambda name: df[name].to_numpy(dtype=np.float64)
+    previous = lambda values: np.concatenate(([np.nan], values[:-1]))
+    weighted_sum = np.zeros(rows)
+    total_weight = np.zeros(rows)
+    
+    def add(mask, value, weight):
+        mask = mask & True
+        weighted_sum[mask] += (value * weight)[mask] if np.ndim(value) else value * weight
+        total_weight[mask] += weight
+    
+    close = column('close')
+    
+    # 1. RSI Signal
+    if 'rsi' in df.columns:
+        rsi = column('rsi')
+        rsi_prev = previous(rsi)
+        rising, falling = rsi > rsi_prev, rsi < rsi_prev
+        strong_buy = (rsi < 30) & rising
+        strong_sell = ~strong_buy & (rsi > 70) & falling
+        weak_buy = ~strong_buy & ~strong_sell & (rsi < 40) & rising
+        weak_sell = ~strong_buy & ~strong_sell & ~weak_buy & (rsi > 60) & falling
+        add(strong_buy, 1.0, 0.25)
+        add(strong_sell, -1.0, 0.25)
+        add(weak_buy, 0.5, 0.15)
+        add(weak_sell, -0.5, 0.15)
+    
+    # 2. MACD Signal
+    if 'macd' in df.columns and 'macd_signal' in df.columns:
+        macd, macd_signal = column('macd'), column('macd_signal')
+        macd_prev, macd_signal_prev = previous(macd), previous(macd_signal)
+        cross_up = (macd_prev <= macd_signal_prev) & (macd > macd_signal)
+        cross_down = ~cross_up & (macd_prev >= macd_signal_prev) & (macd < macd_signal)
+        above = ~cross_up & ~cross_down & (macd > macd_signal)
+        below = ~cross_up & ~cross_down & ~above & (macd < macd_signal)
+        add(cross_up, 1.0, 0.3)
+        add(cross_down, -1.0, 0.3)
+        add(above, _cap((macd - macd_signal) * 20, 1.0) * 0.5, 0.2)
+        add(below, -_cap((macd_signal - macd) * 20, 1.0) * 0.5, 0.2)
+    
+    # 3. Bollinger Bands
+    if 'bb_upper' in df.columns and 'bb_lower' in df.columns and 'bb_middle' in df.columns:
+        upper, lower, middle = column('bb_upper'), column('bb_lower'), column('bb_middle')
+        oversold = close < lower
+        overbought = ~oversold & (close > upper)
+        add(oversold, _cap((lower - close) / lower * 3, 1.0), 0.25)
+        add(overbought, -_cap((close - upper) / upper * 3, 1.0), 0.25)
+        
+        # Band-Squeeze: Richtung aus der Preisänderung über zwei Kerzen
+        close_2 = np.concatenate(([np.nan, np.nan], close[:-2]))
+        direction = np.where((close - close_2) / close_2 > 0, 1.0, -1.0)
+        add((upper - lower) / middle < 0.025, direction * 0.4, 0.15)
+    
+    # 4. SMA Crossover
+    if 'sma_5' in df.columns and 'sma_20' in df.columns:
+        sma_short, sma_long = column('sma_5'), column('sma_20')
+        sma_short_prev, sma_long_prev = previous(sma_short), previous(sma_long)
+        cross_up = (sma_short_prev <= sma_long_prev) & (sma_short > sma_long)
+        cross_down = ~cross_up & (sma_short_prev >= sma_long_prev) & (sma_short < sma_long)
+        above = ~cross_up & ~cross_down & (sma_short > sma_long)
+        below = ~cross_up & ~cross_down & ~above
+        add(cross_up, 0.9, 0.3)
+        add(cross_down, -0.9, 0.3)
+        add(above, _cap((sma_short - sma_long) / sma_long * 20, 1.0) * 0.4, 0.15)
+        add(below, -_cap((sma_long - sma_short) / sma_long * 20, 1.0) * 0.4, 0.15)
+    
+    # 5. Preismomentum (kurzfristig)
+    close_prev = previous(close)
+    add(np.ones(rows, dtype=bool), _cap(_floor((close - close_prev) / close_prev * 100, -0.8), 0.8), 0.1)
+    
+    # 6. Volumen-Anomalien (Durchschnitt der letzten 10 Kerzen inkl. aktueller)
+    if 'volume' in df.columns and not df['volume'].isna().all():
+        volume = column('volume')
+        avg_volume = df['volume'].rolling(10, min_periods=1).mean().to_numpy(dtype=np.float64)
+        spike = volume > avg_volume * 1.8
+        with np.errstate(divide='ignore', invalid='ignore'):
+            vol_signal = _cap(volume / avg_volume * 0.3, 1.0)
+        bullish = close > column('open')
+        add(spike & bullish, vol_signal, 0.2)
+        add(spike & ~bullish, -vol_signal, 0.2)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        strength = weighted_sum / total_weight
+    strength = _floor(_cap(strength, 1.0), -1.0)
+    strength[:min(rows, 9)] = 0
+    return strength
+
 # Globale Instanz der Day-Trader-Strategie
 _day_trader_strategy_instance = None
 
@@ -1,12 +1,16 @@
+import logging
 import pandas as pd
 import numpy as np
 from datetime import datetime
-from colorama import Fore, Style
 import utils
 import os
 import config
+import structured_logging
 from advanced_market_analysis import AdvancedMarketAnalysis, RiskAdjuster
 
+
+logger = structured_logging.get_logger(__name__)
+
 class EnhancedAdaptiveStrategy:
     """
     Verbesserte adaptive Meta-Strategie, die dynamisch die beste Trading-Strategie für
@@ -81,41 +85,24 @@ class EnhancedAdaptiveStrategy:
         
         evaluations = {}
         
+        import strategies
+        
+        # Historische Simulation: Signal i stammt aus df.iloc[:-(lookback+5)+i]
+        n = len(df)
+        window_ends = n - (self.lookback_period + 5) + np.arange(self.lookback_period)
+        closes = df['close'].to_numpy()
+        period_returns = (closes[window_ends[1:]] - closes[window_ends[1:] - 1]) / closes[window_ends[1:] - 1]
+        
         # Erweiterte Performance-Evaluierung mit mehreren Metriken
-        for strategy_name, strategy_func in self.available_strategies.items():
-            if strategy_func is None:
-                self.setup_strategies()
-                strategy_func = self.available_strategies[strategy_name]
+        for strategy_name in self.available_strategies:
+            # Berechne Signale und simulierte Renditen für die letzten N Perioden in einem Durchlauf
+            # (Fenster mit weniger als 3 Kerzen liefern kein Signal)
+            series = strategies.get_signal_series(df, strategy_name)
+            signals = np.where(window_ends >= 3, series[np.maximum(window_ends - 1, 0)], 0)
             
-            # Berechne Signale und simulierte Renditen für die letzten N Perioden
-            signals = []
-            returns = []
-            position = 0
-            
-            for i in range(self.lookback_period):
-                # Erstelle ein temporäres DataFrame bis zum aktuellen Index für historische Simulation
-                hist_index = -(self.lookback_period + 5) + i
-                temp_df = df.iloc[:hist_index].copy() if hist_index < -1 else df.iloc[:-1].copy()
-                
-                # Generiere Signal für diese historische Periode
-                signal, _ = strategy_func(temp_df)
-                signals.append(signal)
-                
-                # Position aktualisieren basierend auf Signal
-                if signal == 1 and position <= 0:  # Kaufsignal
-                    position = 1
-                elif signal == -1 and position >= 0:  # Verkaufssignal
-                    position = -1
-                
-                # Berechne Rendite für diese Periode
-                if i > 0:  # Überspringen der ersten Periode, da wir die Rendite basierend auf vorherigem Signal berechnen
-                    price_prev = df['close'].iloc[-(self.lookback_period + 5) + i - 1]
-                    price_curr = df['close'].iloc[-(self.lookback_period + 5) + i]
-                    period_return = (price_curr - price_prev) / price_prev
-                    
-                    # Rendite basierend auf Position
-                    strategy_return = position * period_return
-                    returns.append(strategy_return)
+            # Position aktualisieren basierend auf Signal, Rendite ab der zweiten Periode
+            positions = strategies.hold_positions(signals)
+            returns = (positions[1:] * period_returns).tolist()
             
             # Berechne verschiedene Performance-Metriken
             if len(returns) > 0:
@@ -224,21 +211,22 @@ class EnhancedAdaptiveStrategy:
         # Speichere die aktuelle Strategie
         self.current_strategy = best_strategy
         
-        # Log von Strategie-Scores für Debugging
-        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Strategie-Auswahl (Marktregime: {market_regime}):{Style.RESET_ALL}")
+        # Log von Strategie-Scores für Debugging (nur aufbauen, wenn INFO aktiv ist)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Strategie-Auswahl (Marktregime: %s):", market_regime)
         
-        # Sortiere Strategien nach Score für bessere Lesbarkeit
-        sorted_strategies = sorted(combined_scores.items(), key=lambda x: x[1], reverse=True)
-        for strategy, score in sorted_strategies:
-            selected_marker = " ◀ AUSGEWÄHLT" if strategy == best_strategy else ""
-            perf_detail = self.strategy_performance.get(strategy, {})
+            # Sortiere Strategien nach Score für bessere Lesbarkeit
+            sorted_strategies = sorted(combined_scores.items(), key=lambda x: x[1], reverse=True)
+            for strategy, score in sorted_strategies:
+                selected_marker = " ◀ AUSGEWÄHLT" if strategy == best_strategy else ""
+                perf_detail = self.strategy_performance.get(strategy, {})
             
-            # Detailliertere Ausgabe für besseres Verständnis
-            performance_details = f" | Return: {perf_detail.get('cumulative_return', 0):.2%}"
-            performance_details += f" | Sharpe: {perf_detail.get('sharpe', 0):.2f}"
-            performance_details += f" | Win Rate: {perf_detail.get('win_rate', 0):.2%}"
+                # Detailliertere Ausgabe für besseres Verständnis
+                performance_details = f" | Return: {perf_detail.get('cumulative_return', 0):.2%}"
+                performance_details += f" | Sharpe: {perf_detail.get('sharpe', 0):.2f}"
+                performance_details += f" | Win Rate: {perf_detail.get('win_rate', 0):.2%}"
             
-            print(f"  {strategy}: {score:.2f}{selected_marker}{performance_details}")
+                logger.info("  %s: %.2f%s%s", strategy, score, selected_marker, performance_details)
         
         # Risikoanalyse basierend auf aktuellen Marktbedingungen
         risk_analysis = self.risk_adjuster.adjust_risk(market_analysis)
@@ -254,7 +242,7 @@ class EnhancedAdaptiveStrategy:
             self.save_strategy_changes()
 
             # Log von Strategie-Scores für Debugging
-        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Strategie-Auswahl (Marktregime: {market_regime}):{Style.RESET_ALL}")
+        logger.info("Strategie-Auswahl (Marktregime: %s):", market_regime)
         
         return best_strategy, market_analysis
     
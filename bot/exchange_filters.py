@@ -0,0 +1,235 @@
+"""
+Zwischenspeicher der Handelsfilter pro Symbol (Schrittgröße, Tick-Größe, Mindest-/Höchstmenge,
+Mindestorderwert).
+
+Die Filter werden beim Start einmal aus den Marktdaten der Exchange geladen und im Hintergrund
+periodisch aktualisiert. Mengen werden vor dem Senden mit Decimal exakt auf die Schrittgröße
+gerundet, sodass Orders nicht erst an LOT_SIZE/MIN_NOTIONAL scheitern.
+"""
+import threading
+import time
+from datetime import datetime
+from decimal import Decimal, ROUND_DOWN, ROUND_UP
+from colorama import Fore, Style
+import utils
+import config
+
+
+# Fehlermeldungen der Exchange, die auf veraltete oder falsch angewendete Filter hinweisen
+FILTER_ERROR_MARKERS = ('LOT_SIZE', 'MIN_NOTIONAL', 'NOTIONAL', 'PRICE_FILTER', '-1013', '-1111', '-4164')
+
+
+def _decimal(value):
+    """Wandelt einen Filterwert in Decimal um (None für fehlende oder 0-Werte)"""
+    if value is None or value == '':
+        return None
+    value = Decimal(str(value))
+    return value if value > 0 else None
+
+
+def _step_from_precision(precision):
+    """ccxt liefert die Präzision je nach Modus als Dezimalstellen (int) oder direkt als Schrittgröße"""
+    if precision is None:
+        return None
+    if isinstance(precision, int):
+        return Decimal(1).scaleb(-precision)
+    return _decimal(precision)
+
+
+class SymbolFilters:
+    """Handelsfilter eines Symbols mit exakter Rundung"""
+
+    def __init__(self, symbol, step_size=None, tick_size=None, min_qty=None, max_qty=None,
+                 min_notional=None, source='markets'):
+        self.symbol = symbol
+        self.step_size = _decimal(step_size)
+        self.tick_size = _decimal(tick_size)
+        self.min_qty = _decimal(min_qty)
+        self.max_qty = _decimal(max_qty)
+        self.min_notional = _decimal(min_notional)
+        self.source = source  # 'markets' oder 'fallback'
+
+    @classmethod
+    def from_market(cls, symbol, market):
+        """
+        Liest die Filter aus einem ccxt-Markt. Die rohen Binance-Filter (info.filters) haben
+        Vorrang, da sie auch die Regeln für Market-Orders (MARKET_LOT_SIZE) enthalten.
+        """
+        raw = {entry.get('filterType'): entry for entry in (market.get('info') or {}).get('filters', [])}
+        lot_size = raw.get('LOT_SIZE', {})
+        market_lot_size = raw.get('MARKET_LOT_SIZE', {})
+        notional = raw.get('MIN_NOTIONAL') or raw.get('NOTIONAL') or {}
+        precision = market.get('precision') or {}
+        limits = market.get('limits') or {}
+        amount_limits = limits.get('amount') or {}
+
+        min_quantities = [value for value in (_decimal(lot_size.get('minQty')), _decimal(market_lot_size.get('minQty'))) if value]
+        max_quantities = [value for value in (_decimal(lot_size.get('maxQty')), _decimal(market_lot_size.get('maxQty'))) if value]
+        return cls(
+            symbol,
+            step_size=_decimal(lot_size.get('stepSize')) or _step_from_precision(precision.get('amount')),
+            tick_size=_decimal(raw.get('PRICE_FILTER', {}).get('tickSize')) or _step_from_precision(precision.get('price')),
+            min_qty=max(min_quantities) if min_quantities else amount_limits.get('min'),
+            max_qty=min(max_quantities) if max_quantities else amount_limits.get('max'),
+            min_notional=notional.get('minNotional') or notional.get('notional') or (limits.get('cost') or {}).get('min')
+        )
+
+    @classmethod
+    def fallback(cls, symbol):
+        """Konservative Standardwerte aus config.COIN_FALLBACKS, wenn keine Marktdaten verfügbar sind"""
+        defaults = config.COIN_FALLBACKS.get(config.get_base_currency(symbol), {'precision': 2, 'min_amount': 0.01})
+        return cls(symbol, step_size=Decimal(1).scaleb(-defaults['precision']), min_qty=defaults['min_amount'], source='fallback')
+
+    def round_quantity(self, quantity, round_up=False):
+        """Rundet eine Menge exakt auf ein Vielfaches der Schrittgröße (Standard: abrunden)"""
+        if not self.step_size:
+            return float(quantity)
+        steps = (Decimal(str(quantity)) / self.step_size).to_integral_value(rounding=ROUND_UP if round_up else ROUND_DOWN)
+        return float(steps * self.step_size)
+
+    def round_price(self, price, round_up=False):
+        """Rundet einen Preis exakt auf ein Vielfaches der Tick-Größe (Standard: abrunden)"""
+        if not self.tick_size:
+            return float(price)
+        ticks = (Decimal(str(price)) / self.tick_size).to_integral_value(rounding=ROUND_UP if round_up else ROUND_DOWN)
+        return float(ticks * self.tick_size)
+
+    def apply(self, quantity, price, closing=False):
+        """
+        Passt eine Menge an alle Filter an: Abrunden auf die Schrittgröße, Anheben auf Mindestmenge
+        und Mindestorderwert (aufgerundet), Begrenzen auf die Höchstmenge.
+
+        Parameters:
+        quantity: Gewünschte Menge
+        price: Aktueller Preis (für den Mindestorderwert)
+        closing: Order schließt eine Position - nur abrunden (nie mehr als vorhanden verkaufen),
+                 unter Mindestmenge bzw. Mindestorderwert ist die Order nicht möglich
+
+        Returns:
+        float: Gültige Ordermenge (0, wenn eine schließende Order die Mindestwerte unterschreitet)
+        """
+        quantity = self.round_quantity(quantity)
+        if closing:
+            if self.max_qty and quantity > self.max_qty:
+                quantity = self.round_quantity(self.max_qty)
+            if self.min_qty and quantity < self.min_qty:
+                return 0.0
+            if self.min_notional and price and Decimal(str(quantity)) * Decimal(str(price)) < self.min_notional:
+                return 0.0
+            return quantity
+        if self.min_qty and quantity < self.min_qty:
+            quantity = self.round_quantity(self.min_qty, round_up=True)
+        if self.min_notional and price and Decimal(str(quantity)) * Decimal(str(price)) < self.min_notional:
+            quantity = self.round_quantity(self.min_notional / Decimal(str(price)), round_up=True)
+        if self.max_qty and quantity > self.max_qty:
+            quantity = self.round_quantity(self.max_qty)
+        return quantity
+
+    def describe(self):
+        return (f"Schrittgröße={self.step_size}, Tick-Größe={self.tick_size}, Mindestmenge={self.min_qty}, "
+                f"Maximalmenge={self.max_qty}, Min. Orderwert={self.min_notional} ({self.source})")
+
+
+class ExchangeFilterCache:
+    """Filter aller genutzten Symbole, einmal geladen und periodisch im Hintergrund aktualisiert"""
+
+    def __init__(self, refresh_interval=None):
+        """
+        Parameters:
+        refresh_interval: Sekunden bis zur nächsten Aktualisierung (Standard: config.EXCHANGE_FILTER_REFRESH_INTERVAL)
+        """
+        self.refresh_interval = refresh_interval or config.EXCHANGE_FILTER_REFRESH_INTERVAL
+        self.loaded_at = None
+        self._filters = {}
+        self._lock = threading.Lock()
+        self._refresh_thread = None
+
+    def update_from_markets(self, markets, symbols=None):
+        """Übernimmt die Filter aus einem ccxt-Markets-Dictionary (Standard: alle bereits bekannten Symbole)"""
+        symbols = symbols or list(self._filters) or list(markets)
+        updated = {}
+        for symbol in symbols:
+            market = markets.get(symbol) or markets.get(symbol.replace('/', ''))
+            if market is not None:
+                updated[symbol] = SymbolFilters.from_market(symbol, market)
+        with self._lock:
+            self._filters.update(updated)
+            self.loaded_at = time.monotonic()
+        return len(updated)
+
+    def load(self, exchange, symbols=None):
+        """
+        Lädt die Marktdaten (synchron) und übernimmt die Filter der Symbole.
+
+        Parameters:
+        exchange: Exchange-Objekt (ccxt, AsyncExchangeBridge oder MockExchange)
+        symbols: Symbole (Standard: config.SYMBOL und config.PORTFOLIO_SYMBOLS)
+        """
+        symbols = symbols or list(dict.fromkeys([config.SYMBOL] + list(config.PORTFOLIO_SYMBOLS) + list(self._filters)))
+        try:
+            markets = exchange.load_markets(reload=self.loaded_at is not None)
+            count = self.update_from_markets(markets, symbols)
+            print(f"{Fore.CYAN}[{datetime.now().strftime('%H:%M:%S')}] Handelsfilter für {count} Symbol(e) geladen.{Style.RESET_ALL}")
+        except Exception as e:
+            utils.log_error(e, "Fehler beim Laden der Handelsfilter")
+
+    def refresh_if_stale(self, exchange):
+        """Startet eine Aktualisierung im Hintergrund, wenn die Filter älter als das Intervall sind"""
+        if self.loaded_at is None or time.monotonic() - self.loaded_at < self.refresh_interval:
+            return
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            return
+        self._refresh_thread = threading.Thread(target=self.load, args=(exchange,), name="exchange-filters", daemon=True)
+        self._refresh_thread.start()
+
+    def get(self, exchange, symbol):
+        """
+        Gibt die Filter eines Symbols zurück. Unbekannte Symbole werden einmalig über
+        exchange.market() nachgeladen, ohne Marktdaten gelten die Standardwerte.
+
+        Returns:
+        SymbolFilters: Filter des Symbols
+        """
+        filters = self._filters.get(symbol)
+        if filters is not None:
+            return filters
+        for candidate in (symbol, symbol.replace('/', '')):
+            try:
+                filters = SymbolFilters.from_market(symbol, exchange.market(candidate))
+                break
+            except Exception:
+                continue
+        if filters is None:
+            print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Keine Marktdaten für {symbol}. Verwende konservative Standardwerte.{Style.RESET_ALL}")
+            return SymbolFilters.fallback(symbol)
+        with self._lock:
+            self._filters[symbol] = filters
+        return filters
+
+    def reload_symbol(self, exchange, symbol):
+        """Lädt die Filter eines Symbols neu (nach einer Ablehnung durch die Exchange)"""
+        with self._lock:
+            self._filters.pop(symbol, None)
+        try:
+            markets = exchange.load_markets(reload=True)
+            if isinstance(markets, dict):
+                self.update_from_markets(markets, [symbol])
+        except Exception as e:
+            utils.log_error(e, f"Fehler beim Neuladen der Handelsfilter für {symbol}")
+        return self.get(exchange, symbol)
+
+
+def is_filter_error(error_message):
+    """Prüft, ob eine Order an einem Handelsfilter gescheitert ist"""
+    return any(marker in error_message for marker in FILTER_ERROR_MARKERS)
+
+
+# Globale Instanz
+_filter_cache = None
+
+def get_filter_cache():
+    """Singleton-Zugriff auf den ExchangeFilterCache"""
+    global _filter_cache
+    if _filter_cache is None:
+        _filter_cache = ExchangeFilterCache()
+    return _filter_cache
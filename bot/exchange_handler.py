@@ -1,160 +1,356 @@
+import contextlib
 import ccxt
 import pandas as pd
 import time
-from datetime import datetime
 from colorama import Fore, Style
 import utils
 import config
-import math
+import structured_logging
+import candle_store
+import exchange_filters
+import ohlcv_cache
+import latency
+import rate_limiter
 
 
+logger = structured_logging.get_logger(__name__)
+
+
+def _exchange_options(api_key, api_secret):
+    """Verbindungsoptionen für Binance - Futures für Testnet oder Spot für Live"""
+    if config.USE_TESTNET:
+        logger.info("Initialisiere FUTURES TESTNET-Modus")
+        return {
+            'apiKey': api_key,
+            'secret': api_secret,
+            'enableRateLimit': True,
+            'options': {
+                'defaultType': 'future',
+                'adjustForTimeDifference': True,
+            }
+        }
+    
+    logger.info("Initialisiere SPOT LIVE-Modus")
+    return {
+        'apiKey': api_key,
+        'secret': api_secret,
+        'enableRateLimit': True,
+        'timeout': 30000,
+        'options': {
+            'defaultType': 'spot',
+            'adjustForTimeDifference': True,
+            'recvWindow': 60000
+        }
+    }
+
+def _validate_exchange(exchange):
+    """
+    Prüft API-Schlüssel und Märkte und fragt beim Live-Trading nach einer Bestätigung.
+    Funktioniert mit jedem synchronen Exchange-Objekt (auch async_exchange_handler.AsyncExchangeBridge).
+    
+    Returns:
+    bool: True wenn die Exchange verwendet werden kann
+    """
+    # Sofortige API-Validierung mit einer Methode, die auf jeden Fall API-Schlüssel erfordert
+    logger.info("Validiere API-Schlüssel...")
+    try:
+        # fetch_balance erfordert einen gültigen API-Schlüssel
+        balance = exchange.fetch_balance()
+        logger.info("API-Verbindung erfolgreich validiert!")
+        
+        # Zeige Kontoinformationen
+        quote_currency = config.get_quote_currency()
+        if config.USE_TESTNET:
+            print(f"{Fore.YELLOW}Testnet {quote_currency} Balance: {balance.get(quote_currency, {}).get('free', 0):.2f}{Style.RESET_ALL}")
+        else:
+            non_zero = {curr: amt for curr, amt in balance['free'].items() if amt > 0}
+            if non_zero:
+                print(f"{Fore.YELLOW}Verfügbare Guthaben:{Style.RESET_ALL}")
+                for currency, amount in non_zero.items():
+                    print(f"{Fore.YELLOW}{currency}: {amount}{Style.RESET_ALL}")
+            else:
+                print(f"{Fore.YELLOW}Keine Guthaben gefunden oder alle Guthaben sind 0.{Style.RESET_ALL}")
+        
+        # Zusätzlich öffentliche Marktdaten laden
+        markets = exchange.load_markets()
+        logger.info("Marktdaten erfolgreich geladen (%s Märkte).", len(markets))
+        
+        # Überprüfen, ob das konfigurierte Symbol verfügbar ist
+        if config.SYMBOL not in markets:
+            available_symbols = ", ".join(list(markets.keys())[:10]) + "..." if len(markets) > 10 else ", ".join(markets.keys())
+            logger.warning("Das konfigurierte Symbol %s wurde nicht in den verfügbaren Märkten gefunden!", config.SYMBOL)
+            print(f"{Fore.YELLOW}Verfügbare Symbole (Beispiele): {available_symbols}{Style.RESET_ALL}")
+            
+            # Versuche alternative Schreibweise
+            alt_symbol = config.SYMBOL.replace("/", "")
+            if alt_symbol in markets:
+                logger.info("Alternative Schreibweise %s gefunden, verwende diese.", alt_symbol)
+            else:
+                logger.info("Fahre fort mit konfiguriertem Symbol, aber es könnte zu Problemen kommen.")
+    
+    except Exception as api_error:
+        logger.error("API-Schlüssel Validierung fehlgeschlagen!")
+        print(f"{Fore.RED}Fehler: {str(api_error)}{Style.RESET_ALL}")
+        return False
+    
+    # Zeige eine deutliche Warnung beim Live-Trading NACH der API-Validierung
+    if not config.USE_TESTNET:
+        print(f"\n{Fore.RED}===============================================")
+        print(f"{Fore.RED}!!! ACHTUNG: LIVE-TRADING MODUS AKTIVIERT !!!")
+        print(f"{Fore.RED}Sie handeln jetzt mit echtem Geld im SPOT-MODUS!")
+        print(f"{Fore.RED}==============================================={Style.RESET_ALL}\n")
+        
+        # Bei Live-Trading zusätzliche Sicherheitsabfrage
+        if config.CONFIRM_TRADES:
+            confirmation = input(f"{Fore.YELLOW}Sind Sie sicher, dass Sie mit echtem Geld handeln möchten? (j/n): {Style.RESET_ALL}")
+            if confirmation.lower() != 'j':
+                print(f"{Fore.GREEN}Live-Trading abgebrochen. Beende Programm.{Style.RESET_ALL}")
+                return False
+    else:
+        print(f"{Fore.GREEN}TESTNET-MODUS aktiv. Es wird kein echtes Geld gehandelt.{Style.RESET_ALL}")
+    
+    return True
+
 def initialize_exchange(api_key, api_secret):
     """Initialisiert den Binance Client - Futures für Testnet oder Spot für Live"""
     try:
-        # Verwende Futures für Testnet, Spot für Live-Handel
-        trading_type = 'future' if config.USE_TESTNET else 'spot'
+        exchange_options = _exchange_options(api_key, api_secret)
         
         if config.USE_TESTNET:
-            print(f"{Fore.CYAN}[{datetime.now().strftime('%H:%M:%S')}] Initialisiere FUTURES TESTNET-Modus{Style.RESET_ALL}")
-            exchange_options = {
-                'apiKey': api_key,
-                'secret': api_secret,
-                'enableRateLimit': True,
-                'options': {
-                    'defaultType': 'future',
-                    'adjustForTimeDifference': True,
-                }
-            }
-            
             # Einfachere Testnet-Setup-Methode
             from ccxt.binance import binance
             exchange = binance(exchange_options)
             exchange.set_sandbox_mode(True)  # Aktiviert Testnet-Modus
         else:
-            print(f"{Fore.CYAN}[{datetime.now().strftime('%H:%M:%S')}] Initialisiere SPOT LIVE-Modus{Style.RESET_ALL}")
-            exchange_options = {
-                'apiKey': api_key,
-                'secret': api_secret,
-                'enableRateLimit': True,
-                'timeout': 30000,
-                'options': {
-                    'defaultType': 'spot',
-                    'adjustForTimeDifference': True,
-                    'recvWindow': 60000
-                }
-            }
             exchange = ccxt.binance(exchange_options)
+        rate_limiter.install(exchange)
         
-        # Sofortige API-Validierung mit einer Methode, die auf jeden Fall API-Schlüssel erfordert
-        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Validiere API-Schlüssel...{Style.RESET_ALL}")
-        try:
-            # fetch_balance erfordert einen gültigen API-Schlüssel
-            balance = exchange.fetch_balance()
-            print(f"{Fore.GREEN}[{datetime.now().strftime('%H:%M:%S')}] API-Verbindung erfolgreich validiert!{Style.RESET_ALL}")
-            
-            # Zeige Kontoinformationen
-            quote_currency = config.get_quote_currency()
-            if config.USE_TESTNET:
-                print(f"{Fore.YELLOW}Testnet {quote_currency} Balance: {balance.get(quote_currency, {}).get('free', 0):.2f}{Style.RESET_ALL}")
-            else:
-                non_zero = {curr: amt for curr, amt in balance['free'].items() if amt > 0}
-                if non_zero:
-                    print(f"{Fore.YELLOW}Verfügbare Guthaben:{Style.RESET_ALL}")
-                    for currency, amount in non_zero.items():
-                        print(f"{Fore.YELLOW}{currency}: {amount}{Style.RESET_ALL}")
-                else:
-                    print(f"{Fore.YELLOW}Keine Guthaben gefunden oder alle Guthaben sind 0.{Style.RESET_ALL}")
-            
-            # Zusätzlich öffentliche Marktdaten laden
-            markets = exchange.load_markets()
-            print(f"{Fore.GREEN}[{datetime.now().strftime('%H:%M:%S')}] Marktdaten erfolgreich geladen ({len(markets)} Märkte).{Style.RESET_ALL}")
-            
-            # Überprüfen, ob das konfigurierte Symbol verfügbar ist
-            if config.SYMBOL not in markets:
-                available_symbols = ", ".join(list(markets.keys())[:10]) + "..." if len(markets) > 10 else ", ".join(markets.keys())
-                print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] Warnung: Das konfigurierte Symbol {config.SYMBOL} wurde nicht in den verfügbaren Märkten gefunden!{Style.RESET_ALL}")
-                print(f"{Fore.YELLOW}Verfügbare Symbole (Beispiele): {available_symbols}{Style.RESET_ALL}")
-                
-                # Versuche alternative Schreibweise
-                alt_symbol = config.SYMBOL.replace("/", "")
-                if alt_symbol in markets:
-                    print(f"{Fore.GREEN}[{datetime.now().strftime('%H:%M:%S')}] Alternative Schreibweise {alt_symbol} gefunden, verwende diese.{Style.RESET_ALL}")
-                else:
-                    print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Fahre fort mit konfiguriertem Symbol, aber es könnte zu Problemen kommen.{Style.RESET_ALL}")
-        
-        except Exception as api_error:
-            print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] API-Schlüssel Validierung fehlgeschlagen!{Style.RESET_ALL}")
-            print(f"{Fore.RED}Fehler: {str(api_error)}{Style.RESET_ALL}")
+        if not _validate_exchange(exchange):
             return None
         
-        # Zeige eine deutliche Warnung beim Live-Trading NACH der API-Validierung
-        if not config.USE_TESTNET:
-            print(f"\n{Fore.RED}===============================================")
-            print(f"{Fore.RED}!!! ACHTUNG: LIVE-TRADING MODUS AKTIVIERT !!!")
-            print(f"{Fore.RED}Sie handeln jetzt mit echtem Geld im SPOT-MODUS!")
-            print(f"{Fore.RED}==============================================={Style.RESET_ALL}\n")
-            
-            # Bei Live-Trading zusätzliche Sicherheitsabfrage
-            if config.CONFIRM_TRADES:
-                confirmation = input(f"{Fore.YELLOW}Sind Sie sicher, dass Sie mit echtem Geld handeln möchten? (j/n): {Style.RESET_ALL}")
-                if confirmation.lower() != 'j':
-                    print(f"{Fore.GREEN}Live-Trading abgebrochen. Beende Programm.{Style.RESET_ALL}")
-                    return None
-        else:
-            print(f"{Fore.GREEN}TESTNET-MODUS aktiv. Es wird kein echtes Geld gehandelt.{Style.RESET_ALL}")
-        
         return exchange
     except Exception as e:
         utils.log_error(e, "Fehler bei der Initialisierung des Exchange")
-        print(f"{Fore.RED}Fehlerdetails: {str(e)}{Style.RESET_ALL}")
+        logger.error("Fehlerdetails: %s", e)
         return None
 
-def get_historical_data(exchange, symbol, timeframe, limit):
-    """Hole historische Candlestick-Daten mit verbesserter Fehlerbehandlung"""
+def _async_bridge(exchange):
+    """
+    Gibt die AsyncExchangeBridge zurück, wenn exchange eine ist (sonst None). Deren Aufrufe
+    laufen als Coroutine im Event-Loop der Bridge, Wartezeiten blockieren dort keine anderen Abfragen.
+    """
+    import async_exchange_handler  # Zirkulärer Import (async_exchange_handler nutzt dieses Modul)
+    return exchange if isinstance(exchange, async_exchange_handler.AsyncExchangeBridge) else None
+
+def _fetch_ohlcv_with_retry(exchange, symbol, timeframe, limit, since=None):
+    """
+    Holt rohe OHLCV-Daten mit Wiederholungsversuchen.
+
+    Returns:
+    list: Liste von [timestamp, open, high, low, close, volume] oder None bei Fehler
+    """
+    bridge = _async_bridge(exchange)
+    if bridge is not None:
+        return bridge.fetch_ohlcv_with_retry(symbol, timeframe, limit, since)
+    
     max_retries = 4
-    retry_delay = 5
     
     for retry_count in range(max_retries):
         try:
-            print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Hole Marktdaten für {symbol} (Versuch {retry_count + 1}/{max_retries})...{Style.RESET_ALL}")
+            logger.info("Hole Marktdaten für %s (Versuch %s/%s)...", symbol, retry_count + 1, max_retries)
             
             # Set a longer timeout for this request
             exchange.options['timeout'] = 30000
             
-            ohlcv = exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+            if since is not None:
+                ohlcv = exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
+            else:
+                ohlcv = exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
             if not ohlcv or len(ohlcv) == 0:
-                print(f"{Fore.RED}Keine Daten von der API erhalten.{Style.RESET_ALL}")
+                logger.warning("Keine Daten von der API erhalten.")
                 if retry_count < max_retries - 1:
-                    print(f"{Fore.YELLOW}Wiederhole in {retry_delay} Sekunden...{Style.RESET_ALL}")
+                    retry_delay = rate_limiter.retry_delay(exchange, retry_count)
+                    logger.warning("Wiederhole in %.0f Sekunden...", retry_delay)
                     time.sleep(retry_delay)
-                    retry_delay *= 2
                     continue
-                return pd.DataFrame()
+                return None
             
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            print(f"{Fore.GREEN}[{datetime.now().strftime('%H:%M:%S')}] Marktdaten erfolgreich geladen.{Style.RESET_ALL}")
-            return df
+            return ohlcv
             
         except Exception as e:
-            error_message = str(e)
             utils.log_error(e, f"Fehler beim Abrufen der Daten für {symbol} (Versuch {retry_count + 1}/{max_retries})")
             
             if retry_count < max_retries - 1:
-                print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Verbindungsfehler. Wiederhole in {retry_delay} Sekunden...{Style.RESET_ALL}")
+                retry_delay = rate_limiter.retry_delay(exchange, retry_count)
+                logger.warning("Verbindungsfehler. Wiederhole in %.0f Sekunden...", retry_delay)
                 time.sleep(retry_delay)
-                retry_delay *= 2
             else:
-                print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] Maximale Anzahl an Wiederholungen erreicht. Konnte keine Daten abrufen.{Style.RESET_ALL}")
-                # Statt Notfalldaten zu erzeugen, geben wir ein leeres DataFrame zurück
-                # Die run_bot Funktion wird dies erkennen und entsprechend handeln
-                return pd.DataFrame()
+                logger.warning("Maximale Anzahl an Wiederholungen erreicht. Konnte keine Daten abrufen.")
+    
+    return None
+
+def get_historical_data(exchange, symbol, timeframe, limit):
+    """Hole historische Candlestick-Daten mit verbesserter Fehlerbehandlung"""
+    ohlcv = _fetch_ohlcv_with_retry(exchange, symbol, timeframe, limit)
+    if not ohlcv:
+        # Statt Notfalldaten zu erzeugen, geben wir ein leeres DataFrame zurück
+        # Die run_bot Funktion wird dies erkennen und entsprechend handeln
+        return pd.DataFrame()
     
-    return pd.DataFrame()  # Wenn alle Versuche fehlschlagen, leeres DataFrame zurückgeben
+    df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    logger.info("Marktdaten erfolgreich geladen.")
+    return df
 
-def execute_trade(exchange, symbol, side, quantity, current_price):
+def update_historical_data(exchange, symbol, timeframe, limit, store_lock=None):
     """
-    Führt einen Trade aus mit verbesserten Fehlermeldungen und automatischen Korrekturversuchen.
+    Aktualisiert den Candle Store inkrementell und gibt dessen DataFrame zurück.
+    
+    Beim ersten Aufruf (oder nach einer Datenlücke) wird die komplette Historie geladen,
+    danach werden nur noch Kerzen ab dem letzten gespeicherten Zeitstempel abgefragt.
+    Die noch laufende Kerze wird dabei überschrieben.
+    
+    Parameters:
+    exchange: Exchange-Objekt
+    symbol: Handelssymbol
+    timeframe: Zeitintervall
+    limit: Anzahl der vorgehaltenen Candlesticks
+    store_lock: Optionaler Lock, der nur beim Lesen und Ändern des Candle Stores gehalten wird
+                (die REST-Abfragen samt Wartezeiten laufen ohne Lock, z.B. neben dem Stream-Thread)
+    
+    Returns:
+    DataFrame: Gleiches Format wie get_historical_data (leer bei Fehler)
+    """
+    store = candle_store.get_candle_store(symbol, timeframe, limit)
+    store_lock = store_lock or contextlib.nullcontext()
+    with store_lock:
+        _attach_ohlcv_cache(exchange, store)
+        since = None if store.is_empty() else store.last_timestamp
+        update_limit = None if since is None else _incremental_update_limit(store)
+    
+    if since is not None:
+        ohlcv = _fetch_ohlcv_with_retry(exchange, symbol, timeframe, update_limit, since=since)
+        if ohlcv is None:
+            return pd.DataFrame()
+        with store_lock:
+            if _apply_incremental_update(store, ohlcv, symbol, update_limit):
+                return store.to_dataframe()
+    
+    # Vollständige Historie laden
+    ohlcv = _fetch_ohlcv_with_retry(exchange, symbol, timeframe, limit)
+    with store_lock:
+        return _replace_store_history(store, ohlcv)
+
+def _attach_ohlcv_cache(exchange, store):
+    """
+    Verbindet den Candle Store beim ersten Aufruf mit dem OHLCV-Cache auf der Festplatte.
+    Ist der Store noch leer, werden die letzten Kerzen aus dem Cache geladen (Warmstart),
+    sofern der Cache nicht älter als die vorgehaltene Historie ist.
+    """
+    if not config.OHLCV_CACHE_ENABLED or store.cache is not None:
+        return
+    cache = ohlcv_cache.get_ohlcv_cache(getattr(exchange, 'id', 'exchange'), store.symbol, store.timeframe)
+    if store.is_empty():
+        rows = cache.read(store.capacity)
+        if len(rows) > 0:
+            missing_bars = (time.time() * 1000 - rows[-1, 0]) // store.timeframe_ms
+            if missing_bars < store.capacity:
+                store.replace(rows)
+                logger.info("Warmstart: %s Kerzen für %s aus dem Cache geladen (%s fehlen).", len(rows), store.symbol, int(missing_bars))
+            else:
+                logger.info("OHLCV-Cache für %s ist veraltet - lade Historie neu...", store.symbol)
+    # Erst nach dem Laden verbinden, damit die Kerzen nicht erneut geschrieben werden
+    store.cache = cache
+
+def _incremental_update_limit(store):
+    """Abfragegröße für die inkrementelle Aktualisierung (nach einem Warmstart fehlen ggf. mehr Kerzen)"""
+    missing_bars = int(time.time() * 1000 - store.last_timestamp) // store.timeframe_ms
+    return max(config.CANDLE_STORE_UPDATE_LIMIT, missing_bars + 2)
+
+def _apply_incremental_update(store, ohlcv, symbol, update_limit=None):
+    """
+    Übernimmt das Ergebnis einer inkrementellen Abfrage in den Candle Store.
+    
+    Returns:
+    bool: False wenn eine Datenlücke besteht und die Historie neu geladen werden muss
+    """
+    # Volle Seite bedeutet, dass mehr Kerzen fehlen als abgefragt wurden
+    if not store.has_gap(ohlcv) and len(ohlcv) < (update_limit or config.CANDLE_STORE_UPDATE_LIMIT):
+        new_bars, amended_bars = store.upsert(ohlcv)
+        if new_bars:
+            logger.info("%s neue Kerze(n) für %s übernommen.", new_bars, symbol)
+        return True
+    logger.info("Datenlücke im Candle Store für %s erkannt - lade Historie neu...", symbol)
+    return False
+
+def _replace_store_history(store, ohlcv):
+    """Ersetzt die Historie im Candle Store und gibt den DataFrame zurück (leer bei Fehler)"""
+    if not ohlcv:
+        return pd.DataFrame()
+    store.replace(ohlcv)
+    logger.info("Marktdaten erfolgreich geladen (%s Kerzen im Candle Store).", len(store))
+    return store.to_dataframe()
+
+def _check_live_trade(side, quantity, current_price, base_currency, quote_currency):
+    """
+    Sicherheitschecks für Live-Trading: maximaler Trade-Wert und Handelsbestätigung.
+    
+    Returns:
+    bool: True wenn der Trade ausgeführt werden darf
+    """
+    if config.USE_TESTNET:
+        return True
+    
+    trade_value = quantity * current_price
+    
+    # Überprüfe maximalen Trade-Wert NUR FÜR KÄUFE
+    if side.lower() == 'buy' and trade_value > config.MAX_TRADE_VALUE:
+        logger.warning("Trade abgelehnt: Wert (%.2f %s) überschreitet Maximum (%s %s)", trade_value, quote_currency, config.MAX_TRADE_VALUE, quote_currency)
+        return False
+    
+    # Handelsbestätigung anfordern
+    if config.CONFIRM_TRADES:
+        confirmation = input(f"{Fore.YELLOW}Bestätigen Sie den Trade: {side.upper()} {quantity} {base_currency} @ ~{current_price:.2f} {quote_currency}? (j/n): {Style.RESET_ALL}")
+        if confirmation.lower() != 'j':
+            print(f"{Fore.RED}Trade abgebrochen durch Benutzer.{Style.RESET_ALL}")
+            return False
+    
+    return True
+
+def _order_params():
+    """Order-Parameter je nach Modus"""
+    if config.USE_TESTNET:
+        # Futures Testnet
+        return {'positionSide': 'BOTH'}
+    return {}
+
+def _print_order_success(side, quantity, current_price, base_currency, quote_currency):
+    color = Fore.GREEN if side == 'buy' else Fore.RED
+    mode_info = f"[SPOT LIVE-MODUS]" if not config.USE_TESTNET else f"[FUTURES TESTNET]"
+    total_value = quantity * current_price
+    logger.info("%s %s Order erfolgreich ausgeführt - %s %s @ %.2f %s (Gesamtwert: %.2f %s)",
+                mode_info, side.upper(), quantity, base_currency, current_price, quote_currency, total_value, quote_currency,
+                extra={'color': color, 'side': side, 'quantity': quantity, 'price': current_price})
+
+def _apply_order_filters(filters, quantity, current_price, base_currency, closing=False):
+    """
+    Passt die Ordermenge vor dem Senden an die Handelsfilter an (exakt auf die Schrittgröße gerundet).
+    
+    Returns:
+    float: Gültige Ordermenge (0, wenn eine schließende Order unter den Mindestwerten liegt)
+    """
+    adjusted_quantity = filters.apply(quantity, current_price, closing)
+    if adjusted_quantity <= 0:
+        logger.warning("Schließende Order übersprungen: %s %s liegt unter Mindestmenge bzw. Mindestorderwert (%s)", quantity, base_currency, filters.describe())
+    elif adjusted_quantity != quantity:
+        logger.info("Menge an Handelsfilter angepasst: %s -> %s %s", quantity, adjusted_quantity, base_currency)
+    return adjusted_quantity
+
+@latency.timed('order')
+def execute_trade(exchange, symbol, side, quantity, current_price, closing=False):
+    """
+    Führt einen Trade aus. Die Menge wird vorab an die zwischengespeicherten Handelsfilter
+    angepasst; nur wenn die Exchange sie trotzdem ablehnt, werden die Filter neu geladen.
     
     Parameters:
     exchange: Exchange-Objekt
@@ -162,250 +358,190 @@ def execute_trade(exchange, symbol, side, quantity, current_price):
     side: Handelsrichtung ('buy' oder 'sell')
     quantity: Handelsmenge
     current_price: Aktueller Preis
+    closing: Order schließt (einen Teil) einer Position - Menge wird nur abgerundet
     
     Returns:
     dict: Order-Informationen oder None bei Fehler
     """
+    bridge = _async_bridge(exchange)
+    if bridge is not None:
+        return bridge.execute_trade(symbol, side, quantity, current_price, closing)
+    
     try:
-        base_currency = config.get_base_currency()
-        quote_currency = config.get_quote_currency()
+        base_currency = config.get_base_currency(symbol)
+        quote_currency = config.get_quote_currency(symbol)
+        
+        # Menge vor dem Senden an die Handelsfilter anpassen (Orders gehen beim ersten Versuch durch)
+        filter_cache = exchange_filters.get_filter_cache()
+        adjusted_quantity = _apply_order_filters(filter_cache.get(exchange, symbol), quantity, current_price, base_currency, closing)
+        if adjusted_quantity <= 0:
+            return None
         
         # Ausführliche Ausgabe vor dem Trade
-        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Führe {side.upper()} Order aus: {quantity} {base_currency} @ ~{current_price:.2f} {quote_currency}{Style.RESET_ALL}")
+        logger.info("Führe %s Order aus: %s %s @ ~%.2f %s", side.upper(), adjusted_quantity, base_currency, current_price, quote_currency)
         
         # Sicherheitscheck für Live-Trading
-        if not config.USE_TESTNET:
-            trade_value = quantity * current_price
-            
-            # Überprüfe maximalen Trade-Wert NUR FÜR KÄUFE
-            if side.lower() == 'buy' and trade_value > config.MAX_TRADE_VALUE:
-                print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] Trade abgelehnt: Wert ({trade_value:.2f} {quote_currency}) überschreitet Maximum ({config.MAX_TRADE_VALUE} {quote_currency}){Style.RESET_ALL}")
-                return None
-            
-            # Handelsbestätigung anfordern
-            if config.CONFIRM_TRADES:
-                confirmation = input(f"{Fore.YELLOW}Bestätigen Sie den Trade: {side.upper()} {quantity} {base_currency} @ ~{current_price:.2f} {quote_currency}? (j/n): {Style.RESET_ALL}")
-                if confirmation.lower() != 'j':
-                    print(f"{Fore.RED}Trade abgebrochen durch Benutzer.{Style.RESET_ALL}")
-                    return None
-        
-        max_retries = 3
-        current_retry = 0
-        adjusted_quantity = quantity  # Startmenge
-        
-        while current_retry < max_retries:
+        if not _check_live_trade(side, adjusted_quantity, current_price, base_currency, quote_currency):
+            return None
+        
+        for attempt in range(2):
             try:
-                # Parameter je nach Modus anpassen
-                params = {}
-                if config.USE_TESTNET:
-                    # Futures Testnet
-                    params = {'positionSide': 'BOTH'}
-                
-                # Order erstellen mit passenden Parametern
-                print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Ausführungsversuch {current_retry+1}: {side.upper()} {adjusted_quantity} {base_currency}{Style.RESET_ALL}")
-                
                 order = exchange.create_market_order(
                     symbol=symbol,
                     side=side,
                     amount=adjusted_quantity,
-                    params=params
+                    params=_order_params()
                 )
                 
-                # Trade-Ausgabe
-                color = Fore.GREEN if side == 'buy' else Fore.RED
-                mode_info = f"[SPOT LIVE-MODUS]" if not config.USE_TESTNET else f"[FUTURES TESTNET]"
-                print(f"\n{color}[{datetime.now().strftime('%H:%M:%S')}] {mode_info} {side.upper()} Order erfolgreich ausgeführt - {adjusted_quantity} {base_currency} @ {current_price:.2f} {quote_currency}" + Style.RESET_ALL)
-                total_value = adjusted_quantity * current_price
-                print(f"{color}Gesamtwert des Trades: {total_value:.2f} {quote_currency}{Style.RESET_ALL}")
-
+                _print_order_success(side, adjusted_quantity, current_price, base_currency, quote_currency)
                 return order
                 
             except Exception as e:
                 error_message = str(e)
-                print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] Fehler beim Ausführen des Orders: {error_message}{Style.RESET_ALL}")
-                
-                # Automatische Anpassungen basierend auf spezifischen Fehlermeldungen
-                if "LOT_SIZE" in error_message:
-                    print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Lot-Size-Fehler erkannt. Versuche Mengenanpassung...{Style.RESET_ALL}")
-                    
-                    # Extrahiere die geforderte Step-Size aus der Fehlermeldung, wenn möglich
-                    # Beispiel: "LOT_SIZE quantity should be a multiple of 0.1" 
-                    import re
-                    step_size_match = re.search(r"multiple of (\d*\.?\d+)", error_message)
-                    
-                    if step_size_match:
-                        step_size = float(step_size_match.group(1))
-                        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Extrahierte Step-Size aus Fehlermeldung: {step_size}{Style.RESET_ALL}")
-                        
-                        # Passe Menge entsprechend an
-                        factor = 1.0 / step_size
-                        adjusted_quantity = math.floor(adjusted_quantity * factor) / factor
-                        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Angepasste Menge auf Step-Size: {adjusted_quantity}{Style.RESET_ALL}")
-                    else:
-                        # Wenn keine Step-Size gefunden, versuche konservative Anpassung
-                        if base_currency == 'SOL':
-                            # SOL oft auf 0.1 oder 0.01
-                            adjusted_quantity = math.floor(adjusted_quantity * 10) / 10
-                        else:
-                            # Generische Anpassung für andere Coins
-                            adjusted_quantity = math.floor(adjusted_quantity * 100) / 100
-                        
-                        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Konservative Mengenanpassung: {adjusted_quantity}{Style.RESET_ALL}")
-                
-                elif "MIN_NOTIONAL" in error_message:
-                    print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Mindestorderwert nicht erreicht. Versuche Erhöhung...{Style.RESET_ALL}")
-                    
-                    # Extrahiere den Mindestorderwert, wenn möglich
-                    min_notional_match = re.search(r"MIN_NOTIONAL.*?(\d+\.?\d*)", error_message)
-                    
-                    if min_notional_match:
-                        min_notional = float(min_notional_match.group(1))
-                        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Extrahierter Mindestorderwert: {min_notional} {quote_currency}{Style.RESET_ALL}")
-                        
-                        # Berechne neue Menge
-                        new_quantity = min_notional / current_price * 1.01  # 1% Sicherheitspuffer
-                        
-                        # Runde entsprechend
-                        if base_currency == 'SOL':
-                            adjusted_quantity = math.ceil(new_quantity * 10) / 10
-                        else:
-                            adjusted_quantity = math.ceil(new_quantity * 100) / 100
-                        
-                        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Erhöhte Menge auf: {adjusted_quantity} {base_currency}{Style.RESET_ALL}")
-                    else:
-                        # Wenn kein Wert extrahiert werden konnte, erhöhe generisch
-                        adjusted_quantity = adjusted_quantity * 1.5
-                        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Generische Mengenerhöhung auf: {adjusted_quantity}{Style.RESET_ALL}")
-                
-                elif "PRICE_FILTER" in error_message:
-                    print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] Preisfilter-Fehler. Bei Market Orders nicht beeinflussbar.{Style.RESET_ALL}")
-                    break  # Keine Anpassung möglich
-                
-                elif "INSUFFICIENT_BALANCE" in error_message:
-                    print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] Nicht genügend Guthaben für diesen Trade.{Style.RESET_ALL}")
-                    break  # Keine sinnvolle Anpassung möglich
-                
-                else:
-                    # Generischer Fehler ohne spezifische Handlung
-                    print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] Generischer API-Fehler: {error_message}{Style.RESET_ALL}")
-                    if current_retry < max_retries - 1:
-                        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Warte 3 Sekunden vor nächstem Versuch...{Style.RESET_ALL}")
-                        time.sleep(3)
+                logger.error("Fehler beim Ausführen des Orders: %s", error_message)
+                if attempt > 0 or not exchange_filters.is_filter_error(error_message):
+                    break
                 
-                current_retry += 1
+                # Filter vermutlich geändert: einmal neu laden und ohne Wartezeit erneut senden
+                filters = filter_cache.reload_symbol(exchange, symbol)
+                retry_quantity = _apply_order_filters(filters, quantity, current_price, base_currency, closing)
+                if retry_quantity <= 0 or retry_quantity == adjusted_quantity:
+                    break
+                adjusted_quantity = retry_quantity
         
-        # Wenn alle Versuche fehlgeschlagen sind
-        print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] Alle Versuche fehlgeschlagen. Trade konnte nicht ausgeführt werden.{Style.RESET_ALL}")
-        utils.log_error(Exception(f"Trade konnte nach {max_retries} Versuchen nicht ausgeführt werden"), 
-                       f"Fehler beim Ausführen des {side} Orders für {quantity} {symbol}")
+        logger.warning("Trade konnte nicht ausgeführt werden.")
+        utils.log_error(Exception(f"Order abgelehnt: {error_message}"), 
+                       f"Fehler beim Ausführen des {side} Orders für {adjusted_quantity} {symbol}")
         return None
         
     except Exception as e:
         utils.log_error(e, f"Kritischer Fehler beim Ausführen des {side} Orders für {quantity} {symbol}")
-        print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] Kritischer Fehler: {str(e)}{Style.RESET_ALL}")
+        logger.error("Kritischer Fehler: %s", e)
         return None
 
+def _empty_position_info():
+    return {'size': 0, 'type': 'KEINE', 'entry_price': 0, 'liquidation_price': 0, 'unrealized_pnl': 0, 'leverage': 1}
+
+def _futures_position_from_api(positions, symbol, base_currency):
+    """
+    Sucht die Position des Symbols in der Antwort von fetch_positions.
+    
+    Returns:
+    tuple: (Positionsgröße, position_info)
+    """
+    formatted_symbol = symbol.replace('/', '')  # "BTC/USDT" -> "BTCUSDT"
+    logger.debug("Positionen von API erhalten: %s", positions)
+    
+    for position in positions:
+        api_symbol = position.get('symbol', '')
+        logger.debug("Position für Symbol '%s' prüfen (vs. '%s')", api_symbol, formatted_symbol)
+        
+        # VERBESSERTE SYMBOLÜBERPRÜFUNG
+        # Prüfe ob das Symbol am Anfang übereinstimmt oder teilweise übereinstimmt
+        base_quote = symbol.split('/')  # ["BTC", "USDT"]
+        if (position['symbol'] == formatted_symbol or 
+            (len(base_quote) > 1 and position['symbol'].startswith(f"{base_quote[0]}/{base_quote[1]}")) or
+            api_symbol.startswith(formatted_symbol)):
+            
+            position_size = float(position['contracts'])
+            position_type = "LONG" if position_size > 0 else ("SHORT" if position_size < 0 else "KEINE")
+            logger.info("Aktuelle Position: %s (%s %s)", position_type, position_size, base_currency)
+            
+            # Zusätzliche Positionsdaten zurückgeben
+            position_info = {
+                 'size': position_size,
+                 'type': position_type,
+                 'entry_price': float(position['entryPrice']) if 'entryPrice' in position and position['entryPrice'] is not None else 0,
+                 'liquidation_price': float(position['liquidationPrice']) if 'liquidationPrice' in position and position['liquidationPrice'] is not None else 0,
+                 'unrealized_pnl': float(position['unrealizedPnl']) if 'unrealizedPnl' in position and position['unrealizedPnl'] is not None else 0,
+                 'leverage': float(position['leverage']) if 'leverage' in position and position['leverage'] is not None else 1
+                }
+            
+            return position_size, position_info
+    logger.info("Aktuelle Position: KEINE")
+    return 0, _empty_position_info()
+
+def _spot_position_from_balance(balance, base_currency):
+    """
+    Spot: Die Position entspricht dem freien Guthaben der Basis-Währung.
+    
+    Returns:
+    tuple: (Positionsgröße, position_info)
+    """
+    if base_currency in balance:
+        position_size = float(balance[base_currency]['free'])
+        position_type = "LONG" if position_size > 0 else "KEINE"
+        logger.info("Aktuelle Position: %s (%s %s)", position_type, position_size, base_currency)
+        
+        # Vereinfachtes position_info für Spot
+        position_info = {
+            'size': position_size,
+            'type': position_type,
+            'entry_price': 0,  # Nicht verfügbar im Spot-Trading
+            'liquidation_price': 0,  # Nicht anwendbar für Spot
+            'unrealized_pnl': 0,  # Nicht direkt verfügbar
+            'leverage': 1  # Immer 1 bei Spot
+        }
+        
+        return position_size, position_info
+    
+    logger.info("Aktuelle Position: KEINE")
+    return 0, _empty_position_info()
+
 def get_position(exchange, symbol):
     """Prüfe aktuelle Position - unterschiedlich je nach Modus"""
+    bridge = _async_bridge(exchange)
+    if bridge is not None:
+        return bridge.get_position(symbol)
+    
     try:
-        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Prüfe aktuelle Position...{Style.RESET_ALL}")
+        logger.info("Prüfe aktuelle Position...")
         
-        base_currency = config.get_base_currency()
-        quote_currency = config.get_quote_currency()
+        base_currency = config.get_base_currency(symbol)
         
         # Debug-Info zum aktuellen Modus
-        print(f"DEBUG: Handels-Modus: {'Futures Testnet' if config.USE_TESTNET else 'Spot Live'}")
-        print(f"DEBUG: Symbol für Positionsabfrage: {symbol}")
+        logger.debug("Handels-Modus: %s, Symbol für Positionsabfrage: %s", 'Futures Testnet' if config.USE_TESTNET else 'Spot Live', symbol)
         
         if config.USE_TESTNET:
             # Futures Testnet: Verwende fetch_positions
             max_retries = 3
-            retry_delay = 3
             
             for retry_count in range(max_retries):
                 try:
                     # Stelle sicher, dass das Symbol korrekt formatiert ist
-                    formatted_symbol = symbol.replace('/', '')  # "BTC/USDT" -> "BTCUSDT"
-                    positions = exchange.fetch_positions([formatted_symbol])
-                    print(f"DEBUG: Positionen von API erhalten: {positions}")
-                    
-                    for position in positions:
-                        api_symbol = position.get('symbol', '')
-                        print(f"DEBUG: Position für Symbol '{api_symbol}' prüfen (vs. '{formatted_symbol}')")
-                        
-                        # VERBESSERTE SYMBOLÜBERPRÜFUNG
-                        # Prüfe ob das Symbol am Anfang übereinstimmt oder teilweise übereinstimmt
-                        base_quote = symbol.split('/')  # ["BTC", "USDT"]
-                        if (position['symbol'] == formatted_symbol or 
-                            (len(base_quote) > 1 and position['symbol'].startswith(f"{base_quote[0]}/{base_quote[1]}")) or
-                            api_symbol.startswith(formatted_symbol)):
-                            
-                            position_size = float(position['contracts'])
-                            position_type = "LONG" if position_size > 0 else ("SHORT" if position_size < 0 else "KEINE")
-                            print(f"{Fore.GREEN}[{datetime.now().strftime('%H:%M:%S')}] Aktuelle Position: {position_type} ({position_size} {base_currency}){Style.RESET_ALL}")
-                            
-                            # Zusätzliche Positionsdaten zurückgeben
-                            position_info = {
-                                 'size': position_size,
-                                 'type': position_type,
-                                 'entry_price': float(position['entryPrice']) if 'entryPrice' in position and position['entryPrice'] is not None else 0,
-                                 'liquidation_price': float(position['liquidationPrice']) if 'liquidationPrice' in position and position['liquidationPrice'] is not None else 0,
-                                 'unrealized_pnl': float(position['unrealizedPnl']) if 'unrealizedPnl' in position and position['unrealizedPnl'] is not None else 0,
-                                 'leverage': float(position['leverage']) if 'leverage' in position and position['leverage'] is not None else 1
-                                }
-                            
-                            return position_size, position_info
-                    print(f"{Fore.GREEN}[{datetime.now().strftime('%H:%M:%S')}] Aktuelle Position: KEINE{Style.RESET_ALL}")
-                    return 0, {'size': 0, 'type': 'KEINE', 'entry_price': 0, 'liquidation_price': 0, 'unrealized_pnl': 0, 'leverage': 1}
+                    positions = exchange.fetch_positions([symbol.replace('/', '')])
+                    return _futures_position_from_api(positions, symbol, base_currency)
                 except Exception as e:
                     if retry_count < max_retries - 1:
-                        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Fehler beim Abrufen der Position: {str(e)}. Wiederhole in {retry_delay} Sekunden...{Style.RESET_ALL}")
+                        retry_delay = rate_limiter.retry_delay(exchange, retry_count)
+                        logger.warning("Fehler beim Abrufen der Position: %s. Wiederhole in %.0f Sekunden...", e, retry_delay)
                         time.sleep(retry_delay)
-                        retry_delay *= 2
                     else:
                         utils.log_error(e, f"Fehler beim Abrufen der Position für {symbol}")
-                        return 0, {'size': 0, 'type': 'KEINE', 'entry_price': 0, 'liquidation_price': 0, 'unrealized_pnl': 0, 'leverage': 1}
+                        return 0, _empty_position_info()
         else:
             # Spot Live: Prüfe das Guthaben der Basis-Währung
             balance = exchange.fetch_balance()
-            if base_currency in balance:
-                position_size = float(balance[base_currency]['free'])
-                position_type = "LONG" if position_size > 0 else "KEINE"
-                print(f"{Fore.GREEN}[{datetime.now().strftime('%H:%M:%S')}] Aktuelle Position: {position_type} ({position_size} {base_currency}){Style.RESET_ALL}")
-                
-                # Vereinfachtes position_info für Spot
-                position_info = {
-                    'size': position_size,
-                    'type': position_type,
-                    'entry_price': 0,  # Nicht verfügbar im Spot-Trading
-                    'liquidation_price': 0,  # Nicht anwendbar für Spot
-                    'unrealized_pnl': 0,  # Nicht direkt verfügbar
-                    'leverage': 1  # Immer 1 bei Spot
-                }
-                
-                return position_size, position_info
-            else:
-                print(f"{Fore.GREEN}[{datetime.now().strftime('%H:%M:%S')}] Aktuelle Position: KEINE{Style.RESET_ALL}")
-                return 0, {'size': 0, 'type': 'KEINE', 'entry_price': 0, 'liquidation_price': 0, 'unrealized_pnl': 0, 'leverage': 1}
+            return _spot_position_from_balance(balance, base_currency)
             
     except Exception as e:
         utils.log_error(e, f"Fehler beim Abrufen der Position für {symbol}")
-        return 0, {'size': 0, 'type': 'KEINE', 'entry_price': 0, 'liquidation_price': 0, 'unrealized_pnl': 0, 'leverage': 1}
+        return 0, _empty_position_info()
 
 def get_market_info(exchange, symbol):
     """Hole Marktinformationen wie Mindest-Order-Größe, Tick-Größe, etc."""
     try:
-        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Hole Marktinformationen für {symbol}...{Style.RESET_ALL}")
+        logger.info("Hole Marktinformationen für %s...", symbol)
         market = exchange.market(symbol)
         return market
     except Exception as e:
         utils.log_error(e, f"Fehler beim Abrufen der Marktinformationen für {symbol}")
         return None
 
-def get_quote_currency_balance(exchange):
+def get_quote_currency_balance(exchange, symbol=None):
     """Gibt das verfügbare Guthaben in der Quote-Währung zurück"""
+    quote_currency = config.get_quote_currency(symbol)
     try:
-        quote_currency = config.get_quote_currency()
         balance = exchange.fetch_balance()
         
         if quote_currency in balance:
@@ -415,7 +551,7 @@ def get_quote_currency_balance(exchange):
         utils.log_error(e, f"Fehler beim Abrufen des {quote_currency} Guthabens")
         return 0
 
-def calculate_quantity(exchange, current_price, balance=None):
+def calculate_quantity(exchange, current_price, balance=None, symbol=None):
     """
     Berechnet die Handelsmenge basierend auf der Konfiguration mit automatischer Anpassung
     an die Handelsregeln verschiedener Coins.
@@ -424,13 +560,15 @@ def calculate_quantity(exchange, current_price, balance=None):
     exchange: Exchange-Objekt
     current_price: Aktueller Preis des Assets
     balance: Optional - Bereits abgerufenes Guthaben
+    symbol: Optional - Handelssymbol (Standard: config.SYMBOL)
     
     Returns:
     float: Berechnete Handelsmenge
     """
     try:
-        base_currency = config.get_base_currency()
-        quote_currency = config.get_quote_currency()
+        symbol = symbol or config.SYMBOL
+        base_currency = config.get_base_currency(symbol)
+        quote_currency = config.get_quote_currency(symbol)
         
         # Fall 1: Wenn absolute Menge konfiguriert ist
         if config.QUANTITY_TYPE == 'ABSOLUTE':
@@ -439,12 +577,12 @@ def calculate_quantity(exchange, current_price, balance=None):
         else:
             # Hole Kontoguthaben, wenn nicht übergeben
             if balance is None:
-                quote_balance = get_quote_currency_balance(exchange)
+                quote_balance = get_quote_currency_balance(exchange, symbol)
             else:
                 quote_balance = balance
                 
             if quote_balance <= 0:
-                print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Warnung: Kein Guthaben verfügbar, verwende Standard-Handelsmenge{Style.RESET_ALL}")
+                logger.warning("Kein Guthaben verfügbar, verwende Standard-Handelsmenge")
                 return config.QUANTITY
                 
             # Berechne Prozentsatz des Guthabens
@@ -453,157 +591,33 @@ def calculate_quantity(exchange, current_price, balance=None):
             
         # ---- KRITISCHER TEIL: MARKTREGELN ANWENDEN ----
         
-        # Hole detaillierte Markt-Informationen
-        symbol = config.SYMBOL
-        market_info = None
-        try:
-            market_info = exchange.market(symbol)
-            print(f"{Fore.CYAN}[{datetime.now().strftime('%H:%M:%S')}] Marktinfo für {symbol} erfolgreich geladen.{Style.RESET_ALL}")
-        except Exception as market_error:
-            print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] Fehler beim Laden der Marktinfos für {symbol}: {str(market_error)}{Style.RESET_ALL}")
-            # Versuche alternative Symbolschreibweise
-            try:
-                alt_symbol = symbol.replace("/", "")
-                market_info = exchange.market(alt_symbol)
-                print(f"{Fore.GREEN}[{datetime.now().strftime('%H:%M:%S')}] Marktinfo mit alternativer Schreibweise {alt_symbol} geladen.{Style.RESET_ALL}")
-            except Exception as alt_error:
-                print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] Auch alternative Symbolschreibweise fehlgeschlagen: {str(alt_error)}{Style.RESET_ALL}")
-        
-        # Verarbeite Marktinformationen, wenn verfügbar
-        if market_info:
-            # 1. Ermittle die Präzision für die Menge
-            precision = None
-            if 'precision' in market_info:
-                if isinstance(market_info['precision'], dict) and 'amount' in market_info['precision']:
-                    precision = market_info['precision']['amount']
-                elif isinstance(market_info['precision'], int):
-                    precision = market_info['precision']
-            
-            # 2. Ermittle Handelslimits
-            min_amount = None
-            max_amount = None
-            step_size = None
-            min_cost = None
-            
-            if 'limits' in market_info:
-                if 'amount' in market_info['limits']:
-                    amount_limits = market_info['limits']['amount']
-                    if 'min' in amount_limits:
-                        min_amount = amount_limits['min']
-                    if 'max' in amount_limits:
-                        max_amount = amount_limits['max']
-                
-                if 'cost' in market_info['limits'] and 'min' in market_info['limits']['cost']:
-                    min_cost = market_info['limits']['cost']['min']
-            
-            # 3. Versuche, die Step-Size zu finden (kann in verschiedenen Formaten vorliegen)
-            if 'precision' in market_info and 'amount' in market_info['precision']:
-                precision_value = market_info['precision']['amount']
-                if isinstance(precision_value, int):
-                    # Wenn Präzision als Anzahl der Dezimalstellen angegeben ist
-                    step_size = 1.0 / (10 ** precision_value)
-                else:
-                    # Wenn Präzision direkt als Schritt angegeben ist
-                    step_size = precision_value
-            
-            # Alternativ: Suche nach Step-Size in anderen Bereichen
-            if step_size is None and 'limits' in market_info and 'amount' in market_info['limits']:
-                if 'min_step' in market_info['limits']['amount']:
-                    step_size = market_info['limits']['amount']['min_step']
-            
-            # 4. Info-Ausgabe über gefundene Werte
-            print(f"{Fore.CYAN}[{datetime.now().strftime('%H:%M:%S')}] Handelsinformationen für {base_currency}:{Style.RESET_ALL}")
-            print(f"  Präzision: {precision}")
-            print(f"  Mindestmenge: {min_amount}")
-            print(f"  Maximalmenge: {max_amount}")
-            print(f"  Schrittgröße: {step_size}")
-            print(f"  Min. Orderwert: {min_cost} {quote_currency}")
-            
-            # 5. Anwenden der Handelsregeln
-            
-            # Mengenanpassung an Step-Size
-            if step_size:
-                # Abrundung auf den nächsten gültigen Step
-                factor = 1.0 / step_size
-                quantity = math.floor(quantity * factor) / factor
-                print(f"{Fore.CYAN}[{datetime.now().strftime('%H:%M:%S')}] Menge an Schrittgröße angepasst: {quantity}{Style.RESET_ALL}")
-            elif precision is not None:
-                # Fallback: Wenn keine Step-Size, verwende Präzision
-                quantity = math.floor(quantity * (10 ** precision)) / (10 ** precision)
-                print(f"{Fore.CYAN}[{datetime.now().strftime('%H:%M:%S')}] Menge an Präzision angepasst: {quantity}{Style.RESET_ALL}")
-            
-            # Mindestmengenprüfung
-            if min_amount and quantity < min_amount:
-                old_quantity = quantity
-                quantity = min_amount
-                print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Menge von {old_quantity} auf Minimum von {min_amount} erhöht{Style.RESET_ALL}")
-            
-            # Maximalmengenprüfung
-            if max_amount and quantity > max_amount:
-                old_quantity = quantity
-                quantity = max_amount
-                print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Menge von {old_quantity} auf Maximum von {max_amount} begrenzt{Style.RESET_ALL}")
-            
-            # Mindestorderwertprüfung
-            if min_cost:
-                order_value = quantity * current_price
-                if order_value < min_cost:
-                    old_quantity = quantity
-                    # Berechne minimale Menge, die den Mindestorderwert erreicht
-                    quantity = min_cost / current_price
-                    # Runde wieder auf Step-Size
-                    if step_size:
-                        factor = 1.0 / step_size
-                        quantity = math.ceil(quantity * factor) / factor
-                    elif precision is not None:
-                        quantity = math.ceil(quantity * (10 ** precision)) / (10 ** precision)
-                    
-                    print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Menge von {old_quantity} auf {quantity} erhöht, um Mindestorderwert von {min_cost} {quote_currency} zu erreichen{Style.RESET_ALL}")
-        else:
-            # Fallback: Wenn keine Marktdaten verfügbar, verwende vorsichtige Standardeinstellungen
-            print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Keine Marktdaten verfügbar. Verwende konservative Standardwerte für {base_currency}{Style.RESET_ALL}")
-            
-            # Konservative Standardwerte für gängige Kryptowährungen
-            if base_currency == 'BTC':
-                precision = 5
-                min_amount = 0.00001
-            elif base_currency == 'ETH':
-                precision = 4
-                min_amount = 0.0001
-            elif base_currency == 'SOL':
-                precision = 1
-                min_amount = 0.1
-            else:
-                # Für unbekannte Coins, verwende moderate Werte
-                precision = 2
-                min_amount = 0.01
-            
-            print(f"{Fore.YELLOW}Standardwerte: Präzision={precision}, Mindestmenge={min_amount}{Style.RESET_ALL}")
-            
-            # Anwenden der Standard-Präzision
-            quantity = math.floor(quantity * (10 ** precision)) / (10 ** precision)
-            
-            # Mindestmengenprüfung
-            if quantity < min_amount:
-                quantity = min_amount
-                print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Menge auf Standard-Mindestmenge von {min_amount} gesetzt{Style.RESET_ALL}")
+        # Handelsfilter aus dem Zwischenspeicher (periodische Aktualisierung im Hintergrund)
+        filter_cache = exchange_filters.get_filter_cache()
+        filter_cache.refresh_if_stale(exchange)
+        filters = filter_cache.get(exchange, symbol)
+        logger.info("Handelsfilter für %s: %s", base_currency, filters.describe())
+        
+        unadjusted_quantity = quantity
+        quantity = filters.apply(quantity, current_price)
+        if quantity != unadjusted_quantity:
+            logger.info("Menge an Handelsfilter angepasst: %s -> %s", unadjusted_quantity, quantity)
         
         # Final berechnete Menge anzeigen
-        print(f"{Fore.GREEN}[{datetime.now().strftime('%H:%M:%S')}] Finale Handelsmenge: {quantity} {base_currency} (Wert: {quantity * current_price:.2f} {quote_currency}){Style.RESET_ALL}")
+        logger.info("Finale Handelsmenge: %s %s (Wert: %.2f %s)", quantity, base_currency, quantity * current_price, quote_currency)
         
         return quantity
         
     except Exception as e:
         utils.log_error(e, f"Fehler bei der Berechnung der Handelsmenge")
-        print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] Exception bei Mengenberechnung: {str(e)}{Style.RESET_ALL}")
+        logger.error("Exception bei Mengenberechnung: %s", e)
         # Fallback auf Standard-Menge
         return config.QUANTITY
 
 def place_limit_order(exchange, symbol, side, amount, price):
     """Platziere eine Limit-Order"""
     try:
-        base_currency = config.get_base_currency()
-        quote_currency = config.get_quote_currency()
+        base_currency = config.get_base_currency(symbol)
+        quote_currency = config.get_quote_currency(symbol)
         
         # Sicherheitscheck für Live-Trading
         if not config.USE_TESTNET and config.CONFIRM_TRADES:
@@ -639,7 +653,7 @@ def place_stop_loss(exchange, symbol, side, amount, stop_price, limit_price=None
         
         # Stop-Loss nur im Futures-Modus verfügbar
         if not config.USE_TESTNET:
-            print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Stop-Loss-Orders sind im Spot-Modus nicht verfügbar.{Style.RESET_ALL}")
+            logger.info("Stop-Loss-Orders sind im Spot-Modus nicht verfügbar.")
             return None
             
         params = {
@@ -683,7 +697,7 @@ def place_take_profit(exchange, symbol, side, amount, take_profit_price, limit_p
         
         # Take-Profit nur im Futures-Modus verfügbar
         if not config.USE_TESTNET:
-            print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Take-Profit-Orders sind im Spot-Modus nicht verfügbar.{Style.RESET_ALL}")
+            logger.info("Take-Profit-Orders sind im Spot-Modus nicht verfügbar.")
             return None
             
         params = {
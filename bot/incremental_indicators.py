@@ -0,0 +1,566 @@
+"""
+Inkrementelle Indikator-Engine.
+
+Statt bei jedem Zyklus alle Rolling-Windows über den kompletten DataFrame neu zu
+berechnen, hält die Engine pro Indikator einen laufenden Zustand (O(1) je Kerze):
+
+- Rollende Summen/Quadratsummen für SMA und Bollinger Bands
+- EMA-Zustand für RSI, MACD und ATR
+- Monotone Deques für Hoch/Tief des Stochastic Oscillators
+
+Die letzte (noch laufende) Kerze wird immer aus dem Zustand der abgeschlossenen
+Kerzen berechnet, sodass Aktualisierungen der laufenden Kerze den Zustand nicht
+verfälschen.
+
+Jede Kerze erhält ihre Indikatorzeile einmal beim Eintreffen (und bei Änderungen der
+laufenden Kerze), ältere Zeilen werden nicht neu berechnet. Die Werte entsprechen
+indicators.calculate_all_indicators auf der gesamten Historie seit dem Start der Engine
+(bis auf Rundung im Bereich 1e-9). Gegenüber der Neuberechnung auf dem gleitenden Fenster
+des Candle Stores starten die EMAs (RSI, MACD, ATR) also nicht am Fensteranfang neu, und der
+Mindestabstand von Bollinger Bands und Stochastic (0.1% des mittleren Schlusskurses) bezieht
+sich auf die Historie bis zur jeweiligen Kerze.
+"""
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+from colorama import Fore
+
+import config
+import indicators
+import structured_logging
+import utils
+
+
+logger = structured_logging.get_logger(__name__)
+
+# Spalten des internen Zeilenpuffers
+_TS, _OPEN, _HIGH, _LOW, _CLOSE, _VOLUME = range(6)
+_SMA_SHORT, _SMA_LONG, _EMA_FAST, _EMA_SLOW, _MACD, _MACD_SIGNAL = range(6, 12)
+_AVG_GAIN, _AVG_LOSS, _BB_MIDDLE, _BB_STD, _LOW_MIN, _HIGH_MAX, _ATR = range(12, 19)
+_ROW_WIDTH = 19
+_CANDLE_COLUMNS = {'open': _OPEN, 'high': _HIGH, 'low': _LOW, 'close': _CLOSE, 'volume': _VOLUME}
+
+# Spalten, die indicators.indicator_signals liest
+_SIGNAL_INPUTS = ('sma_5', 'sma_20', 'rsi', 'macd', 'macd_signal', 'close', 'bb_lower', 'bb_upper', 'stoch_k', 'stoch_d')
+
+# Stochastic/ATR-Perioden wie in indicators.calculate_all_indicators
+STOCH_K_PERIOD = 14
+STOCH_D_PERIOD = 3
+ATR_PERIOD = 14
+
+# Nach so vielen Kerzen werden die rollenden Summen exakt neu berechnet (gegen Rundungsdrift)
+_RESYNC_INTERVAL = 1024
+
+
+class _RowBuffer:
+    """Zeilenpuffer fester Kapazität mit zusammenhängender Sicht auf die letzten Zeilen"""
+
+    def __init__(self, capacity, width):
+        self.capacity = capacity
+        self._data = np.full((2 * capacity, width), np.nan)
+        self._start = 0
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def append(self, row):
+        end = self._start + self._len
+        if end == len(self._data):
+            # Ende des Speichers erreicht: letzte Zeilen an den Anfang verschieben
+            keep = min(self._len, self.capacity - 1)
+            self._data[:keep] = self._data[end - keep:end]
+            self._start = 0
+            self._len = keep
+            end = keep
+        self._data[end] = row
+        if self._len == self.capacity:
+            self._start += 1
+        else:
+            self._len += 1
+
+    def set_last(self, row):
+        self._data[self._start + self._len - 1] = row
+
+    def tail(self, count):
+        end = self._start + self._len
+        return self._data[end - min(count, self._len):end]
+
+
+class _RollingWindow:
+    """Rollender Mittelwert und Standardabweichung (ddof=1) über laufende Summen"""
+
+    def __init__(self, period):
+        self.period = period
+        self._values = deque()  # Abgeschlossene Werte (höchstens period-1)
+        self._shift = None      # Verschiebung für numerische Stabilität der Quadratsummen
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._commits = 0
+
+    def query(self, value):
+        """Mittelwert und Standardabweichung des Fensters, das mit value endet"""
+        if self._shift is None:
+            self._shift = value
+        n = len(self._values) + 1
+        delta = value - self._shift
+        total = self._sum + delta
+        mean = self._shift + total / n
+        if n < 2:
+            return mean, np.nan
+        variance = (self._sumsq + delta * delta - total * total / n) / (n - 1)
+        return mean, math.sqrt(max(variance, 0.0))
+
+    def commit(self, value):
+        if self._shift is None:
+            self._shift = value
+        delta = value - self._shift
+        self._values.append(delta)
+        self._sum += delta
+        self._sumsq += delta * delta
+        if len(self._values) > self.period - 1:
+            old = self._values.popleft()
+            self._sum -= old
+            self._sumsq -= old * old
+
+        self._commits += 1
+        if self._commits % _RESYNC_INTERVAL == 0:
+            self._sum = math.fsum(self._values)
+            self._sumsq = math.fsum(v * v for v in self._values)
+
+
+class _Ema:
+    """EMA-Zustand mit derselben Arithmetik wie pandas ewm(adjust=False)"""
+
+    def __init__(self, span=None, alpha=None):
+        com = (span - 1) / 2 if span is not None else (1 - alpha) / alpha
+        self.alpha = 1.0 / (1.0 + com)
+        self.value = None
+
+    def query(self, x):
+        if self.value is None or self.value == x:
+            return x
+        old_weight = 1.0 - self.alpha
+        return (old_weight * self.value + self.alpha * x) / (old_weight + self.alpha)
+
+    def commit(self, x):
+        self.value = self.query(x)
+
+
+class _MonotonicWindow:
+    """Rollendes Minimum bzw. Maximum über eine monotone Deque"""
+
+    def __init__(self, period, use_max=False):
+        self.period = period
+        self.use_max = use_max
+        self._deque = deque()  # (Index, Wert)
+
+    def query(self, index, value):
+        while self._deque and self._deque[0][0] <= index - self.period:
+            self._deque.popleft()
+        if not self._deque:
+            return value
+        front = self._deque[0][1]
+        return max(front, value) if self.use_max else min(front, value)
+
+    def commit(self, index, value):
+        if self.use_max:
+            while self._deque and self._deque[-1][1] <= value:
+                self._deque.pop()
+        else:
+            while self._deque and self._deque[-1][1] >= value:
+                self._deque.pop()
+        self._deque.append((index, value))
+
+
+class IncrementalIndicatorEngine:
+    """
+    Berechnet alle Indikatoren von indicators.calculate_all_indicators inkrementell.
+    """
+
+    def __init__(self, capacity=None):
+        self.capacity = max(int(capacity or config.LIMIT), 2)
+        self.sma_short_period = config.SMA_SHORT_PERIOD
+        self.sma_long_period = config.SMA_LONG_PERIOD
+        self.rsi_period = config.RSI_PERIOD
+        self.bb_period = max(2, config.BOLLINGER_PERIOD)
+        self.bb_std_dev = config.BOLLINGER_STD_DEV
+        # Kürzere Fenster berechnet calculate_all_indicators mit Ersatzwerten (z.B. RSI 50)
+        self._patch_min_rows = max(self.sma_short_period, self.sma_long_period, self.bb_period,
+                                   self.rsi_period + 1, STOCH_K_PERIOD) + STOCH_D_PERIOD
+        # Indikatorspalten in der Reihenfolge von calculate_all_indicators
+        self.columns = [f'sma_{self.sma_short_period}', f'sma_{self.sma_long_period}', 'rsi',
+                        'ema_fast', 'ema_slow', 'macd', 'macd_signal', 'macd_hist',
+                        'bb_middle', 'bb_std', 'bb_upper', 'bb_lower', 'bb_width', 'bb_percent_b',
+                        'stoch_k', 'stoch_d', 'atr']
+        self._column_index = {name: index for index, name in enumerate(self.columns)}
+        self._raw_k = len(self.columns)  # Erste interne Spalte der Ausgabezeilen
+        self.reset()
+
+    def reset(self):
+        """Verwirft den gesamten Zustand"""
+        self._rows = _RowBuffer(self.capacity + 2, _ROW_WIDTH)
+        self._bar_count = 0       # Anzahl Kerzen seit Start inkl. laufender Kerze
+        self._prev_close = None   # Schlusskurs der letzten abgeschlossenen Kerze
+        self._close_sum = 0.0     # Summe der abgeschlossenen Schlusskurse (für den Mindestabstand)
+        # Ausgabezeilen (Indikatorspalten, unbegrenztes %K, Mindestabstand, Spanne) und Signalzeilen (Gesamtsignal + signal_*)
+        self._out = _RowBuffer(self.capacity + 2, len(self.columns) + 3)
+        self._signals = None
+        self._signal_names = None
+        self._last_row_only = getattr(config, 'SIGNAL_VOTE_LAST_ROW_ONLY', False)
+
+        self._sma_short = _RollingWindow(self.sma_short_period)
+        self._sma_long = _RollingWindow(self.sma_long_period)
+        self._bollinger = _RollingWindow(self.bb_period)
+        self._avg_gain = _Ema(alpha=1 / self.rsi_period)
+        self._avg_loss = _Ema(alpha=1 / self.rsi_period)
+        self._ema_fast = _Ema(span=config.MACD_FAST)
+        self._ema_slow = _Ema(span=config.MACD_SLOW)
+        self._macd_signal = _Ema(span=config.MACD_SIGNAL)
+        self._atr = _Ema(span=ATR_PERIOD)
+        self._low_min = _MonotonicWindow(STOCH_K_PERIOD)
+        self._high_max = _MonotonicWindow(STOCH_K_PERIOD, use_max=True)
+
+    def _compute_row(self, candle):
+        """Berechnet die Zustandszeile der laufenden Kerze aus dem abgeschlossenen Zustand"""
+        high, low, close = candle[_HIGH], candle[_LOW], candle[_CLOSE]
+        index = self._bar_count - 1
+
+        row = np.empty(_ROW_WIDTH)
+        row[:6] = candle
+        row[_SMA_SHORT] = self._sma_short.query(close)[0]
+        row[_SMA_LONG] = self._sma_long.query(close)[0]
+        row[_BB_MIDDLE], row[_BB_STD] = self._bollinger.query(close)
+
+        # RSI (Durchschnitte ohne Schutz vor Division durch Null, der folgt erst im Fenster)
+        delta = 0.0 if self._prev_close is None else close - self._prev_close
+        row[_AVG_GAIN] = self._avg_gain.query(delta if delta > 0 else 0.0)
+        row[_AVG_LOSS] = self._avg_loss.query(-delta if delta < 0 else 0.0)
+
+        # MACD
+        row[_EMA_FAST] = self._ema_fast.query(close)
+        row[_EMA_SLOW] = self._ema_slow.query(close)
+        row[_MACD] = row[_EMA_FAST] - row[_EMA_SLOW]
+        row[_MACD_SIGNAL] = self._macd_signal.query(row[_MACD])
+
+        # Stochastic (Hoch/Tief des Fensters)
+        row[_LOW_MIN] = self._low_min.query(index, low)
+        row[_HIGH_MAX] = self._high_max.query(index, high)
+
+        # ATR
+        if self._prev_close is None:
+            true_range = high - low
+        else:
+            true_range = max(high - low, abs(high - self._prev_close), abs(low - self._prev_close))
+        row[_ATR] = self._atr.query(true_range)
+
+        return row
+
+    def _commit_last(self):
+        """Übernimmt die bisher laufende Kerze in den abgeschlossenen Zustand"""
+        row = self._rows.tail(1)[0]
+        close = row[_CLOSE]
+        index = self._bar_count - 1
+        delta = 0.0 if self._prev_close is None else close - self._prev_close
+        if self._prev_close is None:
+            true_range = row[_HIGH] - row[_LOW]
+        else:
+            true_range = max(row[_HIGH] - row[_LOW], abs(row[_HIGH] - self._prev_close), abs(row[_LOW] - self._prev_close))
+
+        self._sma_short.commit(close)
+        self._sma_long.commit(close)
+        self._bollinger.commit(close)
+        self._avg_gain.commit(delta if delta > 0 else 0.0)
+        self._avg_loss.commit(-delta if delta < 0 else 0.0)
+        self._ema_fast.commit(close)
+        self._ema_slow.commit(close)
+        self._macd_signal.commit(row[_MACD])
+        self._low_min.commit(index, row[_LOW])
+        self._high_max.commit(index, row[_HIGH])
+        self._atr.commit(true_range)
+        self._prev_close = close
+        self._close_sum += close
+
+    def push(self, candle):
+        """Fügt eine neue Kerze hinzu (die bisherige laufende Kerze gilt als abgeschlossen)"""
+        if self._bar_count > 0:
+            self._commit_last()
+        self._bar_count += 1
+        row = self._compute_row(candle)
+        self._rows.append(row)
+        self._emit(amended=False)
+
+    def amend(self, candle):
+        """Aktualisiert die laufende (letzte) Kerze"""
+        row = self._compute_row(candle)
+        self._rows.set_last(row)
+        self._emit(amended=True)
+
+    def update(self, candles):
+        """
+        Gleicht den Zustand mit dem Kerzen-DataFrame ab. Nur neue oder geänderte
+        Kerzen werden verarbeitet; passt der DataFrame nicht zum Zustand, wird neu
+        initialisiert.
+
+        Parameters:
+        candles: DataFrame mit timestamp, open, high, low, close, volume
+
+        Returns:
+        bool: True wenn der Zustand neu aufgebaut wurde
+        """
+        values = candles[['open', 'high', 'low', 'close', 'volume']].to_numpy(dtype=np.float64)
+        timestamps = candles['timestamp'].to_numpy().astype('datetime64[ms]').astype(np.int64).astype(np.float64)
+        ohlcv = np.column_stack((timestamps, values))
+
+        reseed = len(self._rows) < len(ohlcv) or len(self._rows) == 0
+        if not reseed:
+            last_ts = self._rows.tail(1)[0][_TS]
+            pos = int(np.searchsorted(timestamps, last_ts))
+            if pos >= len(ohlcv) or timestamps[pos] != last_ts:
+                reseed = True
+            elif pos > 0 and not np.array_equal(self._rows.tail(2)[0][:6], ohlcv[pos - 1]):
+                # Eine bereits abgeschlossene Kerze wurde nachträglich verändert
+                reseed = True
+
+        if reseed:
+            self.capacity = max(self.capacity, len(ohlcv))
+            self.reset()
+            for candle in ohlcv:
+                self.push(candle)
+            return True
+
+        if not np.array_equal(self._rows.tail(1)[0][:6], ohlcv[pos]):
+            self.amend(ohlcv[pos])
+        for candle in ohlcv[pos + 1:]:
+            self.push(candle)
+        return False
+
+    # ---- Ausgabezeilen (Semantik von calculate_all_indicators auf der Historie seit dem Start) ----
+
+    def _floor(self, close):
+        """Mindestabstand: 0.1% des mittleren Schlusskurses aller Kerzen bis einschließlich der laufenden"""
+        return (self._close_sum + close) / self._bar_count * 0.001
+
+    def _output_row(self, row, previous_raw, floor):
+        """
+        Indikatorspalten einer Kerze aus ihrer Zustandszeile (Reihenfolge wie self.columns,
+        danach unbegrenztes %K, verwendeter Mindestabstand und kleinste Spanne davor).
+
+        Parameters:
+        row: Zustandszeile der Kerze
+        previous_raw: Unbegrenztes %K der (höchstens STOCH_D_PERIOD - 1) Vorkerzen
+        floor: Mindestabstand für Bollinger Bands und Stochastic
+        """
+        epsilon = 1e-10
+        close = row[_CLOSE]
+        avg_loss = row[_AVG_LOSS] if row[_AVG_LOSS] != 0 else 1e-10
+        rsi = min(max(100 - (100 / (1 + row[_AVG_GAIN] / avg_loss)), 0), 100)
+        macd = row[_EMA_FAST] - row[_EMA_SLOW]
+
+        # NaN der ersten Kerze bleibt wie bei Series.clip erhalten
+        bb_std = row[_BB_STD] if math.isnan(row[_BB_STD]) else max(row[_BB_STD], floor)
+        bb_upper = row[_BB_MIDDLE] + bb_std * self.bb_std_dev
+        bb_lower = row[_BB_MIDDLE] - bb_std * self.bb_std_dev
+        band_diff = bb_upper - bb_lower
+        percent_b = (close - bb_lower) / band_diff if band_diff > epsilon else 0.5
+
+        spread = row[_HIGH_MAX] - row[_LOW_MIN]
+        stoch_raw = 100 * ((close - row[_LOW_MIN]) / max(spread, floor))
+        stoch_d = (sum(previous_raw) + stoch_raw) / (len(previous_raw) + 1)
+
+        return np.array([
+            row[_SMA_SHORT], row[_SMA_LONG], rsi,
+            row[_EMA_FAST], row[_EMA_SLOW], macd, row[_MACD_SIGNAL], macd - row[_MACD_SIGNAL],
+            row[_BB_MIDDLE], bb_std, bb_upper, bb_lower, band_diff / (row[_BB_MIDDLE] + epsilon), min(max(percent_b, 0), 1),
+            min(max(stoch_raw, 0), 100), min(max(stoch_d, 0), 100), row[_ATR],
+            stoch_raw, floor, np.fmin(spread, row[_BB_STD])
+        ])
+
+    def _signal_row(self, previous, current, close):
+        """Einzelsignale und Gesamtsignal einer Kerze (Signale lesen die Vorkerze wie shift(1))"""
+        inputs = {'close': np.array([np.nan, close])}
+        for name in _SIGNAL_INPUTS:
+            if name in self._column_index:
+                column = self._column_index[name]
+                inputs[name] = np.array([np.nan if previous is None else previous[column], current[column]])
+        signals = {name: values[-1] for name, values in indicators.indicator_signals(inputs).items()}
+        if self._signal_names is None:
+            self._signal_names = list(signals)
+            self._signals = _RowBuffer(self._rows.capacity, len(self._signal_names) + 1)
+            vote_weights = getattr(config, 'SIGNAL_VOTE_WEIGHTS', {})
+            self._vote_weights = np.array([vote_weights.get(name, 1.0) for name in self._signal_names], dtype=np.float64)
+        votes = np.array([signals[name] for name in self._signal_names], dtype=np.float64)
+        combined = indicators.combine_signal_votes(votes[None, :], self._vote_weights)[0] if len(votes) else 0
+        return np.concatenate(([combined], votes))
+
+    def _fill_first_bands(self, out, signals, states, first):
+        """
+        Erste Kerze der Historie ohne Standardabweichung: Bänder wie bfill() in
+        calculate_bollinger_bands aus der zweiten Kerze, ihre Signale lesen die aufgefüllten Bänder.
+        """
+        for name in ('bb_upper', 'bb_lower', 'bb_width'):
+            out[first, self._column_index[name]] = out[first + 1, self._column_index[name]]
+        if not self._last_row_only:
+            signals[first] = self._signal_row(None, out[first], states[first, _CLOSE])
+
+    def _emit(self, amended):
+        """Berechnet Ausgabe- und Signalzeile der laufenden Kerze (neu oder geändert)"""
+        offset = 1 if amended else 0  # Beim Ändern ist die laufende Kerze schon im Ausgabepuffer
+        history = self._out.tail(STOCH_D_PERIOD - 1 + offset)
+        history = history[:len(history) - offset]
+        previous = history[-1] if len(history) else None
+        row = self._rows.tail(1)[0]
+        out = self._output_row(row, history[:, self._raw_k], self._floor(row[_CLOSE]))
+        signals = self._signal_row(previous, out, row[_CLOSE])
+        if amended:
+            self._out.set_last(out)
+            self._signals.set_last(signals)
+        else:
+            if self._last_row_only and len(self._signals):
+                # Wie generate_signals(last_row_only=True): nur die letzte Kerze stimmt ab
+                self._signals.tail(1)[0] = 0
+            self._out.append(out)
+            self._signals.append(signals)
+        if self._bar_count == 2:
+            self._fill_first_bands(self._out.tail(2), self._signals.tail(2), self._rows.tail(2), 0)
+
+    def _refloor(self, count):
+        """
+        Wendet den aktuellen Mindestabstand auf die letzten count Zeilen an. Betroffen sind nur
+        Zeilen, deren Spanne bzw. Standardabweichung unter dem alten oder neuen Mindestabstand
+        liegt, dazu %D und Signale der Folgezeilen.
+        """
+        epsilon = 1e-10
+        column = self._column_index
+        out = self._out.tail(count + STOCH_D_PERIOD - 1)
+        signals = self._signals.tail(len(out))
+        states = self._rows.tail(len(out))
+        first_global = self._bar_count - len(out)
+        floor = self._floor(states[-1, _CLOSE])
+        used = out[:, self._raw_k + 1]
+        affected = np.flatnonzero((out[:, self._raw_k + 2] < np.maximum(used, floor)) & (used != floor))
+        if len(affected) == 0:
+            return
+
+        close = states[affected, _CLOSE]
+        raw_std = states[affected, _BB_STD]
+        bb_middle = states[affected, _BB_MIDDLE]
+        bb_std = np.where(np.isnan(raw_std), np.nan, np.fmax(raw_std, floor))
+        bb_upper = bb_middle + bb_std * self.bb_std_dev
+        bb_lower = bb_middle - bb_std * self.bb_std_dev
+        band_diff = bb_upper - bb_lower
+        with np.errstate(invalid='ignore'):
+            percent_b = np.where(band_diff > epsilon, (close - bb_lower) / band_diff, 0.5)
+        out[affected, column['bb_std']] = bb_std
+        out[affected, column['bb_upper']] = bb_upper
+        out[affected, column['bb_lower']] = bb_lower
+        out[affected, column['bb_width']] = band_diff / (bb_middle + epsilon)
+        out[affected, column['bb_percent_b']] = np.clip(percent_b, 0, 1)
+
+        low_min = states[affected, _LOW_MIN]
+        stoch_raw = 100 * ((close - low_min) / np.maximum(states[affected, _HIGH_MAX] - low_min, floor))
+        out[affected, self._raw_k] = stoch_raw
+        out[affected, column['stoch_k']] = np.clip(stoch_raw, 0, 100)
+        out[affected, self._raw_k + 1] = floor
+
+        # %D als gleitender Mittelwert (min_periods=1) über das unbegrenzte %K
+        changed = np.unique(np.concatenate([affected + lag for lag in range(STOCH_D_PERIOD)]))
+        changed = changed[changed < len(out)]
+        lags = changed[:, None] - np.arange(STOCH_D_PERIOD)
+        window = np.where(lags >= 0, out[np.maximum(lags, 0), self._raw_k], np.nan)
+        out[changed, column['stoch_d']] = np.clip(np.nanmean(window, axis=1), 0, 100)
+
+        if first_global == 0 and len(out) > 1 and (affected <= 1).any():
+            for name in ('bb_upper', 'bb_lower', 'bb_width'):
+                out[0, column[name]] = out[1, column[name]]
+            affected = np.union1d(affected, [0])
+
+        # Signale der betroffenen Zeilen und ihrer Folgezeilen (Paare aus Vorzeile und Zeile)
+        rows = np.unique(np.concatenate((affected, affected + 1)))
+        rows = rows[(rows < len(out)) & ((rows > 0) | (first_global == 0))]
+        if self._last_row_only:
+            rows = rows[rows == len(out) - 1]
+        if len(rows) == 0:
+            return
+        pairs = np.column_stack((rows - 1, rows)).ravel()
+        inputs = {'close': states[np.maximum(pairs, 0), _CLOSE]}
+        for name in _SIGNAL_INPUTS:
+            if name in column:
+                inputs[name] = out[np.maximum(pairs, 0), column[name]]
+        for values in inputs.values():
+            values[pairs < 0] = np.nan
+        for index, values in enumerate(indicators.indicator_signals(inputs).values()):
+            signals[rows, index + 1] = values[1::2]
+        signals[rows, 0] = indicators.combine_signal_votes(signals[rows, 1:], self._vote_weights)
+
+    def to_dataframe(self, candles):
+        """
+        Indikator-DataFrame für die Kerzen des letzten update()-Aufrufs.
+
+        Die Zeilen werden beim Eintreffen bzw. Ändern ihrer Kerze einmal berechnet (O(1) je Kerze)
+        und entsprechen calculate_all_indicators auf der gesamten Historie seit dem Start der Engine.
+        Kürzere Fenster als die Einschwingphase der Indikatoren werden vollständig berechnet.
+        """
+        n = len(candles)
+        if n < self._patch_min_rows:
+            return indicators.calculate_all_indicators(candles)
+        self._refloor(n)
+        out = self._out.tail(n)
+        signals = self._signals.tail(n).astype(np.int64)
+        data = {name: column.to_numpy(copy=True) for name, column in candles.items()}
+        for index, name in enumerate(self.columns):
+            data[name] = out[:, index].copy()
+        data['signal'] = signals[:, 0]
+        for index, name in enumerate(self._signal_names):
+            data[name] = signals[:, index + 1]
+        return pd.DataFrame(data, index=candles.index)
+
+
+# Globale Registry der Engines (eine Engine pro Symbol und Zeitintervall)
+_indicator_engines = {}
+
+
+def get_indicator_engine(symbol=None, timeframe=None):
+    """
+    Gibt die Indikator-Engine für Symbol und Zeitintervall zurück (wird bei Bedarf erstellt).
+    """
+    key = (symbol or config.SYMBOL, timeframe or config.TIMEFRAME)
+    if key not in _indicator_engines:
+        _indicator_engines[key] = IncrementalIndicatorEngine()
+    return _indicator_engines[key]
+
+
+def calculate_all_indicators_incremental(df, symbol=None, timeframe=None):
+    """
+    Inkrementelle Variante von indicators.calculate_all_indicators.
+
+    Fällt bei unvollständigen Daten (NaN-Werte) oder Fehlern auf die vollständige
+    Neuberechnung zurück.
+
+    Parameters:
+    df: DataFrame mit OHLCV-Daten (z.B. aus dem Candle Store)
+    symbol: Handelssymbol (Standard: config.SYMBOL)
+    timeframe: Zeitintervall (Standard: config.TIMEFRAME)
+
+    Returns:
+    DataFrame: DataFrame mit allen Indikatoren und Signalen
+    """
+    if df is None or df.empty:
+        return indicators.calculate_all_indicators(df)
+
+    engine = get_indicator_engine(symbol, timeframe)
+    columns = ['open', 'high', 'low', 'close', 'volume']
+    if any(col not in df.columns for col in ['timestamp'] + columns) or df[columns].isna().any().any():
+        engine.reset()
+        return indicators.calculate_all_indicators(df)
+
+    try:
+        if engine.update(df):
+            logger.info("Indikator-Engine mit %s Kerzen initialisiert.", len(df), extra={'color': Fore.YELLOW})
+        return engine.to_dataframe(df)
+    except Exception as e:
+        utils.log_error(e, "Fehler in der inkrementellen Indikatorberechnung - verwende vollständige Neuberechnung")
+        engine.reset()
+        return indicators.calculate_all_indicators(df)
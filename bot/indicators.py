@@ -1,9 +1,11 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime
-from colorama import Fore, Style
 import utils
 import config
+import structured_logging
+
+
+logger = structured_logging.get_logger(__name__)
 
 def calculate_sma(df, period=None):
     """Berechnet Simple Moving Average (SMA)"""
@@ -16,14 +18,14 @@ def calculate_sma(df, period=None):
     
     # Sicherstellen, dass df nicht leer ist
     if df is None or df.empty or 'close' not in df.columns:
-        print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] Fehler: Ungültige Daten für SMA-Berechnung{Style.RESET_ALL}")
+        logger.error("Ungültige Daten für SMA-Berechnung")
         df[f'sma_{period_short}'] = np.nan
         df[f'sma_{period_long}'] = np.nan
         return df
     
     # NaN-Werte in 'close' verarbeiten
     if df['close'].isna().any():
-        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Warnung: NaN-Werte in Schlusskursdaten für SMA gefunden. Fülle mit vorherigen Werten.{Style.RESET_ALL}")
+        logger.warning("NaN-Werte in Schlusskursdaten für SMA gefunden. Fülle mit vorherigen Werten.")
         df['close'] = df['close'].fillna(method='ffill').fillna(method='bfill')
 
     # SMA berechnen mit min_periods=1, um auch mit wenigen Datenpunkten zu arbeiten
@@ -32,7 +34,7 @@ def calculate_sma(df, period=None):
     
     # Prüfung auf NaN-Werte in den Ergebnissen
     if df[f'sma_{period_short}'].isna().any() or df[f'sma_{period_long}'].isna().any():
-        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Warnung: NaN-Werte in SMA-Ergebnissen. Fülle fehlende Werte.{Style.RESET_ALL}")
+        logger.warning("NaN-Werte in SMA-Ergebnissen. Fülle fehlende Werte.")
         df[f'sma_{period_short}'] = df[f'sma_{period_short}'].fillna(method='ffill').fillna(method='bfill')
         df[f'sma_{period_long}'] = df[f'sma_{period_long}'].fillna(method='ffill').fillna(method='bfill')
     
@@ -45,19 +47,19 @@ def calculate_rsi(df, period=None):
     
     # Sicherstellen, dass genügend Daten vorhanden sind
     if df is None or df.empty or 'close' not in df.columns:
-        print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] Fehler: Ungültige Daten für RSI-Berechnung{Style.RESET_ALL}")
+        logger.error("Ungültige Daten für RSI-Berechnung")
         df['rsi'] = np.nan
         return df
     
     if len(df) < period + 1:
-        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Warnung: Unzureichende Daten für RSI-Berechnung. Benötigt mindestens {period + 1} Datenpunkte, hat {len(df)}{Style.RESET_ALL}")
+        logger.warning("Unzureichende Daten für RSI-Berechnung. Benötigt mindestens %s Datenpunkte, hat %s", period + 1, len(df))
         # Erstelle leere RSI-Spalte mit Standardwert 50 (neutral)
         df['rsi'] = 50
         return df
         
     # Sicherstellen, dass keine NaN-Werte im Schlusskurs vorhanden sind
     if df['close'].isna().any():
-        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Warnung: NaN-Werte in Schlusskursdaten für RSI gefunden. Fülle mit vorherigen Werten.{Style.RESET_ALL}")
+        logger.warning("NaN-Werte in Schlusskursdaten für RSI gefunden. Fülle mit vorherigen Werten.")
         df['close'] = df['close'].fillna(method='ffill').fillna(method='bfill')
     
     try:
@@ -87,7 +89,7 @@ def calculate_rsi(df, period=None):
         
         # Fülle verbleibende NaN-Werte
         if df['rsi'].isna().any():
-            print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Warnung: NaN-Werte in RSI-Ergebnissen. Fülle fehlende Werte.{Style.RESET_ALL}")
+            logger.warning("NaN-Werte in RSI-Ergebnissen. Fülle fehlende Werte.")
             df['rsi'] = df['rsi'].fillna(method='ffill').fillna(method='bfill')
             
             # Falls immer noch NaN-Werte (z.B. am Anfang), setze auf neutralen Wert
@@ -96,7 +98,7 @@ def calculate_rsi(df, period=None):
         return df
     except Exception as e:
         utils.log_error(e, "Fehler bei der RSI-Berechnung")
-        print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] Fehler bei der RSI-Berechnung: {str(e)}{Style.RESET_ALL}")
+        logger.error("Fehler bei der RSI-Berechnung: %s", e)
         df['rsi'] = np.nan
         return df
 
@@ -109,7 +111,7 @@ def calculate_macd(df, fast_period=None, slow_period=None, signal_period=None):
     
     # Sicherstellen, dass df nicht leer ist
     if df is None or df.empty or 'close' not in df.columns:
-        print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] Fehler: Ungültige Daten für MACD-Berechnung{Style.RESET_ALL}")
+        logger.error("Ungültige Daten für MACD-Berechnung")
         df['ema_fast'] = np.nan
         df['ema_slow'] = np.nan
         df['macd'] = np.nan
@@ -119,7 +121,7 @@ def calculate_macd(df, fast_period=None, slow_period=None, signal_period=None):
     
     # NaN-Werte in 'close' verarbeiten
     if df['close'].isna().any():
-        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Warnung: NaN-Werte in Schlusskursdaten für MACD gefunden. Fülle mit vorherigen Werten.{Style.RESET_ALL}")
+        logger.warning("NaN-Werte in Schlusskursdaten für MACD gefunden. Fülle mit vorherigen Werten.")
         df['close'] = df['close'].fillna(method='ffill').fillna(method='bfill')
     
     try:
@@ -137,14 +139,14 @@ def calculate_macd(df, fast_period=None, slow_period=None, signal_period=None):
         # Prüfung auf NaN-Werte in den Ergebnissen
         for col in ['macd', 'macd_signal', 'macd_hist']:
             if df[col].isna().any():
-                print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Warnung: NaN-Werte in {col} gefunden. Fülle fehlende Werte.{Style.RESET_ALL}")
+                logger.warning("NaN-Werte in %s gefunden. Fülle fehlende Werte.", col)
                 df[col] = df[col].ffill().bfill()
         
         return df
         
     except Exception as e:
         utils.log_error(e, "Fehler bei der MACD-Berechnung")
-        print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] Fehler bei der MACD-Berechnung: {str(e)}{Style.RESET_ALL}")
+        logger.error("Fehler bei der MACD-Berechnung: %s", e)
         df['ema_fast'] = np.nan
         df['ema_slow'] = np.nan
         df['macd'] = np.nan
@@ -163,7 +165,7 @@ def calculate_bollinger_bands(df, period=None, std_dev=None):
     
     # Sicherstellen, dass df nicht leer ist
     if df is None or df.empty or 'close' not in df.columns:
-        print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] Fehler: Ungültige Daten für Bollinger Bands Berechnung{Style.RESET_ALL}")
+        logger.error("Ungültige Daten für Bollinger Bands Berechnung")
         df['bb_middle'] = np.nan
         df['bb_upper'] = np.nan
         df['bb_lower'] = np.nan
@@ -173,7 +175,7 @@ def calculate_bollinger_bands(df, period=None, std_dev=None):
     
     # Sicherstellen, dass genügend Daten vorhanden sind
     if len(df) < period:
-        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Warnung: Unzureichende Daten für Bollinger Bands. Benötigt mindestens {period} Datenpunkte, hat {len(df)}{Style.RESET_ALL}")
+        logger.warning("Unzureichende Daten für Bollinger Bands. Benötigt mindestens %s Datenpunkte, hat %s", period, len(df))
         # Erstelle leere BB-Spalten
         df['bb_middle'] = df['close']  # Setze middle band auf close als Fallback
         df['bb_upper'] = df['close'] * 1.01  # Setze upper band 1% über close
@@ -184,7 +186,7 @@ def calculate_bollinger_bands(df, period=None, std_dev=None):
     
     # Sicherstellen, dass keine NaN-Werte im Schlusskurs vorhanden sind
     if df['close'].isna().any():
-        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Warnung: NaN-Werte in Schlusskursdaten für Bollinger Bands gefunden. Fülle mit vorherigen Werten.{Style.RESET_ALL}")
+        logger.warning("NaN-Werte in Schlusskursdaten für Bollinger Bands gefunden. Fülle mit vorherigen Werten.")
         df['close'] = df['close'].fillna(method='ffill').fillna(method='bfill')
     
     try:
@@ -220,13 +222,13 @@ def calculate_bollinger_bands(df, period=None, std_dev=None):
         # Prüfung auf NaN-Werte in den Ergebnissen
         for col in ['bb_middle', 'bb_upper', 'bb_lower', 'bb_width', 'bb_percent_b']:
             if df[col].isna().any():
-                print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Warnung: NaN-Werte in {col} gefunden. Fülle fehlende Werte.{Style.RESET_ALL}")
+                logger.warning("NaN-Werte in %s gefunden. Fülle fehlende Werte.", col)
                 df[col] = df[col].ffill().bfill()
         
         return df
     except Exception as e:
         utils.log_error(e, "Fehler bei der Bollinger Bands Berechnung")
-        print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] Fehler bei der Bollinger Bands Berechnung: {str(e)}{Style.RESET_ALL}")
+        logger.error("Fehler bei der Bollinger Bands Berechnung: %s", e)
         
         # Setze alle BB-Spalten auf NaN bei Fehler
         df['bb_middle'] = np.nan
@@ -240,7 +242,7 @@ def calculate_stochastic_oscillator(df, k_period=14, d_period=3):
     """Berechnet Stochastischer Oszillator mit verbesserter Validierung"""
     # Sicherstellen, dass df nicht leer ist
     if df is None or df.empty or not all(col in df.columns for col in ['high', 'low', 'close']):
-        print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] Fehler: Ungültige Daten für Stochastic Oscillator Berechnung{Style.RESET_ALL}")
+        logger.error("Ungültige Daten für Stochastic Oscillator Berechnung")
         df['stoch_k'] = np.nan
         df['stoch_d'] = np.nan
         return df
@@ -248,7 +250,7 @@ def calculate_stochastic_oscillator(df, k_period=14, d_period=3):
     # Prüfe auf NaN-Werte in Eingabedaten
     for col in ['high', 'low', 'close']:
         if df[col].isna().any():
-            print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Warnung: NaN-Werte in {col} für Stochastic Oscillator gefunden. Fülle fehlende Werte.{Style.RESET_ALL}")
+            logger.warning("NaN-Werte in %s für Stochastic Oscillator gefunden. Fülle fehlende Werte.", col)
             df[col] = df[col].ffill().bfill()
     
     try:
@@ -275,7 +277,7 @@ def calculate_stochastic_oscillator(df, k_period=14, d_period=3):
         # Prüfung auf NaN-Werte in den Ergebnissen
         for col in ['stoch_k', 'stoch_d']:
             if df[col].isna().any():
-                print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Warnung: NaN-Werte in {col} gefunden. Fülle fehlende Werte.{Style.RESET_ALL}")
+                logger.warning("NaN-Werte in %s gefunden. Fülle fehlende Werte.", col)
                 df[col] = df[col].ffill().bfill()
         
         return df
@@ -289,14 +291,14 @@ def calculate_atr(df, period=14):
     """Berechnet Average True Range (ATR) mit verbesserter Validierung"""
     # Sicherstellen, dass df nicht leer ist
     if df is None or df.empty or not all(col in df.columns for col in ['high', 'low', 'close']):
-        print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] Fehler: Ungültige Daten für ATR-Berechnung{Style.RESET_ALL}")
+        logger.error("Ungültige Daten für ATR-Berechnung")
         df['atr'] = np.nan
         return df
     
     # Prüfe auf NaN-Werte in Eingabedaten
     for col in ['high', 'low', 'close']:
         if df[col].isna().any():
-            print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Warnung: NaN-Werte in {col} für ATR gefunden. Fülle fehlende Werte.{Style.RESET_ALL}")
+            logger.warning("NaN-Werte in %s für ATR gefunden. Fülle fehlende Werte.", col)
             df[col] = df[col].ffill().bfill()
     
     try:
@@ -321,7 +323,7 @@ def calculate_atr(df, period=14):
         
         # Prüfung auf NaN-Werte im Ergebnis
         if df['atr'].isna().any():
-            print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Warnung: NaN-Werte in ATR gefunden. Fülle fehlende Werte.{Style.RESET_ALL}")
+            logger.warning("NaN-Werte in ATR gefunden. Fülle fehlende Werte.")
             df['atr'] = df['atr'].fillna(method='ffill').fillna(method='bfill')
         
         return df
@@ -336,18 +338,18 @@ def calculate_atr(df, period=14):
 
 def calculate_all_indicators(df):
     """Berechnet alle technischen Indikatoren mit verbesserter Validierung"""
-    print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Berechne technische Indikatoren...{Style.RESET_ALL}")
+    logger.info("Berechne technische Indikatoren...")
     
     # Stelle sicher, dass das DataFrame nicht leer ist
     if df is None or df.empty:
-        print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] Fehler: Leeres DataFrame, Indikatorberechnung nicht möglich{Style.RESET_ALL}")
+        logger.error("Leeres DataFrame, Indikatorberechnung nicht möglich")
         return df if df is not None else pd.DataFrame()
     
     # Stelle sicher, dass die erforderlichen Spalten vorhanden sind
     required_columns = ['timestamp', 'open', 'high', 'low', 'close']
     missing = [col for col in required_columns if col not in df.columns]
     if missing:
-        print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] Fehler: Fehlende erforderliche Spalten: {missing}{Style.RESET_ALL}")
+        logger.error("Fehlende erforderliche Spalten: %s", missing)
         return df
     
     try:
@@ -357,7 +359,7 @@ def calculate_all_indicators(df):
         # Fülle NaN-Werte, um Fehler zu vermeiden
         for col in ['open', 'high', 'low', 'close', 'volume']:
             if col in df_copy.columns and df_copy[col].isna().any():
-                print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Warnung: NaN-Werte in {col} gefunden. Fülle fehlende Werte.{Style.RESET_ALL}")
+                logger.warning("NaN-Werte in %s gefunden. Fülle fehlende Werte.", col)
                 df_copy[col] = df_copy[col].fillna(method='ffill').fillna(method='bfill')
         
         # Grundlegende Indikatoren
@@ -379,105 +381,153 @@ def calculate_all_indicators(df):
         # Signalgenerierung
         df_copy = generate_signals(df_copy)
         
-        print(f"{Fore.GREEN}[{datetime.now().strftime('%H:%M:%S')}] Technische Indikatoren erfolgreich berechnet.{Style.RESET_ALL}")
+        logger.info("Technische Indikatoren erfolgreich berechnet.")
         
         return df_copy
     except Exception as e:
         utils.log_error(e, "Kritischer Fehler bei der Berechnung der technischen Indikatoren")
-        print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] Kritischer Fehler bei der Indikatorberechnung: {str(e)}{Style.RESET_ALL}")
+        logger.error("Kritischer Fehler bei der Indikatorberechnung: %s", e)
         
         # Gib das Ursprungs-DataFrame zurück, um Datenverlust zu vermeiden
         return df
 
-def generate_signals(df):
-    """Generiert Signale basierend auf allen berechneten Indikatoren mit verbesserter Validierung"""
-    df['signal'] = 0
+def _previous(values):
+    """Verschiebt ein Array um eine Zeile nach hinten (entspricht Series.shift(1))"""
+    return np.concatenate(([np.nan], values[:-1]))
+
+def indicator_signals(df):
+    """
+    Berechnet die Einzelsignale aller Indikatoren vektorisiert auf NumPy-Arrays.
     
-    try:
-        # SMA-Crossover-Signal
-        if 'sma_5' in df.columns and 'sma_20' in df.columns:
-            # Stelle sicher, dass keine NaN-Werte in den Signalberechnungen sind
-            valid_sma = (~df['sma_5'].isna()) & (~df['sma_20'].isna()) & (~df['sma_5'].shift(1).isna()) & (~df['sma_20'].shift(1).isna())
-            
-            # Initialisiere Signal-Spalte
-            df['signal_sma'] = 0
-            
-            # Berechne Signale nur für gültige Zeilen
-            buy_signal = (df['sma_5'] > df['sma_5'].shift(1)) & (df['sma_5'] > df['sma_20']) & (df['sma_5'].shift(1) <= df['sma_20'].shift(1)) & valid_sma
-            sell_signal = (df['sma_5'] < df['sma_5'].shift(1)) & (df['sma_5'] < df['sma_20']) & (df['sma_5'].shift(1) >= df['sma_20'].shift(1)) & valid_sma
-            
-            df.loc[buy_signal, 'signal_sma'] = 1
-            df.loc[sell_signal, 'signal_sma'] = -1
+    Parameters:
+    df: DataFrame oder dict (Spaltenname -> Array) mit Indikatoren
+    
+    Returns:
+    dict: Spaltenname (signal_*) -> NumPy-Array mit 1 (Kauf), -1 (Verkauf) oder 0
+    """
+    signals = {}
+    column = lambda name: np.asarray(df[name], dtype=np.float64)
+    
+    # SMA-Crossover-Signal
+    if 'sma_5' in df and 'sma_20' in df:
+        sma_short, sma_long = column('sma_5'), column('sma_20')
+        prev_short, prev_long = _previous(sma_short), _previous(sma_long)
         
-        # RSI-Signal
-        if 'rsi' in df.columns and not df['rsi'].isna().all():
-            # Initialisiere Signal-Spalte
-            df['signal_rsi'] = 0
-            
+        # Stelle sicher, dass keine NaN-Werte in den Signalberechnungen sind
+        valid_sma = ~np.isnan(sma_short) & ~np.isnan(sma_long) & ~np.isnan(prev_short) & ~np.isnan(prev_long)
+        
+        buy_signal = (sma_short > prev_short) & (sma_short > sma_long) & (prev_short <= prev_long) & valid_sma
+        sell_signal = (sma_short < prev_short) & (sma_short < sma_long) & (prev_short >= prev_long) & valid_sma
+        signals['signal_sma'] = np.where(sell_signal, -1, np.where(buy_signal, 1, 0))
+    
+    # RSI-Signal
+    if 'rsi' in df:
+        rsi = column('rsi')
+        if not np.isnan(rsi).all():
             # Prüfe RSI-Werte gegen Schwellenwerte aus der Konfiguration
-            if hasattr(config, 'RSI_OVERSOLD') and hasattr(config, 'RSI_OVERBOUGHT'):
-                df.loc[df['rsi'] < config.RSI_OVERSOLD, 'signal_rsi'] = 1  # Überkauft - Kaufsignal
-                df.loc[df['rsi'] > config.RSI_OVERBOUGHT, 'signal_rsi'] = -1  # Überverkauft - Verkaufssignal
-            else:
-                # Standardwerte, wenn Konfiguration nicht verfügbar
-                df.loc[df['rsi'] < 30, 'signal_rsi'] = 1
-                df.loc[df['rsi'] > 70, 'signal_rsi'] = -1
+            oversold = getattr(config, 'RSI_OVERSOLD', 30)
+            overbought = getattr(config, 'RSI_OVERBOUGHT', 70)
+            signals['signal_rsi'] = np.where(rsi > overbought, -1, np.where(rsi < oversold, 1, 0))
+    
+    # MACD-Signal
+    if 'macd' in df and 'macd_signal' in df:
+        macd, macd_signal = column('macd'), column('macd_signal')
+        prev_macd, prev_signal = _previous(macd), _previous(macd_signal)
         
-        # MACD-Signal
-        if 'macd' in df.columns and 'macd_signal' in df.columns:
-            # Stelle sicher, dass keine NaN-Werte in den Signalberechnungen sind
-            valid_macd = (~df['macd'].isna()) & (~df['macd_signal'].isna()) & (~df['macd'].shift(1).isna()) & (~df['macd_signal'].shift(1).isna())
-            
-            # Initialisiere Signal-Spalte
-            df['signal_macd'] = 0
-            
-            # Berechne Signale nur für gültige Zeilen
-            buy_signal = (df['macd'] > df['macd_signal']) & (df['macd'].shift(1) <= df['macd_signal'].shift(1)) & valid_macd
-            sell_signal = (df['macd'] < df['macd_signal']) & (df['macd'].shift(1) >= df['macd_signal'].shift(1)) & valid_macd
-            
-            df.loc[buy_signal, 'signal_macd'] = 1
-            df.loc[sell_signal, 'signal_macd'] = -1
+        # Stelle sicher, dass keine NaN-Werte in den Signalberechnungen sind
+        valid_macd = ~np.isnan(macd) & ~np.isnan(macd_signal) & ~np.isnan(prev_macd) & ~np.isnan(prev_signal)
         
-        # Bollinger Bands Signal
-        if 'bb_lower' in df.columns and 'bb_upper' in df.columns:
-            # Stelle sicher, dass keine NaN-Werte im Close und in den Bändern sind
-            valid_bb = (~df['close'].isna()) & (~df['bb_lower'].isna()) & (~df['bb_upper'].isna())
-            
-            # Initialisiere Signal-Spalte
-            df['signal_bb'] = 0
-            
-            # Berechne Signale nur für gültige Zeilen
-            df.loc[(df['close'] < df['bb_lower']) & valid_bb, 'signal_bb'] = 1  # Preis unter unterem Band - Kaufsignal
-            df.loc[(df['close'] > df['bb_upper']) & valid_bb, 'signal_bb'] = -1  # Preis über oberem Band - Verkaufssignal
+        buy_signal = (macd > macd_signal) & (prev_macd <= prev_signal) & valid_macd
+        sell_signal = (macd < macd_signal) & (prev_macd >= prev_signal) & valid_macd
+        signals['signal_macd'] = np.where(sell_signal, -1, np.where(buy_signal, 1, 0))
+    
+    # Bollinger Bands Signal
+    if 'bb_lower' in df and 'bb_upper' in df:
+        close, bb_lower, bb_upper = column('close'), column('bb_lower'), column('bb_upper')
         
-        # Stochastic Signal
-        if 'stoch_k' in df.columns and 'stoch_d' in df.columns and not df['stoch_k'].isna().all():
-            # Stelle sicher, dass keine NaN-Werte in den Signalberechnungen sind
-            valid_stoch = (~df['stoch_k'].isna()) & (~df['stoch_k'].shift(1).isna())
+        # Stelle sicher, dass keine NaN-Werte im Close und in den Bändern sind
+        valid_bb = ~np.isnan(close) & ~np.isnan(bb_lower) & ~np.isnan(bb_upper)
+        
+        # Preis unter unterem Band - Kaufsignal, Preis über oberem Band - Verkaufssignal
+        signals['signal_bb'] = np.where((close > bb_upper) & valid_bb, -1,
+                                        np.where((close < bb_lower) & valid_bb, 1, 0))
+    
+    # Stochastic Signal
+    if 'stoch_k' in df and 'stoch_d' in df:
+        stoch_k = column('stoch_k')
+        if not np.isnan(stoch_k).all():
+            prev_k = _previous(stoch_k)
             
-            # Initialisiere Signal-Spalte
-            df['signal_stoch'] = 0
+            # Stelle sicher, dass keine NaN-Werte in den Signalberechnungen sind
+            valid_stoch = ~np.isnan(stoch_k) & ~np.isnan(prev_k)
             
-            # Berechne Signale nur für gültige Zeilen
-            df.loc[(df['stoch_k'] < 20) & (df['stoch_k'] > df['stoch_k'].shift(1)) & valid_stoch, 'signal_stoch'] = 1
-            df.loc[(df['stoch_k'] > 80) & (df['stoch_k'] < df['stoch_k'].shift(1)) & valid_stoch, 'signal_stoch'] = -1
-        
-        # Kombiniere alle Signale (optional mit Gewichtung)
-        # In dieser einfachen Version werden die Signale gleichgewichtet
+            buy_signal = (stoch_k < 20) & (stoch_k > prev_k) & valid_stoch
+            sell_signal = (stoch_k > 80) & (stoch_k < prev_k) & valid_stoch
+            signals['signal_stoch'] = np.where(sell_signal, -1, np.where(buy_signal, 1, 0))
+    
+    return signals
+
+def combine_signal_votes(signal_matrix, weights):
+    """
+    Gewichtete Abstimmung über alle Einzelsignale (vollständig vektorisiert).
+    
+    Parameters:
+    signal_matrix: NumPy-Array (Zeilen x Indikatoren) mit Werten 1, -1 oder 0
+    weights: NumPy-Array mit einem Gewicht pro Indikator
+    
+    Returns:
+    np.ndarray: Gesamtsignal pro Zeile (1 = Kauf, -1 = Verkauf, 0 = Halten)
+    """
+    buy_votes = (signal_matrix > 0) @ weights
+    sell_votes = (signal_matrix < 0) @ weights
+    return np.where(buy_votes > sell_votes, 1, np.where(sell_votes > buy_votes, -1, 0))
+
+def generate_signals(df, last_row_only=None):
+    """
+    Generiert Signale basierend auf allen berechneten Indikatoren mit verbesserter Validierung
+    
+    Parameters:
+    df: DataFrame mit Indikatoren
+    last_row_only: Nur die letzte Kerze auswerten (Standard: config.SIGNAL_VOTE_LAST_ROW_ONLY).
+                   Alle anderen Zeilen erhalten dann das Signal 0.
+    
+    Returns:
+    DataFrame: DataFrame mit signal_*-Spalten und Gesamtsignal 'signal'
+    """
+    if last_row_only is None:
+        last_row_only = getattr(config, 'SIGNAL_VOTE_LAST_ROW_ONLY', False)
+    
+    df['signal'] = 0
+    
+    try:
+        if last_row_only and len(df) > 2:
+            # Für die letzte Kerze genügen die letzten beiden Zeilen (wegen shift(1))
+            tail_signals = indicator_signals(df.iloc[-2:])
+            for col, values in tail_signals.items():
+                column = np.zeros(len(df), dtype=np.int64)
+                column[-1] = values[-1]
+                df[col] = column
+        else:
+            for col, values in indicator_signals(df).items():
+                df[col] = values
+        
+        # Kombiniere alle Signale mit den konfigurierten Gewichten
         signal_columns = [col for col in df.columns if col.startswith('signal_')]
         if signal_columns:
-            # Zähle die Kauf- und Verkaufssignale
-            buy_signals = df[signal_columns].apply(lambda row: sum(row > 0), axis=1)
-            sell_signals = df[signal_columns].apply(lambda row: sum(row < 0), axis=1)
+            vote_weights = getattr(config, 'SIGNAL_VOTE_WEIGHTS', {})
+            weights = np.array([vote_weights.get(col, 1.0) for col in signal_columns], dtype=np.float64)
             
-            # Bestimme das Gesamtsignal
-            df['signal'] = np.where(buy_signals > sell_signals, 1, 
-                                   np.where(sell_signals > buy_signals, -1, 0))
+            if last_row_only and len(df) > 2:
+                signal = np.zeros(len(df), dtype=np.int64)
+                signal[-1] = combine_signal_votes(df[signal_columns].to_numpy()[-1:], weights)[0]
+                df['signal'] = signal
+            else:
+                df['signal'] = combine_signal_votes(df[signal_columns].to_numpy(), weights)
             
     except Exception as e:
         utils.log_error(e, "Fehler bei der Signalgenerierung")
-        print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] Fehler bei der Signalgenerierung: {str(e)}{Style.RESET_ALL}")
+        logger.error("Fehler bei der Signalgenerierung: %s", e)
         # Stelle sicher, dass wir mindestens eine Signal-Spalte haben
         df['signal'] = 0
     
-    return df
\ No newline at end of file
+    return df
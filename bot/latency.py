@@ -0,0 +1,227 @@
+"""
+Latenzmessung für die Phasen des Bot-Zyklus (Datenabruf, Indikatoren, Marktregime, Strategie,
+Risiko, Order, Anzeige).
+
+Jede Phase führt ein rollierendes Fenster der letzten Messwerte (p50/p95/p99). Die Werte werden
+im Prometheus-Textformat in eine Datei geschrieben und optional über einen lokalen HTTP-Endpunkt
+(/metrics) bereitgestellt. Dauert ein Zyklus länger als das Update-Intervall, wird gewarnt.
+"""
+import functools
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from colorama import Fore, Style
+import config
+
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class LatencyWindow:
+    """Rollierendes Fenster von Messwerten einer Phase plus Gesamtsumme und -anzahl"""
+
+    def __init__(self, size):
+        self.samples = deque(maxlen=size)
+        self.total = 0.0
+        self.count = 0
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.total += seconds
+        self.count += 1
+
+    def quantiles(self):
+        """Returns: dict Quantil -> Sekunden (leer ohne Messwerte)"""
+        if not self.samples:
+            return {}
+        values = np.quantile(np.fromiter(self.samples, dtype=np.float64), QUANTILES)
+        return dict(zip(QUANTILES, values))
+
+
+class LatencyRecorder:
+    """Sammelt Laufzeiten pro Phase (threadsicher) und überwacht die Zyklusdauer"""
+
+    def __init__(self, window_size=None, cycle_budget=None):
+        """
+        Parameters:
+        window_size: Messwerte pro Phase im rollierenden Fenster (Standard: config.LATENCY_WINDOW_SIZE)
+        cycle_budget: Maximale Zyklusdauer in Sekunden (Standard: config.UPDATE_INTERVAL)
+        """
+        self.window_size = window_size or config.LATENCY_WINDOW_SIZE
+        self.cycle_budget = cycle_budget or config.UPDATE_INTERVAL
+        self.windows = {}
+        self.slow_cycles = 0
+        self._lock = threading.Lock()
+        self._cycle_start = None
+        self._cycle_stages = {}
+        self._last_export = time.monotonic()
+        self._http_server = None
+
+    def record(self, stage, seconds):
+        with self._lock:
+            window = self.windows.get(stage)
+            if window is None:
+                window = self.windows[stage] = LatencyWindow(self.window_size)
+            window.add(seconds)
+            if self._cycle_start is not None:
+                self._cycle_stages[stage] = self._cycle_stages.get(stage, 0) + seconds
+
+    def stage(self, name):
+        """Kontextmanager: with recorder.stage('fetch'): ..."""
+        return _StageTimer(self, name)
+
+    # ---- Zyklus ----
+
+    def start_cycle(self):
+        with self._lock:
+            self._cycle_start = time.perf_counter()
+            self._cycle_stages = {}
+
+    def end_cycle(self):
+        """
+        Schließt den Zyklus ab, warnt bei Überschreitung des Update-Intervalls und exportiert
+        die Metriken, wenn das Export-Intervall abgelaufen ist.
+
+        Returns:
+        float: Zyklusdauer in Sekunden (None ohne start_cycle)
+        """
+        with self._lock:
+            if self._cycle_start is None:
+                return None
+            duration = time.perf_counter() - self._cycle_start
+            stages = self._cycle_stages
+            self._cycle_start = None
+        self.record('cycle', duration)
+
+        if duration > self.cycle_budget:
+            self.slow_cycles += 1
+            breakdown = ", ".join(f"{name}: {seconds:.2f}s" for name, seconds in sorted(stages.items(), key=lambda item: -item[1]))
+            print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Langsamer Zyklus: {duration:.2f}s > {self.cycle_budget}s ({breakdown}){Style.RESET_ALL}")
+
+        if config.LATENCY_EXPORT_FILE and time.monotonic() - self._last_export >= config.LATENCY_EXPORT_INTERVAL:
+            self.export_to_file(config.LATENCY_EXPORT_FILE)
+        return duration
+
+    # ---- Export ----
+
+    def prometheus_text(self):
+        """Metriken im Prometheus-Textformat (Summary pro Phase)"""
+        lines = [
+            "# HELP bot_stage_latency_seconds Laufzeit der Bot-Phasen (rollierendes Fenster)",
+            "# TYPE bot_stage_latency_seconds summary"
+        ]
+        with self._lock:
+            snapshot = [(stage, window.quantiles(), window.total, window.count) for stage, window in sorted(self.windows.items())]
+            slow_cycles = self.slow_cycles
+        for stage, quantiles, total, count in snapshot:
+            for quantile, value in quantiles.items():
+                lines.append(f'bot_stage_latency_seconds{{stage="{stage}",quantile="{quantile}"}} {value:.6f}')
+            lines.append(f'bot_stage_latency_seconds_sum{{stage="{stage}"}} {total:.6f}')
+            lines.append(f'bot_stage_latency_seconds_count{{stage="{stage}"}} {count}')
+        lines += [
+            "# HELP bot_slow_cycles_total Zyklen, die länger als das Update-Intervall dauerten",
+            "# TYPE bot_slow_cycles_total counter",
+            f"bot_slow_cycles_total {slow_cycles}"
+        ]
+        return "\n".join(lines) + "\n"
+
+    def export_to_file(self, path):
+        """Schreibt die Metriken atomar in eine Datei (z.B. für den node_exporter Textfile-Collector)"""
+        self._last_export = time.monotonic()
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temp_path = f"{path}.tmp"
+            with open(temp_path, 'w') as f:
+                f.write(self.prometheus_text())
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Latenz-Metriken konnten nicht geschrieben werden: {e}{Style.RESET_ALL}")
+
+    def start_http_server(self, port, host='127.0.0.1'):
+        """Stellt die Metriken unter http://host:port/metrics bereit (Daemon-Thread)"""
+        if self._http_server is not None:
+            return
+        recorder = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip('/') not in ('', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = recorder.prometheus_text().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keine Zugriffsprotokolle in der Konsole
+
+        self._http_server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self._http_server.serve_forever, name="latency-metrics", daemon=True).start()
+        print(f"{Fore.GREEN}[{datetime.now().strftime('%H:%M:%S')}] Latenz-Metriken unter http://{host}:{port}/metrics{Style.RESET_ALL}")
+
+    def stop_http_server(self):
+        if self._http_server is not None:
+            self._http_server.shutdown()
+            self._http_server = None
+
+    def print_summary(self):
+        """Gibt p50/p95/p99 aller Phasen als Tabelle aus"""
+        print(f"\n{Fore.CYAN}=== Latenz pro Phase (letzte {self.window_size} Messungen) ==={Style.RESET_ALL}")
+        print(f"{'Phase':<12} | {'Anzahl':>7} | {'p50':>9} | {'p95':>9} | {'p99':>9}")
+        print("-" * 57)
+        with self._lock:
+            snapshot = [(stage, window.quantiles(), window.count) for stage, window in sorted(self.windows.items())]
+        for stage, quantiles, count in snapshot:
+            values = " | ".join(f"{quantiles[q] * 1000:>7.1f}ms" for q in QUANTILES)
+            print(f"{stage:<12} | {count:>7} | {values}")
+        if self.slow_cycles:
+            print(f"{Fore.YELLOW}Langsame Zyklen (> {self.cycle_budget}s): {self.slow_cycles}{Style.RESET_ALL}")
+
+
+class _StageTimer:
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if config.LATENCY_TRACKING:
+            self.recorder.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+# Globale Instanz
+_latency_recorder = None
+
+def get_latency_recorder():
+    """Singleton-Zugriff auf den LatencyRecorder"""
+    global _latency_recorder
+    if _latency_recorder is None:
+        _latency_recorder = LatencyRecorder()
+    return _latency_recorder
+
+def stage(name):
+    """Kontextmanager für die globale Instanz: with latency.stage('risk'): ..."""
+    return get_latency_recorder().stage(name)
+
+def timed(name):
+    """Decorator: misst jede Ausführung der Funktion als Phase name"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
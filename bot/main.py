@@ -7,13 +7,27 @@ import sys
 
 # Import der Module
 import exchange_handler
+import exchange_filters
+import async_exchange_handler
+import account_state
+import analysis_cache
+import dashboard
+import structured_logging
 import indicators
+import incremental_indicators
+import resampler
+import stream_ingestion
 import strategies
 import risk_management
+import latency
 import performance
+import position_journal
 import utils
 import config
 
+# Als Skript gestartet wäre __name__ '__main__'
+logger = structured_logging.get_logger('main')
+
 # Farbige Ausgabe initialisieren
 colorama.init(autoreset=True)
 
@@ -51,40 +65,46 @@ def run_bot(exchange):
     quote_currency = config.get_quote_currency()
     
     trading_mode = "Binance Futures Testnet" if config.USE_TESTNET else "Binance Spot Live"
-    print(f"\n{Fore.CYAN}Bot gestartet für {config.SYMBOL} auf {trading_mode}...{Style.RESET_ALL}")
+    logger.info("Bot gestartet für %s auf %s...", config.SYMBOL, trading_mode, extra={'color': Fore.CYAN})
+    
+    # Kontostand und Positionen: einmal per REST, danach aus Order-Antworten und User-Data-Stream
+    account = account_state.start_account_state(exchange) if config.USE_ACCOUNT_STATE else None
     
     # Prüfe Kontostand
     try:
-        balance = exchange.fetch_balance()
+        balance = account.get_balance(exchange) if account is not None else exchange.fetch_balance()
         if config.USE_TESTNET:
             quote_balance = balance[quote_currency]['free']
         else:
             quote_balance = balance.get(quote_currency, {}).get('free', 0)
-        print(f"{Fore.GREEN}Bot erfolgreich initialisiert!{Style.RESET_ALL}")
-        print(f"{Fore.YELLOW}Verfügbares {quote_currency}: {quote_balance:.2f}{Style.RESET_ALL}")
+        logger.info("Bot erfolgreich initialisiert!", extra={'color': Fore.GREEN})
+        logger.info("Verfügbares %s: %.2f", quote_currency, quote_balance, extra={'color': Fore.YELLOW})
     except Exception as e:
         utils.log_error(e, "Fehler beim Abrufen des Kontostands")
         quote_balance = 0
     
     # Prüfe aktuelle Position über die API
-    current_position, position_info = exchange_handler.get_position(exchange, config.SYMBOL)
+    if account is not None:
+        current_position, position_info = account.get_position(exchange, config.SYMBOL)
+    else:
+        current_position, position_info = exchange_handler.get_position(exchange, config.SYMBOL)
     
     # Lade gespeicherte Position
     saved_position_size, saved_position_type, saved_entry_price = utils.load_position_state()
 
     # Positionskonfliktlösung
     if current_position == 0 and saved_position_size != 0:
-        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Positionskonflikt erkannt: API meldet keine Position, lokaler Speicher zeigt {saved_position_type} {abs(saved_position_size)} {base_currency} @ {saved_entry_price} {quote_currency}{Style.RESET_ALL}")
+        logger.warning("Positionskonflikt erkannt: API meldet keine Position, lokaler Speicher zeigt %s %s %s @ %s %s", saved_position_type, abs(saved_position_size), base_currency, saved_entry_price, quote_currency)
         
         # Option 1: Vertraue der API
-        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Lösung: Vertraue der API. Keine Position aktiv.{Style.RESET_ALL}")
+        logger.info("Lösung: Vertraue der API. Keine Position aktiv.", extra={'color': Fore.YELLOW})
         # Aktualisiere lokalen Speicher, um ihn mit der API zu synchronisieren
         utils.save_position_state(0, "KEINE", 0)
         
         # Option 2 (auskommentiert): Vertraue dem lokalen Speicher
         # Nur in bestimmten Fällen aktivieren, wenn die API unzuverlässig ist
         '''
-        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Lösung: Vertraue lokalem Speicher. Setze Position manuell.{Style.RESET_ALL}")
+        logger.info("Lösung: Vertraue lokalem Speicher. Setze Position manuell.", extra={'color': Fore.YELLOW})
         current_position = saved_position_size
         position_info['size'] = saved_position_size
         position_info['type'] = saved_position_type
@@ -92,8 +112,8 @@ def run_bot(exchange):
         '''
     elif current_position != 0 and saved_position_size == 0:
         # API zeigt Position, lokaler Speicher nicht
-        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Positionskonflikt erkannt: API meldet {position_info['type']} {abs(current_position)} {base_currency}, lokaler Speicher keine Position{Style.RESET_ALL}")
-        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Lösung: Aktualisiere lokalen Speicher basierend auf API-Daten{Style.RESET_ALL}")
+        logger.warning("Positionskonflikt erkannt: API meldet %s %s %s, lokaler Speicher keine Position", position_info['type'], abs(current_position), base_currency)
+        logger.info("Lösung: Aktualisiere lokalen Speicher basierend auf API-Daten", extra={'color': Fore.YELLOW})
         utils.save_position_state(
             current_position, 
             position_info['type'], 
@@ -101,8 +121,8 @@ def run_bot(exchange):
         )
     elif current_position != 0 and saved_position_size != 0 and (current_position != saved_position_size or position_info['type'] != saved_position_type):
         # Beide zeigen Positionen, aber unterschiedliche
-        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Positionskonflikt erkannt: API meldet {position_info['type']} {abs(current_position)} {base_currency}, lokaler Speicher {saved_position_type} {abs(saved_position_size)} {base_currency}{Style.RESET_ALL}")
-        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Lösung: Vertraue der API. Aktualisiere lokalen Speicher.{Style.RESET_ALL}")
+        logger.warning("Positionskonflikt erkannt: API meldet %s %s %s, lokaler Speicher %s %s %s", position_info['type'], abs(current_position), base_currency, saved_position_type, abs(saved_position_size), base_currency)
+        logger.info("Lösung: Vertraue der API. Aktualisiere lokalen Speicher.", extra={'color': Fore.YELLOW})
         utils.save_position_state(
             current_position, 
             position_info['type'], 
@@ -115,7 +135,7 @@ def run_bot(exchange):
     # Setze Entry-Preis, wenn er noch nicht gesetzt ist
     if entry_price == 0 and current_position != 0 and saved_entry_price != 0:
         entry_price = saved_entry_price
-        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Einstiegspreis aus lokalem Speicher wiederhergestellt: {entry_price} {quote_currency}{Style.RESET_ALL}")
+        logger.info("Einstiegspreis aus lokalem Speicher wiederhergestellt: %s %s", entry_price, quote_currency, extra={'color': Fore.YELLOW})
     
     current_price = 0
     
@@ -128,15 +148,44 @@ def run_bot(exchange):
     # Tracking für API-Fehler
     consecutive_failures = 0
     
+    # Ereignisgesteuerte Marktdaten: Streams füllen den Candle Store, Auswertung bei Kerzenschluss/Preisbewegung
+    stream = None
+    if config.USE_STREAM_INGESTION:
+        stream = stream_ingestion.start_stream_ingestion(exchange, config.SYMBOL, config.TIMEFRAME, config.LIMIT)
+    
+    # Latenzmessung pro Zyklusphase (p50/p95/p99, Prometheus-Export)
+    latency_recorder = latency.get_latency_recorder()
+    if config.LATENCY_TRACKING and config.LATENCY_HTTP_PORT:
+        latency_recorder.start_http_server(config.LATENCY_HTTP_PORT)
+    
     try:
         while True:
+            # Wartezeit bis zum nächsten Zyklus (None bei KeyboardInterrupt: sofort beenden)
+            next_wait = None
+            wait_for_trigger = False
             try:
+                if config.LATENCY_TRACKING:
+                    latency_recorder.start_cycle()
+                
                 # Hole und analysiere Daten
-                df = exchange_handler.get_historical_data(exchange, config.SYMBOL, config.TIMEFRAME, config.LIMIT)
+                with latency.stage('fetch'):
+                    prefetched_balance = None
+                    if stream is not None:
+                        df = stream.get_dataframe(exchange)
+                    elif config.USE_RESAMPLED_TIMEFRAMES:
+                        # Nur die Basisreihe abfragen, TIMEFRAME und Bestätigungs-Zeitintervalle daraus ableiten
+                        df = resampler.update_resampled_data(exchange, config.SYMBOL, config.TIMEFRAME, config.LIMIT)
+                    elif isinstance(exchange, async_exchange_handler.AsyncExchangeBridge):
+                        # Marktdaten und Kontostand gleichzeitig abfragen (mit AccountState nur Marktdaten)
+                        df, prefetched_balance = exchange.fetch_cycle_data(config.SYMBOL, config.TIMEFRAME, config.LIMIT, with_balance=account is None)
+                    elif config.USE_CANDLE_STORE:
+                        df = exchange_handler.update_historical_data(exchange, config.SYMBOL, config.TIMEFRAME, config.LIMIT)
+                    else:
+                        df = exchange_handler.get_historical_data(exchange, config.SYMBOL, config.TIMEFRAME, config.LIMIT)
                 if df.empty:
                     consecutive_failures += 1
                     wait_time = min(config.UPDATE_INTERVAL * consecutive_failures, 300)  # Max 5 Minuten warten
-                    print(f"{Fore.RED}Keine gültigen Daten verfügbar. Warte {wait_time} Sekunden... (Fehler #{consecutive_failures}){Style.RESET_ALL}")
+                    logger.warning("Keine gültigen Daten verfügbar. Warte %s Sekunden... (Fehler #%s)", wait_time, consecutive_failures, extra={'color': Fore.RED})
                     
                     # Aktualisiere Anzeige mit Fehlerstatus, aber führe keine Trades aus
                     utils.update_display(
@@ -149,14 +198,18 @@ def run_bot(exchange):
                         performance_tracker,
                         position_info
                     )
-                    time.sleep(wait_time)
+                    next_wait = wait_time
                     continue
                 
                 # Zurücksetzen des Fehlerzählers bei erfolgreicher Datenabfrage
                 consecutive_failures = 0
                 
                 # Berechne alle Indikatoren
-                df = indicators.calculate_all_indicators(df)
+                with latency.stage('indicators'):
+                    if config.USE_INCREMENTAL_INDICATORS:
+                        df = incremental_indicators.calculate_all_indicators_incremental(df, config.SYMBOL, config.TIMEFRAME)
+                    else:
+                        df = indicators.calculate_all_indicators(df)
                 
                 # Verwende lokale Position statt API-Abfrage bei jedem Zyklus
                 saved_position_size, saved_position_type, saved_entry_price = utils.load_position_state()
@@ -171,7 +224,10 @@ def run_bot(exchange):
                                 }
                 
                 try:
-                    balance = exchange.fetch_balance()
+                    if account is not None:
+                        balance = account.get_balance(exchange)  # REST nur beim periodischen Abgleich
+                    else:
+                        balance = prefetched_balance if prefetched_balance is not None else exchange.fetch_balance()
                     if config.USE_TESTNET:
                         quote_balance = balance[quote_currency]['free']
                     else:
@@ -187,80 +243,84 @@ def run_bot(exchange):
                 utils.save_position_state(current_position, position_info.get('type', 'KEINE'), position_info.get('entry_price', 0))
                 
                 # Generiere Handelssignal basierend auf der gewählten Strategie
-                if config.ACTIVE_STRATEGY == 'SMALL_CAPITAL':
-                    from small_capital_strategy import get_small_capital_strategy_instance
-                    small_cap_strategy = get_small_capital_strategy_instance()
-                    try:
-                        signal, strategy_info = small_cap_strategy.smart_small_capital_strategy(df, actual_balance=quote_balance)
-                    except Exception as e:
-                        # Verbesserte Fehlerbehandlung
-                        error_msg = f"Fehler bei Ausführung der SMALL_CAPITAL Strategie: {str(e)}"
-                        utils.log_error(e, error_msg)
+                with latency.stage('strategy'):
+                    if config.ACTIVE_STRATEGY == 'SMALL_CAPITAL':
+                        from small_capital_strategy import get_small_capital_strategy_instance
+                        small_cap_strategy = get_small_capital_strategy_instance()
+                        try:
+                            signal, strategy_info = small_cap_strategy.smart_small_capital_strategy(df, actual_balance=quote_balance)
+                        except Exception as e:
+                            # Verbesserte Fehlerbehandlung
+                            error_msg = f"Fehler bei Ausführung der SMALL_CAPITAL Strategie: {str(e)}"
+                            utils.log_error(e, error_msg)
                         
-                        # Erstelle ein Fehler-Strategie-Info-Objekt
-                        strategy_info = {
-                            'strategy': 'SMALL_CAPITAL (Fehler)',
-                            'description': error_msg,
-                            'signal_details': f"Fehler: {str(e)}",
-                            # Füge einen leeren selected_strategy-Wert hinzu, um Fehler zu vermeiden
-                            'selected_strategy': 'NONE'
-                        }
-                        signal = 0  # Kein Signal bei Fehler
+                            # Erstelle ein Fehler-Strategie-Info-Objekt
+                            strategy_info = {
+                                'strategy': 'SMALL_CAPITAL (Fehler)',
+                                'description': error_msg,
+                                'signal_details': f"Fehler: {str(e)}",
+                                # Füge einen leeren selected_strategy-Wert hinzu, um Fehler zu vermeiden
+                                'selected_strategy': 'NONE'
+                            }
+                            signal = 0  # Kein Signal bei Fehler
                 
-                elif config.ACTIVE_STRATEGY == 'DAY_TRADER':
-                    # Spezialbehandlung für Day Trader Strategie
-                    from day_trader_strategy import get_day_trader_strategy_instance
-                    day_trader = get_day_trader_strategy_instance()
-                    try:
-                        signal, strategy_info = day_trader.day_trader_strategy(df, actual_balance=quote_balance)
+                    elif config.ACTIVE_STRATEGY == 'DAY_TRADER':
+                        # Spezialbehandlung für Day Trader Strategie
+                        from day_trader_strategy import get_day_trader_strategy_instance
+                        day_trader = get_day_trader_strategy_instance()
+                        # Die Hintergrund-Optimierung lädt ihre Historie über dasselbe Exchange-Objekt
+                        day_trader.optimization_exchange = exchange
+                        try:
+                            signal, strategy_info = day_trader.day_trader_strategy(df, actual_balance=quote_balance)
                         
-                        # Aktualisiere Trade-Informationen für die Selbstoptimierung
-                        if last_action and "Position geschlossen" in last_action:
-                            try:
-                                import re
-                                profit_match = re.search(r"G/V: .*?([-+]?\d+\.\d+)", last_action)
-                                if profit_match:
-                                    profit = float(profit_match.group(1))
-                                    # Einstiegspreis aus position_info oder entry_price
-                                    entry_p = position_info.get('entry_price', entry_price)
-                                    day_trader.record_trade_result('SELL', entry_p, current_price, profit)
-                            except Exception as e:
-                                print(f"{Fore.YELLOW}Info: Fehler beim Aktualisieren der Trade-Informationen: {e}{Style.RESET_ALL}")
-                    except Exception as e:
-                        # Verbesserte Fehlerbehandlung
-                        error_msg = f"Fehler bei Ausführung der DAY_TRADER Strategie: {str(e)}"
-                        utils.log_error(e, error_msg)
+                            # Aktualisiere Trade-Informationen für die Selbstoptimierung
+                            if last_action and "Position geschlossen" in last_action:
+                                try:
+                                    import re
+                                    profit_match = re.search(r"G/V: .*?([-+]?\d+\.\d+)", last_action)
+                                    if profit_match:
+                                        profit = float(profit_match.group(1))
+                                        # Einstiegspreis aus position_info oder entry_price
+                                        entry_p = position_info.get('entry_price', entry_price)
+                                        day_trader.record_trade_result('SELL', entry_p, current_price, profit)
+                                except Exception as e:
+                                    logger.warning("Fehler beim Aktualisieren der Trade-Informationen: %s", e)
+                        except Exception as e:
+                            # Verbesserte Fehlerbehandlung
+                            error_msg = f"Fehler bei Ausführung der DAY_TRADER Strategie: {str(e)}"
+                            utils.log_error(e, error_msg)
                         
-                        # Erstelle ein Fehler-Strategie-Info-Objekt
-                        strategy_info = {
-                            'strategy': 'DAY_TRADER (Fehler)',
-                            'description': error_msg,
-                            'signal_details': f"Fehler: {str(e)}",
-                            # Füge einen leeren selected_strategy-Wert hinzu, um Fehler zu vermeiden
-                            'selected_strategy': 'NONE'
-                        }
-                        signal = 0  # Kein Signal bei Fehler
+                            # Erstelle ein Fehler-Strategie-Info-Objekt
+                            strategy_info = {
+                                'strategy': 'DAY_TRADER (Fehler)',
+                                'description': error_msg,
+                                'signal_details': f"Fehler: {str(e)}",
+                                # Füge einen leeren selected_strategy-Wert hinzu, um Fehler zu vermeiden
+                                'selected_strategy': 'NONE'
+                            }
+                            signal = 0  # Kein Signal bei Fehler
                 
-                else:
-                    try:
-                        signal, strategy_info = strategies.get_strategy_signal(df, config.ACTIVE_STRATEGY)
-                    except Exception as e:
-                        # Verbesserte Fehlerbehandlung
-                        error_msg = f"Fehler bei Ausführung der {config.ACTIVE_STRATEGY} Strategie: {str(e)}"
-                        utils.log_error(e, error_msg)
+                    else:
+                        try:
+                            signal, strategy_info = strategies.get_strategy_signal(df, config.ACTIVE_STRATEGY)
+                        except Exception as e:
+                            # Verbesserte Fehlerbehandlung
+                            error_msg = f"Fehler bei Ausführung der {config.ACTIVE_STRATEGY} Strategie: {str(e)}"
+                            utils.log_error(e, error_msg)
                         
-                        # Erstelle ein Fehler-Strategie-Info-Objekt
-                        strategy_info = {
-                            'strategy': f"{config.ACTIVE_STRATEGY} (Fehler)",
-                            'description': error_msg,
-                            'signal_details': f"Fehler: {str(e)}",
-                            # Füge einen leeren selected_strategy-Wert hinzu, um Fehler zu vermeiden
-                            'selected_strategy': 'NONE'
-                        }
-                        signal = 0  # Kein Signal bei Fehler
+                            # Erstelle ein Fehler-Strategie-Info-Objekt
+                            strategy_info = {
+                                'strategy': f"{config.ACTIVE_STRATEGY} (Fehler)",
+                                'description': error_msg,
+                                'signal_details': f"Fehler: {str(e)}",
+                                # Füge einen leeren selected_strategy-Wert hinzu, um Fehler zu vermeiden
+                                'selected_strategy': 'NONE'
+                            }
+                            signal = 0  # Kein Signal bei Fehler
                 
                 # Risikomanagement
-                risk_result = risk_management.check_risk(df, current_position, current_price, entry_price, quote_balance)
+                with latency.stage('risk'):
+                    risk_result = risk_management.check_risk(df, current_position, current_price, entry_price, quote_balance)
                 
                 # Trading-Entscheidung
                 execute_trade = risk_result['allow_trade'] and signal != 0
@@ -271,8 +331,11 @@ def run_bot(exchange):
                         # FUTURES TESTNET MODE
                         if signal > 0 and current_position <= 0:  # Kaufsignal
                             if current_position < 0:  # Schließe Short-Position zuerst
-                                closed_order = exchange_handler.execute_trade(exchange, config.SYMBOL, 'buy', abs(current_position), current_price)
+                                closed_order = exchange_handler.execute_trade(exchange, config.SYMBOL, 'buy', abs(current_position), current_price, closing=True)
                                 if closed_order:
+                                    if account is not None:
+                                        account.apply_order(closed_order, config.SYMBOL)
+                                    utils.save_position_state(0, "KEINE", 0, order_id=closed_order.get('id'), exit_price=current_price)
                                     last_action = f"{Fore.YELLOW}SHORT Position geschlossen{Style.RESET_ALL}"
                                     # Berechne Gewinn/Verlust
                                     if entry_price > 0:
@@ -292,23 +355,25 @@ def run_bot(exchange):
                                 entry_price = current_price
                                 
                                 # Sofortiges Positionsupdate nach Trade
-                                print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Trade ausgeführt - Aktualisiere Position...{Style.RESET_ALL}")
-                                time.sleep(1)  # Kurze Pause für API-Synchronisation
-                                
-                                # Hole aktualisierte Position
-                                current_position, position_info = exchange_handler.get_position(exchange, config.SYMBOL)
+                                logger.info("Trade ausgeführt - Aktualisiere Position...", extra={'color': Fore.YELLOW})
+                                # Hole aktualisierte Position (aus der Order-Antwort, ohne Account-State nach kurzer Pause per REST)
+                                current_position, position_info = account_state.position_after_trade(exchange, open_order, config.SYMBOL, account)
                                 
                                 # Speichere die Position in der lokalen Datei
                                 utils.save_position_state(
                                     current_position, 
                                     position_info.get('type', 'KEINE'), 
-                                    entry_price
+                                    entry_price,
+                                    order_id=open_order.get('id')
                                 )
                             
                         elif signal < 0 and current_position >= 0:  # Verkaufssignal
                             if current_position > 0:  # Schließe Long-Position zuerst
-                                closed_order = exchange_handler.execute_trade(exchange, config.SYMBOL, 'sell', current_position, current_price)
+                                closed_order = exchange_handler.execute_trade(exchange, config.SYMBOL, 'sell', current_position, current_price, closing=True)
                                 if closed_order:
+                                    if account is not None:
+                                        account.apply_order(closed_order, config.SYMBOL)
+                                    utils.save_position_state(0, "KEINE", 0, order_id=closed_order.get('id'), exit_price=current_price)
                                     last_action = f"{Fore.YELLOW}LONG Position geschlossen{Style.RESET_ALL}"
                                     # Berechne Gewinn/Verlust
                                     if entry_price > 0:
@@ -328,17 +393,16 @@ def run_bot(exchange):
                                 entry_price = current_price
                                 
                                 # Sofortiges Positionsupdate nach Trade
-                                print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Trade ausgeführt - Aktualisiere Position...{Style.RESET_ALL}")
-                                time.sleep(1)  # Kurze Pause für API-Synchronisation
-                                
-                                # Hole aktualisierte Position
-                                current_position, position_info = exchange_handler.get_position(exchange, config.SYMBOL)
+                                logger.info("Trade ausgeführt - Aktualisiere Position...", extra={'color': Fore.YELLOW})
+                                # Hole aktualisierte Position (aus der Order-Antwort, ohne Account-State nach kurzer Pause per REST)
+                                current_position, position_info = account_state.position_after_trade(exchange, open_order, config.SYMBOL, account)
                                 
                                 # Speichere die Position in der lokalen Datei
                                 utils.save_position_state(
                                     current_position, 
                                     position_info.get('type', 'KEINE'), 
-                                    entry_price
+                                    entry_price,
+                                    order_id=open_order.get('id')
                                 )
                     else:
                         # SPOT LIVE MODE
@@ -346,7 +410,7 @@ def run_bot(exchange):
                         if signal > 0:  # Kaufsignal
                             # Überprüfe Quote-Währung-Guthaben
                             try:
-                                balance = exchange.fetch_balance()
+                                balance = account.get_balance(exchange) if account is not None else exchange.fetch_balance()
                                 quote_balance = balance.get(quote_currency, {}).get('free', 0)
                                 
                                 # Verwende calculate_quantity für flexible Positionsgrößenberechnung
@@ -362,17 +426,16 @@ def run_bot(exchange):
                                         entry_price = current_price
                                         
                                         # Sofortiges Positionsupdate nach Trade
-                                        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Trade ausgeführt - Aktualisiere Position...{Style.RESET_ALL}")
-                                        time.sleep(1)  # Kurze Pause für API-Synchronisation
-                                        
-                                        # Hole aktualisierte Position
-                                        current_position, position_info = exchange_handler.get_position(exchange, config.SYMBOL)
+                                        logger.info("Trade ausgeführt - Aktualisiere Position...", extra={'color': Fore.YELLOW})
+                                        # Hole aktualisierte Position (aus der Order-Antwort, ohne Account-State nach kurzer Pause per REST)
+                                        current_position, position_info = account_state.position_after_trade(exchange, open_order, config.SYMBOL, account)
                                         
                                         # Speichere die Position in der lokalen Datei
                                         utils.save_position_state(
                                             current_position, 
                                             position_info.get('type', 'KEINE'), 
-                                            entry_price
+                                            entry_price,
+                                            order_id=open_order.get('id')
                                         )
                                         
                                         # Wenn Small Capital Strategie aktiv, letzte Kaufdaten aktualisieren
@@ -383,10 +446,10 @@ def run_bot(exchange):
                                             small_cap_strategy.last_trade_type = 'BUY'
                                             
                                 else:
-                                    print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Nicht genug {quote_currency} für Kauf: {quote_balance:.2f} verfügbar, {trade_value:.2f} benötigt{Style.RESET_ALL}")
+                                    logger.warning("Nicht genug %s für Kauf: %.2f verfügbar, %.2f benötigt", quote_currency, quote_balance, trade_value)
                             except Exception as balance_error:
                                 utils.log_error(balance_error, f"Fehler beim Überprüfen des {quote_currency}-Guthabens")
-                                print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] Konnte {quote_currency}-Guthaben nicht überprüfen: {str(balance_error)}{Style.RESET_ALL}")
+                                logger.error("Konnte %s-Guthaben nicht überprüfen: %s", quote_currency, balance_error)
                         
                         elif signal < 0 and current_position > 0:  # Verkaufssignal und Base-Währung im Besitz
                             # Berechne zu verkaufende Menge
@@ -399,7 +462,7 @@ def run_bot(exchange):
                                 sell_size = min(current_position, sell_size)  # Nicht mehr als wir haben
                             
                             # Verkaufe Base-Währung
-                            sell_order = exchange_handler.execute_trade(exchange, config.SYMBOL, 'sell', sell_size, current_price)
+                            sell_order = exchange_handler.execute_trade(exchange, config.SYMBOL, 'sell', sell_size, current_price, closing=True)
                             if sell_order:
                                 last_action = f"{Fore.RED}Verkauf von {sell_size} {base_currency} @ {current_price:.2f} {quote_currency}{Style.RESET_ALL}"
                                 
@@ -412,17 +475,17 @@ def run_bot(exchange):
                                     last_action += f" | Gesamtwert: {sell_size * current_price:.2f} {quote_currency}"
                                 
                                 # Sofortiges Positionsupdate nach Trade
-                                print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Trade ausgeführt - Aktualisiere Position...{Style.RESET_ALL}")
-                                time.sleep(1)  # Kurze Pause für API-Synchronisation
-                                
-                                # Hole aktualisierte Position
-                                current_position, position_info = exchange_handler.get_position(exchange, config.SYMBOL)
+                                logger.info("Trade ausgeführt - Aktualisiere Position...", extra={'color': Fore.YELLOW})
+                                # Hole aktualisierte Position (aus der Order-Antwort, ohne Account-State nach kurzer Pause per REST)
+                                current_position, position_info = account_state.position_after_trade(exchange, sell_order, config.SYMBOL, account)
                                 
                                 # Speichere die Position in der lokalen Datei
                                 utils.save_position_state(
                                     current_position, 
                                     position_info.get('type', 'KEINE'), 
-                                    0  # Nach Verkauf kein Entry-Preis mehr
+                                    0,  # Nach Verkauf kein Entry-Preis mehr
+                                    order_id=sell_order.get('id'),
+                                    exit_price=current_price
                                 )
                                 
                                 # Wenn Small Capital Strategie aktiv, letzte Verkaufsdaten aktualisieren
@@ -435,39 +498,43 @@ def run_bot(exchange):
                     # Wenn Risikomanagement den Trade nicht erlaubt
                     if signal != 0 and not risk_result['allow_trade']:
                         risk_reason = risk_result.get('reason', 'Unbekannter Risikogrund')
-                        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Handelssignal ignoriert wegen Risikomanagement: {risk_reason}{Style.RESET_ALL}")
+                        logger.warning("Handelssignal ignoriert wegen Risikomanagement: %s", risk_reason)
                     else:
-                        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Kein neues Handelssignal. Aktuelle Empfehlung: HALTEN{Style.RESET_ALL}")
+                        logger.info("Kein neues Handelssignal. Aktuelle Empfehlung: HALTEN", extra={'color': Fore.YELLOW})
                 
                 # Update Anzeige mit allen Informationen
-                utils.update_display(
-                    df, 
-                    current_position, 
-                    quote_balance, 
-                    last_action, 
-                    risk_result,
-                    strategy_info,
-                    performance_tracker,
-                    position_info
-                )
+                with latency.stage('display'):
+                    utils.update_display(
+                        df, 
+                        current_position, 
+                        quote_balance, 
+                        last_action, 
+                        risk_result,
+                        strategy_info,
+                        performance_tracker,
+                        position_info
+                    )
                 
                 # Erhöhe den Zähler für Positionsüberprüfung
                 position_check_counter += 1
                 
                 # Regelmäßige Positions-Überprüfung
                 if position_check_counter % 20 == 0:  # Jeder 20. Zyklus
-                    print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Führe regelmäßige Positions-Überprüfung durch...{Style.RESET_ALL}")
+                    logger.info("Führe regelmäßige Positions-Überprüfung durch...", extra={'color': Fore.YELLOW})
                     
-                    # Position über API abrufen
-                    api_position, api_position_info = exchange_handler.get_position(exchange, config.SYMBOL)
+                    # Position über API abrufen (mit Account-State aus dem periodisch abgeglichenen Cache)
+                    if account is not None:
+                        api_position, api_position_info = account.get_position(exchange, config.SYMBOL)
+                    else:
+                        api_position, api_position_info = exchange_handler.get_position(exchange, config.SYMBOL)
                     
                     # Lokal gespeicherte Position laden
                     saved_position_size, saved_position_type, saved_entry_price = utils.load_position_state()
                     
-                    # Prüfen ob Diskrepanz besteht
-                    if api_position != saved_position_size:
-                        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Positions-Diskrepanz entdeckt: API zeigt {api_position}, lokal gespeichert ist {saved_position_size}{Style.RESET_ALL}")
-                        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Synchronisiere mit API-Daten...{Style.RESET_ALL}")
+                    # Prüfen ob Diskrepanz besteht (Größe oder Richtung)
+                    if position_journal.get_position_journal().differs(api_position, api_position_info.get('type')):
+                        logger.warning("Positions-Diskrepanz entdeckt: API zeigt %s, lokal gespeichert ist %s", api_position, saved_position_size)
+                        logger.info("Synchronisiere mit API-Daten...", extra={'color': Fore.YELLOW})
                         
                         # Lokale Position aktualisieren
                         utils.save_position_state(
@@ -482,8 +549,8 @@ def run_bot(exchange):
                         if api_position != 0:
                             entry_price = api_position_info.get('entry_price', saved_entry_price)
                 
-                # Warte vor dem nächsten Update
-                time.sleep(config.UPDATE_INTERVAL)
+                next_wait = config.UPDATE_INTERVAL
+                wait_for_trigger = stream is not None
                 
             except Exception as e:
                 consecutive_failures += 1
@@ -491,34 +558,78 @@ def run_bot(exchange):
                 
                 # Erhöhe Wartezeit bei mehreren aufeinanderfolgenden Fehlern
                 wait_time = min(config.UPDATE_INTERVAL * consecutive_failures, 300)  # Max 5 Minuten
-                print(f"{Fore.RED}Fehler im Hauptloop. Warte {wait_time} Sekunden vor dem nächsten Versuch... (Fehler #{consecutive_failures}){Style.RESET_ALL}")
-                time.sleep(wait_time)
+                logger.warning("Fehler im Hauptloop. Warte %s Sekunden vor dem nächsten Versuch... (Fehler #%s)", wait_time, consecutive_failures, extra={'color': Fore.RED})
+                next_wait = wait_time
+            
+            finally:
+                # Zyklus auf allen Wegen abschließen (auch ohne Daten oder nach Fehlern), vor der Wartezeit
+                if config.LATENCY_TRACKING:
+                    latency_recorder.end_cycle()
+                
+                # Warte vor dem nächsten Update
+                if wait_for_trigger:
+                    trigger_reason = stream.wait_for_trigger(config.STREAM_STALE_SECONDS)
+                    if trigger_reason:
+                        logger.info("Auswertung ausgelöst: %s", trigger_reason, extra={'color': Fore.CYAN})
+                elif next_wait is not None:
+                    time.sleep(next_wait)
     
     except KeyboardInterrupt:
-        print(f"\n{Fore.YELLOW}Bot wird beendet...{Style.RESET_ALL}")
+        dashboard.stop_dashboard()
+        logger.info("Bot wird beendet...", extra={'color': Fore.YELLOW})
+        if stream is not None:
+            stream.stop()
+        if account is not None:
+            account.stop()
         
-        # Performance-Bericht anzeigen
+        # Performance-Bericht anzeigen (nach den ausstehenden Log-Meldungen)
+        structured_logging.flush()
         performance_tracker.print_summary()
+        if config.LATENCY_TRACKING:
+            latency_recorder.print_summary()
+            if config.LATENCY_EXPORT_FILE:
+                latency_recorder.export_to_file(config.LATENCY_EXPORT_FILE)
+        if config.USE_ANALYSIS_CACHE:
+            cache_status = analysis_cache.get_analysis_cache().get_status()
+            print(f"Analyse-Cache: {cache_status['hits']} Treffer, {cache_status['misses']} Berechnungen "
+                  f"({cache_status['hit_rate']:.0%} Trefferquote), {cache_status['evictions']} verdrängt")
         
         # Offene Positionen schließen
         if current_position != 0:
-            print(f"{Fore.YELLOW}Schließe offene Positionen...{Style.RESET_ALL}")
+            logger.info("Schließe offene Positionen...", extra={'color': Fore.YELLOW})
             try:
                 if current_position > 0:
-                    exchange_handler.execute_trade(exchange, config.SYMBOL, 'sell', current_position, current_price)
+                    exchange_handler.execute_trade(exchange, config.SYMBOL, 'sell', current_position, current_price, closing=True)
                 else:
-                    exchange_handler.execute_trade(exchange, config.SYMBOL, 'buy', abs(current_position), current_price)
-                print(f"{Fore.GREEN}Positionen erfolgreich geschlossen.{Style.RESET_ALL}")
+                    exchange_handler.execute_trade(exchange, config.SYMBOL, 'buy', abs(current_position), current_price, closing=True)
+                logger.info("Positionen erfolgreich geschlossen.", extra={'color': Fore.GREEN})
             except Exception as e:
                 utils.log_error(e, "Fehler beim Schließen offener Positionen")
         
-        print(f"{Fore.GREEN}Bot erfolgreich beendet!{Style.RESET_ALL}")
+        logger.info("Bot erfolgreich beendet!", extra={'color': Fore.GREEN})
 
 def main():
     utils.print_banner()
     
     base_currency = config.get_base_currency()
     quote_currency = config.get_quote_currency()
+    portfolio_mode = "--portfolio" in sys.argv
+    if "--headless" in sys.argv:
+        config.DASHBOARD_HEADLESS = True
+    if "--quiet" in sys.argv:
+        # Produktionsprofil: nur Warnungen/Fehler, keine Konsolenanzeige
+        config.LOG_PROFILE = 'quiet'
+        structured_logging.configure()
+    
+    # Portfolio-Modus gegen die lokale Exchange-Simulation (keine API-Daten erforderlich)
+    if portfolio_mode and "--mock" in sys.argv:
+        from mock_exchange import MockExchange
+        import portfolio
+        print(f"{Fore.CYAN}Portfolio-Modus mit lokaler Exchange-Simulation (MockExchange){Style.RESET_ALL}")
+        mock_exchange = MockExchange(seconds_per_bar=config.UPDATE_INTERVAL)
+        exchange_filters.get_filter_cache().load(mock_exchange)
+        portfolio.run_portfolio(mock_exchange)
+        return
     
     # Zeige Hinweis zum aktuellen Modus
     if config.USE_TESTNET:
@@ -554,16 +665,25 @@ def main():
             print(f"\n{Fore.YELLOW}Verbinde mit Binance Spot Live...{Style.RESET_ALL}")
         
         # Initialisiere Exchange
-        exchange = exchange_handler.initialize_exchange(api_key, api_secret)
+        if config.USE_ASYNC_EXCHANGE:
+            exchange = async_exchange_handler.initialize_async_exchange(api_key, api_secret)
+        else:
+            exchange = exchange_handler.initialize_exchange(api_key, api_secret)
         if exchange is None:
             print(f"{Fore.RED}Exchange konnte nicht initialisiert werden.{Style.RESET_ALL}")
             return
             
         # Teste API-Verbindung wurde bereits in initialize_exchange durchgeführt
         
+        # Handelsfilter einmalig laden (Mengen werden vor jeder Order exakt gerundet)
+        exchange_filters.get_filter_cache().load(exchange)
+        
         # Konfiguration anzeigen
         print(f"\n{Fore.CYAN}Konfiguration:{Style.RESET_ALL}")
-        print(f"Symbol: {Fore.YELLOW}{config.SYMBOL}{Style.RESET_ALL}")
+        if portfolio_mode:
+            print(f"Symbole: {Fore.YELLOW}{', '.join(config.PORTFOLIO_SYMBOLS)}{Style.RESET_ALL}")
+        else:
+            print(f"Symbol: {Fore.YELLOW}{config.SYMBOL}{Style.RESET_ALL}")
         print(f"Zeitintervall: {Fore.YELLOW}{config.TIMEFRAME}{Style.RESET_ALL}")
         
         # Zeige Handelsmenge basierend auf QUANTITY_TYPE
@@ -578,9 +698,17 @@ def main():
         # Bestätigung vom Benutzer einholen
         confirmation = input(f"{Fore.YELLOW}Möchten Sie den Bot starten? (j/ja/n/nein): {Style.RESET_ALL}")
         if confirmation.lower() in ['j', 'ja', 'y', 'yes']:
-            run_bot(exchange)
+            if portfolio_mode:
+                import portfolio  # Nur im Portfolio-Modus laden
+                portfolio.run_portfolio(exchange)
+            else:
+                run_bot(exchange)
         else:
             print(f"\n{Fore.RED}Bot-Start abgebrochen.{Style.RESET_ALL}")
+        
+        # HTTP-Session der asynchronen Exchange schließen
+        if isinstance(exchange, async_exchange_handler.AsyncExchangeBridge):
+            exchange.close()
     
     except Exception as e:
         utils.log_error(e, "Unerwarteter Fehler in der Hauptfunktion")
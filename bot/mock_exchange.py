@@ -0,0 +1,364 @@
+import asyncio
+import threading
+import time
+import numpy as np
+import config
+import candle_store
+
+
+# Startpreise der simulierten Märkte (Fallback für unbekannte Coins: 100)
+_START_PRICES = {
+    'BTC': 60000.0,
+    'ETH': 3000.0,
+    'SOL': 150.0,
+}
+
+# Mengen-Schrittweite und Mindestmenge der simulierten Märkte
+_AMOUNT_STEPS = {
+    'BTC': 0.00001,
+    'ETH': 0.0001,
+    'SOL': 0.01,
+}
+
+
+class MockExchange:
+    """
+    Lokale Exchange-Simulation mit der von exchange_handler genutzten ccxt-Schnittstelle
+    (fetch_ohlcv, fetch_balance, create_market_order, fetch_positions, market, ...).
+
+    Kurse werden als reproduzierbarer Random Walk pro Symbol erzeugt. Neue Kerzen entstehen
+    entweder manuell über advance() oder - wenn seconds_per_bar gesetzt ist - anhand der
+    verstrichenen Zeit. Orders werden sofort zum letzten Schlusskurs ausgeführt.
+    """
+
+    id = 'mock'
+
+    def __init__(self, symbols=None, timeframe=None, history=None, quote_balance=1000.0,
+                 market_type=None, seconds_per_bar=None, latency=0.0, volatility=0.004,
+                 fee_rate=0.001, seed=42):
+        """
+        Parameters:
+        symbols: Simulierte Handelspaare (Standard: config.PORTFOLIO_SYMBOLS)
+        timeframe: Zeitintervall der Kerzen (Standard: config.TIMEFRAME)
+        history: Anzahl vorab erzeugter Kerzen (Standard: 2 * config.LIMIT)
+        quote_balance: Startguthaben in der Quote-Währung
+        market_type: 'future' oder 'spot' (Standard: abhängig von config.USE_TESTNET)
+        seconds_per_bar: Echtzeit-Sekunden pro neuer Kerze (None = nur manuell über advance())
+        latency: Simulierte Netzwerklatenz pro API-Aufruf in Sekunden
+        volatility: Standardabweichung der Kursänderung pro Kerze
+        fee_rate: Handelsgebühr pro Order
+        seed: Startwert des Zufallsgenerators
+        """
+        self.symbols = list(symbols or config.PORTFOLIO_SYMBOLS)
+        self.timeframe = timeframe or config.TIMEFRAME
+        self.timeframe_ms = candle_store.timeframe_to_ms(self.timeframe)
+        self.market_type = market_type or ('future' if config.USE_TESTNET else 'spot')
+        self.seconds_per_bar = seconds_per_bar
+        self.latency = latency
+        self.volatility = volatility
+        self.fee_rate = fee_rate
+        self.options = {'defaultType': self.market_type}
+        self.orders = []
+
+        self._lock = threading.Lock()
+        self._rngs = {symbol: np.random.default_rng(seed + index) for index, symbol in enumerate(self.symbols)}
+        self._candles = {symbol: [] for symbol in self.symbols}
+        self._positions = {symbol: {'contracts': 0.0, 'entry_price': 0.0} for symbol in self.symbols}
+
+        # Guthaben pro Währung
+        quote_currencies = {config.get_quote_currency(symbol) for symbol in self.symbols}
+        self._balances = {currency: float(quote_balance) for currency in quote_currencies}
+        for symbol in self.symbols:
+            self._balances.setdefault(config.get_base_currency(symbol), 0.0)
+
+        # Historie so erzeugen, dass die letzte Kerze die aktuelle ist
+        history = int(history or config.LIMIT * 2)
+        now_ms = int(time.time() * 1000)
+        self._start_ms = (now_ms // self.timeframe_ms - history + 1) * self.timeframe_ms
+        for symbol in self.symbols:
+            base = config.get_base_currency(symbol)
+            self._append_bars(symbol, history, _START_PRICES.get(base, 100.0))
+        self._bars_advanced = 0
+        self._clock_start = time.monotonic()
+
+    # ---- Simulation ----
+
+    def _append_bars(self, symbol, count, last_close=None):
+        candles = self._candles[symbol]
+        rng = self._rngs[symbol]
+        close = candles[-1][4] if candles else last_close
+        timestamp = candles[-1][0] + self.timeframe_ms if candles else self._start_ms
+
+        for _ in range(count):
+            open_ = close
+            close = open_ * float(np.exp(rng.normal(0, self.volatility)))
+            high = max(open_, close) * (1 + abs(float(rng.normal(0, self.volatility / 2))))
+            low = min(open_, close) * (1 - abs(float(rng.normal(0, self.volatility / 2))))
+            volume = float(rng.gamma(2.0, 50.0))
+            candles.append([timestamp, open_, high, low, close, volume])
+            timestamp += self.timeframe_ms
+
+    def advance(self, bars=1):
+        """Erzeugt für alle Symbole die nächsten Kerzen"""
+        with self._lock:
+            for symbol in self.symbols:
+                self._append_bars(symbol, bars)
+            self._bars_advanced += bars
+
+    def _sync_clock(self):
+        """Erzeugt im Echtzeitbetrieb die seit dem Start fälligen Kerzen"""
+        if not self.seconds_per_bar:
+            return
+        due = int((time.monotonic() - self._clock_start) / self.seconds_per_bar)
+        if due > self._bars_advanced:
+            self.advance(due - self._bars_advanced)
+
+    def _resolve_symbol(self, symbol):
+        if symbol in self._candles:
+            return symbol
+        # Alternative Schreibweisen: "BTCUSDT", "BTC/USDT:USDT"
+        for known in self.symbols:
+            if symbol in (known.replace('/', ''), f"{known}:{config.get_quote_currency(known)}"):
+                return known
+        raise Exception(f"MockExchange: unbekanntes Symbol {symbol}")
+
+    def _last_price(self, symbol):
+        return self._candles[symbol][-1][4]
+
+    # ---- Marktdaten ----
+
+    def load_markets(self, reload=False):
+        return {symbol: self.market(symbol) for symbol in self.symbols}
+
+    @property
+    def markets(self):
+        return self.load_markets()
+
+    def market(self, symbol):
+        symbol = self._resolve_symbol(symbol)
+        base = config.get_base_currency(symbol)
+        step = _AMOUNT_STEPS.get(base, 0.001)
+        return {
+            'id': symbol.replace('/', ''),
+            'symbol': symbol,
+            'base': base,
+            'quote': config.get_quote_currency(symbol),
+            'type': self.market_type,
+            'precision': {'amount': step, 'price': 0.01},
+            'limits': {
+                'amount': {'min': step, 'max': 10000.0},
+                'cost': {'min': 5.0},
+            },
+        }
+
+    def _network_delay(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def fetch_ohlcv(self, symbol, timeframe=None, since=None, limit=None, params=None):
+        self._network_delay()
+        return self._ohlcv(symbol, timeframe, since, limit)
+
+    def _ohlcv(self, symbol, timeframe=None, since=None, limit=None):
+        if timeframe and timeframe != self.timeframe:
+            raise Exception(f"MockExchange: Zeitintervall {timeframe} nicht simuliert (nur {self.timeframe})")
+
+        self._sync_clock()
+        with self._lock:
+            candles = self._candles[self._resolve_symbol(symbol)]
+            if since is not None:
+                # Wie Binance: aufsteigend ab 'since', begrenzt auf 'limit' Kerzen
+                rows = [list(candle) for candle in candles if candle[0] >= since]
+                return rows[:limit] if limit else rows
+            rows = candles[-limit:] if limit else candles
+            return [list(candle) for candle in rows]
+
+    def fetch_ticker(self, symbol, params=None):
+        self._sync_clock()
+        with self._lock:
+            symbol = self._resolve_symbol(symbol)
+            price = self._last_price(symbol)
+            return {'symbol': symbol, 'last': price, 'close': price, 'bid': price, 'ask': price}
+
+    # ---- Konto ----
+
+    def _used_margin(self, currency):
+        used = 0.0
+        for symbol, position in self._positions.items():
+            if config.get_quote_currency(symbol) == currency:
+                used += abs(position['contracts']) * position['entry_price']
+        return used
+
+    def fetch_balance(self, params=None):
+        self._network_delay()
+        return self._balance()
+
+    def _balance(self):
+        with self._lock:
+            balance = {'free': {}, 'used': {}, 'total': {}}
+            for currency, total in self._balances.items():
+                used = self._used_margin(currency) if self.market_type == 'future' else 0.0
+                entry = {'free': total - used, 'used': used, 'total': total}
+                balance[currency] = entry
+                for key in ('free', 'used', 'total'):
+                    balance[key][currency] = entry[key]
+            return balance
+
+    def fetch_positions(self, symbols=None, params=None):
+        self._network_delay()
+        return self._positions_list(symbols)
+
+    def _positions_list(self, symbols=None):
+        self._sync_clock()
+        with self._lock:
+            requested = {self._resolve_symbol(symbol) for symbol in symbols} if symbols else set(self.symbols)
+            positions = []
+            for symbol in self.symbols:
+                if symbol not in requested:
+                    continue
+                position = self._positions[symbol]
+                contracts = position['contracts']
+                price = self._last_price(symbol)
+                positions.append({
+                    'symbol': f"{symbol}:{config.get_quote_currency(symbol)}",
+                    'contracts': contracts,
+                    'side': 'long' if contracts > 0 else ('short' if contracts < 0 else None),
+                    'entryPrice': position['entry_price'],
+                    'markPrice': price,
+                    'unrealizedPnl': contracts * (price - position['entry_price']),
+                    'liquidationPrice': None,
+                    'leverage': 1,
+                })
+            return positions
+
+    # ---- Orders ----
+
+    def create_market_order(self, symbol, side, amount, price=None, params=None):
+        self._network_delay()
+        return self._market_order(symbol, side, amount)
+
+    def _market_order(self, symbol, side, amount):
+        self._sync_clock()
+        with self._lock:
+            symbol = self._resolve_symbol(symbol)
+            amount = float(amount)
+            if amount <= 0:
+                raise Exception(f"MockExchange: ungültige Menge {amount}")
+
+            market = self.market(symbol)
+            fill_price = self._last_price(symbol)
+            cost = amount * fill_price
+            fee = cost * self.fee_rate
+            if cost < market['limits']['cost']['min']:
+                raise Exception(f"MockExchange: MIN_NOTIONAL - Orderwert {cost:.2f} unter {market['limits']['cost']['min']}")
+
+            base = market['base']
+            quote = market['quote']
+
+            if self.market_type == 'spot':
+                if side == 'buy':
+                    if self._balances[quote] < cost + fee:
+                        raise Exception(f"MockExchange: INSUFFICIENT_BALANCE - {cost + fee:.2f} {quote} benötigt")
+                    self._balances[quote] -= cost + fee
+                    self._balances[base] += amount
+                else:
+                    if self._balances[base] < amount:
+                        raise Exception(f"MockExchange: INSUFFICIENT_BALANCE - {amount} {base} benötigt")
+                    self._balances[base] -= amount
+                    self._balances[quote] += cost - fee
+            else:
+                self._fill_future(symbol, quote, side, amount, fill_price, fee)
+
+            order = {
+                'id': str(len(self.orders) + 1),
+                'symbol': symbol,
+                'type': 'market',
+                'side': side,
+                'amount': amount,
+                'filled': amount,
+                'price': fill_price,
+                'average': fill_price,
+                'cost': cost,
+                'fee': {'cost': fee, 'currency': quote},
+                'status': 'closed',
+                'timestamp': self._candles[symbol][-1][0],
+            }
+            self.orders.append(order)
+            return order
+
+    def _fill_future(self, symbol, quote, side, amount, fill_price, fee):
+        """Aktualisiert eine Futures-Position (One-Way-Modus, Hebel 1)"""
+        position = self._positions[symbol]
+        contracts = position['contracts']
+        delta = amount if side == 'buy' else -amount
+
+        # Positionserhöhung benötigt freie Margin
+        increase = abs(contracts + delta) - abs(contracts)
+        if increase > 0:
+            free = self._balances[quote] - self._used_margin(quote)
+            if free < increase * fill_price + fee:
+                raise Exception(f"MockExchange: INSUFFICIENT_BALANCE - {increase * fill_price + fee:.2f} {quote} Margin benötigt")
+
+        realized = 0.0
+        if contracts != 0 and np.sign(delta) != np.sign(contracts):
+            # Reduzieren bzw. Schließen: Gewinn/Verlust realisieren
+            closed = min(abs(delta), abs(contracts))
+            realized = closed * (fill_price - position['entry_price']) * np.sign(contracts)
+
+        new_contracts = contracts + delta
+        if abs(new_contracts) < 1e-12:
+            position['contracts'] = 0.0
+            position['entry_price'] = 0.0
+        elif contracts == 0 or np.sign(new_contracts) != np.sign(contracts):
+            # Neue Position bzw. Seitenwechsel
+            position['contracts'] = new_contracts
+            position['entry_price'] = fill_price
+        elif abs(new_contracts) > abs(contracts):
+            # Aufstocken: Durchschnittlicher Einstiegspreis
+            position['entry_price'] = (abs(contracts) * position['entry_price'] + abs(delta) * fill_price) / abs(new_contracts)
+            position['contracts'] = new_contracts
+        else:
+            position['contracts'] = new_contracts
+
+        self._balances[quote] += float(realized) - fee
+
+
+class AsyncMockExchange(MockExchange):
+    """
+    Asynchrone Variante mit der Schnittstelle von ccxt.async_support (für async_exchange_handler).
+    Die simulierte Latenz wartet mit asyncio.sleep, gleichzeitige Abfragen überlappen sich also.
+    """
+
+    async def _network_delay_async(self):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def load_markets(self, reload=False):
+        return MockExchange.load_markets(self, reload)
+
+    @property
+    def markets(self):
+        return MockExchange.load_markets(self)
+
+    async def fetch_ohlcv(self, symbol, timeframe=None, since=None, limit=None, params=None):
+        await self._network_delay_async()
+        return self._ohlcv(symbol, timeframe, since, limit)
+
+    async def fetch_ticker(self, symbol, params=None):
+        await self._network_delay_async()
+        return MockExchange.fetch_ticker(self, symbol, params)
+
+    async def fetch_balance(self, params=None):
+        await self._network_delay_async()
+        return self._balance()
+
+    async def fetch_positions(self, symbols=None, params=None):
+        await self._network_delay_async()
+        return self._positions_list(symbols)
+
+    async def create_market_order(self, symbol, side, amount, price=None, params=None):
+        await self._network_delay_async()
+        return self._market_order(symbol, side, amount)
+
+    async def close(self):
+        pass
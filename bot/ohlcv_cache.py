@@ -0,0 +1,188 @@
+"""
+Persistenter OHLCV-Cache auf der Festplatte (eine Datei pro Exchange, Symbol und Zeitintervall).
+
+Die Kerzen liegen als rohe float64-Zeilen [timestamp_ms, open, high, low, close, volume] in
+aufsteigender Reihenfolge und werden per np.memmap gelesen, ohne die ganze Datei zu laden.
+Neue Kerzen werden angehängt, die laufende Kerze wird an ihrer Position überschrieben.
+Beginnen neue Kerzen erst nach einer Lücke, wird der bisherige Inhalt als eigenes Segment
+(<Name>-<erster>-<letzter Zeitstempel>.ohlcv) abgelegt, damit die Datei lückenlos bleibt.
+Beim Neustart lädt exchange_handler die letzten Kerzen aus dem Cache und fragt nur die
+fehlenden Kerzen ab; Backtests können die Dateien direkt lesen (backtest.load_ohlcv).
+"""
+import os
+import threading
+import numpy as np
+import pandas as pd
+import config
+import structured_logging
+from candle_store import OHLCV_COLUMNS, timeframe_to_ms
+
+logger = structured_logging.get_logger(__name__)
+
+
+FILE_EXTENSION = '.ohlcv'
+ROW_BYTES = len(OHLCV_COLUMNS) * np.dtype(np.float64).itemsize
+
+
+def cache_path(exchange_id, symbol, timeframe, directory=None):
+    """
+    Dateipfad des Caches, z.B. data/ohlcv/binance-testnet/BTCUSDT_15m.ohlcv
+
+    Parameters:
+    exchange_id: ccxt-ID der Exchange (Testnet- und Live-Daten werden getrennt gespeichert)
+    symbol: Handelssymbol
+    timeframe: Zeitintervall
+    directory: Basisverzeichnis (Standard: config.OHLCV_CACHE_DIR)
+    """
+    directory = directory or config.OHLCV_CACHE_DIR
+    environment = 'testnet' if config.USE_TESTNET else 'live'
+    file_name = f"{symbol.replace('/', '').replace(':', '_')}_{timeframe}{FILE_EXTENSION}"
+    return os.path.join(directory, f"{exchange_id}-{environment}", file_name)
+
+
+class OhlcvCache:
+    """Append-orientierte Kerzendatei mit Lesezugriff über np.memmap"""
+
+    def __init__(self, path, timeframe_ms=None):
+        self.path = path
+        self.timeframe_ms = timeframe_ms  # Kerzendauer für die Lückenprüfung (None: keine Prüfung)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        try:
+            return os.path.getsize(self.path) // ROW_BYTES
+        except OSError:
+            return 0
+
+    def _map(self, rows, mode='r'):
+        return np.memmap(self.path, dtype=np.float64, mode=mode, shape=(rows, len(OHLCV_COLUMNS)))
+
+    @property
+    def last_timestamp(self):
+        """Zeitstempel (ms) der letzten gespeicherten Kerze oder None"""
+        rows = len(self)
+        if rows == 0:
+            return None
+        return int(self._map(rows)[-1, 0])
+
+    def read(self, limit=None):
+        """
+        Liest die letzten limit Kerzen (Standard: alle).
+
+        Returns:
+        ndarray: Kopie der Zeilen [timestamp, open, high, low, close, volume]
+        """
+        with self._lock:
+            rows = len(self)
+            if rows == 0:
+                return np.empty((0, len(OHLCV_COLUMNS)), dtype=np.float64)
+            data = self._map(rows)
+            start = 0 if limit is None else max(rows - int(limit), 0)
+            return np.array(data[start:])
+
+    def to_dataframe(self, limit=None):
+        """Gibt die Kerzen im Format von exchange_handler.get_historical_data zurück"""
+        df = pd.DataFrame(self.read(limit), columns=OHLCV_COLUMNS)
+        df['timestamp'] = pd.to_datetime(df['timestamp'].astype(np.int64), unit='ms')
+        return df
+
+    def write(self, ohlcv):
+        """
+        Übernimmt Kerzen in die Datei. Bekannte Zeitstempel werden überschrieben, neuere angehängt.
+        Ältere Kerzen oder Kerzen innerhalb von Lücken führen zu einem vollständigen Neuschreiben.
+        Liegt zwischen der letzten gespeicherten und der ersten neuen Kerze eine Lücke, wird der
+        bisherige Inhalt als Segment abgelegt und die Datei mit den neuen Kerzen neu begonnen.
+
+        Parameters:
+        ohlcv: Liste oder Array von [timestamp, open, high, low, close, volume] (aufsteigend sortiert)
+        """
+        rows = np.asarray(ohlcv, dtype=np.float64).reshape(-1, len(OHLCV_COLUMNS))
+        if len(rows) == 0:
+            return
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+            if size % ROW_BYTES:
+                # Unvollständige Zeile nach einem Abbruch während des Schreibens verwerfen
+                os.truncate(self.path, size - size % ROW_BYTES)
+            stored = size // ROW_BYTES
+
+            if stored == 0:
+                self._rewrite(rows)
+                return
+
+            data = self._map(stored)
+            timestamps = data[:, 0]
+            if self.timeframe_ms and rows[0, 0] > timestamps[-1] + self.timeframe_ms:
+                segment_path = self._segment_path(int(timestamps[0]), int(timestamps[-1]))
+                del data, timestamps
+                os.replace(self.path, segment_path)
+                logger.info("Lücke im OHLCV-Cache %s - bisherige %s Kerzen nach %s verschoben.", self.path, stored, segment_path)
+                self._rewrite(rows)
+                return
+            existing = rows[rows[:, 0] <= timestamps[-1]]
+            new_rows = rows[rows[:, 0] > timestamps[-1]]
+
+            positions = np.searchsorted(timestamps, existing[:, 0])
+            in_place = bool(np.all(positions < stored)) and np.array_equal(timestamps[np.minimum(positions, stored - 1)], existing[:, 0])
+            if not in_place:
+                merged = np.concatenate((np.array(data), rows))
+                del data
+                # Bei doppelten Zeitstempeln gewinnt die neu übergebene Kerze
+                _, last_index = np.unique(merged[::-1, 0], return_index=True)
+                self._rewrite(merged[::-1][last_index])
+                return
+            del data
+
+            if len(existing):
+                writable = self._map(stored, mode='r+')
+                changed = np.any(writable[positions] != existing, axis=1)
+                if changed.any():
+                    writable[positions[changed]] = existing[changed]
+                    writable.flush()
+                del writable
+            if len(new_rows):
+                with open(self.path, 'ab') as f:
+                    f.write(np.ascontiguousarray(new_rows).tobytes())
+
+    def _segment_path(self, first_ms, last_ms):
+        base = self.path[:-len(FILE_EXTENSION)] if self.path.endswith(FILE_EXTENSION) else self.path
+        return f"{base}-{first_ms}-{last_ms}{FILE_EXTENSION}"
+
+    def _rewrite(self, rows):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(np.ascontiguousarray(rows).tobytes())
+        os.replace(temp_path, self.path)
+
+
+def load_file(path):
+    """Lädt eine Cache-Datei als DataFrame (für Backtests)"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    return OhlcvCache(path).to_dataframe()
+
+
+# Globale Registry der Caches (eine Instanz pro Datei)
+_ohlcv_caches = {}
+
+
+def get_ohlcv_cache(exchange_id, symbol=None, timeframe=None):
+    """
+    Gibt den Cache für Exchange, Symbol und Zeitintervall zurück (wird bei Bedarf erstellt).
+
+    Parameters:
+    exchange_id: ccxt-ID der Exchange
+    symbol: Handelssymbol (Standard: config.SYMBOL)
+    timeframe: Zeitintervall (Standard: config.TIMEFRAME)
+
+    Returns:
+    OhlcvCache: Cache-Instanz
+    """
+    timeframe = timeframe or config.TIMEFRAME
+    path = cache_path(exchange_id, symbol or config.SYMBOL, timeframe)
+    if path not in _ohlcv_caches:
+        _ohlcv_caches[path] = OhlcvCache(path, timeframe_to_ms(timeframe))
+    return _ohlcv_caches[path]
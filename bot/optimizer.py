@@ -0,0 +1,171 @@
+"""
+Parameter-Optimierung der DAY_TRADER-Strategie per Backtest.
+
+Alle Kandidaten aus config.DAY_TRADER_PARAM_RANGES (vollständiges Gitter oder Zufallsstichprobe)
+werden mit backtest.Backtester auf den jüngsten Kerzen bewertet. Indikatoren und Signalstärke
+werden nur einmal berechnet und an die Prozesse des Pools übergeben; jeder Prozess hält einen
+Backtester, der für alle seine Kandidaten wiederverwendet wird.
+
+Aufruf:
+    python optimizer.py daten.csv [grid|random]
+"""
+import itertools
+import multiprocessing
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from datetime import datetime
+from colorama import Fore, Style
+import backtest
+import exchange_handler
+import indicators
+import structured_logging
+import config
+from day_trader_strategy import calculate_signal_strength_series
+
+
+PARAMETER_NAMES = ['signal_threshold', 'min_trade_interval', 'daily_profit_target', 'max_daily_loss']
+
+# Backtester des jeweiligen Worker-Prozesses (wird im Initializer einmal erstellt)
+_worker_backtester = None
+
+
+def candidate_parameters(param_ranges=None, method=None, samples=None, seed=None):
+    """
+    Erzeugt die zu testenden Parameterkombinationen.
+
+    Parameters:
+    param_ranges: Werte pro Parameter (Standard: config.DAY_TRADER_PARAM_RANGES)
+    method: 'grid' oder 'random' (Standard: config.OPTIMIZER_METHOD)
+    samples: Anzahl Kandidaten bei 'random' (Standard: config.OPTIMIZER_RANDOM_SAMPLES)
+    seed: Startwert für die Zufallsstichprobe
+
+    Returns:
+    list: Liste von Parameter-Dictionaries
+    """
+    param_ranges = param_ranges or config.DAY_TRADER_PARAM_RANGES
+    method = method or config.OPTIMIZER_METHOD
+    samples = samples or config.OPTIMIZER_RANDOM_SAMPLES
+
+    grid = [dict(zip(PARAMETER_NAMES, values))
+            for values in itertools.product(*(param_ranges[name] for name in PARAMETER_NAMES))]
+    if method == 'random' and samples < len(grid):
+        return random.Random(seed).sample(grid, samples)
+    return grid
+
+
+def _init_worker(df, futures):
+    global _worker_backtester
+    _worker_backtester = backtest.Backtester(df, 'DAY_TRADER', futures=futures)
+
+
+def _evaluate(params):
+    """Bewertet einen Kandidaten im Worker-Prozess (ohne Konsolenausgabe der simulierten Trades)"""
+    with structured_logging.console_suppressed():
+        result = _worker_backtester.run(strategy_params=params)
+    summary, tracker = result['summary'], result['tracker']
+    return {
+        'params': params,
+        'score': summary['return_percent'],
+        'return_percent': summary['return_percent'],
+        'trades': summary['trades'],
+        'win_rate': tracker.win_rate,
+        'max_drawdown_percent': summary['max_drawdown_percent'],
+        'valid': summary['trades'] >= config.OPTIMIZER_MIN_TRADES
+    }
+
+
+def optimize_day_trader(df, param_ranges=None, method=None, samples=None, time_budget=None,
+                        max_workers=None, current_params=None, futures=None, verbose=True):
+    """
+    Bewertet Parameterkandidaten per Backtest in einem Prozess-Pool.
+
+    Parameters:
+    df: OHLCV-DataFrame (Indikatoren werden bei Bedarf einmal berechnet)
+    param_ranges, method, samples: siehe candidate_parameters
+    time_budget: Maximale Laufzeit in Sekunden (Standard: config.OPTIMIZER_TIME_BUDGET)
+    max_workers: Anzahl Prozesse (Standard: config.OPTIMIZER_MAX_WORKERS bzw. CPU-Kerne)
+    current_params: Aktuelle Parameter, werden immer mitbewertet (is_current=True)
+    futures: Long/Short handeln (Standard: config.USE_TESTNET)
+    verbose: Rangliste ausgeben
+
+    Returns:
+    list: Ergebnisse absteigend nach Rendite (Kandidaten mit zu wenigen Trades am Ende)
+    """
+    time_budget = time_budget if time_budget is not None else config.OPTIMIZER_TIME_BUDGET
+    max_workers = max_workers or config.OPTIMIZER_MAX_WORKERS or os.cpu_count() or 1
+    start = time.perf_counter()
+
+    # Gemeinsame Vorberechnung für alle Kandidaten
+    if 'atr' not in df.columns:
+        with structured_logging.console_suppressed():
+            df = indicators.calculate_all_indicators(df)
+    df = df.copy()
+    df['day_trader_strength'] = calculate_signal_strength_series(df)
+
+    candidates = candidate_parameters(param_ranges, method, samples)
+    if current_params is not None and current_params not in candidates:
+        candidates.insert(0, dict(current_params))
+
+    results = []
+    # 'spawn' statt 'fork': der Bot läuft mit weiteren Threads (Stream, Event-Loop)
+    executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'),
+                                   initializer=_init_worker, initargs=(df, futures))
+    try:
+        # Ein Auftrag pro Kandidat: bei Ablauf des Zeitbudgets bleiben alle fertigen Ergebnisse erhalten
+        pending = [executor.submit(_evaluate, params) for params in candidates]
+        remaining = time_budget - (time.perf_counter() - start)
+        for future in as_completed(pending, timeout=max(remaining, 0)):
+            results.append(future.result())
+    except FuturesTimeoutError:
+        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Zeitbudget von {time_budget}s erreicht - "
+              f"{len(results)} von {len(candidates)} Kandidaten bewertet.{Style.RESET_ALL}")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    for result in results:
+        result['is_current'] = current_params is not None and result['params'] == current_params
+    results.sort(key=lambda result: (result['valid'], result['score'], result['win_rate']), reverse=True)
+
+    if verbose:
+        print_optimization_results(results, time.perf_counter() - start)
+    return results
+
+
+def load_optimization_candles(exchange, fallback_df):
+    """
+    Lädt config.OPTIMIZER_LOOKBACK_CANDLES Kerzen für die Optimierung. Ohne Exchange oder
+    bei einem Fehler werden die übergebenen Kerzen verwendet.
+    """
+    if exchange is not None:
+        df = exchange_handler.get_historical_data(exchange, config.SYMBOL, config.TIMEFRAME, config.OPTIMIZER_LOOKBACK_CANDLES)
+        if len(df) > len(fallback_df):
+            return df
+    return fallback_df
+
+
+def print_optimization_results(results, duration=None, top=10):
+    """Gibt die besten Kandidaten als Tabelle aus"""
+    print(f"\n{Fore.CYAN}=== Parameter-Optimierung DAY_TRADER ({len(results)} Kandidaten"
+          f"{f', {duration:.1f}s' if duration is not None else ''}) ==={Style.RESET_ALL}")
+    print(f"{'Schwelle':>8} | {'Intervall':>9} | {'Tagesziel':>9} | {'Max.Verl.':>9} | {'Rendite':>8} | {'Trades':>6} | {'Win Rate':>8}")
+    print("-" * 78)
+    for result in results[:top]:
+        params = result['params']
+        color = Fore.GREEN if result['return_percent'] > 0 else Fore.RED
+        marker = " (aktuell)" if result.get('is_current') else ""
+        print(f"{params['signal_threshold']:>8.2f} | {params['min_trade_interval']:>8}s | "
+              f"{params['daily_profit_target'] * 100:>8.1f}% | {params['max_daily_loss'] * 100:>8.1f}% | "
+              f"{color}{result['return_percent']:>+7.2f}%{Style.RESET_ALL} | {result['trades']:>6} | "
+              f"{result['win_rate'] * 100:>7.1f}%{marker}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(f"{Fore.YELLOW}Aufruf: python optimizer.py <daten.csv|daten.parquet> [grid|random]{Style.RESET_ALL}")
+        sys.exit(1)
+
+    data = backtest.load_ohlcv(sys.argv[1])
+    optimize_day_trader(data, method=sys.argv[2] if len(sys.argv) > 2 else None)
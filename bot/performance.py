@@ -1,10 +1,9 @@
-import pandas as pd
 import numpy as np
-from datetime import datetime
-import os
+from datetime import date, datetime
 from colorama import Fore, Style
 import utils
 import config
+import trade_ledger
 
 class PerformanceTracker:
     """Klasse zum Verfolgen der Performance des Trading-Bots"""
@@ -19,9 +18,12 @@ class PerformanceTracker:
         self.winning_trades = 0
         self.losing_trades = 0
         
-        # Performance-Metriken
+        # Performance-Metriken (werden pro Trade in O(1) fortgeschrieben)
         self.total_profit = 0
+        self.gross_profit = 0
+        self.gross_loss = 0
         self.max_drawdown = 0
+        self.peak_equity = None
         self.win_rate = 0
         self.profit_factor = 0
         self.avg_win = 0
@@ -40,25 +42,46 @@ class PerformanceTracker:
         """Setzt den initialen Kontostand"""
         self.initial_balance = balance
         self.current_balance = balance
+        self.peak_equity = balance
     
     def update_balance(self, balance):
         """Aktualisiert den aktuellen Kontostand"""
         self.current_balance = balance
-        
-        # Berechne aktuellen Drawdown
-        if self.initial_balance is not None and self.initial_balance > 0:
-            drawdown = (self.initial_balance - self.current_balance) / self.initial_balance
+        self._track_equity(balance)
+    
+    def update_equity_curve(self, equity):
+        """
+        Übernimmt eine ganze Kontowert-Reihe (z.B. aus einem Backtest) vektorisiert; entspricht
+        update_balance für jeden einzelnen Wert.
+        """
+        equity = np.asarray(equity, dtype=np.float64)
+        if len(equity) == 0:
+            return
+        peak = np.maximum.accumulate(equity)
+        if self.peak_equity is not None:
+            peak = np.maximum(peak, self.peak_equity)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            drawdown = np.where(peak > 0, (peak - equity) / peak, 0)
+        self.max_drawdown = max(self.max_drawdown, float(drawdown.max()))
+        self.peak_equity = float(peak[-1])
+        self.current_balance = float(equity[-1])
+
+    def _track_equity(self, equity):
+        """Drawdown vom bisherigen Höchststand des Kontos (laufendes Maximum statt Neuberechnung)"""
+        if self.peak_equity is None or equity > self.peak_equity:
+            self.peak_equity = equity
+        if self.peak_equity > 0:
+            drawdown = (self.peak_equity - equity) / self.peak_equity
             if drawdown > self.max_drawdown:
                 self.max_drawdown = drawdown
     
-    def add_trade(self, trade_type, entry_price, exit_price, position_size, profit):
-        """Fügt einen abgeschlossenen Trade hinzu"""
+    def add_trade(self, trade_type, entry_price, exit_price, position_size, profit, symbol=None):
+        """Fügt einen abgeschlossenen Trade hinzu (symbol: Handelspaar im Portfolio-Modus)"""
         trade_time = datetime.now()
-        trade_date = trade_time.date()
         
         # Aktualisiere die Quote-Währung für den Fall, dass sich die Konfiguration geändert hat
-        self.quote_currency = config.get_quote_currency()
-        base_currency = config.get_base_currency()
+        self.quote_currency = config.get_quote_currency(symbol)
+        base_currency = config.get_base_currency(symbol)
         
         # Trade-Informationen
         trade = {
@@ -70,23 +93,34 @@ class PerformanceTracker:
             'profit': profit,
             'profit_percent': (profit / (entry_price * position_size)) * 100 if entry_price * position_size != 0 else 0,
             'quote_currency': self.quote_currency,
-            'base_currency': base_currency
+            'base_currency': base_currency,
+            'symbol': symbol or config.SYMBOL
         }
         
         self.trades.append(trade)
-        self.total_trades += 1
+        self._apply_trade(profit, trade_time.date())
         
-        # Aktualisiere täglichen P&L
-        if trade_date not in self.daily_pnl:
-            self.daily_pnl[trade_date] = 0
-        self.daily_pnl[trade_date] += profit
+        # Ein Datensatz wird an das Ledger angehängt (kein Neuschreiben der Historie)
+        if config.SAVE_PERFORMANCE_DATA:
+            self.save_trade(trade)
         
-        # Aktualisiere Gewinn/Verlust-Statistiken
+        # Ausgabe der Trade-Informationen
+        trade_info = f"Trade: {trade_type} | Einstieg: {entry_price:.2f} | Ausstieg: {exit_price:.2f} | Gewinn/Verlust: "
+        if profit > 0:
+            print(f"{Fore.GREEN}{trade_info}{profit:.2f} {self.quote_currency}{Style.RESET_ALL}")
+        else:
+            print(f"{Fore.RED}{trade_info}{profit:.2f} {self.quote_currency}{Style.RESET_ALL}")
+    
+    def _apply_trade(self, profit, trade_date):
+        """Schreibt alle Metriken mit einem weiteren Trade fort (laufende Summen, Serien und Drawdown)"""
+        self.total_trades += 1
         self.total_profit += profit
+        self.daily_pnl[trade_date] = self.daily_pnl.get(trade_date, 0) + profit
         
         if profit > 0:
             self.winning_trades += 1
-            self.avg_win = (self.avg_win * (self.winning_trades - 1) + profit) / self.winning_trades if self.winning_trades > 0 else 0
+            self.gross_profit += profit
+            self.avg_win = self.gross_profit / self.winning_trades
             if profit > self.largest_win:
                 self.largest_win = profit
             
@@ -97,7 +131,8 @@ class PerformanceTracker:
         
         elif profit < 0:
             self.losing_trades += 1
-            self.avg_loss = (self.avg_loss * (self.losing_trades - 1) + abs(profit)) / self.losing_trades if self.losing_trades > 0 else 0
+            self.gross_loss += abs(profit)
+            self.avg_loss = self.gross_loss / self.losing_trades
             if abs(profit) > self.largest_loss:
                 self.largest_loss = abs(profit)
             
@@ -106,126 +141,138 @@ class PerformanceTracker:
             if self.consecutive_losses > self.max_consecutive_losses:
                 self.max_consecutive_losses = self.consecutive_losses
         
-        # Aktualisiere Performance-Metriken
-        if self.total_trades > 0:
-            self.win_rate = self.winning_trades / self.total_trades
-        
-        total_wins = sum(trade['profit'] for trade in self.trades if trade['profit'] > 0)
-        total_losses = sum(abs(trade['profit']) for trade in self.trades if trade['profit'] < 0)
-        
-        if total_losses > 0:
-            self.profit_factor = total_wins / total_losses
+        self.win_rate = self.winning_trades / self.total_trades
+        if self.gross_loss > 0:
+            self.profit_factor = self.gross_profit / self.gross_loss
         
-        # Speichere Daten, wenn konfiguriert
-        if config.SAVE_PERFORMANCE_DATA:
-            self.save_to_csv()
-        
-        # Ausgabe der Trade-Informationen
-        trade_info = f"Trade: {trade_type} | Einstieg: {entry_price:.2f} | Ausstieg: {exit_price:.2f} | Gewinn/Verlust: "
-        if profit > 0:
-            print(f"{Fore.GREEN}{trade_info}{profit:.2f} {self.quote_currency}{Style.RESET_ALL}")
-        else:
-            print(f"{Fore.RED}{trade_info}{profit:.2f} {self.quote_currency}{Style.RESET_ALL}")
+        # Realisierte Equity-Kurve (Startkapital + kumulierter Gewinn)
+        if self.initial_balance is not None:
+            self._track_equity(self.initial_balance + self.total_profit)
     
-    def save_to_csv(self):
-        """Speichert die Performance-Daten in eine CSV-Datei"""
+    def save_trade(self, trade):
+        """Hängt einen Trade an das Trade-Ledger an"""
         try:
-            # Trades als DataFrame konvertieren
-            trades_df = pd.DataFrame(self.trades)
-            
-            # Speichere in CSV
-            trades_df.to_csv(config.PERFORMANCE_FILE, index=False)
+            trade_ledger.get_trade_ledger().append(trade)
         except Exception as e:
             utils.log_error(e, "Fehler beim Speichern der Performance-Daten")
     
-    def load_from_csv(self):
-        """Lädt Performance-Daten aus einer CSV-Datei"""
+    def save_to_csv(self, path=None):
+        """Exportiert alle Trades des Ledgers als CSV-Datei (Standard: config.PERFORMANCE_FILE)"""
         try:
-            if os.path.exists(config.PERFORMANCE_FILE):
-                trades_df = pd.read_csv(config.PERFORMANCE_FILE)
-                
-                # Konvertiere zu Liste von Dictionaries
-                self.trades = trades_df.to_dict('records')
-                
-                # Aktualisiere Statistiken
-                self.total_trades = len(self.trades)
-                self.winning_trades = sum(1 for trade in self.trades if trade['profit'] > 0)
-                self.losing_trades = sum(1 for trade in self.trades if trade['profit'] < 0)
-                
-                # Berechne Metriken neu
-                self.calculate_metrics()
+            return trade_ledger.get_trade_ledger().export_csv(path)
+        except Exception as e:
+            utils.log_error(e, "Fehler beim Exportieren der Performance-Daten")
+    
+    def load_from_ledger(self):
+        """
+        Lädt die komplette Trade-Historie aus dem Ledger und berechnet die Metriken spaltenweise.
+        Die Trades werden dabei nicht als Dictionaries aufgebaut (self.trades enthält nur die
+        Trades dieser Sitzung).
+        """
+        try:
+            records = trade_ledger.get_trade_ledger().read()
+            self._reset_metrics()
+            self._apply_columns(records['profit'], records['day'])
         except Exception as e:
             utils.log_error(e, "Fehler beim Laden der Performance-Daten")
     
+    def set_trades(self, trades):
+        """
+        Übernimmt eine vollständige Trade-Liste (z.B. aus einem Backtest) und berechnet alle
+        Metriken in einem Durchlauf, ohne Einzelausgabe und ohne Speicherung pro Trade.
+        
+        Parameters:
+        trades: Liste von Trade-Dictionaries (gleiche Schlüssel wie in add_trade)
+        """
+        self.trades = list(trades)
+        self.calculate_metrics()
+    
     def calculate_metrics(self):
-        """Berechnet Performance-Metriken basierend auf den gespeicherten Trades"""
+        """Berechnet Performance-Metriken basierend auf den gespeicherten Trades (self.trades)"""
+        self._reset_metrics()
         if not self.trades:
             return
         
         # Aktualisiere Währungsinformationen
         self.quote_currency = config.get_quote_currency()
         
-        # Total Profit
-        self.total_profit = sum(trade['profit'] for trade in self.trades)
-        
-        # Win Rate
-        if self.total_trades > 0:
-            self.win_rate = self.winning_trades / self.total_trades
-        
-        # Profit Factor
-        total_wins = sum(trade['profit'] for trade in self.trades if trade['profit'] > 0)
-        total_losses = sum(abs(trade['profit']) for trade in self.trades if trade['profit'] < 0)
-        
-        if total_losses > 0:
-            self.profit_factor = total_wins / total_losses
-        
-        # Average Win/Loss
-        if self.winning_trades > 0:
-            self.avg_win = total_wins / self.winning_trades
-        
-        if self.losing_trades > 0:
-            self.avg_loss = total_losses / self.losing_trades
-        
-        # Largest Win/Loss
-        if self.winning_trades > 0:
-            self.largest_win = max(trade['profit'] for trade in self.trades if trade['profit'] > 0)
-        
-        if self.losing_trades > 0:
-            self.largest_loss = max(abs(trade['profit']) for trade in self.trades if trade['profit'] < 0)
-        
-        # Berechne täglichen P&L
+        profits = np.array([float(trade['profit']) for trade in self.trades], dtype=np.float64)
+        days = np.array([trade_ledger.trade_datetime(trade['time']).date().toordinal() for trade in self.trades], dtype=np.int64)
+        self._apply_columns(profits, days)
+    
+    def _reset_metrics(self):
         self.daily_pnl = {}
-        for trade in self.trades:
-            trade_date = pd.to_datetime(trade['time']).date() if isinstance(trade['time'], str) else trade['time'].date()
-            if trade_date not in self.daily_pnl:
-                self.daily_pnl[trade_date] = 0
-            self.daily_pnl[trade_date] += trade['profit']
-        
-        # Berechne maximale aufeinanderfolgende Gewinne/Verluste
-        self.calculate_consecutive_wins_losses()
+        self.total_trades = self.winning_trades = self.losing_trades = 0
+        self.total_profit = self.gross_profit = self.gross_loss = 0
+        self.win_rate = self.profit_factor = self.avg_win = self.avg_loss = 0
+        self.largest_win = self.largest_loss = 0
+        self.consecutive_wins = self.consecutive_losses = 0
+        self.max_consecutive_wins = self.max_consecutive_losses = 0
+        self.max_drawdown = 0
+        self.peak_equity = self.initial_balance
     
-    def calculate_consecutive_wins_losses(self):
-        """Berechnet die maximale Anzahl aufeinanderfolgender Gewinne und Verluste"""
-        if not self.trades:
+    def _apply_columns(self, profits, days):
+        """
+        Schreibt die Metriken mit vielen Trades auf einmal fort (vektorisiert, Trades in zeitlicher
+        Reihenfolge). Liefert dieselben Werte wie _apply_trade für jeden einzelnen Trade.
+        
+        Parameters:
+        profits: Gewinn/Verlust pro Trade
+        days: Datum pro Trade als Ordinalzahl (date.toordinal)
+        """
+        profits = np.asarray(profits, dtype=np.float64)
+        if len(profits) == 0:
             return
-        
-        # Sortiere Trades nach Zeit
-        sorted_trades = sorted(self.trades, key=lambda x: x['time'])
-        
-        current_wins = 0
-        current_losses = 0
-        
-        for trade in sorted_trades:
-            if trade['profit'] > 0:
-                current_wins += 1
-                current_losses = 0
-                if current_wins > self.max_consecutive_wins:
-                    self.max_consecutive_wins = current_wins
-            elif trade['profit'] < 0:
-                current_losses += 1
-                current_wins = 0
-                if current_losses > self.max_consecutive_losses:
-                    self.max_consecutive_losses = current_losses
+        wins = profits[profits > 0]
+        losses = -profits[profits < 0]
+        
+        self.total_trades += len(profits)
+        self.winning_trades += len(wins)
+        self.losing_trades += len(losses)
+        self.total_profit += float(profits.sum())
+        self.gross_profit += float(wins.sum())
+        self.gross_loss += float(losses.sum())
+        self.largest_win = max(self.largest_win, float(wins.max(initial=0)))
+        self.largest_loss = max(self.largest_loss, float(losses.max(initial=0)))
+        if self.winning_trades > 0:
+            self.avg_win = self.gross_profit / self.winning_trades
+        if self.losing_trades > 0:
+            self.avg_loss = self.gross_loss / self.losing_trades
+        self.win_rate = self.winning_trades / self.total_trades
+        if self.gross_loss > 0:
+            self.profit_factor = self.gross_profit / self.gross_loss
+        
+        # Täglicher P&L
+        unique_days, inverse = np.unique(np.asarray(days), return_inverse=True)
+        day_sums = np.bincount(inverse, weights=profits)
+        for day, day_profit in zip(unique_days.tolist(), day_sums.tolist()):
+            trade_date = date.fromordinal(day)
+            self.daily_pnl[trade_date] = self.daily_pnl.get(trade_date, 0) + day_profit
+        
+        # Serien: Läufe gleichen Vorzeichens (Trades mit 0 Gewinn unterbrechen keine Serie)
+        signs = np.sign(profits[profits != 0])
+        if len(signs):
+            starts = np.flatnonzero(np.diff(signs, prepend=0))
+            lengths = np.diff(np.append(starts, len(signs)))
+            run_signs = signs[starts]
+            # Die erste Serie setzt eine laufende Serie gleichen Vorzeichens fort
+            if run_signs[0] > 0:
+                lengths[0] += self.consecutive_wins
+            else:
+                lengths[0] += self.consecutive_losses
+            self.max_consecutive_wins = max(self.max_consecutive_wins, int(lengths[run_signs > 0].max(initial=0)))
+            self.max_consecutive_losses = max(self.max_consecutive_losses, int(lengths[run_signs < 0].max(initial=0)))
+            self.consecutive_wins = int(lengths[-1]) if run_signs[-1] > 0 else 0
+            self.consecutive_losses = int(lengths[-1]) if run_signs[-1] < 0 else 0
+        
+        # Drawdown der realisierten Equity-Kurve
+        if self.initial_balance is not None:
+            equity = self.initial_balance + (self.total_profit - float(profits.sum())) + np.cumsum(profits)
+            peak = np.maximum.accumulate(np.maximum(equity, self.peak_equity if self.peak_equity is not None else equity[0]))
+            valid = peak > 0
+            if valid.any():
+                self.max_drawdown = max(self.max_drawdown, float(((peak[valid] - equity[valid]) / peak[valid]).max()))
+            self.peak_equity = float(peak[-1])
     
     def print_summary(self):
         """Gibt eine Zusammenfassung der Performance aus"""
@@ -0,0 +1,527 @@
+import heapq
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from colorama import Fore, Style
+import account_state
+import analysis_cache
+import exchange_handler
+import incremental_indicators
+import indicators
+import performance
+import risk_management
+import structured_logging
+import utils
+import config
+from strategy_factory import StrategyFactory
+
+
+logger = structured_logging.get_logger(__name__)
+
+# Strategien, die das tatsächliche Guthaben als Parameter erhalten (wie in main.run_bot)
+_BALANCE_AWARE_STRATEGIES = ('DAY_TRADER', 'SMALL_CAPITAL')
+
+_EMPTY_POSITION_INFO = {'size': 0, 'type': 'KEINE', 'entry_price': 0, 'liquidation_price': 0, 'unrealized_pnl': 0, 'leverage': 1}
+
+
+class PortfolioScheduler:
+    """
+    Gemeinsamer Taktgeber für alle Symbole. Jedes Symbol hat einen eigenen Fälligkeitszeitpunkt,
+    fällige Symbole werden gemeinsam abgearbeitet. Nach Fehlern verschiebt sich nur der Termin
+    des betroffenen Symbols (Backoff wie in main.run_bot).
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._queue = []  # Heap aus (Fälligkeit, Symbol)
+
+    def schedule(self, symbol, due_time):
+        heapq.heappush(self._queue, (due_time, symbol))
+
+    def pop_due(self, now=None):
+        """Entnimmt alle fälligen Symbole (mit ihrer geplanten Fälligkeit)"""
+        now = time.monotonic() if now is None else now
+        due = []
+        while self._queue and self._queue[0][0] <= now:
+            due.append(heapq.heappop(self._queue))
+        return due
+
+    def time_until_next(self, now=None):
+        if not self._queue:
+            return self.interval
+        now = time.monotonic() if now is None else now
+        return max(self._queue[0][0] - now, 0)
+
+    def reschedule(self, symbol, planned_time, failures=0):
+        """Plant den nächsten Lauf ohne Drift; bei Fehlern mit wachsender Wartezeit (max. 5 Minuten)"""
+        now = time.monotonic()
+        if failures:
+            self.schedule(symbol, now + min(self.interval * failures, 300))
+        else:
+            self.schedule(symbol, max(planned_time + self.interval, now))
+
+
+class SharedAccount:
+    """
+    Gemeinsames Konto aller Symbole: verfügbares Quote-Guthaben, Anzahl offener Positionen
+    und Gesamtrisiko (potenzieller Verlust bis zum Stop-Loss über alle Positionen).
+    """
+
+    def __init__(self, quote_currency, state=None):
+        """
+        Parameters:
+        quote_currency: Gemeinsame Quote-Währung aller Symbole
+        state: Optional - AccountState, aus dem das Guthaben gelesen wird (statt fetch_balance)
+        """
+        self.quote_currency = quote_currency
+        self.quote_balance = 0
+        self.state = state
+        self._position_risk = {}  # Symbol -> potenzieller Verlust in der Quote-Währung
+        self._lock = threading.Lock()
+
+    def refresh(self, exchange):
+        """Aktualisiert das Guthaben (aus dem AccountState, sonst ein API-Aufruf pro Zyklus für alle Symbole)"""
+        try:
+            balance = self.state.get_balance(exchange) if self.state is not None else exchange.fetch_balance()
+            with self._lock:
+                if config.USE_TESTNET:
+                    self.quote_balance = balance[self.quote_currency]['free']
+                else:
+                    self.quote_balance = balance.get(self.quote_currency, {}).get('free', 0)
+        except Exception as e:
+            utils.log_error(e, f"Fehler beim Aktualisieren des {self.quote_currency}-Kontostands - verwende letzten bekannten Wert")
+        return self.quote_balance
+
+    def adjust_balance(self, amount):
+        """Verbucht einen Trade lokal, damit folgende Symbole im selben Zyklus das reduzierte Guthaben sehen"""
+        with self._lock:
+            self.quote_balance += amount
+
+    @property
+    def open_positions(self):
+        with self._lock:
+            return len(self._position_risk)
+
+    @property
+    def total_risk(self):
+        with self._lock:
+            return sum(self._position_risk.values())
+
+    def set_position_risk(self, symbol, risk):
+        with self._lock:
+            if risk > 0:
+                self._position_risk[symbol] = risk
+            else:
+                self._position_risk.pop(symbol, None)
+
+    def can_open(self, symbol, additional_risk):
+        """
+        Prüft die Portfolio-Grenzen für eine neue Position.
+
+        Returns:
+        tuple: (erlaubt, Grund)
+        """
+        with self._lock:
+            if symbol not in self._position_risk and len(self._position_risk) >= config.PORTFOLIO_MAX_OPEN_POSITIONS:
+                return False, f"Maximale Anzahl offener Positionen erreicht ({config.PORTFOLIO_MAX_OPEN_POSITIONS})"
+
+            risk_after = sum(risk for other, risk in self._position_risk.items() if other != symbol) + additional_risk
+            risk_limit = self.quote_balance * config.PORTFOLIO_MAX_TOTAL_RISK
+            if risk_after > risk_limit:
+                return False, f"Gesamtrisiko zu hoch: {risk_after:.2f} {self.quote_currency} (Limit {risk_limit:.2f})"
+        return True, None
+
+
+class SymbolContext:
+    """Zustand eines Symbols im Portfolio: eigene Strategie-Instanz, Position und letzte Analyse"""
+
+    def __init__(self, symbol, strategy_name):
+        self.symbol = symbol
+        self.strategy_name = strategy_name
+        self.strategy_instance, self.strategy_func = StrategyFactory.create_strategy_instance(strategy_name)
+        self.base_currency = config.get_base_currency(symbol)
+        self.quote_currency = config.get_quote_currency(symbol)
+
+        self.position = 0
+        self.position_info = dict(_EMPTY_POSITION_INFO)
+        self.entry_price = 0
+
+        self.df = None
+        self.current_price = 0
+        self.signal = 0
+        self.strategy_info = {}
+        self.risk_result = {}
+        self.last_action = None
+        self.consecutive_failures = 0
+
+    def analyze(self, exchange, quote_balance):
+        """
+        Holt Marktdaten, berechnet Indikatoren, Signal und Risikoprüfung.
+        Läuft im Thread-Pool parallel zu den anderen Symbolen - hier werden keine Orders ausgeführt.
+
+        Returns:
+        bool: True wenn gültige Daten vorliegen
+        """
+        try:
+            if config.USE_CANDLE_STORE:
+                df = exchange_handler.update_historical_data(exchange, self.symbol, config.TIMEFRAME, config.LIMIT)
+            else:
+                df = exchange_handler.get_historical_data(exchange, self.symbol, config.TIMEFRAME, config.LIMIT)
+            if df.empty:
+                self.consecutive_failures += 1
+                self.signal = 0
+                return False
+
+            if config.USE_INCREMENTAL_INDICATORS:
+                df = incremental_indicators.calculate_all_indicators_incremental(df, self.symbol, config.TIMEFRAME)
+            else:
+                df = indicators.calculate_all_indicators(df)
+
+            self.consecutive_failures = 0
+            self.df = df
+            self.current_price = df['close'].iloc[-1]
+
+            try:
+                analysis_cache.set_market(self.symbol, config.TIMEFRAME)  # Schlüssel für den Analyse-Cache dieses Threads
+                if self.strategy_name in _BALANCE_AWARE_STRATEGIES and self.strategy_instance is not None:
+                    self.signal, self.strategy_info = self.strategy_func(df, actual_balance=quote_balance)
+                else:
+                    self.signal, self.strategy_info = self.strategy_func(df)
+            except Exception as e:
+                error_msg = f"Fehler bei Ausführung der {self.strategy_name} Strategie für {self.symbol}: {str(e)}"
+                utils.log_error(e, error_msg)
+                self.strategy_info = {
+                    'strategy': f"{self.strategy_name} (Fehler)",
+                    'description': error_msg,
+                    'signal_details': f"Fehler: {str(e)}",
+                    'selected_strategy': 'NONE'
+                }
+                self.signal = 0
+
+            self.risk_result = risk_management.check_risk(df, self.position, self.current_price, self.entry_price, quote_balance)
+            return True
+
+        except Exception as e:
+            self.consecutive_failures += 1
+            self.signal = 0
+            utils.log_error(e, f"Fehler bei der Analyse von {self.symbol}")
+            return False
+
+    def set_position(self, size, entry_price):
+        self.position = size
+        self.entry_price = entry_price if size != 0 else 0
+        position_type = "LONG" if size > 0 else ("SHORT" if size < 0 else "KEINE")
+        self.position_info = dict(_EMPTY_POSITION_INFO, size=size, type=position_type, entry_price=self.entry_price)
+        utils.save_position_state(size, position_type, self.entry_price, self.symbol)
+
+    def position_risk(self, size=None, entry_price=None):
+        """Potenzieller Verlust bis zum Stop-Loss in der Quote-Währung"""
+        size = self.position if size is None else size
+        entry_price = self.entry_price if entry_price is None else entry_price
+        if size == 0 or entry_price <= 0:
+            return 0
+        atr = self.df['atr'].iloc[-1] if self.df is not None and 'atr' in self.df.columns else None
+        position_type = 'LONG' if size > 0 else 'SHORT'
+        stop_loss = risk_management.calculate_stop_loss(entry_price, position_type, atr)
+        return abs(entry_price - stop_loss) * abs(size)
+
+
+class PortfolioRunner:
+    """
+    Handelt mehrere Symbole aus einem Prozess. Ein gemeinsamer Scheduler bestimmt die fälligen
+    Symbole; Datenabfrage, Indikatoren und Strategie laufen parallel im Thread-Pool. Orders werden
+    danach nacheinander in fester Symbolreihenfolge ausgeführt, damit Guthaben und Gesamtrisiko
+    konsistent bleiben.
+    """
+
+    def __init__(self, exchange, symbols=None, interval=None, max_workers=None):
+        self.exchange = exchange
+        self.symbols = list(symbols or config.PORTFOLIO_SYMBOLS)
+        self.interval = config.UPDATE_INTERVAL if interval is None else interval
+        self.contexts = {
+            symbol: SymbolContext(symbol, config.PORTFOLIO_STRATEGIES.get(symbol, config.ACTIVE_STRATEGY))
+            for symbol in self.symbols
+        }
+
+        quote_currencies = {context.quote_currency for context in self.contexts.values()}
+        if len(quote_currencies) > 1:
+            raise ValueError(f"Alle Portfolio-Symbole benötigen dieselbe Quote-Währung (gefunden: {', '.join(sorted(quote_currencies))})")
+
+        self.account = SharedAccount(quote_currencies.pop())
+        self.scheduler = PortfolioScheduler(self.interval)
+        self.performance_tracker = performance.PerformanceTracker()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or config.PORTFOLIO_MAX_WORKERS, thread_name_prefix='portfolio')
+        self.cycle_count = 0
+        self._stop_event = threading.Event()
+
+    # ---- Initialisierung ----
+
+    def _sync_position(self, context):
+        """Gleicht die Position eines Symbols mit der API ab (API hat Vorrang, wie in main.run_bot)"""
+        if self.account.state is not None:
+            api_position, api_position_info = self.account.state.get_position(self.exchange, context.symbol)
+        else:
+            api_position, api_position_info = exchange_handler.get_position(self.exchange, context.symbol)
+        saved_size, saved_type, saved_entry = utils.load_position_state(context.symbol)
+
+        entry_price = api_position_info.get('entry_price', 0)
+        if entry_price == 0 and api_position != 0:
+            entry_price = saved_entry if context.entry_price == 0 else context.entry_price
+
+        if api_position != saved_size:
+            logger.warning("%s: Positions-Diskrepanz (API %s, lokal %s) - synchronisiere mit API-Daten", context.symbol, api_position, saved_size)
+
+        context.set_position(api_position, entry_price)
+        self.account.set_position_risk(context.symbol, context.position_risk())
+
+    def initialize(self):
+        """Lädt Guthaben und Positionen aller Symbole (parallel)"""
+        if config.USE_ACCOUNT_STATE and self.account.state is None:
+            # Kontostand und Positionen: einmal per REST, danach aus Order-Antworten und User-Data-Stream
+            self.account.state = account_state.start_account_state(self.exchange, self.symbols)
+        balance = self.account.refresh(self.exchange)
+        self.performance_tracker.set_initial_balance(balance)
+        print(f"{Fore.GREEN}Portfolio initialisiert: {', '.join(self.symbols)}{Style.RESET_ALL}")
+        print(f"{Fore.YELLOW}Verfügbares {self.account.quote_currency}: {balance:.2f}{Style.RESET_ALL}")
+
+        list(self.executor.map(self._sync_position, self.contexts.values()))
+
+        start = time.monotonic()
+        for symbol in self.symbols:
+            self.scheduler.schedule(symbol, start)
+
+    # ---- Handelsausführung ----
+
+    def _open_position(self, context, side, size):
+        """Eröffnet eine Position nach Prüfung der Portfolio-Grenzen"""
+        price = context.current_price
+        allowed, reason = self.account.can_open(context.symbol, context.position_risk(size, price))
+        if not allowed:
+            logger.info("%s: Handelssignal ignoriert wegen Portfolio-Risiko: %s", context.symbol, reason, extra={'color': Fore.YELLOW})
+            return False
+
+        order = exchange_handler.execute_trade(self.exchange, context.symbol, side, size, price)
+        if not order:
+            return False
+
+        self._apply_order(context, order)
+        filled = order.get('filled') or size
+        signed = filled if side == 'buy' else -filled
+        context.set_position(context.position + signed, price)
+        self.account.adjust_balance(-filled * price)
+        self.account.set_position_risk(context.symbol, context.position_risk())
+        self._notify_strategy(context, 'BUY' if side == 'buy' else 'SELL', price)
+        return True
+
+    def _close_position(self, context, size, trade_type):
+        """Schließt (einen Teil) der Position und verbucht den Gewinn/Verlust"""
+        price = context.current_price
+        side = 'sell' if context.position > 0 else 'buy'
+        order = exchange_handler.execute_trade(self.exchange, context.symbol, side, size, price, closing=True)
+        if not order:
+            return None
+
+        self._apply_order(context, order)
+        filled = order.get('filled') or size
+        trade_profit = None
+        if context.entry_price > 0:
+            if context.position > 0:
+                trade_profit = filled * (price - context.entry_price)
+            else:
+                trade_profit = filled * (context.entry_price - price)
+            self.performance_tracker.add_trade(trade_type, context.entry_price, price, filled, trade_profit, context.symbol)
+
+        entry_price = context.entry_price
+        remaining = context.position - filled if context.position > 0 else context.position + filled
+        context.set_position(remaining if abs(remaining) > 1e-12 else 0, entry_price)
+        self.account.adjust_balance(filled * price if trade_type == 'SPOT' else filled * entry_price + (trade_profit or 0))
+        self.account.set_position_risk(context.symbol, context.position_risk())
+        self._notify_strategy(context, 'SELL' if side == 'sell' else 'BUY', price, entry_price, trade_profit)
+        return trade_profit
+
+    def _apply_order(self, context, order):
+        """Schreibt eine ausgeführte Order im AccountState fort (nächster Zyklus ohne REST-Abfrage)"""
+        if self.account.state is not None:
+            self.account.state.apply_order(order, context.symbol)
+
+    def _notify_strategy(self, context, trade_type, price, entry_price=None, profit=None):
+        """Meldet Trades an die Strategie-Instanz des Symbols (Selbstoptimierung, letzte Kauf-/Verkaufspreise)"""
+        instance = context.strategy_instance
+        if instance is None:
+            return
+        try:
+            if context.strategy_name == 'DAY_TRADER' and profit is not None:
+                instance.record_trade_result(trade_type, entry_price, price, profit)
+            elif context.strategy_name == 'SMALL_CAPITAL':
+                if trade_type == 'BUY':
+                    instance.last_buy_price = price
+                else:
+                    instance.last_sell_price = price
+                instance.last_trade_time = datetime.now()
+                instance.last_trade_type = trade_type
+        except Exception as e:
+            logger.warning("Info: Fehler beim Aktualisieren der Trade-Informationen für %s: %s", context.symbol, e)
+
+    def _describe_profit(self, profit):
+        if profit is None:
+            return ""
+        profit_color = Fore.GREEN if profit > 0 else Fore.RED
+        return f" (G/V: {profit_color}{profit:.2f} {self.account.quote_currency}{Style.RESET_ALL})"
+
+    def _execute_signal(self, context):
+        """Setzt das Signal eines Symbols um (Logik wie in main.run_bot)"""
+        signal = context.signal
+        if signal == 0 or not context.risk_result.get('allow_trade', False):
+            if signal != 0:
+                context.last_action = f"Signal ignoriert: {context.risk_result.get('reason', 'Unbekannter Risikogrund')}"
+            return
+
+        price = context.current_price
+        quote = self.account.quote_currency
+
+        if config.USE_TESTNET:
+            # FUTURES: Gegenposition schließen, dann neue Position eröffnen
+            if signal > 0 and context.position <= 0:
+                if context.position < 0:
+                    profit = self._close_position(context, abs(context.position), 'SHORT')
+                    context.last_action = f"{Fore.YELLOW}SHORT Position geschlossen{Style.RESET_ALL}{self._describe_profit(profit)}"
+                size = risk_management.calculate_position_size(self.account.quote_balance, price, config.QUANTITY, context.symbol)
+                if self._open_position(context, 'buy', size):
+                    context.last_action = f"{Fore.GREEN}LONG Position eröffnet @ {price:.2f} {quote}{Style.RESET_ALL}"
+            elif signal < 0 and context.position >= 0:
+                if context.position > 0:
+                    profit = self._close_position(context, context.position, 'LONG')
+                    context.last_action = f"{Fore.YELLOW}LONG Position geschlossen{Style.RESET_ALL}{self._describe_profit(profit)}"
+                size = risk_management.calculate_position_size(self.account.quote_balance, price, config.QUANTITY, context.symbol)
+                if self._open_position(context, 'sell', size):
+                    context.last_action = f"{Fore.RED}SHORT Position eröffnet @ {price:.2f} {quote}{Style.RESET_ALL}"
+        else:
+            # SPOT: Kaufen mit Quote-Guthaben, Verkaufen vorhandener Base-Bestände
+            if signal > 0:
+                size = exchange_handler.calculate_quantity(self.exchange, price, self.account.quote_balance, context.symbol)
+                trade_value = size * price
+                if self.account.quote_balance > trade_value:
+                    if self._open_position(context, 'buy', size):
+                        context.last_action = f"{Fore.GREEN}Kauf von {size} {context.base_currency} @ {price:.2f} {quote}{Style.RESET_ALL}"
+                else:
+                    context.last_action = f"Nicht genug {quote} für Kauf: {self.account.quote_balance:.2f} verfügbar, {trade_value:.2f} benötigt"
+            elif signal < 0 and context.position > 0:
+                sell_size = min(context.position, config.QUANTITY)
+                if config.QUANTITY_TYPE == 'PERCENTAGE':
+                    sell_size = min(context.position, context.position * config.QUANTITY)
+                profit = self._close_position(context, sell_size, 'SPOT')
+                context.last_action = f"{Fore.RED}Verkauf von {sell_size} {context.base_currency} @ {price:.2f} {quote}{Style.RESET_ALL}{self._describe_profit(profit)}"
+
+    # ---- Zyklus ----
+
+    def _reconcile_positions(self):
+        logger.info("Führe regelmäßige Positions-Überprüfung für alle Symbole durch...", extra={'color': Fore.YELLOW})
+        if self.account.state is not None:
+            self.account.state.invalidate()  # Abgleich per REST statt aus dem Zwischenspeicher
+        list(self.executor.map(self._sync_position, self.contexts.values()))
+
+    def run_cycle(self, due):
+        """
+        Verarbeitet die fälligen Symbole eines Scheduler-Takts.
+
+        Parameters:
+        due: Liste von (geplante Fälligkeit, Symbol)
+        """
+        quote_balance = self.account.refresh(self.exchange)
+        self.performance_tracker.update_balance(quote_balance)
+
+        # Datenabfrage und Analyse überlappen sich für alle fälligen Symbole
+        contexts = [self.contexts[symbol] for _, symbol in due]
+        results = list(self.executor.map(lambda context: context.analyze(self.exchange, quote_balance), contexts))
+
+        # Orders nacheinander in Konfigurationsreihenfolge
+        for (planned_time, symbol), ok in sorted(zip(due, results), key=lambda item: self.symbols.index(item[0][1])):
+            context = self.contexts[symbol]
+            if ok:
+                try:
+                    self._execute_signal(context)
+                except Exception as e:
+                    utils.log_error(e, f"Fehler bei der Handelsausführung für {symbol}")
+            else:
+                logger.warning("Keine gültigen Daten für %s verfügbar (Fehler #%s)", symbol, context.consecutive_failures, extra={'color': Fore.RED})
+            self.scheduler.reschedule(symbol, planned_time, context.consecutive_failures)
+
+        self.cycle_count += 1
+        if self.cycle_count % config.PORTFOLIO_RECONCILE_INTERVAL == 0:
+            self._reconcile_positions()
+
+        self.print_status()
+
+    def print_status(self):
+        """Kompakte Übersicht über alle Symbole und das gemeinsame Konto"""
+        quote = self.account.quote_currency
+        print(f"\n{Fore.CYAN}=== Portfolio ({datetime.now().strftime('%H:%M:%S')}) - Zyklus {self.cycle_count} ==={Style.RESET_ALL}")
+        print(f"{'Symbol':<12} {'Preis':>12} {'Signal':>7} {'Position':>14} {'Einstieg':>12}  Letzte Aktion")
+        for symbol in self.symbols:
+            context = self.contexts[symbol]
+            signal_text = {1: f"{Fore.GREEN}KAUF{Style.RESET_ALL}", -1: f"{Fore.RED}VERK{Style.RESET_ALL}"}.get(context.signal, "HALT")
+            print(f"{symbol:<12} {context.current_price:>12.4f} {signal_text:>7} {context.position:>14.6f} {context.entry_price:>12.4f}  {context.last_action or '-'}")
+        print(f"{Fore.YELLOW}Verfügbar: {self.account.quote_balance:.2f} {quote} | Offene Positionen: {self.account.open_positions}/{config.PORTFOLIO_MAX_OPEN_POSITIONS} | Gesamtrisiko: {self.account.total_risk:.2f} {quote}{Style.RESET_ALL}")
+
+    def run(self, max_cycles=None):
+        """
+        Hauptschleife des Portfolio-Modus.
+
+        Parameters:
+        max_cycles: Optional - Anzahl der Zyklen (None = bis STRG+C oder stop())
+        """
+        self.initialize()
+        try:
+            while not self._stop_event.is_set():
+                due = self.scheduler.pop_due()
+                if not due:
+                    self._stop_event.wait(self.scheduler.time_until_next())
+                    continue
+
+                try:
+                    self.run_cycle(due)
+                except Exception as e:
+                    utils.log_error(e, "Fehler im Portfolio-Hauptloop")
+                    for planned_time, symbol in due:
+                        self.scheduler.reschedule(symbol, planned_time, 1)
+
+                if max_cycles is not None and self.cycle_count >= max_cycles:
+                    break
+        except KeyboardInterrupt:
+            print(f"\n{Fore.YELLOW}Portfolio-Modus wird beendet...{Style.RESET_ALL}")
+            self.performance_tracker.print_summary()
+            self.close_all_positions()
+        finally:
+            self.executor.shutdown(wait=True)
+            if self.account.state is not None:
+                self.account.state.stop()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def close_all_positions(self):
+        """Schließt alle offenen Positionen (beim Beenden)"""
+        for context in self.contexts.values():
+            if context.position == 0:
+                continue
+            logger.info("Schließe offene Position für %s...", context.symbol, extra={'color': Fore.YELLOW})
+            try:
+                side = 'sell' if context.position > 0 else 'buy'
+                order = exchange_handler.execute_trade(self.exchange, context.symbol, side, abs(context.position), context.current_price, closing=True)
+                if order:
+                    self._apply_order(context, order)
+                    context.set_position(0, 0)
+                    self.account.set_position_risk(context.symbol, 0)
+            except Exception as e:
+                utils.log_error(e, f"Fehler beim Schließen der Position für {context.symbol}")
+
+
+def run_portfolio(exchange, symbols=None):
+    """Startet den Portfolio-Modus mit den konfigurierten Symbolen"""
+    trading_mode = "Binance Futures Testnet" if config.USE_TESTNET else "Binance Spot Live"
+    runner = PortfolioRunner(exchange, symbols)
+    print(f"\n{Fore.CYAN}Portfolio-Modus gestartet für {', '.join(runner.symbols)} auf {trading_mode}...{Style.RESET_ALL}")
+    runner.run()
+    print(f"{Fore.GREEN}Portfolio-Modus erfolgreich beendet!{Style.RESET_ALL}")
+    return runner
@@ -0,0 +1,235 @@
+"""
+Positionsstatus im Speicher mit Journal auf der Festplatte (ersetzt das Neuschreiben von
+position_state.txt in jedem Zyklus).
+
+Jede echte Positionsänderung wird als JSON-Zeile an position_state[_SYMBOL].journal angehängt
+(Größe, Typ, Einstiegs-/Ausstiegspreis, Order-ID). fsync läuft gebündelt höchstens alle
+config.POSITION_JOURNAL_FSYNC_INTERVAL Sekunden. Nach config.POSITION_JOURNAL_SNAPSHOT_EVERY
+Einträgen wird der Zustand atomar als .snapshot geschrieben und das Journal geleert. Beim Start
+wird der Snapshot geladen und nur das kurze Journal dahinter nachgespielt; eine nach einem
+Absturz unvollständige letzte Zeile wird verworfen.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from colorama import Fore, Style
+import config
+
+
+def state_base_path(symbol=None):
+    """Dateiname ohne Endung (im Portfolio-Modus eine Datei pro Symbol), z.B. position_state_BTCUSDT"""
+    if symbol is None:
+        return "position_state"
+    return f"position_state_{symbol.replace('/', '').replace(':', '_')}"
+
+
+class PositionJournal:
+    """Positionsstatus eines Symbols mit Append-only-Journal und atomaren Snapshots"""
+
+    def __init__(self, base_path, symbol=None):
+        """
+        Parameters:
+        base_path: Dateiname ohne Endung (.journal, .snapshot, .txt für den alten Positionsstatus)
+        symbol: Handelssymbol (nur für Ausgaben)
+        """
+        self.symbol = symbol
+        self.journal_path = f"{base_path}.journal"
+        self.snapshot_path = f"{base_path}.snapshot"
+        self.legacy_path = f"{base_path}.txt"
+
+        self._state = {'size': 0.0, 'type': 'KEINE', 'entry_price': 0.0, 'exit_price': 0.0, 'order_id': None, 'timestamp': None}
+        self._seq = 0
+        self._records_since_snapshot = 0
+        self._file = None
+        self._last_fsync = 0.0
+        self._fsync_timer = None
+        self._lock = threading.Lock()
+
+        self._replay()
+
+    # ---- Start ----
+
+    def _replay(self):
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'r') as f:
+                snapshot = json.load(f)
+            self._seq = snapshot['seq']
+            self._state.update(snapshot['state'])
+        elif not os.path.exists(self.journal_path) and os.path.exists(self.legacy_path):
+            self._import_legacy()
+
+        if os.path.exists(self.journal_path):
+            valid_bytes = 0
+            with open(self.journal_path, 'rb') as f:
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("unvollständige Zeile")
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # Abbruch während des Schreibens: Rest verwerfen
+                    valid_bytes += len(line)
+                    self._records_since_snapshot += 1
+                    if record['seq'] > self._seq:
+                        self._apply(record)
+            if valid_bytes < os.path.getsize(self.journal_path):
+                os.truncate(self.journal_path, valid_bytes)
+
+        if self._state['size'] != 0:
+            base_currency = config.get_base_currency(self.symbol)
+            quote_currency = config.get_quote_currency(self.symbol)
+            print(f"{Fore.GREEN}[{datetime.now().strftime('%H:%M:%S')}] Gespeicherte Position gefunden: {self._state['type']} {abs(self._state['size'])} {base_currency} @ {self._state['entry_price']} {quote_currency}{Style.RESET_ALL}")
+
+    def _import_legacy(self):
+        """Übernimmt einmalig den Positionsstatus aus dem alten Format (position_state.txt)"""
+        try:
+            with open(self.legacy_path, 'r') as f:
+                data = f.read().strip().split(",")
+            if len(data) == 3:
+                self._state.update({'size': float(data[0]), 'type': data[1], 'entry_price': float(data[2])})
+        except Exception as e:
+            print(f"{Fore.RED}Fehler beim Laden des Positionsstatus: {str(e)}{Style.RESET_ALL}")
+
+    def _apply(self, record):
+        self._seq = record['seq']
+        self._state.update({key: record[key] for key in self._state if key in record})
+
+    # ---- Zugriff ----
+
+    def state(self):
+        """
+        Aktueller Positionsstatus (ohne Dateizugriff).
+
+        Returns:
+        tuple: (Positionsgröße, Positionstyp, Einstiegspreis) wie utils.load_position_state
+        """
+        with self._lock:
+            return self._state['size'], self._state['type'], self._state['entry_price']
+
+    def differs(self, position_size, position_type=None):
+        """Abgleich mit einer Position von get_position (Größe und ggf. Typ)"""
+        with self._lock:
+            if abs(self._state['size'] - position_size) > 1e-12:
+                return True
+            return position_type is not None and position_type != self._state['type']
+
+    def record(self, position_size, position_type, entry_price, order_id=None, exit_price=None):
+        """
+        Schreibt eine Positionsänderung ins Journal. Unveränderte Zustände lösen keinen
+        Dateizugriff aus.
+
+        Parameters:
+        position_size: Positionsgröße (negativ für Short)
+        position_type: 'LONG', 'SHORT' oder 'KEINE'
+        entry_price: Einstiegspreis
+        order_id: ID der auslösenden Order (optional)
+        exit_price: Ausstiegspreis beim Reduzieren oder Schließen (optional)
+
+        Returns:
+        bool: True wenn eine Änderung geschrieben wurde
+        """
+        position_size = float(position_size)
+        entry_price = float(entry_price or 0)
+        with self._lock:
+            state = self._state
+            if (abs(state['size'] - position_size) <= 1e-12 and state['type'] == position_type
+                    and state['entry_price'] == entry_price and order_id in (None, state['order_id'])):
+                return False
+
+            self._seq += 1
+            record = {
+                'seq': self._seq,
+                'timestamp': time.time(),
+                'size': position_size,
+                'type': position_type,
+                'entry_price': entry_price,
+                'exit_price': float(exit_price) if exit_price is not None else state['exit_price'],
+                'order_id': order_id if order_id is not None else state['order_id']
+            }
+            self._apply(record)
+
+            if self._file is None:
+                self._file = open(self.journal_path, 'a')
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+            self._records_since_snapshot += 1
+
+            if self._records_since_snapshot >= config.POSITION_JOURNAL_SNAPSHOT_EVERY:
+                self._snapshot()
+            else:
+                self._schedule_fsync()
+        return True
+
+    # ---- Dauerhaftigkeit ----
+
+    def _schedule_fsync(self):
+        elapsed = time.monotonic() - self._last_fsync
+        if elapsed >= config.POSITION_JOURNAL_FSYNC_INTERVAL:
+            self._fsync()
+        elif self._fsync_timer is None:
+            # Weitere Änderungen innerhalb des Intervalls teilen sich einen fsync
+            self._fsync_timer = threading.Timer(config.POSITION_JOURNAL_FSYNC_INTERVAL - elapsed, self.sync)
+            self._fsync_timer.daemon = True
+            self._fsync_timer.start()
+
+    def _fsync(self):
+        if self._file is not None:
+            os.fsync(self._file.fileno())
+        self._last_fsync = time.monotonic()
+
+    def sync(self):
+        """Sichert ausstehende Journaleinträge mit fsync"""
+        with self._lock:
+            self._fsync_timer = None
+            self._fsync()
+
+    def _snapshot(self):
+        """Schreibt den Zustand atomar als Snapshot und leert danach das Journal"""
+        temp_path = f"{self.snapshot_path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump({'seq': self._seq, 'state': self._state}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.snapshot_path)
+        # Ein Absturz vor dem Leeren ist unkritisch: Einträge bis seq gelten beim Start als erledigt
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self.journal_path, 'w')
+        self._records_since_snapshot = 0
+        self._last_fsync = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if self._fsync_timer is not None:
+                self._fsync_timer.cancel()
+                self._fsync_timer = None
+            if self._file is not None:
+                self._fsync()
+                self._file.close()
+                self._file = None
+
+
+# Globale Registry der Journale (eines pro Symbol)
+_journals = {}
+_journals_lock = threading.Lock()
+
+
+def get_position_journal(symbol=None):
+    """
+    Gibt das Positionsjournal eines Symbols zurück (beim ersten Zugriff wird es nachgespielt).
+
+    Parameters:
+    symbol: Handelssymbol (None = Einzelsymbol-Modus mit position_state.journal)
+
+    Returns:
+    PositionJournal: Journal-Instanz
+    """
+    with _journals_lock:
+        if symbol not in _journals:
+            journal = PositionJournal(state_base_path(symbol), symbol)
+            atexit.register(journal.close)
+            _journals[symbol] = journal
+        return _journals[symbol]
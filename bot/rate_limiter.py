@@ -0,0 +1,346 @@
+"""
+Zentrales, gewichtsbasiertes Rate-Limit für alle REST-Aufrufe einer ccxt-Exchange.
+
+install() leitet fetch2 der ccxt-Instanz (synchron oder ccxt.async_support) über einen
+gemeinsamen RequestWeightLimiter. Das Gewicht jedes Aufrufs stammt aus den Endpunkt-Kosten
+von ccxt; das Budget entspricht dem, was ccxt pro Minute zulässt (60000 / rateLimit), und
+wird mit dem von Binance gemeldeten Verbrauch (X-MBX-USED-WEIGHT-1M) abgeglichen.
+
+Prioritäten: Orders dürfen das volle Budget nutzen, Konto-/Positionsabfragen und Marktdaten
+nur einen Anteil davon - Orders bleiben so auch bei voller Datenlast möglich. Gleiche
+GET-Anfragen, die gleichzeitig laufen, werden zusammengefasst. Nach 429/418 pausieren alle
+Aufrufe bis zum Ablauf von Retry-After; Wiederholungsversuche nach Fehlern warten über
+retry_delay() mit exponentiellem Backoff und mindestens bis zum Ende einer solchen Sperre.
+"""
+import asyncio
+import contextvars
+import inspect
+import threading
+import time
+from collections import deque
+import ccxt
+import structured_logging
+import config
+
+
+logger = structured_logging.get_logger(__name__)
+
+
+PRIORITY_ORDER = 0
+PRIORITY_ACCOUNT = 1
+PRIORITY_DATA = 2
+PRIORITY_NAMES = {PRIORITY_ORDER: 'order', PRIORITY_ACCOUNT: 'account', PRIORITY_DATA: 'data'}
+
+
+def request_priority(api, method, path):
+    """Leitet die Priorität eines REST-Aufrufs aus Endpunkt und HTTP-Methode ab"""
+    if method != 'GET' and 'order' in str(path).lower():
+        return PRIORITY_ORDER
+    api_name = str(api).lower()
+    if 'private' in api_name or api_name.startswith('sapi'):
+        return PRIORITY_ACCOUNT
+    return PRIORITY_DATA
+
+
+class RequestWeightLimiter:
+    """Gleitendes Gewichtsbudget pro Minute mit Prioritäten und Sperre nach 429/418"""
+
+    def __init__(self, weight_limit, window=60.0):
+        """
+        Parameters:
+        weight_limit: Gewichtsbudget pro Fenster (in ccxt-Kosteneinheiten)
+        window: Fensterlänge in Sekunden
+        """
+        self.weight_limit = weight_limit
+        self.window = window
+        self.capacity = {
+            PRIORITY_ORDER: weight_limit,
+            PRIORITY_ACCOUNT: weight_limit * config.RATE_LIMIT_ACCOUNT_SHARE,
+            PRIORITY_DATA: weight_limit * config.RATE_LIMIT_DATA_SHARE
+        }
+        self.used_weight = 0.0
+        self.banned_until = 0.0
+        self.stats = {'requests': 0, 'waits': 0, 'wait_seconds': 0.0, 'coalesced': 0, 'bans': 0, 'retries': 0}
+
+        self._events = deque()  # (Zeitpunkt, Gewicht)
+        self._waiting = {priority: 0 for priority in PRIORITY_NAMES}
+        self._lock = threading.Lock()
+
+    def _prune(self, now):
+        while self._events and self._events[0][0] <= now - self.window:
+            self.used_weight -= self._events.popleft()[1]
+
+    def _try_acquire(self, weight, priority):
+        """
+        Returns:
+        float: 0 wenn das Gewicht verbucht wurde, sonst Sekunden bis zum nächsten Versuch
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self.banned_until:
+                return self.banned_until - now
+            # Wartende Aufrufe höherer Priorität haben Vorrang
+            if any(self._waiting[higher] for higher in PRIORITY_NAMES if higher < priority):
+                return 0.05
+            self._prune(now)
+            if self.used_weight + weight <= self.capacity[priority] or not self._events:
+                self._events.append((now, weight))
+                self.used_weight += weight
+                self.stats['requests'] += 1
+                return 0.0
+            # Warten, bis genug Gewicht aus dem Fenster fällt
+            freed = self.used_weight + weight - self.capacity[priority]
+            for timestamp, event_weight in self._events:
+                freed -= event_weight
+                if freed <= 0:
+                    return max(timestamp + self.window - now, 0.01)
+            return self.window
+
+    def acquire(self, weight, priority=PRIORITY_DATA):
+        """Blockiert, bis der Aufruf im Budget ist"""
+        delay = self._try_acquire(weight, priority)
+        if not delay:
+            return
+        self._begin_wait(priority)
+        start = time.monotonic()
+        try:
+            while delay:
+                time.sleep(min(delay, 1.0))
+                delay = self._try_acquire(weight, priority)
+        finally:
+            self._end_wait(priority, time.monotonic() - start)
+
+    async def acquire_async(self, weight, priority=PRIORITY_DATA):
+        """Wie acquire, blockiert aber nur die aufrufende Coroutine"""
+        delay = self._try_acquire(weight, priority)
+        if not delay:
+            return
+        self._begin_wait(priority)
+        start = time.monotonic()
+        try:
+            while delay:
+                await asyncio.sleep(min(delay, 1.0))
+                delay = self._try_acquire(weight, priority)
+        finally:
+            self._end_wait(priority, time.monotonic() - start)
+
+    def _begin_wait(self, priority):
+        with self._lock:
+            self._waiting[priority] += 1
+
+    def _end_wait(self, priority, seconds):
+        with self._lock:
+            self._waiting[priority] -= 1
+            self.stats['waits'] += 1
+            self.stats['wait_seconds'] += seconds
+
+    def sync_used_weight(self, fraction):
+        """Übernimmt den von der Exchange gemeldeten Verbrauch (Anteil am Limit), falls er höher ist"""
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            missing = fraction * self.weight_limit - self.used_weight
+            if missing > 0:
+                # z.B. andere Prozesse mit derselben IP
+                self._events.append((now, missing))
+                self.used_weight += missing
+
+    def penalize(self, retry_after=None):
+        """Sperrt alle Aufrufe nach 429/418 bis Retry-After (Standard: config.RATE_LIMIT_BAN_SECONDS)"""
+        seconds = retry_after or config.RATE_LIMIT_BAN_SECONDS
+        with self._lock:
+            self.banned_until = max(self.banned_until, time.monotonic() + seconds)
+            self.stats['bans'] += 1
+        logger.error("Rate-Limit der Exchange erreicht - alle Anfragen pausieren %.0f Sekunden.", seconds)
+
+    def backoff_delay(self, attempt):
+        """
+        Wartezeit vor dem erneuten Versuch eines fehlgeschlagenen Aufrufs: exponentiell ab
+        config.RATE_LIMIT_RETRY_DELAY, mindestens bis zum Ende einer Sperre nach 429/418.
+
+        Parameters:
+        attempt: Nummer des fehlgeschlagenen Versuchs (0 = erster Versuch)
+
+        Returns:
+        float: Wartezeit in Sekunden
+        """
+        delay = min(config.RATE_LIMIT_RETRY_DELAY * 2 ** attempt, config.RATE_LIMIT_RETRY_MAX_DELAY)
+        with self._lock:
+            self.stats['retries'] += 1
+            return max(delay, self.banned_until - time.monotonic())
+
+    def get_status(self):
+        with self._lock:
+            self._prune(time.monotonic())
+            return {
+                'used_weight': self.used_weight,
+                'weight_limit': self.weight_limit,
+                'banned_for': max(self.banned_until - time.monotonic(), 0),
+                **self.stats
+            }
+
+
+def _coalesce_key(api, method, path, params):
+    if method != 'GET':
+        return None
+    return (str(api), path, tuple(sorted((key, str(value)) for key, value in params.items())))
+
+
+def _header(headers, name):
+    if not headers:
+        return None
+    return headers.get(name) or headers.get(name.lower())
+
+
+# Header der letzten Antwort des laufenden Aufrufs. ccxt legt sie nur im gemeinsamen
+# last_response_headers ab, das parallele Aufrufe überschreiben; Kontextvariablen sind
+# je Thread bzw. asyncio-Task getrennt.
+_response_headers = contextvars.ContextVar('rate_limiter_response_headers', default=None)
+
+
+def _after_response(exchange, limiter, headers):
+    used = _header(headers, 'X-MBX-USED-WEIGHT-1M')
+    if used is not None:
+        server_limit = config.RATE_LIMIT_SERVER_WEIGHT.get(exchange.options.get('defaultType', 'spot'), config.RATE_LIMIT_SERVER_WEIGHT['spot'])
+        limiter.sync_used_weight(float(used) / server_limit)
+
+
+def _after_rate_limit_error(limiter, headers):
+    retry_after = _header(headers, 'Retry-After')
+    limiter.penalize(float(retry_after) if retry_after else None)
+
+
+def retry_delay(exchange, attempt):
+    """
+    Wartezeit vor dem nächsten Versuch eines fehlgeschlagenen Aufrufs über den Limiter der
+    Exchange (bzw. den globalen Limiter, falls keiner installiert ist).
+
+    Parameters:
+    exchange: Exchange-Objekt (auch AsyncExchangeBridge)
+    attempt: Nummer des fehlgeschlagenen Versuchs (0 = erster Versuch)
+
+    Returns:
+    float: Wartezeit in Sekunden
+    """
+    target = getattr(exchange, '__dict__', {}).get('exchange', exchange)
+    limiter = getattr(target, '_rate_limiter', None) or get_rate_limiter()
+    return limiter.backoff_delay(attempt)
+
+
+def install(exchange, limiter=None):
+    """
+    Leitet alle REST-Aufrufe einer ccxt-Instanz über den Limiter. Bei einer AsyncExchangeBridge
+    wird die darin laufende Exchange angepasst; Objekte ohne fetch2 (z.B. MockExchange)
+    bleiben unverändert.
+
+    Returns:
+    RequestWeightLimiter: Verwendeter Limiter oder None
+    """
+    target = exchange.__dict__.get('exchange', exchange)
+    if not config.RATE_LIMIT_ENABLED or not hasattr(target, 'fetch2') or getattr(target, '_rate_limiter', None):
+        return getattr(target, '_rate_limiter', None)
+
+    limiter = limiter or get_rate_limiter(60000 / target.rateLimit)
+    original_fetch2 = target.fetch2
+    original_handle_errors = target.handle_errors
+    inflight = {}
+    # Der Limiter übernimmt die Drosselung, ccxt soll nicht zusätzlich warten
+    target.enableRateLimit = False
+
+    def handle_errors(code, reason, url, method, headers, *args):
+        # ccxt ruft handle_errors für jede Antwort (auch bei Erfolg) mit deren eigenen Headern auf
+        _response_headers.set(headers)
+        return original_handle_errors(code, reason, url, method, headers, *args)
+
+    def prepare(api, method, path, params, request_config):
+        weight = target.calculate_rate_limiter_cost(api, method, path, params, request_config or {})
+        return weight, request_priority(api, method, path), _coalesce_key(api, method, path, params or {})
+
+    if inspect.iscoroutinefunction(original_fetch2):
+        async def fetch2(path, api='public', method='GET', params={}, headers=None, body=None, config={}):
+            weight, priority, key = prepare(api, method, path, params, config)
+            if key is not None and key in inflight:
+                limiter.stats['coalesced'] += 1
+                return await asyncio.shield(inflight[key])
+            # Schon während des Wartens auf das Budget registriert, damit gleiche Anfragen
+            # sich anschließen statt selbst Gewicht anzufordern
+            future = asyncio.get_running_loop().create_future()
+            if key is not None:
+                inflight[key] = future
+            _response_headers.set(None)
+            try:
+                await limiter.acquire_async(weight, priority)
+                response = await original_fetch2(path, api, method, params, headers, body, config)
+                future.set_result(response)
+                _after_response(target, limiter, _response_headers.get())
+                return response
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                future.set_exception(e)
+                future.exception()  # Ohne wartende Aufrufer keine Warnung über unbeachtete Fehler
+                if isinstance(e, ccxt.DDoSProtection):
+                    _after_rate_limit_error(limiter, _response_headers.get())
+                raise
+            finally:
+                if key is not None:
+                    inflight.pop(key, None)
+    else:
+        lock = threading.Lock()
+
+        def fetch2(path, api='public', method='GET', params={}, headers=None, body=None, config={}):
+            weight, priority, key = prepare(api, method, path, params, config)
+            entry = None
+            if key is not None:
+                with lock:
+                    entry = inflight.get(key)
+                    leader = entry is None
+                    if leader:
+                        entry = inflight[key] = {'done': threading.Event(), 'response': None, 'error': None}
+                if not leader:
+                    limiter.stats['coalesced'] += 1
+                    entry['done'].wait()
+                    if entry['error'] is not None:
+                        raise entry['error']
+                    return entry['response']
+            _response_headers.set(None)
+            try:
+                limiter.acquire(weight, priority)
+                response = original_fetch2(path, api, method, params, headers, body, config)
+                if entry is not None:
+                    entry['response'] = response
+                _after_response(target, limiter, _response_headers.get())
+                return response
+            except Exception as e:
+                if entry is not None:
+                    entry['error'] = e
+                if isinstance(e, ccxt.DDoSProtection):
+                    _after_rate_limit_error(limiter, _response_headers.get())
+                raise
+            finally:
+                if entry is not None:
+                    with lock:
+                        inflight.pop(key, None)
+                    entry['done'].set()
+
+    target.fetch2 = fetch2
+    target.handle_errors = handle_errors
+    target._rate_limiter = limiter
+    return limiter
+
+
+# Globale Instanz (ein Budget für alle Exchange-Objekte des Prozesses)
+_rate_limiter = None
+
+def get_rate_limiter(weight_limit=None):
+    """
+    Singleton-Zugriff auf den RequestWeightLimiter.
+
+    Parameters:
+    weight_limit: Budget pro Minute beim ersten Aufruf (Standard: 1200 wie ccxt-Binance)
+    """
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RequestWeightLimiter(weight_limit or 1200)
+    return _rate_limiter
@@ -0,0 +1,497 @@
+"""
+Rollende Merkmale für MarketRegimeDetector.detect_regime.
+
+Statt bei jedem Aufruf die letzten lookback Kerzen zu kopieren und Regression, Perzentile und
+Mittelwerte neu zu berechnen, hält RegimeFeatureWindow die Merkmale als laufenden Zustand:
+
+- Rollende Summen (Schlusskurs, Renditen, ATR, Volumen, Bandbreite) für Mittelwerte und
+  Standardabweichungen, dazu die Summe index * Kurs für die Regressionsgerade (Steigung, R²)
+- Sortierte Fenster (Einfügen/Entfernen per Binärsuche) für die Perzentile von Bandbreite,
+  RSI und Bandabstand sowie für Hoch/Tief des Fensters
+
+Eine neue Kerze kostet damit konstante Zeit (unabhängig von der Länge des DataFrames), eine
+Aktualisierung der laufenden Kerze ersetzt nur die letzte Zeile. Passt der DataFrame nicht zum
+Zustand (andere Kerzen, nachträglich geänderte Kurse), wird das Fenster neu aufgebaut.
+Indikatorwerte bereits abgeschlossener Kerzen werden dabei nicht verglichen: auf einem
+gleitenden Fenster neu berechnet weichen sie leicht ab, ohne dass sich die Kerze geändert hat.
+compute_regime_features ist die vollständige Berechnung auf einem DataFrame und liefert
+dieselben Merkmale.
+"""
+import math
+from bisect import bisect_left, insort
+from collections import deque
+from itertools import islice
+
+import numpy as np
+
+
+# Spalten einer Fensterzeile
+_TS, _CLOSE, _HIGH, _LOW, _VOLUME, _ATR, _RANGE, _RSI, _BAND, _BB_UPPER, _BB_LOWER, _RETURN = range(12)
+
+# Nach so vielen Kerzen werden die rollenden Summen exakt neu berechnet (gegen Rundungsdrift)
+_RESYNC_INTERVAL = 1024
+
+RANGE_PERCENTILES = (25, 50, 75)
+RSI_PERCENTILES = (10, 30, 70, 90)
+BAND_PERCENTILES = (10, 90)
+
+
+def compute_regime_features(recent_df, lookback_period):
+    """
+    Berechnet die Regime-Merkmale vollständig aus den letzten Kerzen.
+
+    Parameters:
+    recent_df (pandas.DataFrame): Die letzten lookback_period Kerzen mit Indikatoren
+    lookback_period (int): Fensterlänge (skaliert die Kursvolatilität)
+
+    Returns:
+    dict: Merkmale wie RegimeFeatureWindow.features
+    """
+    close = recent_df['close']
+    returns = close.pct_change()
+    features = {
+        'price_volatility': returns.std() * np.sqrt(lookback_period),
+        'price_change': (close.iloc[-1] - close.iloc[0]) / close.iloc[0],
+        'close': close.iloc[-1],
+        'mean_close': close.mean(),
+        'recent_high': recent_df['high'].max(),
+        'recent_low': recent_df['low'].min()
+    }
+
+    # Trendstärke und -richtung (Regressionsgerade über die Schlusskurse)
+    from scipy import stats  # Erst bei der ersten vollständigen Berechnung laden (Importzeit beim Start)
+    linear_reg = stats.linregress(range(len(recent_df)), close.values)
+    features['trend_strength'] = abs(linear_reg.slope) / np.mean(close)
+    features['r_squared'] = linear_reg.rvalue ** 2
+
+    # Volatilität
+    if 'atr' in recent_df.columns:
+        features['volatility'] = recent_df['atr'].mean() / close.mean()
+    else:
+        features['volatility'] = returns.dropna().std()
+
+    # Bandbreite (Bollinger) bzw. Hoch/Tief-Spanne für die Range-Erkennung
+    if 'bb_width' in recent_df.columns:
+        range_values = recent_df['bb_width']
+    else:
+        range_values = (recent_df['high'] - recent_df['low']) / close
+    features['range_avg'] = range_values.mean()
+    features['range_percentiles'] = np.percentile(range_values.dropna(), RANGE_PERCENTILES)
+
+    # Volumen
+    if 'volume' in recent_df.columns and not recent_df['volume'].isna().all():
+        volume_sma = recent_df['volume'].rolling(window=10).mean()
+        norm_volume = recent_df['volume'] / recent_df['volume'].mean()
+        recent_volume = norm_volume.iloc[-5:].mean()
+        features['volume_trend'] = (recent_volume / norm_volume.mean()) - 1
+        features['volume_spike'] = recent_df['volume'].iloc[-1] > 2 * volume_sma.iloc[-1]
+    else:
+        features['volume_trend'] = 0
+        features['volume_spike'] = False
+
+    # Momentum (RSI-Verteilung oder Kursänderung über 5 Kerzen)
+    if 'rsi' in recent_df.columns and not recent_df['rsi'].isna().all():
+        features['rsi_latest'] = recent_df['rsi'].iloc[-1]
+        features['rsi_percentiles'] = np.percentile(recent_df['rsi'].dropna(), RSI_PERCENTILES)
+        features['momentum'] = None
+    else:
+        features['rsi_latest'] = None
+        features['rsi_percentiles'] = None
+        features['momentum'] = close.diff(5).iloc[-1] / close.iloc[-6] if len(recent_df) > 6 else 0
+
+    # Abstand der Bollinger Bänder
+    if 'bb_upper' in recent_df.columns and 'bb_lower' in recent_df.columns:
+        band_distance = (recent_df['bb_upper'] - recent_df['bb_lower']) / close
+        features['band_percentiles'] = np.percentile(band_distance.dropna(), BAND_PERCENTILES)
+        features['bb_upper'] = recent_df['bb_upper'].iloc[-1]
+        features['bb_lower'] = recent_df['bb_lower'].iloc[-1]
+    else:
+        features['band_percentiles'] = None
+        features['bb_upper'] = None
+        features['bb_lower'] = None
+
+    return features
+
+
+class _WindowSum:
+    """Summe, Quadratsumme und Anzahl der gültigen (nicht-NaN) Werte eines Fensters"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._shift = None  # Verschiebung für numerische Stabilität der Quadratsummen
+        self.sum = 0.0      # Summe der verschobenen Werte
+        self.sumsq = 0.0
+        self.count = 0
+
+    def add(self, value):
+        if value != value:
+            return
+        if self._shift is None:
+            self._shift = value
+        delta = value - self._shift
+        self.sum += delta
+        self.sumsq += delta * delta
+        self.count += 1
+
+    def remove(self, value):
+        if value != value:
+            return
+        self.count -= 1
+        if self.count == 0:
+            self.reset()
+            return
+        delta = value - self._shift
+        self.sum -= delta
+        self.sumsq -= delta * delta
+
+    def delta(self, value):
+        """Wert relativ zur internen Verschiebung"""
+        return value - self._shift
+
+    def resync(self, values):
+        """Berechnet die Summen exakt aus den Werten des Fensters neu"""
+        values = [value for value in values if value == value]
+        self.reset()
+        if values:
+            self._shift = values[0]
+            self.sum = math.fsum(value - self._shift for value in values)
+            self.sumsq = math.fsum((value - self._shift) ** 2 for value in values)
+            self.count = len(values)
+
+    def mean(self):
+        if self.count == 0:
+            return np.nan
+        return self._shift + self.sum / self.count
+
+    def std(self):
+        """Standardabweichung (ddof=1 wie pandas)"""
+        if self.count < 2:
+            return np.nan
+        variance = (self.sumsq - self.sum * self.sum / self.count) / (self.count - 1)
+        return math.sqrt(max(variance, 0.0))
+
+
+class _SortedWindow:
+    """Sortierte Werte eines Fensters für Perzentile, Minimum und Maximum (NaN wird ignoriert)"""
+
+    def __init__(self):
+        self._values = []
+
+    def __len__(self):
+        return len(self._values)
+
+    def add(self, value):
+        if value == value:
+            insort(self._values, value)
+
+    def remove(self, value):
+        if value == value:
+            del self._values[bisect_left(self._values, value)]
+
+    def min(self):
+        return self._values[0] if self._values else np.nan
+
+    def max(self):
+        return self._values[-1] if self._values else np.nan
+
+    def percentiles(self, quantiles):
+        """Perzentile mit linearer Interpolation (Rechenweg wie np.percentile)"""
+        values = self._values
+        if not values:
+            return np.full(len(quantiles), np.nan)
+        result = np.empty(len(quantiles))
+        last = len(values) - 1
+        for i, q in enumerate(quantiles):
+            index = q / 100 * last
+            lower = math.floor(index)
+            upper = min(lower + 1, last)
+            gamma = index - lower
+            a, b = values[lower], values[upper]
+            diff = b - a
+            result[i] = b - diff * (1 - gamma) if gamma >= 0.5 else a + diff * gamma
+        return result
+
+
+class RegimeFeatureWindow:
+    """
+    Regime-Merkmale der letzten lookback_period Kerzen als rollender Zustand.
+    """
+
+    def __init__(self, lookback_period=50):
+        self.lookback_period = lookback_period
+        self.reset()
+
+    def reset(self):
+        """Verwirft den gesamten Zustand"""
+        self._rows = deque()
+        self._columns = None    # Vorhandene Indikatorspalten des DataFrames beim Aufbau
+        self._first_index = 0   # Regressionsindex der ersten Zeile im Fenster
+        self._pushes = 0
+
+        self._close = _WindowSum()
+        self._index_close = 0.0  # Summe index * (close - shift) für die Regression
+        self._returns = _WindowSum()
+        self._atr = _WindowSum()
+        self._volume = _WindowSum()
+        self._range = _WindowSum()
+
+        self._range_sorted = _SortedWindow()
+        self._rsi_sorted = _SortedWindow()
+        self._band_sorted = _SortedWindow()
+        self._high_sorted = _SortedWindow()
+        self._low_sorted = _SortedWindow()
+
+    # ---- Fensterpflege ----
+
+    def _add_row(self, row):
+        index = self._first_index + len(self._rows)
+        self._close.add(row[_CLOSE])
+        self._index_close += index * self._close.delta(row[_CLOSE])
+        if self._rows:
+            self._returns.add(row[_RETURN])
+        self._atr.add(row[_ATR])
+        self._volume.add(row[_VOLUME])
+        self._range.add(row[_RANGE])
+        self._range_sorted.add(row[_RANGE])
+        self._rsi_sorted.add(row[_RSI])
+        self._band_sorted.add(row[_BAND])
+        self._high_sorted.add(row[_HIGH])
+        self._low_sorted.add(row[_LOW])
+        self._rows.append(row)
+
+    def _remove_values(self, row, index):
+        self._index_close -= index * self._close.delta(row[_CLOSE])
+        self._close.remove(row[_CLOSE])
+        self._atr.remove(row[_ATR])
+        self._volume.remove(row[_VOLUME])
+        self._range.remove(row[_RANGE])
+        self._range_sorted.remove(row[_RANGE])
+        self._rsi_sorted.remove(row[_RSI])
+        self._band_sorted.remove(row[_BAND])
+        self._high_sorted.remove(row[_HIGH])
+        self._low_sorted.remove(row[_LOW])
+
+    def _pop_first(self):
+        row = self._rows.popleft()
+        self._remove_values(row, self._first_index)
+        self._first_index += 1
+        # Die Rendite der neuen ersten Zeile bezieht sich auf eine Kerze außerhalb des Fensters
+        if self._rows:
+            self._returns.remove(self._rows[0][_RETURN])
+        if not self._rows:
+            self._first_index = 0
+            self._index_close = 0.0
+
+    def _pop_last(self):
+        row = self._rows.pop()
+        self._remove_values(row, self._first_index + len(self._rows))
+        if self._rows:
+            self._returns.remove(row[_RETURN])
+        if not self._rows:
+            self._first_index = 0
+            self._index_close = 0.0
+
+    def _push(self, row):
+        """Fügt eine neue Kerze hinzu und entfernt die älteste, sobald das Fenster voll ist"""
+        if self._rows:
+            previous_close = self._rows[-1][_CLOSE]
+            row[_RETURN] = row[_CLOSE] / previous_close - 1
+        if len(self._rows) >= self.lookback_period:
+            self._pop_first()
+        self._add_row(tuple(row))
+
+        self._pushes += 1
+        if self._pushes % _RESYNC_INTERVAL == 0:
+            self._resync()
+
+    def _amend(self, row):
+        """Ersetzt die laufende (letzte) Kerze"""
+        self._pop_last()
+        self._push(row)
+
+    def _resync(self):
+        rows = self._rows
+        self._first_index = 0
+        self._close.resync([row[_CLOSE] for row in rows])
+        self._index_close = math.fsum(index * self._close.delta(row[_CLOSE]) for index, row in enumerate(rows))
+        self._returns.resync([row[_RETURN] for row in islice(rows, 1, None)])
+        self._atr.resync([row[_ATR] for row in rows])
+        self._volume.resync([row[_VOLUME] for row in rows])
+        self._range.resync([row[_RANGE] for row in rows])
+
+    # ---- Abgleich mit dem DataFrame ----
+
+    @staticmethod
+    def _column_layout(df):
+        columns = df.columns
+        return (
+            'volume' in columns,
+            'atr' in columns,
+            'bb_width' in columns,
+            'rsi' in columns,
+            'bb_upper' in columns and 'bb_lower' in columns
+        )
+
+    def _extract_rows(self, df, start):
+        """Fensterzeilen (als float-Array) für die Kerzen ab Position start"""
+        has_volume, has_atr, has_bb_width, has_rsi, has_bands = self._columns
+
+        def column(name):
+            return df[name].to_numpy(dtype=np.float64)[start:]
+
+        close, high, low = column('close'), column('high'), column('low')
+        if np.isnan(close).any() or np.isnan(high).any() or np.isnan(low).any():
+            raise ValueError("Kerzen mit fehlenden Kursdaten")
+
+        rows = np.full((len(close), _RETURN + 1), np.nan)
+        rows[:, _TS] = df['timestamp'].to_numpy()[start:].astype('datetime64[ms]').astype(np.int64)
+        rows[:, _CLOSE] = close
+        rows[:, _HIGH] = high
+        rows[:, _LOW] = low
+        if has_volume:
+            rows[:, _VOLUME] = column('volume')
+        if has_atr:
+            rows[:, _ATR] = column('atr')
+        rows[:, _RANGE] = column('bb_width') if has_bb_width else (high - low) / close
+        if has_rsi:
+            rows[:, _RSI] = column('rsi')
+        if has_bands:
+            rows[:, _BB_UPPER] = column('bb_upper')
+            rows[:, _BB_LOWER] = column('bb_lower')
+            rows[:, _BAND] = (rows[:, _BB_UPPER] - rows[:, _BB_LOWER]) / close
+        return rows
+
+    @staticmethod
+    def _same_row(stored, row):
+        return np.array_equal(np.asarray(stored[:_RETURN]), row[:_RETURN], equal_nan=True)
+
+    @staticmethod
+    def _same_candle(stored, row):
+        """Vergleicht nur Zeitstempel und Kursdaten (ohne Indikatorwerte)"""
+        return np.array_equal(np.asarray(stored[:_ATR]), row[:_ATR], equal_nan=True)
+
+    def update(self, df):
+        """
+        Gleicht das Fenster mit dem DataFrame ab. Nur neue Kerzen und eine geänderte
+        laufende Kerze werden verarbeitet; passt der DataFrame nicht zum Zustand, wird
+        das Fenster aus den letzten lookback_period Kerzen neu aufgebaut.
+
+        Parameters:
+        df (pandas.DataFrame): Kerzen mit timestamp, OHLCV und Indikatoren
+
+        Returns:
+        bool: True wenn das Fenster neu aufgebaut wurde
+        """
+        timestamps = df['timestamp'].to_numpy()
+        if timestamps.dtype.kind != 'M':
+            raise ValueError("timestamp-Spalte ohne datetime64-Werte")
+
+        layout = self._column_layout(df)
+        reseed = not self._rows or layout != self._columns
+        if not reseed:
+            last_ts = np.datetime64(int(self._rows[-1][_TS]), 'ms')
+            pos = int(np.searchsorted(timestamps, last_ts))
+            reseed = (
+                pos >= len(timestamps) or timestamps[pos] != last_ts
+                or pos + 1 < len(self._rows)                       # DataFrame kürzer als das Fenster
+                or len(timestamps) - pos > self.lookback_period    # Neuaufbau ist günstiger
+            )
+        if not reseed:
+            start = max(pos - 1, 0)
+            rows = self._extract_rows(df, start)
+            # Eine bereits abgeschlossene Kerze wurde nachträglich verändert
+            if pos > 0 and len(self._rows) > 1 and not self._same_candle(self._rows[-2], rows[0]):
+                reseed = True
+
+        if reseed:
+            self.reset()
+            self._columns = layout
+            for row in self._extract_rows(df, max(len(df) - self.lookback_period, 0)):
+                self._push(row)
+            return True
+
+        offset = pos - start
+        if not self._same_row(self._rows[-1], rows[offset]):
+            self._amend(rows[offset])
+        for row in rows[offset + 1:]:
+            self._push(row)
+        return False
+
+    # ---- Merkmale ----
+
+    def features(self):
+        """
+        Aktuelle Regime-Merkmale des Fensters.
+
+        Returns:
+        dict: Merkmale wie compute_regime_features
+        """
+        rows = self._rows
+        n = len(rows)
+        has_volume, has_atr, _, has_rsi, has_bands = self._columns
+        first, last = rows[0], rows[-1]
+        mean_close = self._close.mean()
+
+        features = {
+            'price_volatility': self._returns.std() * np.sqrt(self.lookback_period),
+            'price_change': (last[_CLOSE] - first[_CLOSE]) / first[_CLOSE],
+            'close': last[_CLOSE],
+            'mean_close': mean_close,
+            'recent_high': self._high_sorted.max(),
+            'recent_low': self._low_sorted.min()
+        }
+
+        # Regressionsgerade über index 0..n-1 aus den laufenden Summen
+        index_sum = n * (2 * self._first_index + n - 1) / 2
+        sxy = self._index_close - index_sum * self._close.sum / n
+        sxx = n * (n * n - 1) / 12
+        syy = self._close.sumsq - self._close.sum * self._close.sum / n
+        slope = sxy / sxx if sxx > 0 else 0.0
+        r_value = min(max(sxy / math.sqrt(sxx * syy), -1.0), 1.0) if sxx > 0 and syy > 0 else 0.0
+        features['trend_strength'] = abs(slope) / mean_close
+        features['r_squared'] = r_value ** 2
+
+        if has_atr:
+            features['volatility'] = self._atr.mean() / mean_close
+        else:
+            features['volatility'] = self._returns.std()
+
+        features['range_avg'] = self._range.mean()
+        features['range_percentiles'] = self._range_sorted.percentiles(RANGE_PERCENTILES)
+
+        if has_volume and self._volume.count > 0:
+            recent = [row[_VOLUME] for row in islice(reversed(rows), 10)]
+            last5 = [volume for volume in recent[:5] if volume == volume]
+            features['volume_trend'] = (sum(last5) / len(last5)) / self._volume.mean() - 1 if last5 else np.nan
+            # rolling(window=10).mean() braucht 10 gültige Werte
+            volume_sma = sum(recent) / 10 if len(recent) == 10 else np.nan
+            features['volume_spike'] = bool(last[_VOLUME] > 2 * volume_sma)
+        else:
+            features['volume_trend'] = 0
+            features['volume_spike'] = False
+
+        if has_rsi and len(self._rsi_sorted) > 0:
+            features['rsi_latest'] = last[_RSI]
+            features['rsi_percentiles'] = self._rsi_sorted.percentiles(RSI_PERCENTILES)
+            features['momentum'] = None
+        else:
+            features['rsi_latest'] = None
+            features['rsi_percentiles'] = None
+            if n > 6:
+                base = rows[-6][_CLOSE]
+                features['momentum'] = (last[_CLOSE] - base) / base
+            else:
+                features['momentum'] = 0
+
+        if has_bands:
+            features['band_percentiles'] = self._band_sorted.percentiles(BAND_PERCENTILES)
+            features['bb_upper'] = last[_BB_UPPER]
+            features['bb_lower'] = last[_BB_LOWER]
+        else:
+            features['band_percentiles'] = None
+            features['bb_upper'] = None
+            features['bb_lower'] = None
+
+        return features
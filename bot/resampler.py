@@ -0,0 +1,161 @@
+"""
+Höhere Zeitintervalle aus einer Basis-Kerzenreihe (z.B. 1m) ableiten.
+
+Pro Symbol wird nur die Basisreihe über exchange_handler.update_historical_data aktualisiert.
+Die Candle Stores der abgeleiteten Zeitintervalle (z.B. 15m, 1h, 4h) werden beim Start einmal
+von der API geladen und danach nur noch aus den neuen Basiskerzen fortgeschrieben: neu
+aggregiert werden ausschließlich die Perioden, in die neue oder geänderte Basiskerzen fallen.
+"""
+import numpy as np
+import pandas as pd
+import candle_store
+import exchange_handler
+import config
+from candle_store import OHLCV_COLUMNS, timeframe_to_ms
+
+
+def resample_ohlcv(rows, timeframe_ms):
+    """
+    Fasst Kerzen zu Perioden von timeframe_ms zusammen (an UTC-Grenzen ausgerichtet wie bei Binance).
+
+    Parameters:
+    rows: Array von [timestamp, open, high, low, close, volume] (aufsteigend sortiert)
+    timeframe_ms: Dauer der Zielkerze in Millisekunden
+
+    Returns:
+    ndarray: Zielkerzen im selben Format
+    """
+    rows = np.asarray(rows, dtype=np.float64)
+    if len(rows) == 0:
+        return np.empty((0, len(OHLCV_COLUMNS)), dtype=np.float64)
+    buckets = rows[:, 0] - rows[:, 0] % timeframe_ms
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(rows)] - 1
+    return np.column_stack((
+        buckets[starts],
+        rows[starts, 1],
+        np.maximum.reduceat(rows[:, 2], starts),
+        np.minimum.reduceat(rows[:, 3], starts),
+        rows[ends, 4],
+        np.add.reduceat(rows[:, 5], starts)
+    ))
+
+
+class TimeframeResampler:
+    """Hält die Basisreihe eines Symbols und schreibt die abgeleiteten Zeitintervalle fort"""
+
+    def __init__(self, symbol, timeframes, base_timeframe=None, limit=None):
+        """
+        Parameters:
+        symbol: Handelssymbol
+        timeframes: Abzuleitende Zeitintervalle, z.B. ['15m', '1h', '4h']
+        base_timeframe: Zeitintervall der Basisreihe (Standard: config.RESAMPLE_BASE_TIMEFRAME)
+        limit: Vorgehaltene Kerzen pro abgeleitetem Zeitintervall (Standard: config.LIMIT)
+        """
+        self.symbol = symbol
+        self.base_timeframe = base_timeframe or config.RESAMPLE_BASE_TIMEFRAME
+        self.base_ms = timeframe_to_ms(self.base_timeframe)
+        self.limit = limit or config.LIMIT
+
+        self.targets = {}
+        for timeframe in dict.fromkeys(timeframes):
+            if timeframe == self.base_timeframe:
+                continue
+            timeframe_ms = timeframe_to_ms(timeframe)
+            if timeframe.endswith('w') or timeframe_ms % self.base_ms:
+                raise ValueError(f"{timeframe} lässt sich nicht aus {self.base_timeframe} ableiten")
+            self.targets[timeframe] = timeframe_ms
+
+        # Die Basisreihe muss die laufende Periode des größten Zeitintervalls vollständig enthalten
+        max_ratio = max((timeframe_ms // self.base_ms for timeframe_ms in self.targets.values()), default=1)
+        self.base_limit = max(self.limit, 2 * max_ratio)
+        if self.base_limit > config.RESAMPLE_MAX_BASE_CANDLES:
+            raise ValueError(f"Basis {self.base_timeframe} zu fein für {max(self.targets, key=self.targets.get)} "
+                             f"({self.base_limit} Kerzen > {config.RESAMPLE_MAX_BASE_CANDLES})")
+
+        self._last_base_timestamp = None
+
+    def _store(self, timeframe):
+        if timeframe == self.base_timeframe:
+            return candle_store.get_candle_store(self.symbol, self.base_timeframe, self.base_limit)
+        return candle_store.get_candle_store(self.symbol, timeframe, self.limit)
+
+    def update(self, exchange):
+        """
+        Aktualisiert die Basisreihe und schreibt alle abgeleiteten Zeitintervalle fort.
+
+        Returns:
+        bool: False wenn keine Daten geladen werden konnten
+        """
+        base = exchange_handler.update_historical_data(exchange, self.symbol, self.base_timeframe, self.base_limit)
+        if base.empty:
+            return False
+        rows = self._store(self.base_timeframe).to_array()
+
+        if self._last_base_timestamp is None or self._last_base_timestamp < rows[0, 0]:
+            # Start oder Lücke länger als die Basisreihe: abgeleitete Reihen einmal von der API laden
+            for timeframe in self.targets:
+                if exchange_handler.update_historical_data(exchange, self.symbol, timeframe, self.limit).empty:
+                    return False
+            since = rows[-1, 0]
+        else:
+            since = self._last_base_timestamp
+
+        for timeframe, timeframe_ms in self.targets.items():
+            period_start = since - since % timeframe_ms
+            changed = rows[np.searchsorted(rows[:, 0], period_start):]
+            self._store(timeframe).upsert(resample_ohlcv(changed, timeframe_ms).tolist())
+
+        self._last_base_timestamp = rows[-1, 0]
+        return True
+
+    def get_dataframe(self, timeframe):
+        """Kerzen eines Zeitintervalls (ohne API-Aufruf)"""
+        if timeframe != self.base_timeframe and timeframe not in self.targets:
+            raise ValueError(f"Zeitintervall {timeframe} wird für {self.symbol} nicht abgeleitet")
+        return self._store(timeframe).to_dataframe()
+
+
+# Globale Registry der Resampler (einer pro Symbol)
+_resamplers = {}
+
+
+def get_resampler(symbol=None, limit=None):
+    """
+    Gibt den Resampler eines Symbols für config.TIMEFRAME und config.CONFIRMATION_TIMEFRAMES zurück.
+
+    Parameters:
+    symbol: Handelssymbol (Standard: config.SYMBOL)
+    limit: Vorgehaltene Kerzen pro Zeitintervall (Standard: config.LIMIT)
+
+    Returns:
+    TimeframeResampler: Resampler-Instanz
+    """
+    symbol = symbol or config.SYMBOL
+    if symbol not in _resamplers:
+        _resamplers[symbol] = TimeframeResampler(symbol, [config.TIMEFRAME] + list(config.CONFIRMATION_TIMEFRAMES), limit=limit)
+    return _resamplers[symbol]
+
+
+def update_resampled_data(exchange, symbol, timeframe, limit):
+    """
+    Ersatz für exchange_handler.update_historical_data: aktualisiert nur die Basisreihe und
+    gibt das gewünschte, daraus abgeleitete Zeitintervall zurück.
+
+    Returns:
+    DataFrame: Gleiches Format wie get_historical_data (leer bei Fehler)
+    """
+    resampler = get_resampler(symbol, limit)
+    if not resampler.update(exchange):
+        return pd.DataFrame()
+    return resampler.get_dataframe(timeframe)
+
+
+def get_timeframe_data(timeframe, symbol=None):
+    """
+    Kerzen eines Bestätigungs-Zeitintervalls für Strategien (ohne API-Aufruf).
+
+    Returns:
+    DataFrame: Gleiches Format wie get_historical_data
+    """
+    return get_resampler(symbol).get_dataframe(timeframe)
@@ -1,9 +1,11 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime
-from colorama import Fore, Style
 import utils
 import config
+import structured_logging
+
+
+logger = structured_logging.get_logger(__name__)
 
 class PositionSizing:
     """Methoden für die Berechnung der optimalen Positionsgröße"""
@@ -48,11 +50,11 @@ class PositionSizing:
         else:
             return config.QUANTITY
 
-def calculate_position_size(balance, current_price, default_quantity=None):
+def calculate_position_size(balance, current_price, default_quantity=None, symbol=None):
     """Berechnet die optimale Positionsgröße basierend auf der Konfiguration"""
     try:
-        base_currency = config.get_base_currency()
-        quote_currency = config.get_quote_currency()
+        base_currency = config.get_base_currency(symbol)
+        quote_currency = config.get_quote_currency(symbol)
         risk_percent = config.MAX_RISK_PER_TRADE
         stop_loss_percent = config.STOP_LOSS_PERCENT
         stop_loss_price = current_price * (1 - stop_loss_percent)
@@ -90,7 +92,7 @@ def calculate_position_size(balance, current_price, default_quantity=None):
         precision = 5 if base_currency == 'BTC' else 3  # 5 Dezimalstellen für BTC, 3 für andere
         size = round(size, precision)
         
-        print(f"{Fore.CYAN}[{datetime.now().strftime('%H:%M:%S')}] Berechnete Positionsgröße: {size} {base_currency} (Risiko: {risk_percent*100}%){Style.RESET_ALL}")
+        logger.info("Berechnete Positionsgröße: %s %s (Risiko: %s%%)", size, base_currency, risk_percent*100)
         return size
     except Exception as e:
         utils.log_error(e, "Fehler bei der Berechnung der Positionsgröße")
@@ -174,7 +176,7 @@ def check_trailing_stop(current_price, highest_price, trailing_stop_percent, pos
 def check_risk(df, current_position, current_price, entry_price, balance):
     """Überprüft verschiedene Risikofaktoren und entscheidet, ob ein Trade erlaubt ist"""
     
-    print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Führe Risikoanalyse durch...{Style.RESET_ALL}")
+    logger.info("Führe Risikoanalyse durch...")
     
     # Holen der Währungskonfiguration
     base_currency = config.get_base_currency()
@@ -189,7 +191,7 @@ def check_risk(df, current_position, current_price, entry_price, balance):
             'stop_loss': None,
             'take_profit': None
         }
-        print(f"{Fore.GREEN}[{datetime.now().strftime('%H:%M:%S')}] Risikoanalyse: Trade erlaubt (Testmodus){Style.RESET_ALL}")
+        logger.info("Risikoanalyse: Trade erlaubt (Testmodus)")
         return result
     
     # Initialisiere das Ergebnis
@@ -261,7 +263,7 @@ def check_risk(df, current_position, current_price, entry_price, balance):
                 return result
         
         # Wenn wir hier ankommen, ist der Trade erlaubt
-        print(f"{Fore.GREEN}[{datetime.now().strftime('%H:%M:%S')}] Risikoanalyse: Trade erlaubt (Risikolevel: {result['risk_level']}){Style.RESET_ALL}")
+        logger.info("Risikoanalyse: Trade erlaubt (Risikolevel: %s)", result['risk_level'])
         
         return result
     
@@ -0,0 +1,252 @@
+"""
+Strukturierte Ablage abgelehnter Handelssignale in SQLite (WAL-Modus).
+
+utils.log_trade_signal übergibt die Datensätze an einen Hintergrund-Thread, der sie gebündelt
+in einer Transaktion schreibt. Neben den Einzeldatensätzen (Index auf Zeit und Strategie) wird
+eine stündliche Zusammenfassung pro Signaltyp, Strategie und Grund fortgeschrieben. Berichte
+(utils.analyze_rejected_signals) lesen die vollen Stunden aus der Zusammenfassung und nur die
+angebrochene erste Stunde per Indexbereich aus den Einzeldatensätzen - die Laufzeit hängt damit
+vom Zeitraum in Stunden ab, nicht von der Anzahl der Ablehnungen.
+"""
+import atexit
+import json
+import math
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from colorama import Fore, Style
+import utils
+import config
+
+
+SECONDS_PER_HOUR = 3600
+LEGACY_LOG_PATH = "logs/rejected_signals.log"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rejected_signals (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    signal_type TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    price REAL,
+    balance REAL,
+    indicators TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_rejected_signals_ts ON rejected_signals (ts);
+CREATE INDEX IF NOT EXISTS idx_rejected_signals_strategy_ts ON rejected_signals (strategy, ts);
+CREATE TABLE IF NOT EXISTS rejected_signals_hourly (
+    hour INTEGER NOT NULL,
+    signal_type TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (hour, signal_type, strategy, reason)
+) WITHOUT ROWID;
+"""
+
+
+class RejectedSignalStore:
+    """SQLite-Ablage der abgelehnten Signale mit gepuffertem Schreib-Thread"""
+
+    def __init__(self, path=None, flush_interval=None):
+        """
+        Parameters:
+        path: Datenbankdatei (Standard: config.REJECTED_SIGNALS_DB)
+        flush_interval: Sekunden, in denen Datensätze für eine Transaktion gesammelt werden
+                        (Standard: config.REJECTED_SIGNALS_FLUSH_INTERVAL)
+        """
+        self.path = path or config.REJECTED_SIGNALS_DB
+        self.flush_interval = config.REJECTED_SIGNALS_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        is_new = not os.path.exists(self.path)
+        connection = self._connect()
+        connection.executescript(SCHEMA)
+        connection.close()
+        if is_new and os.path.exists(LEGACY_LOG_PATH):
+            self.import_legacy_log(LEGACY_LOG_PATH)
+
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="rejected-signals", daemon=True)
+        self._thread.start()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=10)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    # ---- Schreiben ----
+
+    def add(self, signal_type, strategy, reason, price=None, balance=None, indicators=None, timestamp=None):
+        """Übergibt ein abgelehntes Signal an den Schreib-Thread (blockiert nicht)"""
+        self._queue.put((timestamp or time.time(), signal_type, strategy, reason, price, balance,
+                         json.dumps(indicators) if indicators else None))
+
+    def _run(self):
+        connection = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while batch[-1] is not None:
+                try:
+                    batch.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+            records = [record for record in batch if record is not None]
+            try:
+                if records:
+                    self._write(connection, records)
+            except Exception as e:
+                utils.log_error(e, "Fehler beim Speichern abgelehnter Signale")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if batch[-1] is None:
+                connection.close()
+                return
+
+    @staticmethod
+    def _write(connection, records):
+        hourly = {}
+        for ts, signal_type, strategy, reason, *_ in records:
+            key = (int(ts // SECONDS_PER_HOUR), signal_type, strategy, reason)
+            hourly[key] = hourly.get(key, 0) + 1
+        with connection:
+            connection.executemany(
+                "INSERT INTO rejected_signals (ts, signal_type, strategy, reason, price, balance, indicators) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", records)
+            connection.executemany(
+                "INSERT INTO rejected_signals_hourly (hour, signal_type, strategy, reason, count) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (hour, signal_type, strategy, reason) DO UPDATE SET count = count + excluded.count",
+                [key + (count,) for key, count in hourly.items()])
+
+    def flush(self):
+        """Wartet, bis alle übergebenen Datensätze geschrieben sind"""
+        self._queue.join()
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=10)
+
+    # ---- Auswertung ----
+
+    def summary(self, since=None):
+        """
+        Zählt die abgelehnten Signale ab einem Zeitpunkt.
+
+        Parameters:
+        since: Unix-Zeitstempel (None = alle)
+
+        Returns:
+        dict: total, buy, sell sowie Anzahl pro Grund und pro Strategie (absteigend sortiert)
+        """
+        counts = {}
+        with self._connect() as connection:
+            if since is None:
+                rows = connection.execute(
+                    "SELECT signal_type, strategy, reason, SUM(count) FROM rejected_signals_hourly "
+                    "GROUP BY signal_type, strategy, reason").fetchall()
+            else:
+                first_full_hour = math.ceil(since / SECONDS_PER_HOUR)
+                # Angebrochene Stunde aus den Einzeldatensätzen (Indexbereich), danach volle Stunden
+                rows = connection.execute(
+                    "SELECT signal_type, strategy, reason, COUNT(*) FROM rejected_signals "
+                    "WHERE ts >= ? AND ts < ? GROUP BY signal_type, strategy, reason",
+                    (since, first_full_hour * SECONDS_PER_HOUR)).fetchall()
+                rows += connection.execute(
+                    "SELECT signal_type, strategy, reason, SUM(count) FROM rejected_signals_hourly "
+                    "WHERE hour >= ? GROUP BY signal_type, strategy, reason", (first_full_hour,)).fetchall()
+        connection.close()
+
+        for signal_type, strategy, reason, count in rows:
+            key = (signal_type, strategy, reason)
+            counts[key] = counts.get(key, 0) + count
+
+        reasons, strategies = {}, {}
+        buy = 0
+        for (signal_type, strategy, reason), count in counts.items():
+            reasons[reason] = reasons.get(reason, 0) + count
+            strategies[strategy] = strategies.get(strategy, 0) + count
+            if signal_type == "BUY":
+                buy += count
+        total = sum(counts.values())
+        return {
+            "total": total,
+            "buy": buy,
+            "sell": total - buy,
+            "reasons": dict(sorted(reasons.items(), key=lambda item: item[1], reverse=True)),
+            "strategies": dict(sorted(strategies.items(), key=lambda item: item[1], reverse=True))
+        }
+
+    def recent(self, limit=20, strategy=None):
+        """Die letzten abgelehnten Signale (optional einer Strategie) als Liste von Dictionaries"""
+        query = "SELECT ts, signal_type, strategy, reason, price, balance, indicators FROM rejected_signals"
+        params = ()
+        if strategy:
+            query += " WHERE strategy = ?"
+            params = (strategy,)
+        query += " ORDER BY ts DESC LIMIT ?"
+        with self._connect() as connection:
+            rows = connection.execute(query, params + (limit,)).fetchall()
+        connection.close()
+        return [{
+            "timestamp": datetime.fromtimestamp(ts),
+            "signal_type": signal_type,
+            "strategy": strategy_name,
+            "reason": reason,
+            "price": price,
+            "balance": balance,
+            "indicators": json.loads(indicators) if indicators else {}
+        } for ts, signal_type, strategy_name, reason, price, balance, indicators in rows]
+
+    # ---- Übernahme des alten Textformats ----
+
+    def import_legacy_log(self, path):
+        """Übernimmt einmalig die Einträge aus dem früheren Textlog (logs/rejected_signals.log)"""
+        try:
+            with open(path, "r") as f:
+                entries = [entry.strip() for entry in f.read().split("-" * 50) if entry.strip()]
+        except OSError:
+            return 0
+
+        records = []
+        for entry in entries:
+            try:
+                lines = entry.split('\n')
+                timestamp = datetime.strptime(lines[0].split('[')[1].split(']')[0], "%Y-%m-%d %H:%M:%S")
+                signal_type = "BUY" if "REJECTED BUY SIGNAL" in lines[0] else "SELL"
+                strategy = next((line.split("Strategy: ")[1] for line in lines if "Strategy: " in line), "Unknown")
+                reason = next((line.split("Reason: ")[1] for line in lines if "Reason: " in line), "Unknown")
+                price = float(next((line.split("Price: ")[1] for line in lines if "Price: " in line), 0))
+                records.append((timestamp.timestamp(), signal_type, strategy, reason, price, None, None))
+            except Exception:
+                continue
+
+        if records:
+            connection = self._connect()
+            self._write(connection, records)
+            connection.close()
+            print(f"{Fore.CYAN}[{datetime.now().strftime('%H:%M:%S')}] {len(records)} abgelehnte Signale aus {path} übernommen.{Style.RESET_ALL}")
+        return len(records)
+
+
+# Globale Instanz
+_signal_store = None
+_signal_store_lock = threading.Lock()
+
+def get_signal_store():
+    """Singleton-Zugriff auf den RejectedSignalStore (startet den Schreib-Thread beim ersten Aufruf)"""
+    global _signal_store
+    with _signal_store_lock:
+        if _signal_store is None:
+            _signal_store = RejectedSignalStore()
+            atexit.register(_signal_store.close)
+        return _signal_store
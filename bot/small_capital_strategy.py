@@ -1,12 +1,16 @@
+import logging
 import os
 import pandas as pd
 import numpy as np
 from datetime import datetime
-from colorama import Fore, Style
 import utils
 import config
+import structured_logging
 from advanced_market_analysis import AdvancedMarketAnalysis, RiskAdjuster
 
+
+logger = structured_logging.get_logger(__name__)
+
 class SmallCapitalAdaptiveStrategy:
     """
     Eine angepasste adaptive Strategie, optimiert für Spot Trading mit geringem Kapital.
@@ -106,44 +110,35 @@ class SmallCapitalAdaptiveStrategy:
         
         evaluations = {}
         
-        for strategy_name, strategy_func in self.available_strategies.items():
-            if strategy_func is None:
-                self.setup_strategies()
-                strategy_func = self.available_strategies[strategy_name]
+        import strategies
+        
+        # Historische Simulation: Signal i stammt aus df.iloc[:-(lookback+5)+i]
+        n = len(df)
+        window_ends = n - (self.lookback_period + 5) + np.arange(self.lookback_period)
+        closes = df['close'].to_numpy()
+        period_returns = (closes[window_ends[1:]] - closes[window_ends[1:] - 1]) / closes[window_ends[1:] - 1]
+        
+        for strategy_name in self.available_strategies:
+            # Berechne Signale für die letzten N Perioden in einem Durchlauf
+            # (Fenster mit weniger als 3 Kerzen liefern kein Signal)
+            series = strategies.get_signal_series(df, strategy_name)
+            signal_array = np.where(window_ends >= 3, series[np.maximum(window_ends - 1, 0)], 0)
+            signals = signal_array.tolist()
             
-            # Berechne Signale und simulierte Renditen für die letzten N Perioden
-            signals = []
-            returns = []
-            position = 0
+            # Position nur Long für Spot: Kauf eröffnet, Verkauf schließt
+            long_position = (strategies.hold_positions(signal_array) == 1)[1:]
             
-            for i in range(self.lookback_period):
-                hist_index = -(self.lookback_period + 5) + i
-                temp_df = df.iloc[:hist_index].copy() if hist_index < -1 else df.iloc[:-1].copy()
-                
-                signal, _ = strategy_func(temp_df)
-                signals.append(signal)
-                
-                # Position aktualisieren basierend auf Signal (nur Long für Spot)
-                if signal == 1 and position == 0:  # Kaufsignal wenn keine Position
-                    position = 1
-                elif signal == -1 and position == 1:  # Verkaufssignal wenn Long-Position
-                    position = 0
-                
-                # Berechne Rendite für diese Periode
-                if i > 0 and position == 1:  # Nur für Long-Positionen (Spot Trading)
-                    price_prev = df['close'].iloc[-(self.lookback_period + 5) + i - 1]
-                    price_curr = df['close'].iloc[-(self.lookback_period + 5) + i]
-                    period_return = (price_curr - price_prev) / price_prev
-                    
-                    # Berücksichtige Transaktionskosten bei Positionswechseln
-                    if signals[i-1] == 1 and signals[i-2] != 1:  # Einstieg in letzter Periode
-                        period_return -= 0.001  # Abzug für Eintrittgebühr (0.1%)
-                    
-                    strategy_return = period_return
-                    returns.append(strategy_return)
-                elif i > 0 and position == 0 and signals[i-1] == -1 and signals[i-2] == 1:
-                    # Berücksichtige Ausstiegsgebühr beim Verkauf
-                    returns.append(-0.001)  # Abzug für Austrittsgebühr (0.1%)
+            # Signal der Vorperiode und der Periode davor (für i=1 wie bisher signals[-1])
+            prev_signal = signal_array[:-1]
+            prev2_signal = np.concatenate((signal_array[1:2], signal_array[:-2]))
+            
+            # Rendite für Long-Perioden, Eintrittsgebühr nach frischem Kaufsignal (0.1%)
+            entry_fee = (prev_signal == 1) & (prev2_signal != 1)
+            long_returns = np.where(entry_fee, period_returns - 0.001, period_returns)
+            
+            # Ausstiegsgebühr beim Verkauf aus einer Long-Position (0.1%)
+            exit_fee = ~long_position & (prev_signal == -1) & (prev2_signal == 1)
+            returns = np.where(long_position, long_returns, -0.001)[long_position | exit_fee].tolist()
             
             # Berechne Performance-Metriken speziell für kleine Konten
             if len(returns) > 0:
@@ -235,7 +230,7 @@ class SmallCapitalAdaptiveStrategy:
         if 'downtrend' in market_regime or market_analysis.get('volume', {}).get('volume_pressure') == 'strong_selling':
             # Senke alle Scores ab, um weniger zu handeln in fallenden Märkten
             combined_scores = {k: v * 0.8 for k, v in combined_scores.items()}
-            print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Bärischer Markt erkannt - konservative Handelseinstellung aktiviert.{Style.RESET_ALL}")
+            logger.info("Bärischer Markt erkannt - konservative Handelseinstellung aktiviert.")
         
         # Beste Strategie auswählen
         best_strategy = max(combined_scores.items(), key=lambda x: x[1])[0]
@@ -263,21 +258,22 @@ class SmallCapitalAdaptiveStrategy:
         # Speichere die aktuelle Strategie
         self.current_strategy = best_strategy
         
-        # Log von Strategie-Scores für Debugging
-        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Strategie-Auswahl für kleines Kapital (Marktregime: {market_regime}):{Style.RESET_ALL}")
+        # Log von Strategie-Scores für Debugging (nur aufbauen, wenn INFO aktiv ist)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Strategie-Auswahl für kleines Kapital (Marktregime: %s):", market_regime)
         
-        # Sortiere Strategien nach Score für bessere Lesbarkeit
-        sorted_strategies = sorted(combined_scores.items(), key=lambda x: x[1], reverse=True)
-        for strategy, score in sorted_strategies:
-            selected_marker = " ◀ AUSGEWÄHLT" if strategy == best_strategy else ""
-            perf_detail = self.strategy_performance.get(strategy, {})
+            # Sortiere Strategien nach Score für bessere Lesbarkeit
+            sorted_strategies = sorted(combined_scores.items(), key=lambda x: x[1], reverse=True)
+            for strategy, score in sorted_strategies:
+                selected_marker = " ◀ AUSGEWÄHLT" if strategy == best_strategy else ""
+                perf_detail = self.strategy_performance.get(strategy, {})
             
-            # Detailliertere Ausgabe
-            performance_details = f" | Return: {perf_detail.get('cumulative_return', 0):.2%}"
-            performance_details += f" | Win Rate: {perf_detail.get('win_rate', 0):.2%}"
-            performance_details += f" | Kap.Effizienz: {perf_detail.get('capital_efficiency', 0):.2f}"
+                # Detailliertere Ausgabe
+                performance_details = f" | Return: {perf_detail.get('cumulative_return', 0):.2%}"
+                performance_details += f" | Win Rate: {perf_detail.get('win_rate', 0):.2%}"
+                performance_details += f" | Kap.Effizienz: {perf_detail.get('capital_efficiency', 0):.2f}"
             
-            print(f"  {strategy}: {score:.2f}{selected_marker}{performance_details}")
+                logger.info("  %s: %.2f%s%s", strategy, score, selected_marker, performance_details)
         
         # Risikoanalyse basierend auf aktuellen Marktbedingungen für kleine Konten
         risk_analysis = self.risk_adjuster.adjust_risk(market_analysis)
@@ -307,7 +303,7 @@ class SmallCapitalAdaptiveStrategy:
             self.save_strategy_changes()
 
             # Log von Strategie-Scores für Debugging
-        print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Strategie-Auswahl (Marktregime: {market_regime}):{Style.RESET_ALL}")
+        logger.info("Strategie-Auswahl (Marktregime: %s):", market_regime)
         
         return best_strategy, market_analysis
     
@@ -354,8 +350,8 @@ class SmallCapitalAdaptiveStrategy:
         # Runde auf 5 Dezimalstellen (minimale BTC-Einheit bei Binance)
         position_size = round(position_size, 5)
         
-        print(f"{Fore.CYAN}[{datetime.now().strftime('%H:%M:%S')}] Positionsgröße für kleines Kapital: {position_size} BTC "
-              f"({position_size * current_price:.2f} USDT, {position_size * current_price / balance * 100:.1f}% des Guthabens){Style.RESET_ALL}")
+        logger.info("Positionsgröße für kleines Kapital: %s BTC (%.2f USDT, %.1f%% des Guthabens)",
+                    position_size, position_size * current_price, position_size * current_price / balance * 100)
         
         return position_size
 
@@ -503,7 +499,7 @@ class SmallCapitalAdaptiveStrategy:
         # Standardwert für Balance, falls nicht angegeben
         if actual_balance is None:
             actual_balance = 100  # Vorsichtiger Standardwert
-            print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Warnung: Kein Kontostand übermittelt. Verwende Standardwert: {actual_balance} USDT{Style.RESET_ALL}")
+            logger.warning("Kein Kontostand übermittelt. Verwende Standardwert: %s USDT", actual_balance)
         
         # Beste Strategie für aktuelle Marktbedingungen auswählen
         best_strategy, market_analysis = self.select_best_strategy(df)
@@ -528,7 +524,7 @@ class SmallCapitalAdaptiveStrategy:
         if not execute_trade:
             original_signal = signal
             signal = 0
-            print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Signal ignoriert: {reason}{Style.RESET_ALL}")
+            logger.info("Signal ignoriert: %s", reason)
         
         # Zusätzliche Informationen für die Strategie
         info = {
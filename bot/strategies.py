@@ -1,10 +1,12 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime
 from colorama import Fore, Style
-from small_capital_strategy import small_capital_strategy
 import utils
 import config
+import structured_logging
+
+
+logger = structured_logging.get_logger(__name__)
 
 # Importiere die adaptive Strategie
 # Hinweis: Wir importieren das Modul hier für die Funktion get_strategy_signal
@@ -271,14 +273,117 @@ def aggressive_test_strategy(df):
     
     return signal, info
 
+# Vektorisierte Signalserien der Basisstrategien
+# Eintrag i entspricht dem Signal, das die jeweilige Strategie für ein Fenster liefert,
+# das mit Zeile i endet (die Basisstrategien werten nur die letzten beiden Zeilen aus).
+# Fenster mit weniger als 3 Zeilen liefern immer 0 und müssen vom Aufrufer behandelt werden.
+
+def _current_and_previous(df, column):
+    """Gibt die Spalte und die um eine Zeile verschobene Spalte als NumPy-Arrays zurück"""
+    values = df[column].to_numpy(dtype=np.float64)
+    return values, np.concatenate(([np.nan], values[:-1]))
+
+def sma_crossover_signals(df):
+    """Signalserie der SMA Crossover Strategie"""
+    if 'sma_5' not in df.columns or 'sma_20' not in df.columns:
+        return np.zeros(len(df), dtype=np.int64)
+    
+    sma_short, prev_short = _current_and_previous(df, 'sma_5')
+    sma_long, prev_long = _current_and_previous(df, 'sma_20')
+    buy = (prev_short <= prev_long) & (sma_short > sma_long)
+    sell = (prev_short >= prev_long) & (sma_short < sma_long)
+    return np.where(buy, 1, np.where(sell, -1, 0))
+
+def rsi_signals(df):
+    """Signalserie der RSI Strategie"""
+    if 'rsi' not in df.columns:
+        return np.zeros(len(df), dtype=np.int64)
+    
+    rsi, prev_rsi = _current_and_previous(df, 'rsi')
+    buy = (rsi < config.RSI_OVERSOLD) & (rsi > prev_rsi)
+    sell = (rsi > config.RSI_OVERBOUGHT) & (rsi < prev_rsi)
+    return np.where(buy, 1, np.where(sell, -1, 0))
+
+def macd_signals(df):
+    """Signalserie der MACD Strategie"""
+    if not all(col in df.columns for col in ['macd', 'macd_signal', 'macd_hist']):
+        return np.zeros(len(df), dtype=np.int64)
+    
+    macd, macd_prev = _current_and_previous(df, 'macd')
+    macd_signal, macd_signal_prev = _current_and_previous(df, 'macd_signal')
+    buy = (macd_prev <= macd_signal_prev) & (macd > macd_signal)
+    sell = (macd_prev >= macd_signal_prev) & (macd < macd_signal)
+    return np.where(buy, 1, np.where(sell, -1, 0))
+
+def bollinger_bands_signals(df):
+    """Signalserie der Bollinger Bands Strategie"""
+    if not all(col in df.columns for col in ['bb_upper', 'bb_middle', 'bb_lower']):
+        return np.zeros(len(df), dtype=np.int64)
+    
+    close = df['close'].to_numpy(dtype=np.float64)
+    buy = close < df['bb_lower'].to_numpy(dtype=np.float64)
+    sell = close > df['bb_upper'].to_numpy(dtype=np.float64)
+    return np.where(buy, 1, np.where(sell, -1, 0))
+
+def multi_indicator_signals(df):
+    """Signalserie der Multi-Indikator Strategie (gleiche Gewichte wie multi_indicator_strategy)"""
+    weighted_signal = (
+        sma_crossover_signals(df) * 0.2 +
+        rsi_signals(df) * 0.2 +
+        macd_signals(df) * 0.3 +
+        bollinger_bands_signals(df) * 0.3
+    )
+    return np.where(weighted_signal > 0.3, 1, np.where(weighted_signal < -0.3, -1, 0))
+
+def aggressive_test_signals(df):
+    """Signalserie der aggressiven Teststrategie (Schwellenwert 0.1% Preisänderung)"""
+    close, prev_close = _current_and_previous(df, 'close')
+    price_change_pct = (close - prev_close) / prev_close * 100
+    return np.where(price_change_pct > 0.1, 1, np.where(price_change_pct < -0.1, -1, 0))
+
+SIGNAL_SERIES_FUNCTIONS = {
+    'SMA_CROSSOVER': sma_crossover_signals,
+    'RSI': rsi_signals,
+    'MACD': macd_signals,
+    'BOLLINGER_BANDS': bollinger_bands_signals,
+    'MULTI_INDICATOR': multi_indicator_signals,
+    'AGGRESSIVE_TEST': aggressive_test_signals
+}
+
+def get_signal_series(df, strategy_name):
+    """
+    Berechnet die Signale einer Basisstrategie für alle Zeilen in einem NumPy-Durchlauf.
+    
+    Parameters:
+    df: DataFrame mit Indikatoren
+    strategy_name: Name der Strategie (siehe SIGNAL_SERIES_FUNCTIONS)
+    
+    Returns:
+    np.ndarray: Signal (1, -1, 0) pro Zeile
+    """
+    return SIGNAL_SERIES_FUNCTIONS[strategy_name](df)
+
+def hold_positions(signals):
+    """
+    Leitet die gehaltene Position aus einer Signalfolge ab: Nach einem Kauf- bzw.
+    Verkaufssignal bleibt die Position bestehen, bis ein Gegensignal folgt.
+    
+    Returns:
+    np.ndarray: Letztes Signal ungleich 0 bis einschließlich Index i (0 wenn keines)
+    """
+    signals = np.asarray(signals)
+    last_index = np.where(signals != 0, np.arange(len(signals)), -1)
+    last_index = np.maximum.accumulate(last_index) if len(signals) else last_index
+    return np.where(last_index >= 0, signals[np.maximum(last_index, 0)], 0)
+
 def get_strategy_signal(df, strategy_name):
     """Generiert ein Handelssignal basierend auf der gewählten Strategie"""
-    print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Generiere Handelssignal mit Strategie: {strategy_name}...{Style.RESET_ALL}")
+    logger.info("Generiere Handelssignal mit Strategie: %s...", strategy_name)
     
     try:
         # Stelle sicher, dass das DataFrame nicht leer ist
         if df.empty or len(df) < 3:
-            print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] Nicht genügend Daten für Signalgenerierung.{Style.RESET_ALL}")
+            logger.warning("Nicht genügend Daten für Signalgenerierung.")
             info = {
                 'strategy': strategy_name,
                 'description': 'Nicht ausgeführt - unzureichende Daten',
@@ -294,11 +399,11 @@ def get_strategy_signal(df, strategy_name):
             signal, info = strategy_func(df)
             
             if signal == 1:
-                print(f"{Fore.GREEN}[{datetime.now().strftime('%H:%M:%S')}] Kaufsignal generiert!{Style.RESET_ALL}")
+                logger.info("Kaufsignal generiert!", extra={'color': Fore.GREEN})
             elif signal == -1:
-                print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] Verkaufssignal generiert!{Style.RESET_ALL}")
+                logger.info("Verkaufssignal generiert!", extra={'color': Fore.RED})
             else:
-                print(f"{Fore.YELLOW}[{datetime.now().strftime('%H:%M:%S')}] Kein Handelssignal (Halten).{Style.RESET_ALL}")
+                logger.info("Kein Handelssignal (Halten).")
             
             return signal, info
         else:
@@ -306,7 +411,7 @@ def get_strategy_signal(df, strategy_name):
     
     except Exception as e:
         utils.log_error(e, f"Fehler bei der Signalgenerierung mit Strategie {strategy_name}")
-        print(f"{Fore.RED}[{datetime.now().strftime('%H:%M:%S')}] Fehler bei der Signalgenerierung: {str(e)}{Style.RESET_ALL}")
+        logger.error("Fehler bei der Signalgenerierung: %s", e)
         
         # Stelle ein sicheres Fallback bereit
         info = {
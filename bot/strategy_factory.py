@@ -7,6 +7,14 @@ class StrategyFactory:
     _strategies = {}
     _initialized = False
     
+    # Strategien mit internem Zustand: (Modul, Klasse, Methode, Konstruktor-Argumente)
+    _stateful_strategies = {
+        'DAY_TRADER': ('day_trader_strategy', 'SimpleDayTraderStrategy', 'day_trader_strategy', {}),
+        'SMALL_CAPITAL': ('small_capital_strategy', 'SmallCapitalAdaptiveStrategy', 'smart_small_capital_strategy', {'lookback_period': 15}),
+        'ADAPTIVE': ('adaptive_strategy', 'AdaptiveStrategy', 'adaptive_strategy', {}),
+        'ENHANCED_ADAPTIVE': ('enhanced_adaptive_strategy', 'EnhancedAdaptiveStrategy', 'enhanced_adaptive_strategy', {'lookback_period': 'ADAPTIVE_LOOKBACK_PERIOD'}),
+    }
+    
     @classmethod
     def initialize(cls):
         """Initialisiert die verfügbaren Strategien"""
@@ -90,4 +98,31 @@ class StrategyFactory:
         except (ImportError, AttributeError):
             # Wenn Strategie nicht gefunden, verwende Multi-Indikator als Standard
             print(f"Strategie {strategy_name} nicht gefunden. Verwende MULTI_INDICATOR.")
-            return cls._strategies['MULTI_INDICATOR']
\ No newline at end of file
+            return cls._strategies['MULTI_INDICATOR']
+    
+    @classmethod
+    def create_strategy_instance(cls, strategy_name):
+        """
+        Erstellt eine neue, unabhängige Strategie-Instanz (statt der globalen Singletons),
+        z.B. eine pro Symbol im Portfolio-Modus.
+        
+        Parameters:
+        strategy_name: Name der Strategie (wie in config.ACTIVE_STRATEGY)
+        
+        Returns:
+        tuple: (instance, strategy_func) - instance ist None bei zustandslosen Strategien
+        """
+        if strategy_name not in cls._stateful_strategies:
+            return None, cls.get_strategy(strategy_name)
+        
+        module_name, class_name, method_name, kwargs = cls._stateful_strategies[strategy_name]
+        try:
+            import config
+            module = importlib.import_module(module_name)
+            # String-Werte verweisen auf Konfigurationsparameter
+            kwargs = {key: getattr(config, value) if isinstance(value, str) else value for key, value in kwargs.items()}
+            instance = getattr(module, class_name)(**kwargs)
+            return instance, getattr(instance, method_name)
+        except (ImportError, AttributeError):
+            print(f"Strategie {strategy_name} nicht gefunden. Verwende MULTI_INDICATOR.")
+            return None, cls.get_strategy('MULTI_INDICATOR')
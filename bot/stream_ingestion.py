@@ -0,0 +1,293 @@
+"""
+Ereignisgesteuerte Marktdaten über Binance-WebSocket-Streams (kline + bookTicker).
+
+Die Kerzen laufen direkt in den Candle Store; die Strategie wird bei Kerzenschluss oder
+bei einer Preisbewegung über STREAM_PRICE_TRIGGER_PERCENT ausgelöst statt im festen Takt.
+
+Aufruf (Aufzeichnung einer Fixture-Datei für Offline-Tests):
+    python stream_ingestion.py record 120 fixtures/mein_stream.jsonl
+"""
+import asyncio
+import json
+import sys
+import threading
+import time
+from colorama import Fore, Style
+import candle_store
+import exchange_handler
+import structured_logging
+import utils
+import config
+
+
+logger = structured_logging.get_logger(__name__)
+
+
+STREAM_URL_SPOT = 'wss://stream.binance.com:9443/stream'
+STREAM_URL_FUTURES_TESTNET = 'wss://stream.binancefuture.com/stream'
+
+
+def stream_names(symbol, timeframe):
+    """Namen der kombinierten Streams für ein Symbol, z.B. ['btcusdt@kline_15m', 'btcusdt@bookTicker']"""
+    stream_symbol = symbol.replace('/', '').split(':')[0].lower()
+    return [f"{stream_symbol}@kline_{timeframe}", f"{stream_symbol}@bookTicker"]
+
+
+class BinanceWebSocketSource:
+    """Live-Quelle: kombinierter Binance-Stream über eine WebSocket-Verbindung"""
+
+    def __init__(self, symbol, timeframe, url=None):
+        base_url = url or (STREAM_URL_FUTURES_TESTNET if config.USE_TESTNET else STREAM_URL_SPOT)
+        self.url = f"{base_url}?streams={'/'.join(stream_names(symbol, timeframe))}"
+
+    def prepare(self, last_timestamp):
+        pass
+
+    async def messages(self):
+        import aiohttp  # Erst beim Verbindungsaufbau laden (Importzeit beim Start)
+        async with aiohttp.ClientSession() as session:
+            async with session.ws_connect(self.url, heartbeat=20) as websocket:
+                logger.info("WebSocket verbunden: %s", self.url, extra={'color': Fore.GREEN})
+                async for message in websocket:
+                    if message.type == aiohttp.WSMsgType.TEXT:
+                        yield json.loads(message.data)
+                    elif message.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                        break
+
+
+class FixtureStreamSource:
+    """
+    Offline-Quelle: spielt eine aufgezeichnete Stream-Datei (eine JSON-Nachricht pro Zeile) ab.
+    Die Zeitstempel werden an die letzte Kerze im Candle Store angeglichen, die erste Kline
+    der Datei aktualisiert also die laufende Kerze.
+    """
+
+    def __init__(self, path, speed=None):
+        """
+        Parameters:
+        path: Pfad zur JSONL-Datei
+        speed: Abspielgeschwindigkeit relativ zur Aufnahme (None = ohne Pausen)
+        """
+        self.path = path
+        self.speed = speed
+        self._offset = 0
+
+    def prepare(self, last_timestamp):
+        self._offset = 0
+        if last_timestamp is None:
+            return
+        with open(self.path, 'r') as f:
+            for line in f:
+                data = json.loads(line).get('data', {})
+                if 'k' in data:
+                    self._offset = last_timestamp - data['k']['t']
+                    return
+
+    def _shift(self, message):
+        data = message.get('data', message)
+        for key in ('E', 'T'):
+            if key in data:
+                data[key] += self._offset
+        if 'k' in data:
+            data['k']['t'] += self._offset
+            data['k']['T'] += self._offset
+        return message
+
+    async def messages(self):
+        previous_event_time = None
+        with open(self.path, 'r') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                message = self._shift(json.loads(line))
+                event_time = message.get('data', message).get('E')
+                if self.speed and event_time and previous_event_time:
+                    await asyncio.sleep(max(event_time - previous_event_time, 0) / 1000 / self.speed)
+                else:
+                    await asyncio.sleep(0)
+                previous_event_time = event_time or previous_event_time
+                yield message
+
+
+class StreamIngestor:
+    """
+    Verarbeitet Stream-Nachrichten für ein Symbol: Klines werden in den Candle Store übernommen,
+    bookTicker-Kurse überwachen die Preisbewegung. Der Stream läuft in einem eigenen Thread mit
+    eigenem Event-Loop und verbindet sich nach Abbrüchen automatisch neu.
+    """
+
+    def __init__(self, symbol, timeframe, limit, source=None):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.limit = limit
+        self.store = candle_store.get_candle_store(symbol, timeframe, limit)
+        self.source = source or BinanceWebSocketSource(symbol, timeframe)
+
+        self.last_message_time = None
+        self.last_price = None
+        self.messages_received = 0
+
+        self._lock = threading.Lock()  # Schützt den Candle Store (Stream-Thread vs. Bot-Thread)
+        self._trigger = threading.Event()
+        self._trigger_reason = None
+        self._last_trigger_time = 0
+        self._reference_price = None
+        self._needs_resync = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ---- Nachrichtenverarbeitung ----
+
+    def handle_message(self, message):
+        """Verarbeitet eine Stream-Nachricht (kombiniertes Format {'stream': ..., 'data': ...} oder Rohdaten)"""
+        data = message.get('data', message)
+        self.last_message_time = time.monotonic()
+        self.messages_received += 1
+
+        if 'k' in data:
+            self._handle_kline(data['k'])
+        elif 'b' in data and 'a' in data:
+            self._handle_book_ticker(data)
+
+    def _handle_kline(self, kline):
+        row = [kline['t'], float(kline['o']), float(kline['h']), float(kline['l']), float(kline['c']), float(kline['v'])]
+        with self._lock:
+            if self.store.has_gap([row]):
+                # Verbindungsabbruch o.ä.: fehlende Kerzen per REST nachladen
+                self._needs_resync = True
+                return
+            self.store.upsert([row])
+        self.last_price = row[4]
+
+        if kline.get('x'):
+            self._fire('Kerzenschluss', force=True)
+        else:
+            self._check_price_move()
+
+    def _handle_book_ticker(self, data):
+        self.last_price = (float(data['b']) + float(data['a'])) / 2
+        self._check_price_move()
+
+    def _check_price_move(self):
+        if self._reference_price is None:
+            self._reference_price = self.last_price
+            return
+        move = abs(self.last_price - self._reference_price) / self._reference_price
+        if move >= config.STREAM_PRICE_TRIGGER_PERCENT:
+            self._fire(f"Preisbewegung {move * 100:.2f}%")
+
+    def _fire(self, reason, force=False):
+        now = time.monotonic()
+        if not force and now - self._last_trigger_time < config.STREAM_MIN_TRIGGER_INTERVAL:
+            return
+        self._last_trigger_time = now
+        self._trigger_reason = reason
+        self._trigger.set()
+
+    # ---- Zugriff aus dem Bot-Thread ----
+
+    def is_stale(self):
+        if self.last_message_time is None:
+            return True
+        return time.monotonic() - self.last_message_time > config.STREAM_STALE_SECONDS
+
+    def get_dataframe(self, exchange):
+        """
+        Gibt die aktuellen Kerzen zurück. Fehlen Kerzen oder kommen keine Nachrichten mehr an,
+        wird der Candle Store vorher per REST aktualisiert.
+        """
+        with self._lock:
+            if not (self._needs_resync or self.is_stale()):
+                return self.store.to_dataframe()
+            self._needs_resync = False
+        # REST-Abfrage ohne Lock, damit der Stream-Thread währenddessen weiter Kerzen verarbeiten kann
+        logger.warning("Stream für %s unvollständig oder inaktiv - aktualisiere per REST...", self.symbol)
+        df = exchange_handler.update_historical_data(exchange, self.symbol, self.timeframe, self.limit, store_lock=self._lock)
+        if df.empty:
+            self._needs_resync = True
+        return df
+
+    def wait_for_trigger(self, timeout=None):
+        """
+        Wartet auf das nächste Auslöseereignis.
+
+        Returns:
+        str: Auslösegrund oder None bei Timeout
+        """
+        triggered = self._trigger.wait(timeout)
+        self._trigger.clear()
+        self._reference_price = self.last_price
+        return self._trigger_reason if triggered else None
+
+    # ---- Stream-Thread ----
+
+    async def _consume(self):
+        retry_delay = 1
+        while not self._stop.is_set():
+            try:
+                self.source.prepare(self.store.last_timestamp)
+                async for message in self.source.messages():
+                    if self._stop.is_set():
+                        return
+                    self.handle_message(message)
+                    retry_delay = 1
+                if isinstance(self.source, FixtureStreamSource):
+                    logger.info("Stream-Aufzeichnung vollständig abgespielt (%s Nachrichten).", self.messages_received, extra={'color': Fore.CYAN})
+                    return
+            except Exception as e:
+                utils.log_error(e, f"WebSocket-Fehler für {self.symbol}")
+            logger.warning("Stream getrennt. Neuer Verbindungsversuch in %s Sekunden...", retry_delay)
+            await asyncio.sleep(retry_delay)
+            retry_delay = min(retry_delay * 2, 60)
+            self._needs_resync = True
+
+    def start(self, exchange):
+        """Lädt die Historie per REST und startet den Stream-Thread"""
+        exchange_handler.update_historical_data(exchange, self.symbol, self.timeframe, self.limit, store_lock=self._lock)
+        # Frisch geladene Historie gilt bis zur ersten Stream-Nachricht als aktuell
+        self.last_message_time = time.monotonic()
+        self._thread = threading.Thread(target=lambda: asyncio.run(self._consume()), name=f"stream-{self.symbol}", daemon=True)
+        self._thread.start()
+        logger.info("Stream-Ingestion gestartet für %s (%s)", self.symbol, ', '.join(stream_names(self.symbol, self.timeframe)), extra={'color': Fore.GREEN})
+
+    def stop(self):
+        self._stop.set()
+        self._trigger.set()
+
+
+def start_stream_ingestion(exchange, symbol, timeframe, limit):
+    """
+    Startet die Stream-Ingestion für ein Symbol. Ist config.STREAM_REPLAY_FILE gesetzt,
+    wird statt des WebSockets die aufgezeichnete Datei abgespielt.
+
+    Returns:
+    StreamIngestor: Laufende Instanz
+    """
+    source = None
+    if config.STREAM_REPLAY_FILE:
+        source = FixtureStreamSource(config.STREAM_REPLAY_FILE, config.STREAM_REPLAY_SPEED)
+    ingestor = StreamIngestor(symbol, timeframe, limit, source)
+    ingestor.start(exchange)
+    return ingestor
+
+
+async def record_stream(path, duration, symbol=None, timeframe=None):
+    """Zeichnet den Live-Stream für duration Sekunden als JSONL-Datei auf (Fixture für Offline-Tests)"""
+    source = BinanceWebSocketSource(symbol or config.SYMBOL, timeframe or config.TIMEFRAME)
+    end = time.monotonic() + duration
+    count = 0
+    with open(path, 'w') as f:
+        async for message in source.messages():
+            f.write(json.dumps(message) + "\n")
+            count += 1
+            if time.monotonic() >= end:
+                break
+    print(f"{Fore.GREEN}{count} Nachrichten nach {path} geschrieben.{Style.RESET_ALL}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 3 and sys.argv[1] == "record":
+        output = sys.argv[3] if len(sys.argv) > 3 else "fixtures/stream_recording.jsonl"
+        asyncio.run(record_stream(output, float(sys.argv[2])))
+    else:
+        print(f"{Fore.YELLOW}Aufruf: python stream_ingestion.py record <Sekunden> [Datei]{Style.RESET_ALL}")
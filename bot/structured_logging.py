@@ -0,0 +1,245 @@
+"""
+Strukturiertes Logging mit Warteschlange (ersetzt print/log_error in den zeitkritischen Modulen).
+
+Die Module holen sich mit get_logger(__name__) einen Logger unterhalb von "bot". Ein Aufruf legt
+nur einen LogRecord in eine Warteschlange; Formatierung, Farbausgabe und Dateizugriffe erledigt
+ein QueueListener-Thread. Deaktivierte Level kosten nur eine (gecachte) Levelprüfung - Meldungen
+daher mit %-Platzhaltern statt f-Strings übergeben, damit auch die Formatierung entfällt.
+
+Ausgaben des Listeners:
+- Konsole: farbig nach Level mit [HH:MM:SS]-Präfix
+- config.LOG_FILE: eine JSON-Zeile pro Meldung (Zeit, Level, Modul, Meldung, Zusatzfelder)
+- config.ERROR_LOG_FILE: Fehler mit Stacktrace im bisherigen Format von bot_error.log
+
+Level: config.LOG_LEVEL für alle Module, config.LOG_LEVELS pro Modul (z.B. {'indicators': 'WARNING'}).
+Das Profil 'quiet' (config.LOG_PROFILE oder --quiet) zeigt nur Warnungen und Fehler und schaltet
+die Konsolenanzeige ab.
+
+Backtests, Optimierer und Benchmarks unterdrücken die Konsolenausgabe ihrer Simulationen mit
+console_suppressed(): Meldungen unter WARNING entfallen, Warnungen und Fehler landen nur in den Dateien.
+"""
+import atexit
+import contextlib
+import copy
+import io
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from datetime import datetime
+from colorama import Fore, Style
+import config
+
+
+ROOT_LOGGER_NAME = "bot"
+
+LEVEL_COLORS = {
+    logging.DEBUG: Style.DIM,
+    logging.INFO: "",
+    logging.WARNING: Fore.YELLOW,
+    logging.ERROR: Fore.RED,
+    logging.CRITICAL: Fore.RED + Style.BRIGHT
+}
+
+# Standardattribute eines LogRecords; alles andere (extra=...) gilt als strukturiertes Zusatzfeld
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "color", "console"}
+
+# Unterdrückung der Konsolenausgabe pro Thread (siehe console_suppressed)
+_console_state = threading.local()
+
+
+def _extra_fields(record):
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES}
+
+
+class ConsoleFormatter(logging.Formatter):
+    """[HH:MM:SS] Meldung, eingefärbt nach Level (oder nach extra={'color': ...})"""
+
+    def format(self, record):
+        color = getattr(record, 'color', None) or LEVEL_COLORS.get(record.levelno, "")
+        message = record.getMessage()
+        additional_info = getattr(record, 'additional_info', None)
+        if additional_info:
+            message = f"{additional_info}: {message}"
+        text = f"{color}[{datetime.fromtimestamp(record.created).strftime('%H:%M:%S')}] {message}"
+        if record.exc_info and record.exc_info[0] is not None:
+            text += "\n" + self.formatException(record.exc_info)
+        return text + Style.RESET_ALL
+
+
+class JsonFormatter(logging.Formatter):
+    """Eine JSON-Zeile pro Meldung"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'module': record.name.split(".", 1)[-1],
+            'message': record.getMessage()
+        }
+        entry.update(_extra_fields(record))
+        if record.exc_info and record.exc_info[0] is not None:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class ErrorFileFormatter(logging.Formatter):
+    """Bisheriges Format von bot_error.log (Meldung, Zusatzinfo, Stacktrace, Trennlinie)"""
+
+    def format(self, record):
+        text = f"[{datetime.fromtimestamp(record.created).strftime('%Y-%m-%d %H:%M:%S')}] ERROR: {record.getMessage()}\n"
+        additional_info = getattr(record, 'additional_info', None)
+        if additional_info:
+            text += f"Zusätzliche Info: {additional_info}\n"
+        if record.exc_info and record.exc_info[0] is not None:
+            text += self.formatException(record.exc_info) + "\n"
+        else:
+            text += "NoneType: None\n"
+        return text + "\n" + "-" * 50
+
+
+class ConsoleHandler(logging.StreamHandler):
+    """Schreibt immer auf das aktuelle sys.stdout (colorama ersetzt es erst nach dem Import der Module)"""
+
+    def emit(self, record):
+        if not getattr(record, 'console', True):
+            return
+        stream = sys.stdout
+        # Meldungen anderer Threads nicht in die umgeleitete Ausgabe von console_suppressed schreiben
+        while isinstance(stream, _SuppressedOutput):
+            stream = stream.console
+        self.stream = stream
+        super().emit(record)
+
+
+class _SuppressedOutput(io.StringIO):
+    """Verworfene print-Ausgabe innerhalb von console_suppressed (merkt sich die eigentliche Konsole)"""
+
+    def __init__(self, console):
+        super().__init__()
+        self.console = console
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def handle(self, record):
+        if getattr(_console_state, 'depth', 0):
+            # Innerhalb von console_suppressed(): Meldungen unter WARNING gar nicht erst einreihen
+            if record.levelno < logging.WARNING:
+                return False
+            record.console = False
+        return super().handle(record)
+
+    def prepare(self, record):
+        # Nur die Meldung im aufrufenden Thread auflösen (die Argumente können sich danach ändern);
+        # Farbe, Zeitformat und Stacktrace formatiert erst der Listener
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class _QueueListener(logging.handlers.QueueListener):
+    def handle(self, record):
+        flush_event = getattr(record, 'flush_event', None)
+        if flush_event is not None:
+            flush_event.set()
+            return
+        super().handle(record)
+
+
+_listener = None
+_configure_lock = threading.Lock()
+_configured_profile = None
+
+
+def configure(force=False):
+    """
+    Richtet die Warteschlange, den Listener und die Level nach config ein. Wird beim ersten
+    get_logger automatisch aufgerufen; nach Änderungen an config (z.B. --quiet) erneut aufrufen.
+    """
+    global _listener, _configured_profile
+    with _configure_lock:
+        root = logging.getLogger(ROOT_LOGGER_NAME)
+        if _listener is None:
+            log_queue = queue.SimpleQueue()
+            handlers = []
+
+            console = ConsoleHandler(sys.stdout)
+            console.setFormatter(ConsoleFormatter())
+            handlers.append(console)
+
+            if config.LOG_FILE:
+                directory = os.path.dirname(config.LOG_FILE)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                json_file = logging.FileHandler(config.LOG_FILE, encoding='utf-8', delay=True)
+                json_file.setFormatter(JsonFormatter())
+                handlers.append(json_file)
+
+            if config.ERROR_LOG_FILE:
+                error_file = logging.FileHandler(config.ERROR_LOG_FILE, encoding='utf-8', delay=True)
+                error_file.setLevel(logging.ERROR)
+                error_file.setFormatter(ErrorFileFormatter())
+                handlers.append(error_file)
+
+            root.addHandler(_QueueHandler(log_queue))
+            root.propagate = False
+            _listener = _QueueListener(log_queue, *handlers, respect_handler_level=True)
+            _listener.start()
+            atexit.register(shutdown)
+        elif not force and _configured_profile == config.LOG_PROFILE:
+            return
+
+        _configured_profile = config.LOG_PROFILE
+        quiet = config.LOG_PROFILE == 'quiet'
+        root.setLevel(logging.WARNING if quiet else config.LOG_LEVEL)
+        for module, level in config.LOG_LEVELS.items():
+            logging.getLogger(f"{ROOT_LOGGER_NAME}.{module}").setLevel(level)
+
+
+def get_logger(name):
+    """
+    Logger eines Moduls (z.B. get_logger(__name__) -> "bot.indicators").
+
+    Returns:
+    logging.Logger: Logger mit Warteschlangen-Ausgabe
+    """
+    if _listener is None:
+        configure()
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name.rsplit('.', 1)[-1]}")
+
+
+@contextlib.contextmanager
+def console_suppressed():
+    """
+    Unterdrückt die Konsolenausgabe des aktuellen Threads (Logger und print), z.B. für simulierte
+    Trades in Backtests. Warnungen und Fehler werden weiterhin in die Log-Dateien geschrieben.
+    """
+    depth = getattr(_console_state, 'depth', 0)
+    _console_state.depth = depth + 1
+    try:
+        with contextlib.redirect_stdout(_SuppressedOutput(sys.stdout)):
+            yield
+    finally:
+        _console_state.depth = depth
+
+
+def flush():
+    """Wartet, bis alle bisher übergebenen Meldungen ausgegeben sind (z.B. vor einer Eingabeaufforderung)"""
+    if _listener is None:
+        return
+    done = threading.Event()
+    _listener.queue.put_nowait(logging.makeLogRecord({'flush_event': done}))
+    done.wait(timeout=5)
+
+
+def shutdown():
+    """Gibt alle ausstehenden Meldungen aus und beendet den Listener-Thread"""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Die Bot-Module liegen flach im Verzeichnis bot/ und importieren sich gegenseitig ohne Paket
+BOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(BOT_DIR, 'fixtures')
+if BOT_DIR not in sys.path:
+    sys.path.insert(0, BOT_DIR)
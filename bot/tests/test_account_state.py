@@ -0,0 +1,144 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from conftest import FIXTURES_DIR
+import account_state
+import config
+import stream_ingestion
+
+
+SPOT_FIXTURE = os.path.join(FIXTURES_DIR, 'binance_user_data_spot.jsonl')
+FUTURES_FIXTURE = os.path.join(FIXTURES_DIR, 'binance_user_data_futures.jsonl')
+
+
+def _fixture_events(path):
+    with open(path, 'r') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _replay(state, path):
+    """Spielt die Aufzeichnung wie der Stream-Thread (_consume) in den AccountState ein"""
+    async def collect():
+        source = stream_ingestion.FixtureStreamSource(path)
+        source.prepare(None)
+        return [message async for message in source.messages()]
+
+    for message in asyncio.run(collect()):
+        state.handle_message(message)
+
+
+def _balances(state):
+    return {currency: dict(entry) for currency, entry in state.balances.items()}
+
+
+@pytest.fixture
+def spot_state(monkeypatch):
+    monkeypatch.setattr(config, 'USE_TESTNET', False)
+    return account_state.AccountState(['BTC/USDT'])
+
+
+@pytest.fixture
+def futures_state(monkeypatch):
+    monkeypatch.setattr(config, 'USE_TESTNET', True)
+    return account_state.AccountState(['BTC/USDT'])
+
+
+def test_spot_replay_balances_and_position(spot_state):
+    _replay(spot_state, SPOT_FIXTURE)
+
+    assert spot_state.events_received == len(_fixture_events(SPOT_FIXTURE))
+    balance = spot_state.get_balance()
+    assert balance['BTC']['free'] == pytest.approx(0.0000067)
+    assert balance['USDT']['free'] == pytest.approx(999.73070045)
+    assert balance['free']['USDT'] == pytest.approx(999.73070045)
+
+    size, info = spot_state.get_position(None, 'BTC/USDT')
+    assert size == pytest.approx(0.0000067)
+    assert info['type'] == 'LONG'
+
+    assert spot_state.orders['28457731']['filled'] == pytest.approx(0.0033)
+    assert spot_state.orders['28460118']['side'] == 'sell'
+
+
+def test_spot_order_response_does_not_double_count_stream_fill(spot_state):
+    _replay(spot_state, SPOT_FIXTURE)
+    before = _balances(spot_state)
+
+    # Antwort der Kauf-Order, deren Ausführung der Stream bereits gemeldet hat
+    order = {'id': 28457731, 'side': 'buy', 'filled': 0.0033, 'average': 60250.39, 'cost': 198.826287,
+             'fee': {'cost': 0.0000033, 'currency': 'BTC'}}
+    assert spot_state.apply_order(order, 'BTC/USDT')
+    assert _balances(spot_state) == before
+
+    # Eine Order, die der Stream (noch) nicht gemeldet hat, wird übernommen
+    order = dict(order, id=28461000)
+    assert spot_state.apply_order(order, 'BTC/USDT')
+    assert spot_state.balances['BTC']['free'] == pytest.approx(before['BTC']['free'] + 0.0033 - 0.0000033)
+    assert spot_state.balances['USDT']['free'] == pytest.approx(before['USDT']['free'] - 198.826287)
+
+
+def test_spot_partial_stream_fill_applies_only_the_rest(spot_state):
+    events = _fixture_events(SPOT_FIXTURE)
+    spot_state.handle_message(events[0])
+    # Der Stream hat nur die Hälfte der Kauf-Order gemeldet
+    spot_state.handle_message(dict(events[2], X='PARTIALLY_FILLED', z='0.00165000'))
+    spot_state.handle_message(dict(events[0], B=[{'a': 'BTC', 'f': '0.00165000', 'l': '0.00000000'},
+                                                 {'a': 'USDT', 'f': str(1000.0 - 99.4131435), 'l': '0.00000000'}]))
+
+    order = {'id': 28457731, 'side': 'buy', 'filled': 0.0033, 'average': 60250.39, 'cost': 198.826287,
+             'fee': {'cost': 0.0000033, 'currency': 'BTC'}}
+    assert spot_state.apply_order(order, 'BTC/USDT')
+    assert spot_state.balances['BTC']['free'] == pytest.approx(0.0033 - 0.0000033 / 2)
+    assert spot_state.balances['USDT']['free'] == pytest.approx(1000.0 - 198.826287)
+
+
+def test_futures_replay_positions_and_balance(futures_state):
+    events = _fixture_events(FUTURES_FIXTURE)
+    for message in events[:3]:
+        futures_state.handle_message(message)
+
+    # Nach dem Kauf: offene Long-Position, Margin gebunden
+    size, info = futures_state.get_position(None, 'BTC/USDT')
+    assert size == pytest.approx(0.003)
+    assert info['entry_price'] == pytest.approx(60250.0)
+    assert info['type'] == 'LONG'
+    usdt = futures_state.balances['USDT']
+    assert usdt['total'] == pytest.approx(4999.9277)
+    assert usdt['used'] == pytest.approx(0.003 * 60250.0)
+    assert usdt['free'] == pytest.approx(4999.9277 - 0.003 * 60250.0)
+
+    futures_state = account_state.AccountState(['BTC/USDT'])
+    _replay(futures_state, FUTURES_FIXTURE)
+
+    # Nach dem Verkauf: Position geschlossen, realisierter Gewinn im Wallet-Guthaben
+    size, info = futures_state.get_position(None, 'BTC/USDT')
+    assert size == 0
+    assert info['type'] == 'KEINE'
+    usdt = futures_state.get_balance()['USDT']
+    assert usdt['total'] == pytest.approx(5000.32342548)
+    assert usdt['free'] == pytest.approx(5000.32342548)
+    assert futures_state.orders['4062357790']['status'] == 'FILLED'
+
+
+def test_futures_order_response_does_not_double_count_stream_fill(futures_state):
+    _replay(futures_state, FUTURES_FIXTURE)
+    before = _balances(futures_state)
+    position = dict(futures_state.positions['BTCUSDT'])
+
+    for order in ({'id': 4062339102, 'side': 'buy', 'filled': 0.003, 'average': 60250.0, 'fee': {'cost': 0.0723, 'currency': 'USDT'}},
+                  {'id': 4062357790, 'side': 'sell', 'filled': 0.003, 'average': 60412.1, 'fee': {'cost': 0.07249452, 'currency': 'USDT'}}):
+        assert futures_state.apply_order(order, 'BTC/USDT')
+    assert _balances(futures_state) == before
+    assert futures_state.positions['BTCUSDT'] == position
+
+    # Nicht gemeldete Order: Position und Margin werden aus der Antwort fortgeschrieben
+    order = {'id': 4062360000, 'side': 'sell', 'filled': 0.002, 'average': 60500.0, 'fee': {'cost': 0.0484, 'currency': 'USDT'}}
+    assert futures_state.apply_order(order, 'BTC/USDT')
+    size, info = futures_state.get_position(None, 'BTC/USDT')
+    assert size == pytest.approx(-0.002)
+    assert info['entry_price'] == pytest.approx(60500.0)
+    assert futures_state.balances['USDT']['total'] == pytest.approx(before['USDT']['total'] - 0.0484)
+    assert futures_state.balances['USDT']['used'] == pytest.approx(0.002 * 60500.0)
@@ -0,0 +1,91 @@
+import time
+
+import pytest
+
+import config
+import mock_exchange
+import portfolio
+import position_journal
+
+
+@pytest.fixture
+def runner(tmp_path, monkeypatch):
+    """PortfolioRunner gegen die MockExchange (Futures), alle Strategien melden dauerhaft KAUF"""
+    monkeypatch.chdir(tmp_path)  # Positionsjournale und Logs im Testverzeichnis
+    monkeypatch.setattr(position_journal, '_journals', {})
+    monkeypatch.setattr(config, 'USE_TESTNET', True)
+    monkeypatch.setattr(config, 'USE_ACCOUNT_STATE', True)
+    monkeypatch.setattr(config, 'ACCOUNT_STREAM_REPLAY_FILE', None)
+    monkeypatch.setattr(config, 'USE_CANDLE_STORE', False)
+
+    exchange = mock_exchange.MockExchange(['BTC/USDT', 'ETH/USDT', 'SOL/USDT'], history=300, quote_balance=1000.0)
+    runner = portfolio.PortfolioRunner(exchange, interval=0, max_workers=3)
+    for context in runner.contexts.values():
+        context.strategy_func = lambda df, **kwargs: (1, {'strategy': 'TEST'})
+
+    calls = {'fetch_balance': 0}
+    fetch_balance = exchange.fetch_balance
+
+    def counting_fetch_balance(params=None):
+        calls['fetch_balance'] += 1
+        return fetch_balance(params)
+
+    monkeypatch.setattr(exchange, 'fetch_balance', counting_fetch_balance)
+    runner.rest_calls = calls
+    runner.initialize()
+    yield runner
+    runner.executor.shutdown(wait=True)
+    runner.account.state.stop()
+
+
+def _run_cycles(runner, cycles):
+    for _ in range(cycles):
+        due = runner.scheduler.pop_due(now=time.monotonic() + runner.interval + 1)
+        runner.run_cycle(due)
+        runner.exchange.advance()
+
+
+def test_orders_are_placed_sequentially_in_symbol_order(runner):
+    _run_cycles(runner, 3)
+
+    orders = runner.exchange.orders
+    assert [order['symbol'] for order in orders] == ['BTC/USDT', 'ETH/USDT', 'SOL/USDT']
+    assert all(order['side'] == 'buy' for order in orders)
+
+    # Jede Order sieht das durch die vorherigen Orders reduzierte Guthaben
+    balance = 1000.0
+    for order in orders:
+        assert order['cost'] == pytest.approx(balance * config.QUANTITY, rel=0.05)
+        balance -= order['cost']
+
+    # Weitere KAUF-Signale bei offenen Positionen erzeugen keine neuen Orders
+    assert runner.account.open_positions == 3
+    for order in orders:
+        assert runner.contexts[order['symbol']].position == pytest.approx(order['filled'])
+
+
+def test_portfolio_risk_rejects_additional_positions(runner, monkeypatch):
+    # Limit erlaubt nur die erste Position (Stop-Loss-Risiko je Position etwa 2.5-4 USDT)
+    monkeypatch.setattr(config, 'PORTFOLIO_MAX_TOTAL_RISK', 0.006)
+    _run_cycles(runner, 3)
+
+    assert [order['symbol'] for order in runner.exchange.orders] == ['BTC/USDT']
+    assert runner.account.open_positions == 1
+    for symbol in ('ETH/USDT', 'SOL/USDT'):
+        context = runner.contexts[symbol]
+        assert context.signal == 1 and context.risk_result['allow_trade']
+        assert context.position == 0
+        allowed, reason = runner.account.can_open(symbol, context.position_risk(1000.0 * config.QUANTITY / context.current_price, context.current_price))
+        assert not allowed and reason.startswith('Gesamtrisiko')
+
+
+def test_cycles_use_account_state_instead_of_rest(runner):
+    _run_cycles(runner, 3)
+
+    # Nur der Abgleich beim Start fragt den Kontostand per REST ab, danach gilt der AccountState
+    assert runner.rest_calls['fetch_balance'] == 1
+    state = runner.account.state
+    assert state.rest_reconciliations == 1
+    for order in runner.exchange.orders:
+        size, _ = state.get_position(runner.exchange, order['symbol'])
+        assert size == pytest.approx(order['filled'])
@@ -0,0 +1,109 @@
+import asyncio
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from conftest import FIXTURES_DIR
+import candle_store
+import config
+import exchange_handler
+import stream_ingestion
+
+
+FIXTURE = os.path.join(FIXTURES_DIR, 'binance_stream_btcusdt_15m.jsonl')
+BAR_MS = 15 * 60 * 1000
+HISTORY = 50
+
+
+def _fixture_klines():
+    with open(FIXTURE, 'r') as f:
+        messages = [json.loads(line)['data'] for line in f if line.strip()]
+    return [data['k'] for data in messages if 'k' in data]
+
+
+@pytest.fixture
+def ingestor(monkeypatch):
+    """StreamIngestor mit Historie, deren letzte (laufende) Kerze die erste Kline der Aufzeichnung ist"""
+    monkeypatch.setattr(candle_store, '_candle_stores', {})
+    monkeypatch.setattr(config, 'OHLCV_CACHE_ENABLED', False)
+    monkeypatch.setattr(config, 'STREAM_MIN_TRIGGER_INTERVAL', 0)
+
+    first_open = _fixture_klines()[0]['t']
+    source = stream_ingestion.FixtureStreamSource(FIXTURE)
+    ingestor = stream_ingestion.StreamIngestor('BTC/USDT', '15m', HISTORY + 10, source)
+    ingestor.store.replace([[first_open - (HISTORY - 1 - i) * BAR_MS, 60000.0, 60100.0, 59900.0, 60000.0, 10.0]
+                            for i in range(HISTORY)])
+    return ingestor
+
+
+def _replay(ingestor):
+    """Spielt die Aufzeichnung ab und sammelt die Auslösegründe wie die Hauptschleife (wait_for_trigger)"""
+    async def collect():
+        ingestor.source.prepare(ingestor.store.last_timestamp)
+        return [message async for message in ingestor.source.messages()]
+
+    reasons = []
+    for message in asyncio.run(collect()):
+        ingestor.handle_message(message)
+        if ingestor._trigger.is_set():
+            reasons.append(ingestor.wait_for_trigger(0))
+    return reasons
+
+
+def test_replay_updates_candle_store(ingestor):
+    _replay(ingestor)
+
+    klines = _fixture_klines()
+    closed = [kline for kline in klines if kline['x']]
+    df = ingestor.store.to_dataframe()
+
+    assert len(df) == HISTORY + len(closed) - 1
+    assert ingestor.store.last_timestamp == klines[-1]['t']
+    assert not ingestor._needs_resync
+
+    # Jede abgeschlossene Kerze steht mit ihrem letzten Stand im Store
+    for kline in closed:
+        row = df[df['timestamp'] == pd.to_datetime(kline['t'], unit='ms')].iloc[0]
+        assert row['close'] == pytest.approx(float(kline['c']))
+        assert row['high'] == pytest.approx(float(kline['h']))
+        assert row['low'] == pytest.approx(float(kline['l']))
+        assert row['volume'] == pytest.approx(float(kline['v']))
+
+
+def test_replay_trigger_reasons(ingestor):
+    reasons = _replay(ingestor)
+
+    closed = sum(1 for kline in _fixture_klines() if kline['x'])
+    assert reasons.count('Kerzenschluss') == closed
+    price_moves = [reason for reason in reasons if reason.startswith('Preisbewegung')]
+    assert price_moves
+    # Die erste Auslösung kommt von der Preisbewegung innerhalb der ersten Kerze (> 0.3%)
+    assert reasons[0].startswith('Preisbewegung')
+    for reason in price_moves:
+        assert float(reason.split()[1].rstrip('%')) >= config.STREAM_PRICE_TRIGGER_PERCENT * 100
+
+
+def test_gap_requests_rest_resync(ingestor, monkeypatch):
+    _replay(ingestor)
+    last_timestamp = ingestor.store.last_timestamp
+    length = len(ingestor.store)
+
+    # Zwei Kerzen fehlen (z.B. nach einem Verbindungsabbruch)
+    ingestor.handle_message({'data': {'e': 'kline', 'k': {
+        't': last_timestamp + 3 * BAR_MS, 'o': '59400', 'h': '59500', 'l': '59300', 'c': '59450', 'v': '1.0', 'x': False}}})
+    assert ingestor._needs_resync
+    assert ingestor.store.last_timestamp == last_timestamp
+    assert len(ingestor.store) == length
+
+    calls = []
+
+    def update_historical_data(exchange, symbol, timeframe, limit, store_lock=None):
+        calls.append((symbol, timeframe, store_lock))
+        return ingestor.store.to_dataframe()
+
+    monkeypatch.setattr(exchange_handler, 'update_historical_data', update_historical_data)
+    ingestor.get_dataframe(exchange=None)
+    assert calls == [('BTC/USDT', '15m', ingestor._lock)]
+    assert not ingestor._needs_resync
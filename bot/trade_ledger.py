@@ -0,0 +1,196 @@
+"""
+Append-only Trade-Ledger im kompakten Binärformat (ersetzt das Neuschreiben von bot_performance.csv
+nach jedem Trade).
+
+Jeder Trade ist ein Datensatz fester Länge (LEDGER_DTYPE). add_trade hängt genau einen Datensatz an,
+unabhängig von der Länge der Historie. Beim Laden wird die Datei mit einem einzigen np.fromfile
+gelesen; die Spalten (profit, day, ...) stehen danach direkt als numpy-Arrays zur Verfügung - auch
+Jahre an Trades sind so in Millisekunden geladen. Ein nach einem Absturz unvollständiger letzter
+Datensatz wird verworfen.
+"""
+import os
+import threading
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from colorama import Fore, Style
+import utils
+import config
+
+
+LEDGER_MAGIC = b"TRADELEDGER\x00\x00\x00\x00\x01"  # 16 Bytes, letztes Byte = Formatversion
+
+LEDGER_DTYPE = np.dtype([
+    ('time', '<f8'),            # Unix-Zeitstempel des Ausstiegs
+    ('day', '<i4'),             # Lokales Datum als Ordinalzahl (date.toordinal) für den Tages-P&L
+    ('type', 'S8'),             # LONG, SHORT oder SPOT
+    ('entry_price', '<f8'),
+    ('exit_price', '<f8'),
+    ('position_size', '<f8'),
+    ('profit', '<f8'),
+    ('profit_percent', '<f8'),
+    ('quote_currency', 'S12'),
+    ('base_currency', 'S12'),
+    ('symbol', 'S24')
+])
+
+TEXT_FIELDS = ('type', 'quote_currency', 'base_currency', 'symbol')
+
+
+def trade_datetime(value):
+    """Wandelt den Zeitpunkt eines Trades (datetime, pd.Timestamp, String oder Unix-Zeit) in datetime um"""
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return datetime.fromtimestamp(float(value))
+    if isinstance(value, str):
+        return pd.to_datetime(value).to_pydatetime()
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    return value
+
+
+def trade_to_record(trade):
+    """
+    Wandelt ein Trade-Dictionary (Schlüssel wie in PerformanceTracker.add_trade) in einen Datensatz um.
+
+    Returns:
+    np.ndarray: Array der Länge 1 mit LEDGER_DTYPE
+    """
+    trade_time = trade_datetime(trade['time'])
+    record = np.zeros(1, dtype=LEDGER_DTYPE)
+    record['time'] = trade_time.timestamp()
+    record['day'] = trade_time.date().toordinal()
+    for field in ('entry_price', 'exit_price', 'position_size', 'profit', 'profit_percent'):
+        value = trade.get(field)
+        record[field] = float(value) if value is not None and not pd.isna(value) else 0.0
+    for field in TEXT_FIELDS:
+        value = trade.get(field)
+        record[field] = str(value).encode() if value is not None and not pd.isna(value) else b""
+    return record
+
+
+def records_to_trades(records):
+    """Wandelt Ledger-Datensätze zurück in Trade-Dictionaries (z.B. für den CSV-Export)"""
+    trades = []
+    for record in records:
+        trade = {field: record[field].item() for field in LEDGER_DTYPE.names if field != 'day'}
+        trade['time'] = datetime.fromtimestamp(trade['time'])
+        for field in TEXT_FIELDS:
+            trade[field] = trade[field].decode()
+        trades.append(trade)
+    return trades
+
+
+class TradeLedger:
+    """Append-only Datei mit allen abgeschlossenen Trades"""
+
+    def __init__(self, path=None):
+        """
+        Parameters:
+        path: Ledger-Datei (Standard: config.PERFORMANCE_LEDGER_FILE)
+        """
+        self.path = path or config.PERFORMANCE_LEDGER_FILE
+        self._file = None
+        self._lock = threading.Lock()
+
+        if not os.path.exists(self.path):
+            self._create()
+            if os.path.exists(config.PERFORMANCE_FILE):
+                self.import_csv(config.PERFORMANCE_FILE)
+        else:
+            self._repair()
+
+    def _create(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'wb') as f:
+            f.write(LEDGER_MAGIC)
+
+    def _repair(self):
+        """Prüft die Kennung und schneidet einen unvollständigen letzten Datensatz ab"""
+        with open(self.path, 'rb') as f:
+            magic = f.read(len(LEDGER_MAGIC))
+        if magic != LEDGER_MAGIC:
+            raise ValueError(f"{self.path} ist kein Trade-Ledger (oder hat ein unbekanntes Format)")
+        payload = os.path.getsize(self.path) - len(LEDGER_MAGIC)
+        if payload % LEDGER_DTYPE.itemsize:
+            os.truncate(self.path, len(LEDGER_MAGIC) + payload - payload % LEDGER_DTYPE.itemsize)
+
+    def __len__(self):
+        return (os.path.getsize(self.path) - len(LEDGER_MAGIC)) // LEDGER_DTYPE.itemsize
+
+    def append(self, trade):
+        """
+        Hängt einen Trade an (ein write + fsync, unabhängig von der Anzahl bisheriger Trades).
+
+        Parameters:
+        trade: Trade-Dictionary wie in PerformanceTracker.add_trade
+        """
+        self.append_records(trade_to_record(trade))
+
+    def append_records(self, records):
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'ab')
+            self._file.write(records.tobytes())
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def read(self):
+        """
+        Lädt alle Trades spaltenweise.
+
+        Returns:
+        np.ndarray: Strukturiertes Array mit LEDGER_DTYPE (z.B. records['profit'])
+        """
+        with self._lock:
+            count = len(self)
+            with open(self.path, 'rb') as f:
+                f.seek(len(LEDGER_MAGIC))
+                return np.fromfile(f, dtype=LEDGER_DTYPE, count=count)
+
+    def import_csv(self, path):
+        """Übernimmt einmalig die Trades aus der früheren CSV-Datei (bot_performance.csv)"""
+        try:
+            if os.path.getsize(path) == 0:
+                return 0
+            trades = pd.read_csv(path).to_dict('records')
+            if not trades:
+                return 0
+            self.append_records(np.concatenate([trade_to_record(trade) for trade in trades]))
+            print(f"{Fore.CYAN}[{datetime.now().strftime('%H:%M:%S')}] {len(trades)} Trades aus {path} in das Trade-Ledger übernommen.{Style.RESET_ALL}")
+            return len(trades)
+        except Exception as e:
+            utils.log_error(e, "Fehler beim Übernehmen der Performance-Daten aus der CSV-Datei")
+            return 0
+
+    def export_csv(self, path=None):
+        """Schreibt alle Trades als CSV (nur auf Anforderung, z.B. zur Auswertung in einer Tabellenkalkulation)"""
+        path = path or config.PERFORMANCE_FILE
+        pd.DataFrame(records_to_trades(self.read())).to_csv(path, index=False)
+        return path
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+# Globale Registry (ein Ledger pro Datei)
+_ledgers = {}
+_ledgers_lock = threading.Lock()
+
+
+def get_trade_ledger(path=None):
+    """
+    Gibt das Trade-Ledger einer Datei zurück (Standard: config.PERFORMANCE_LEDGER_FILE).
+
+    Returns:
+    TradeLedger: Ledger-Instanz
+    """
+    path = path or config.PERFORMANCE_LEDGER_FILE
+    with _ledgers_lock:
+        if path not in _ledgers:
+            _ledgers[path] = TradeLedger(path)
+        return _ledgers[path]